@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+"""
+Ingest throughput benchmark against a local PNCP stand-in.
+
+Runs a full ``collect_all_municipios`` (and, optionally, the item/result
+harvest of every collected bidding) with the collectors' HTTP client routed
+to ``tests.fake_pncp.FakePNCP``, on a throwaway SQLite database, and reports
+records/sec, request counts and peak memory.
+
+Usage:
+    python -m benchmarks.bench_ingest --municipios 10 --licitacoes 50 --itens
+    python -m benchmarks.bench_ingest --incremental --latency 0.05 --rate-429 0.02 --json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import resource
+import tempfile
+import tracemalloc
+from typing import Any, Dict
+
+import click
+
+# Settings are read when src is imported: point the run at a scratch
+# database and lift the politeness limits that only matter for the real API.
+_DB_DIR = tempfile.mkdtemp(prefix="lap-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_DB_DIR, 'bench.db')}")
+os.environ.setdefault("PNCP_RATE_LIMIT", "100000")
+os.environ.setdefault("PNCP_RETRY_DELAY", "0")
+os.environ.setdefault("PNCP_RETRY_MAX_DELAY", "0")
+os.environ.setdefault("PNCP_ARCHIVE_ENABLED", "false")
+os.environ.setdefault("DEBUG", "false")
+
+from src.collectors.adaptive import pncp_concurrency  # noqa: E402
+from src.collectors.http_client import http_client_manager  # noqa: E402
+from src.database.connection import get_db_context, init_db  # noqa: E402
+from src.database.repositories import LicitacaoRepository  # noqa: E402
+from src.models import Municipio  # noqa: E402
+from src.services.coleta_service import ColetaService  # noqa: E402
+from tests.fake_pncp import FakePNCP  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def criar_municipios(quantidade: int) -> list:
+    """
+    Insert synthetic municipalities.
+    
+    Args:
+        quantidade: Number of municipalities
+    
+    Returns:
+        IBGE codes created
+    """
+    codigos = [f"52{i:05d}" for i in range(1, quantidade + 1)]
+    with get_db_context() as db:
+        for i, codigo in enumerate(codigos):
+            if not db.query(Municipio).filter(Municipio.codigo_ibge == codigo).first():
+                db.add(Municipio(codigo_ibge=codigo, municipio=f"Município {codigo}", uf="GO", distancia_km=i))
+        db.commit()
+    return codigos
+
+
+async def colher_itens(service: ColetaService, concorrencia: int) -> Dict[str, int]:
+    """
+    Harvest items and results of every bidding without items.
+    
+    Args:
+        service: Collection service
+        concorrencia: Biddings harvested at once
+    
+    Returns:
+        Item, result and error totals
+    """
+    with get_db_context() as db:
+        ids = LicitacaoRepository(db).get_ids_sem_itens()
+    
+    semaforo = asyncio.Semaphore(concorrencia)
+    
+    async def run(licitacao_id: int) -> Dict[str, int]:
+        async with semaforo:
+            return await service.collect_itens_and_resultados(licitacao_id)
+    
+    totais = {'itens': 0, 'resultados': 0, 'erros_itens': 0}
+    for stats in await asyncio.gather(*(run(i) for i in ids)):
+        for chave in totais:
+            totais[chave] += stats.get(chave, 0)
+    return totais
+
+
+async def executar(
+    fake: FakePNCP,
+    years: int,
+    incremental: bool,
+    concorrencia: int,
+    itens: bool
+) -> Dict[str, Any]:
+    """
+    Run one benchmark pass.
+    
+    Returns:
+        Report with throughput, requests and memory
+    """
+    service = ColetaService()
+    relatorio: Dict[str, Any] = {}
+    
+    with fake.mounted():
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        
+        stats = await service.collect_all_municipios(
+            years=years, incremental=incremental, concorrencia=concorrencia
+        )
+        duracao_coleta = time.perf_counter() - inicio
+        relatorio['licitacoes'] = stats['total_licitacoes']
+        relatorio['licitacoes_por_s'] = round(stats['total_licitacoes'] / duracao_coleta, 1) if duracao_coleta else 0.0
+        relatorio['duracao_coleta_s'] = round(duracao_coleta, 3)
+        
+        if itens:
+            inicio_itens = time.perf_counter()
+            totais = await colher_itens(service, concorrencia)
+            duracao_itens = time.perf_counter() - inicio_itens
+            registros = totais['itens'] + totais['resultados']
+            relatorio.update(totais)
+            relatorio['itens_resultados_por_s'] = round(registros / duracao_itens, 1) if duracao_itens else 0.0
+            relatorio['duracao_itens_s'] = round(duracao_itens, 3)
+        
+        duracao = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        await http_client_manager.aclose()
+    
+    registros = relatorio['licitacoes'] + relatorio.get('itens', 0) + relatorio.get('resultados', 0)
+    relatorio.update({
+        'registros': registros,
+        'registros_por_s': round(registros / duracao, 1) if duracao else 0.0,
+        'duracao_s': round(duracao, 3),
+        'requests': dict(fake.requests, total=fake.total_requests),
+        'respostas': {str(status): total for status, total in sorted(fake.respostas.items())},
+        'pico_memoria_mb': round(pico / (1024 * 1024), 2),
+        # ru_maxrss is in KiB on Linux
+        'pico_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+        'concorrencia_pncp': pncp_concurrency.snapshot()
+    })
+    return relatorio
+
+
+@click.command()
+@click.option('--municipios', default=10, help='Synthetic municipalities')
+@click.option('--licitacoes', default=50, help='Biddings per listing query (municipality × window)')
+@click.option('--years', '-y', default=1, help='Years collected')
+@click.option('--incremental', is_flag=True, help='Incremental collection instead of the full backfill')
+@click.option('--itens/--sem-itens', default=False, help='Also harvest items and results')
+@click.option('--itens-por-licitacao', default=3, help='Items of each bidding')
+@click.option('--resultados-por-item', default=1, help='Results of each item')
+@click.option('--concurrency', '-c', default=4, help='Municipalities (or biddings) collected at once')
+@click.option('--latency', default=0.0, help='Seconds added to every fake response')
+@click.option('--rate-429', default=0.0, help='Fraction of requests answered with 429')
+@click.option('--error-rate', default=0.0, help='Fraction of requests answered with 503')
+@click.option('--json', 'as_json', is_flag=True, help='Print the report as JSON')
+def main(municipios, licitacoes, years, incremental, itens, itens_por_licitacao, resultados_por_item,
+         concurrency, latency, rate_429, error_rate, as_json):
+    """Benchmark ingest throughput against a local PNCP stand-in."""
+    logging.basicConfig(level=logging.WARNING)
+    
+    init_db()
+    codigos = criar_municipios(municipios)
+    fake = FakePNCP(
+        codigos,
+        licitacoes_por_consulta=licitacoes,
+        itens_por_licitacao=itens_por_licitacao,
+        resultados_por_item=resultados_por_item,
+        latencia=latency,
+        taxa_429=rate_429,
+        taxa_erro=error_rate
+    )
+    
+    relatorio = asyncio.run(executar(fake, years, incremental, concurrency, itens))
+    relatorio['banco'] = os.environ["DATABASE_URL"]
+    
+    if as_json:
+        click.echo(json.dumps(relatorio, indent=2, default=str))
+        return
+    
+    click.echo(f"Records:        {relatorio['registros']} in {relatorio['duracao_s']}s "
+               f"({relatorio['registros_por_s']}/s)")
+    click.echo(f"  Licitações:   {relatorio['licitacoes']} ({relatorio['licitacoes_por_s']}/s)")
+    if itens:
+        click.echo(f"  Itens:        {relatorio['itens']}, resultados: {relatorio['resultados']} "
+                   f"({relatorio['itens_resultados_por_s']}/s)")
+    click.echo(f"Requests:       {relatorio['requests']}")
+    click.echo(f"Responses:      {relatorio['respostas']}")
+    click.echo(f"Peak memory:    {relatorio['pico_memoria_mb']} MB traced, {relatorio['pico_rss_mb']} MB RSS")
+    click.echo(f"PNCP limit:     {relatorio['concorrencia_pncp']}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
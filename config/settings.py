@@ -15,6 +15,18 @@ class Settings(BaseSettings):
     DATABASE_NAME: str = "lap_db"
     DATABASE_USER: str = "lap_user"
     DATABASE_PASSWORD: str = "lap_password"
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    # Async driver URL (derived from DATABASE_URL when empty)
+    DATABASE_ASYNC_URL: str = ""
+    # Read replicas (comma-separated URLs) serving read-only routes
+    DATABASE_REPLICA_URLS: str = ""
+    DATABASE_REPLICA_MAX_LAG: float = 30.0
+    DATABASE_REPLICA_CHECK_INTERVAL: float = 10.0
+    # Monthly partitions of licitacoes/itens/resultados (migration 018)
+    DATABASE_PARTITION_MONTHS_AHEAD: int = 3
+    DATABASE_PARTITION_RETENTION_MONTHS: int = 0
+    DATABASE_PARTITION_MAINTENANCE_TIME: str = "03:30"
     
     # Redis Configuration
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -25,6 +37,9 @@ class Settings(BaseSettings):
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     API_WORKERS: int = 4
+    API_COUNT_LIMIT: int = 10000
+    API_MAX_OFFSET: int = 1000
+    API_THREADPOOL_SIZE: int = 20
     DEBUG: bool = True
     
     # PNCP API Configuration
@@ -32,11 +47,55 @@ class Settings(BaseSettings):
     PNCP_TIMEOUT: int = 30
     PNCP_MAX_RETRIES: int = 3
     PNCP_RETRY_DELAY: int = 5
+    PNCP_RETRY_MAX_DELAY: int = 60
+    PNCP_RATE_LIMIT: float = 5.0
+    PNCP_RATE_BURST: int = 10
+    
+    # PNCP HTTP Connection Pool
+    PNCP_HTTP2: bool = False
+    PNCP_MAX_CONNECTIONS: int = 20
+    PNCP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    PNCP_KEEPALIVE_EXPIRY: float = 30.0
+    PNCP_HOST_CONCURRENCY: int = 10
+    
+    # PNCP Adaptive Concurrency and Circuit Breaker
+    PNCP_ADAPTIVE_CONCURRENCY: bool = True
+    PNCP_INITIAL_CONCURRENCY: int = 4
+    PNCP_MIN_CONCURRENCY: int = 1
+    PNCP_TARGET_P95_LATENCY: float = 5.0
+    PNCP_BREAKER_FAILURE_THRESHOLD: int = 5
+    PNCP_BREAKER_OPEN_SECONDS: float = 30.0
+    
+    # PNCP Pagination
+    PNCP_PAGE_CONCURRENCY: int = 4
+    PNCP_PAGE_RETRY_ROUNDS: int = 2
+    
+    # Raw Response Archive
+    PNCP_ARCHIVE_ENABLED: bool = False
+    PNCP_ARCHIVE_DIR: str = "data/pncp_archive"
+    
+    # Ingestion Pipeline
+    INGEST_QUEUE_SIZE: int = 8
+    INGEST_WRITE_BATCH_SIZE: int = 200
+    INGEST_OFFLOAD_WRITES: bool = True
+    INGEST_REPLAY_COMMIT_ROWS: int = 50000
+    
+    # Collection Work Queue
+    WORK_QUEUE_LEASE_SECONDS: int = 300
+    WORK_QUEUE_MAX_ATTEMPTS: int = 3
+    WORK_QUEUE_CONCURRENCY: int = 2
+    WORK_QUEUE_POLL_INTERVAL: float = 10.0
     
     # Scheduler Configuration
     SCHEDULER_ENABLED: bool = True
     SCHEDULER_TIMEZONE: str = "America/Sao_Paulo"
     COLLECTION_TIMES: str = "06:00,12:00,18:00,00:00"
+    COLLECTION_OVERLAP_DAYS: int = 1
+    COLLECTION_UF_SWEEP: bool = False
+    COLLECTION_MUNICIPIO_CONCURRENCY: int = 4
+    COLLECTION_QUEUE_CHANGED: bool = True
+    BACKFILL_GRANULARITY: str = "mes"
+    BACKFILL_PARALLELISM: int = 4
     
     # Email Notifications
     SMTP_HOST: str = "smtp.gmail.com"
@@ -73,3 +132,8 @@ settings = Settings()
 def get_collection_times() -> List[str]:
     """Get collection times from settings."""
     return [time.strip() for time in settings.COLLECTION_TIMES.split(",")]
+
+
+def get_database_replica_urls() -> List[str]:
+    """Get read replica URLs from settings."""
+    return [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
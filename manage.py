@@ -9,6 +9,7 @@ from typing import Optional
 import click
 
 from src.services.coleta_service import ColetaService
+from src.collectors.http_client import http_client_manager
 from src.database.connection import init_db
 
 logging.basicConfig(
@@ -57,22 +58,42 @@ def load_municipios():
 @cli.command()
 @click.option('--municipio', '-m', help='Municipality IBGE code')
 @click.option('--years', '-y', default=2, help='Number of years to collect')
-def collect(municipio: Optional[str], years: int):
-    """Collect bidding data."""
+@click.option('--full', is_flag=True, help='Full backfill of --years instead of incremental delta')
+@click.option('--sweep/--per-municipio', default=None,
+              help='Single UF-wide sweep instead of one query per municipality (default: COLLECTION_UF_SWEEP)')
+@click.option('--concurrency', '-c', type=int, default=None,
+              help='Municipalities collected at once (default: COLLECTION_MUNICIPIO_CONCURRENCY)')
+def collect(municipio: Optional[str], years: int, full: bool, sweep: Optional[bool], concurrency: Optional[int]):
+    """Collect bidding data (incremental unless --full)."""
     async def _collect():
         service = ColetaService()
+        modo = "full backfill" if full else "incremental"
         
-        if municipio:
-            click.echo(f"Collecting data for municipality {municipio}...")
-            count = await service.collect_licitacoes_for_municipio(municipio, years)
-            click.echo(f"✓ Collected {count} biddings!")
-        else:
-            click.echo("Collecting data for all municipalities...")
-            stats = await service.collect_all_municipios(years)
-            click.echo(f"✓ Collection complete!")
-            click.echo(f"  - Municipalities: {stats['total_municipios']}")
-            click.echo(f"  - Biddings: {stats['total_licitacoes']}")
-            click.echo(f"  - Errors: {stats['errors']}")
+        async with http_client_manager.lifespan():
+            if municipio:
+                click.echo(f"Collecting data for municipality {municipio} ({modo})...")
+                if full:
+                    count = await service.collect_licitacoes_for_municipio(municipio, years)
+                else:
+                    count = await service.collect_incremental_for_municipio(municipio, years)
+                click.echo(f"✓ Collected {count} biddings!")
+            else:
+                click.echo(f"Collecting data for all municipalities ({modo})...")
+                stats = await service.collect_all_municipios(
+                    years, incremental=not full, sweep=sweep, concorrencia=concurrency
+                )
+                click.echo(f"✓ Collection complete!")
+                click.echo(f"  - Municipalities: {stats['total_municipios']}")
+                if stats.get('varredura_uf'):
+                    click.echo(f"  - Records outside radius: {stats['registros_descartados']}")
+                click.echo(f"  - Biddings: {stats['total_licitacoes']}")
+                click.echo(f"  - Errors: {stats['errors']}")
+                por_municipio = stats.get('municipios', {})
+                for resultado in sorted(por_municipio.values(), key=lambda r: r['duracao_s'], reverse=True)[:5]:
+                    click.echo(
+                        f"    {resultado['municipio']}: {resultado['licitacoes']} biddings "
+                        f"in {resultado['duracao_s']:.1f}s" + (f" (error: {resultado['erro']})" if resultado['erro'] else "")
+                    )
     
     try:
         asyncio.run(_collect())
@@ -81,6 +102,164 @@ def collect(municipio: Optional[str], years: int):
         sys.exit(1)
 
 
+@cli.command()
+@click.option('--municipio', '-m', multiple=True, help='Municipality IBGE code (repeatable; default: all)')
+@click.option('--years', '-y', default=2, help='Number of years to cover')
+@click.option('--granularidade', '-g', type=click.Choice(['mes', 'semana']), default=None,
+              help='Shard size (default: BACKFILL_GRANULARITY)')
+@click.option('--paralelismo', '-p', type=int, default=None, help='Shards running at once (default: BACKFILL_PARALLELISM)')
+@click.option('--status', 'show_status', is_flag=True, help='Only show shard counts by status')
+def backfill(municipio: tuple, years: int, granularidade: Optional[str], paralelismo: Optional[int], show_status: bool):
+    """Sharded, resumable historical backfill (re-run to resume)."""
+    from src.services.backfill_service import BackfillService
+    
+    async def _backfill():
+        service = BackfillService()
+        
+        if show_status:
+            resumo = service.resumo()
+            click.echo("Backfill shards:")
+            for status_shard, total in sorted(resumo.items()):
+                click.echo(f"  - {status_shard}: {total}")
+            return
+        
+        async with http_client_manager.lifespan():
+            click.echo(f"Running backfill of {years} years...")
+            stats = await service.backfill(
+                years=years,
+                granularidade=granularidade,
+                paralelismo=paralelismo,
+                codigos_ibge=list(municipio) or None
+            )
+            click.echo("✓ Backfill run complete!")
+            click.echo(f"  - New shards: {stats['shards_planejados']}")
+            click.echo(f"  - Shards run: {stats['shards_executados']}")
+            click.echo(f"  - Failed shards: {stats['shards_com_erro']}")
+            click.echo(f"  - Biddings: {stats['total_licitacoes']}")
+            click.echo(f"  - Municipalities completed: {stats['municipios_concluidos']}")
+            if stats['shards_com_erro']:
+                click.echo("Run the command again to retry the failed shards.")
+    
+    try:
+        asyncio.run(_backfill())
+    except Exception as e:
+        click.echo(f"✗ Error running backfill: {e}", err=True)
+        sys.exit(1)
+
+
+@cli.command()
+@click.option('--municipio', '-m', multiple=True, help='Municipality IBGE code (repeatable; default: all)')
+@click.option('--years', '-y', default=2, help='Number of years of backfill windows to enqueue')
+@click.option('--granularidade', '-g', type=click.Choice(['mes', 'semana']), default=None,
+              help='Window size (default: BACKFILL_GRANULARITY)')
+@click.option('--itens', is_flag=True, help='Enqueue item/result harvests of biddings without items instead')
+def enqueue(municipio: tuple, years: int, granularidade: Optional[str], itens: bool):
+    """Add collection units to the shared work queue."""
+    from src.services.work_queue_service import WorkQueueService
+    
+    try:
+        service = WorkQueueService()
+        codigos_ibge = list(municipio) or None
+        if itens:
+            total = service.enfileirar_itens(codigos_ibge)
+            click.echo(f"✓ Enqueued {total} item harvest tasks")
+        else:
+            total = service.enfileirar_backfill(years, granularidade, codigos_ibge)
+            click.echo(f"✓ Enqueued {total} backfill window tasks")
+    except Exception as e:
+        click.echo(f"✗ Error enqueueing tasks: {e}", err=True)
+        sys.exit(1)
+
+
+@cli.command()
+@click.option('--concurrency', '-c', type=int, default=None, help='Tasks run at once (default: WORK_QUEUE_CONCURRENCY)')
+@click.option('--max-tasks', type=int, default=None, help='Stop after this many tasks')
+@click.option('--wait/--until-empty', default=False, help='Keep polling for new tasks or stop when the queue is empty')
+@click.option('--status', 'show_status', is_flag=True, help='Only show task counts by type and status')
+def worker(concurrency: Optional[int], max_tasks: Optional[int], wait: bool, show_status: bool):
+    """Claim and run queued collection units (run on as many nodes as needed)."""
+    from src.services.work_queue_service import ColetaWorker, WorkQueueService
+    
+    if show_status:
+        click.echo("Work queue:")
+        for tipo, contagem in sorted(WorkQueueService().resumo().items()):
+            detalhes = ", ".join(f"{status_tarefa}: {total}" for status_tarefa, total in sorted(contagem.items()))
+            click.echo(f"  - {tipo}: {detalhes}")
+        return
+    
+    async def _worker():
+        coleta_worker = ColetaWorker()
+        async with http_client_manager.lifespan():
+            click.echo(f"Worker {coleta_worker.worker_id} started...")
+            stats = await coleta_worker.run(concorrencia=concurrency, max_tarefas=max_tasks, aguardar=wait)
+            click.echo("✓ Worker finished!")
+            click.echo(f"  - Tasks completed: {stats['tarefas_concluidas']}")
+            click.echo(f"  - Tasks failed: {stats['tarefas_com_erro']}")
+            click.echo(f"  - Leases lost: {stats['leases_perdidos']}")
+    
+    try:
+        asyncio.run(_worker())
+    except Exception as e:
+        click.echo(f"✗ Error running worker: {e}", err=True)
+        sys.exit(1)
+
+
+@cli.command()
+@click.option('--workers', '-w', type=int, default=None, help='Parser processes (default: number of CPUs)')
+@click.option('--archive-dir', default=None, help='Archive directory (default: PNCP_ARCHIVE_DIR)')
+def replay(workers: Optional[int], archive_dir: Optional[str]):
+    """Rebuild biddings, items and results from archived PNCP responses."""
+    from src.collectors.archive import ResponseArchive
+    from src.services.replay_service import ReplayService
+    
+    try:
+        archive = ResponseArchive(archive_dir) if archive_dir else None
+        service = ReplayService(archive)
+        click.echo(f"Replaying archived responses from {service.archive.root}...")
+        stats = service.replay(workers=workers)
+        click.echo("✓ Replay complete!")
+        click.echo(f"  - Files: {stats['arquivos']}")
+        click.echo(f"  - Biddings: {stats['licitacoes']}")
+        click.echo(f"  - Items: {stats['itens']}")
+        click.echo(f"  - Results: {stats['resultados']}")
+        click.echo(f"  - Skipped: {stats['ignorados']}")
+        click.echo(f"  - Errors: {stats['erros']}")
+    except Exception as e:
+        click.echo(f"✗ Error replaying archive: {e}", err=True)
+        sys.exit(1)
+
+
+@cli.command()
+@click.option('--ahead', type=int, default=None, help='Months to create ahead (default: DATABASE_PARTITION_MONTHS_AHEAD)')
+@click.option('--since', default=None, help='Also create the months since this one (YYYY-MM)')
+@click.option('--detach-before', default=None, help='Detach the months before this one (YYYY-MM) for archival')
+def partitions(ahead: Optional[int], since: Optional[str], detach_before: Optional[str]):
+    """Create monthly partitions ahead of time and detach old ones."""
+    from datetime import date, datetime
+    from config.settings import settings
+    from src.database.connection import get_db_context
+    from src.database.partitioning import add_months, create_partitions, detach_partitions, is_partitioned
+    
+    try:
+        with get_db_context() as db:
+            if not is_partitioned(db):
+                click.echo("Bidding tables are not partitioned (apply migration 018 first)")
+                return
+            
+            inicio = datetime.strptime(since, '%Y-%m').date() if since else None
+            meses = settings.DATABASE_PARTITION_MONTHS_AHEAD if ahead is None else ahead
+            criadas = create_partitions(db, inicio=inicio, fim=add_months(date.today(), meses + 1))
+            click.echo(f"✓ Created {len(criadas)} partitions")
+            
+            if detach_before:
+                desanexadas = detach_partitions(db, datetime.strptime(detach_before, '%Y-%m').date())
+                click.echo(f"✓ Detached {len(desanexadas)} partitions: {', '.join(desanexadas) or '-'}")
+                click.echo("  Archive them with pg_dump -t <table> and drop them when done")
+    except Exception as e:
+        click.echo(f"✗ Error maintaining partitions: {e}", err=True)
+        sys.exit(1)
+
+
 @cli.command()
 def run_api():
     """Run the API server."""
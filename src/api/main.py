@@ -1,11 +1,14 @@
 """FastAPI application main module."""
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from config.settings import settings
-from src.database.connection import init_db
+from src.collectors.adaptive import CIRCUITO_FECHADO, pncp_concurrency
+from src.collectors.http_client import http_client_manager
+from src.database.connection import dispose_async_engine, init_db, replica_router
 
 # Configure logging
 logging.basicConfig(
@@ -38,6 +41,11 @@ app.add_middleware(
 async def startup_event():
     """Initialize application on startup."""
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    
+    # Sync (def) handlers run in this threadpool, off the event loop; its
+    # size bounds the blocking requests served at once by this worker
+    to_thread.current_default_thread_limiter().total_tokens = settings.API_THREADPOOL_SIZE
+    
     try:
         init_db()
         logger.info("Database initialized successfully")
@@ -49,6 +57,8 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down application")
+    await http_client_manager.aclose()
+    await dispose_async_engine()
 
 
 @app.get("/")
@@ -67,6 +77,28 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/health/coleta")
+async def health_coleta():
+    """PNCP concurrency limits and circuit breaker state per host."""
+    hosts = pncp_concurrency.snapshot()
+    circuito_aberto = any(h["circuito"]["estado"] != CIRCUITO_FECHADO for h in hosts.values())
+    return {
+        "status": "degraded" if circuito_aberto else "healthy",
+        "hosts": hosts
+    }
+
+
+@app.get("/health/replicas")
+def health_replicas():
+    """Last health check (reachability, replication lag) of the read replicas."""
+    replicas = replica_router.status()
+    return {
+        "status": "degraded" if any(r["saudavel"] is False for r in replicas) else "healthy",
+        "max_lag_s": replica_router.max_lag,
+        "replicas": replicas
+    }
+
+
 # Import and include routers
 from src.api.routes import (
     licitacoes, municipios, anomalias, alertas, 
@@ -5,13 +5,19 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
+from config.settings import settings
 from src.database.connection import get_db
+from src.database.pagination import COUNT_ESTIMATED, count_total, paginate_keyset, paginate_offset
+from src.exceptions import ValidationError
 from src.models import AlertaConfiguracao, AlertaDisparado
 from src.services.alerta_service import AlertaService
 
 
 router = APIRouter(prefix="/api/v1/alertas", tags=["Alertas"])
 
+# Sort keys of the triggered alert list: newest first, ID breaking ties
+DISPARADOS_SORT_KEYS = (AlertaDisparado.created_at, AlertaDisparado.id)
+
 
 class AlertaConfigSchema(BaseModel):
     nome: str
@@ -27,7 +33,7 @@ class AlertaConfigSchema(BaseModel):
 
 
 @router.get("/configuracoes", response_model=dict)
-async def listar_configuracoes_alerta(
+def listar_configuracoes_alerta(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db)
@@ -71,7 +77,7 @@ async def listar_configuracoes_alerta(
 
 
 @router.post("/configuracoes", response_model=dict)
-async def criar_configuracao_alerta(
+def criar_configuracao_alerta(
     config: AlertaConfigSchema,
     db: Session = Depends(get_db)
 ):
@@ -93,7 +99,7 @@ async def criar_configuracao_alerta(
 
 
 @router.get("/configuracoes/{id}", response_model=dict)
-async def detalhe_configuracao_alerta(id: int, db: Session = Depends(get_db)):
+def detalhe_configuracao_alerta(id: int, db: Session = Depends(get_db)):
     """Get alert configuration details."""
     config = db.query(AlertaConfiguracao).filter(AlertaConfiguracao.id == id).first()
     
@@ -117,7 +123,7 @@ async def detalhe_configuracao_alerta(id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/configuracoes/{id}", response_model=dict)
-async def atualizar_configuracao_alerta(
+def atualizar_configuracao_alerta(
     id: int,
     config: AlertaConfigSchema,
     db: Session = Depends(get_db)
@@ -154,7 +160,7 @@ async def atualizar_configuracao_alerta(
 
 
 @router.delete("/configuracoes/{id}", response_model=dict)
-async def deletar_configuracao_alerta(id: int, db: Session = Depends(get_db)):
+def deletar_configuracao_alerta(id: int, db: Session = Depends(get_db)):
     """Delete alert configuration."""
     config = db.query(AlertaConfiguracao).filter(AlertaConfiguracao.id == id).first()
     
@@ -168,29 +174,37 @@ async def deletar_configuracao_alerta(id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/disparados", response_model=dict)
-async def listar_alertas_disparados(
+def listar_alertas_disparados(
     enviado: Optional[bool] = None,
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1, description="OFFSET pagination (deprecated, use cursor)"),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query(COUNT_ESTIMATED, pattern="^(exact|estimated|none)$"),
     db: Session = Depends(get_db)
 ):
-    """List triggered alerts."""
+    """List triggered alerts, newest first, with cursor pagination."""
     # Build query
     query = db.query(AlertaDisparado)
     
     if enviado is not None:
         query = query.filter(AlertaDisparado.enviado == enviado)
     
-    # Count total
-    total = query.count()
-    
-    # Paginate
-    offset = (page - 1) * per_page
-    alertas = query.order_by(AlertaDisparado.created_at.desc()).offset(offset).limit(per_page).all()
+    # Paginate (page > 1 without a cursor keeps the old OFFSET behaviour,
+    # up to API_MAX_OFFSET rows)
+    try:
+        if page > 1 and not cursor:
+            resultado = paginate_offset(
+                query, DISPARADOS_SORT_KEYS, (page - 1) * per_page, per_page, settings.API_MAX_OFFSET
+            )
+        else:
+            resultado = paginate_keyset(query, DISPARADOS_SORT_KEYS, per_page, cursor)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    total, total_exact = count_total(query, count, settings.API_COUNT_LIMIT)
     
     # Convert to dict
     items = []
-    for alerta in alertas:
+    for alerta in resultado.items:
         items.append({
             'id': alerta.id,
             'configuracao_id': alerta.configuracao_id,
@@ -205,14 +219,16 @@ async def listar_alertas_disparados(
     return {
         'items': items,
         'total': total,
+        'total_exact': total_exact,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page
+        'pages': (total + per_page - 1) // per_page if total is not None else None,
+        'next_cursor': resultado.next_cursor
     }
 
 
 @router.post("/disparados/{id}/reenviar", response_model=dict)
-async def reenviar_alerta(id: int, db: Session = Depends(get_db)):
+def reenviar_alerta(id: int, db: Session = Depends(get_db)):
     """Resend alert."""
     alerta = db.query(AlertaDisparado).filter(AlertaDisparado.id == id).first()
     
@@ -236,7 +252,7 @@ async def reenviar_alerta(id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/estatisticas", response_model=dict)
-async def estatisticas_alertas(db: Session = Depends(get_db)):
+def estatisticas_alertas(db: Session = Depends(get_db)):
     """Get alert statistics."""
     from sqlalchemy import func
     
@@ -6,7 +6,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
+from config.settings import settings
 from src.database.connection import get_db
+from src.database.pagination import COUNT_ESTIMATED, count_total, paginate_keyset, paginate_offset
+from src.exceptions import ValidationError
 from src.models import Anomalia
 from src.services.anomalia_service import AnomaliaService
 from pydantic import BaseModel
@@ -14,6 +17,9 @@ from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/v1/anomalias", tags=["Anomalias"])
 
+# Sort keys of the anomaly list: newest first, ID breaking ties
+SORT_KEYS = (Anomalia.created_at, Anomalia.id)
+
 
 class AnomaliaResponse(BaseModel):
     id: int
@@ -42,18 +48,48 @@ class StatusUpdate(BaseModel):
     analisado_por: Optional[str] = None
 
 
+def _anomalia_dict(anomalia: Anomalia) -> dict:
+    """Convert an anomaly to its response dictionary."""
+    return {
+        'id': anomalia.id,
+        'licitacao_id': anomalia.licitacao_id,
+        'item_id': anomalia.item_id,
+        'fornecedor_id': anomalia.fornecedor_id,
+        'tipo': anomalia.tipo,
+        'descricao': anomalia.descricao,
+        'valor_detectado': float(anomalia.valor_detectado) if anomalia.valor_detectado else None,
+        'valor_referencia': float(anomalia.valor_referencia) if anomalia.valor_referencia else None,
+        'percentual_desvio': float(anomalia.percentual_desvio) if anomalia.percentual_desvio else None,
+        'score_risco': float(anomalia.score_risco) if anomalia.score_risco else None,
+        'status': anomalia.status,
+        'observacoes': anomalia.observacoes,
+        'analisado_por': anomalia.analisado_por,
+        'analisado_em': anomalia.analisado_em.isoformat() if anomalia.analisado_em else None,
+        'created_at': anomalia.created_at.isoformat() if anomalia.created_at else None
+    }
+
+
 @router.get("/", response_model=dict)
-async def listar_anomalias(
+def listar_anomalias(
     tipo: Optional[str] = None,
     status: Optional[str] = None,
     municipio_id: Optional[int] = None,
     data_inicio: Optional[date] = None,
     data_fim: Optional[date] = None,
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1, description="OFFSET pagination (deprecated, use cursor)"),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    count: str = Query(COUNT_ESTIMATED, pattern="^(exact|estimated|none)$"),
     db: Session = Depends(get_db)
 ):
-    """List detected anomalies with filters."""
+    """
+    List detected anomalies with filters, newest first.
+    
+    Pages are fetched by cursor (``next_cursor`` of the previous page);
+    ``page`` only reaches API_MAX_OFFSET rows deep. ``total`` is estimated
+    by the planner, or capped at API_COUNT_LIMIT (``total_exact`` false)
+    with ``count=exact``.
+    """
     # Build query
     query = db.query(Anomalia)
     
@@ -74,72 +110,43 @@ async def listar_anomalias(
     if data_fim:
         query = query.filter(Anomalia.created_at <= data_fim)
     
-    # Count total
-    total = query.count()
-    
-    # Paginate
-    offset = (page - 1) * per_page
-    anomalias = query.order_by(Anomalia.created_at.desc()).offset(offset).limit(per_page).all()
-    
-    # Convert to dict
-    items = []
-    for anomalia in anomalias:
-        items.append({
-            'id': anomalia.id,
-            'licitacao_id': anomalia.licitacao_id,
-            'item_id': anomalia.item_id,
-            'fornecedor_id': anomalia.fornecedor_id,
-            'tipo': anomalia.tipo,
-            'descricao': anomalia.descricao,
-            'valor_detectado': float(anomalia.valor_detectado) if anomalia.valor_detectado else None,
-            'valor_referencia': float(anomalia.valor_referencia) if anomalia.valor_referencia else None,
-            'percentual_desvio': float(anomalia.percentual_desvio) if anomalia.percentual_desvio else None,
-            'score_risco': float(anomalia.score_risco) if anomalia.score_risco else None,
-            'status': anomalia.status,
-            'observacoes': anomalia.observacoes,
-            'analisado_por': anomalia.analisado_por,
-            'analisado_em': anomalia.analisado_em.isoformat() if anomalia.analisado_em else None,
-            'created_at': anomalia.created_at.isoformat() if anomalia.created_at else None
-        })
+    # Paginate (page > 1 without a cursor keeps the old OFFSET behaviour,
+    # up to API_MAX_OFFSET rows)
+    try:
+        if page > 1 and not cursor:
+            resultado = paginate_offset(
+                query, SORT_KEYS, (page - 1) * per_page, per_page, settings.API_MAX_OFFSET
+            )
+        else:
+            resultado = paginate_keyset(query, SORT_KEYS, per_page, cursor)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    total, total_exact = count_total(query, count, settings.API_COUNT_LIMIT)
     
     return {
-        'items': items,
+        'items': [_anomalia_dict(anomalia) for anomalia in resultado.items],
         'total': total,
+        'total_exact': total_exact,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page
+        'pages': (total + per_page - 1) // per_page if total is not None else None,
+        'next_cursor': resultado.next_cursor
     }
 
 
 @router.get("/{id}", response_model=dict)
-async def detalhe_anomalia(id: int, db: Session = Depends(get_db)):
+def detalhe_anomalia(id: int, db: Session = Depends(get_db)):
     """Get anomaly details."""
     anomalia = db.query(Anomalia).filter(Anomalia.id == id).first()
     
     if not anomalia:
         raise HTTPException(status_code=404, detail="Anomalia não encontrada")
     
-    return {
-        'id': anomalia.id,
-        'licitacao_id': anomalia.licitacao_id,
-        'item_id': anomalia.item_id,
-        'fornecedor_id': anomalia.fornecedor_id,
-        'tipo': anomalia.tipo,
-        'descricao': anomalia.descricao,
-        'valor_detectado': float(anomalia.valor_detectado) if anomalia.valor_detectado else None,
-        'valor_referencia': float(anomalia.valor_referencia) if anomalia.valor_referencia else None,
-        'percentual_desvio': float(anomalia.percentual_desvio) if anomalia.percentual_desvio else None,
-        'score_risco': float(anomalia.score_risco) if anomalia.score_risco else None,
-        'status': anomalia.status,
-        'observacoes': anomalia.observacoes,
-        'analisado_por': anomalia.analisado_por,
-        'analisado_em': anomalia.analisado_em.isoformat() if anomalia.analisado_em else None,
-        'created_at': anomalia.created_at.isoformat() if anomalia.created_at else None
-    }
+    return _anomalia_dict(anomalia)
 
 
 @router.put("/{id}/status", response_model=dict)
-async def atualizar_status_anomalia(
+def atualizar_status_anomalia(
     id: int,
     update: StatusUpdate,
     db: Session = Depends(get_db)
@@ -175,7 +182,7 @@ async def atualizar_status_anomalia(
 
 
 @router.post("/executar-analise", response_model=dict)
-async def executar_analise_anomalias(
+def executar_analise_anomalias(
     licitacao_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
@@ -202,7 +209,7 @@ async def executar_analise_anomalias(
 
 
 @router.get("/tipos/lista", response_model=dict)
-async def listar_tipos_anomalia():
+def listar_tipos_anomalia():
     """List anomaly types."""
     return {
         'tipos': AnomaliaService.TIPOS_ANOMALIA
@@ -210,7 +217,7 @@ async def listar_tipos_anomalia():
 
 
 @router.get("/estatisticas/resumo", response_model=dict)
-async def estatisticas_anomalias(db: Session = Depends(get_db)):
+def estatisticas_anomalias(db: Session = Depends(get_db)):
     """Get anomaly statistics."""
     from sqlalchemy import func
     
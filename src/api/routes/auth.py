@@ -93,7 +93,7 @@ def get_user_by_id(user_id: int):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """
     Authenticate user and return JWT token.
     
@@ -142,7 +142,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+def get_current_user(token: str = Depends(oauth2_scheme)):
     """
     Get current authenticated user.
     
@@ -176,7 +176,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
 
 
 @router.post("/register", response_model=UserResponse)
-async def register_user(user_data: UserCreate):
+def register_user(user_data: UserCreate):
     """
     Register a new user.
     
@@ -1,5 +1,6 @@
 """API routes for CEIS/CNEP integration."""
 
+import asyncio
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
@@ -13,9 +14,9 @@ router = APIRouter(prefix="/api/v1/ceis-cnep", tags=["CEIS/CNEP"])
 
 
 @router.get("/verificar/{cnpj}", response_model=dict)
-async def verificar_impedimento(cnpj: str, db: Session = Depends(get_db)):
-    """Check if company is restricted."""
-    service = CEISCNEPService(db)
+async def verificar_impedimento(cnpj: str):
+    """Check if company is restricted (online query, no database access)."""
+    service = CEISCNEPService()
     
     try:
         resultado = await service.verificar_impedimento(cnpj)
@@ -26,7 +27,7 @@ async def verificar_impedimento(cnpj: str, db: Session = Depends(get_db)):
 
 
 @router.get("/empresas-impedidas", response_model=dict)
-async def listar_empresas_impedidas(
+def listar_empresas_impedidas(
     fonte: Optional[str] = Query(None, description="CEIS ou CNEP"),
     uf: Optional[str] = None,
     page: int = Query(1, ge=1),
@@ -87,12 +88,13 @@ async def listar_empresas_impedidas(
 
 
 @router.post("/atualizar-base", response_model=dict)
-async def atualizar_base_ceis_cnep(db: Session = Depends(get_db)):
+def atualizar_base_ceis_cnep(db: Session = Depends(get_db)):
     """Update local database of restricted companies."""
     service = CEISCNEPService(db)
     
     try:
-        await service.atualizar_base_local()
+        # Sync Session: the online queries run on this worker thread's own loop
+        asyncio.run(service.atualizar_base_local())
         
         return {
             'success': True,
@@ -103,7 +105,7 @@ async def atualizar_base_ceis_cnep(db: Session = Depends(get_db)):
 
 
 @router.get("/licitacao/{licitacao_id}/verificar", response_model=dict)
-async def verificar_fornecedores_licitacao(
+def verificar_fornecedores_licitacao(
     licitacao_id: int,
     db: Session = Depends(get_db)
 ):
@@ -111,7 +113,8 @@ async def verificar_fornecedores_licitacao(
     service = CEISCNEPService(db)
     
     try:
-        alertas = await service.verificar_fornecedores_licitacao(licitacao_id)
+        # Sync Session: the online queries run on this worker thread's own loop
+        alertas = asyncio.run(service.verificar_fornecedores_licitacao(licitacao_id))
         
         return {
             'licitacao_id': licitacao_id,
@@ -123,7 +126,7 @@ async def verificar_fornecedores_licitacao(
 
 
 @router.get("/fornecedor/{cnpj}/local", response_model=dict)
-async def verificar_fornecedor_local(cnpj: str, db: Session = Depends(get_db)):
+def verificar_fornecedor_local(cnpj: str, db: Session = Depends(get_db)):
     """Check if supplier is in local database of restricted companies."""
     service = CEISCNEPService(db)
     
@@ -154,7 +157,7 @@ async def verificar_fornecedor_local(cnpj: str, db: Session = Depends(get_db)):
 
 
 @router.get("/estatisticas", response_model=dict)
-async def estatisticas_ceis_cnep(db: Session = Depends(get_db)):
+def estatisticas_ceis_cnep(db: Session = Depends(get_db)):
     """Get CEIS/CNEP statistics."""
     from sqlalchemy import func
     from datetime import date
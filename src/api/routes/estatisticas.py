@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, case
 
-from src.database.connection import get_db
+from src.database.connection import get_read_db
 from src.models import Licitacao, Item, Fornecedor, Resultado, Municipio, Anomalia, AlertaDisparado
 
 
@@ -14,11 +14,11 @@ router = APIRouter(prefix="/api/v1/estatisticas", tags=["Estatísticas"])
 
 
 @router.get("/kpis", response_model=dict)
-async def kpis_dashboard(
+def kpis_dashboard(
     data_inicio: Optional[str] = None,
     data_fim: Optional[str] = None,
     municipio_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get main KPIs for dashboard."""
     # Build base query
@@ -84,10 +84,10 @@ async def kpis_dashboard(
 
 
 @router.get("/por-mes", response_model=dict)
-async def licitacoes_por_mes(
+def licitacoes_por_mes(
     meses: int = Query(12, ge=1, le=36),
     municipio_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get biddings count by month."""
     from sqlalchemy import extract
@@ -126,9 +126,9 @@ async def licitacoes_por_mes(
 
 
 @router.get("/por-modalidade", response_model=dict)
-async def distribuicao_modalidade(
+def distribuicao_modalidade(
     municipio_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get biddings distribution by modality."""
     query = db.query(
@@ -158,9 +158,9 @@ async def distribuicao_modalidade(
 
 
 @router.get("/top-municipios", response_model=dict)
-async def top_municipios(
+def top_municipios(
     limite: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get top municipalities by value."""
     resultados = db.query(
@@ -195,10 +195,10 @@ async def top_municipios(
 
 
 @router.get("/top-fornecedores", response_model=dict)
-async def top_fornecedores(
+def top_fornecedores(
     limite: int = Query(10, ge=1, le=50),
     municipio_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get top suppliers by value."""
     query = db.query(
@@ -238,10 +238,10 @@ async def top_fornecedores(
 
 
 @router.get("/economia-por-periodo", response_model=dict)
-async def economia_por_periodo(
+def economia_por_periodo(
     meses: int = Query(12, ge=1, le=36),
     municipio_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get savings by period."""
     from sqlalchemy import extract
@@ -291,9 +291,9 @@ async def economia_por_periodo(
 
 
 @router.get("/ultimas-licitacoes", response_model=dict)
-async def ultimas_licitacoes(
+def ultimas_licitacoes(
     limite: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get latest published biddings."""
     licitacoes = db.query(Licitacao).order_by(
@@ -321,10 +321,10 @@ async def ultimas_licitacoes(
 
 
 @router.get("/proximas-aberturas", response_model=dict)
-async def proximas_aberturas(
+def proximas_aberturas(
     dias: int = Query(7, ge=1, le=30),
     limite: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get upcoming bidding openings."""
     hoje = datetime.now()
@@ -4,7 +4,7 @@ from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from src.database.connection import get_db
+from src.database.connection import get_db, get_read_db
 from src.services.governanca_service import GovernancaService
 
 
@@ -12,9 +12,9 @@ router = APIRouter(prefix="/api/v1/governanca", tags=["Governança"])
 
 
 @router.get("/kpis", response_model=dict)
-async def kpis_governanca(
+def kpis_governanca(
     municipio_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get governance KPIs."""
     service = GovernancaService(db)
@@ -55,7 +55,7 @@ async def kpis_governanca(
 
 
 @router.get("/ranking", response_model=dict)
-async def ranking_governanca(db: Session = Depends(get_db)):
+def ranking_governanca(db: Session = Depends(get_read_db)):
     """Get municipality ranking by governance."""
     service = GovernancaService(db)
     
@@ -68,10 +68,10 @@ async def ranking_governanca(db: Session = Depends(get_db)):
 
 
 @router.get("/municipio/{id}", response_model=dict)
-async def governanca_municipio(
+def governanca_municipio(
     id: int,
     periodo: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get governance details for a municipality."""
     service = GovernancaService(db)
@@ -85,9 +85,9 @@ async def governanca_municipio(
 
 
 @router.get("/comparativo", response_model=dict)
-async def comparativo_governanca(
+def comparativo_governanca(
     municipios: str = Query(..., description="Comma-separated municipality IDs"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get comparative governance between municipalities."""
     # Parse municipality IDs
@@ -111,7 +111,7 @@ async def comparativo_governanca(
 
 
 @router.post("/atualizar", response_model=dict)
-async def atualizar_governanca(
+def atualizar_governanca(
     municipio_id: Optional[int] = None,
     periodo: Optional[str] = None,
     db: Session = Depends(get_db)
@@ -132,11 +132,11 @@ async def atualizar_governanca(
 
 
 @router.get("/historico/{municipio_id}", response_model=dict)
-async def historico_governanca(
+def historico_governanca(
     municipio_id: int,
     page: int = Query(1, ge=1),
     per_page: int = Query(12, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get historical governance data for a municipality."""
     from src.models import GovernancaMunicipio
@@ -179,7 +179,7 @@ async def historico_governanca(
 
 
 @router.get("/indicadores/explicacao", response_model=dict)
-async def explicacao_indicadores():
+def explicacao_indicadores():
     """Get explanation of governance indicators."""
     return {
         'indicadores': {
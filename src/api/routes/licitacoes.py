@@ -1,12 +1,16 @@
 """API routes for licitacoes."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
+from config.settings import settings
 from src.database.connection import get_db
+from src.database.loading import LICITACAO_DETALHE, LICITACAO_LISTA
+from src.database.pagination import COUNT_NONE, Page, check_offset
 from src.database.repositories import LicitacaoRepository
+from src.exceptions import ValidationError
 from src.api.schemas.licitacao import (
     LicitacaoResponse,
     LicitacaoDetail,
@@ -15,22 +19,50 @@ from src.api.schemas.licitacao import (
 
 router = APIRouter()
 
+COUNT_PATTERN = "^(exact|estimated|none)$"
+
+
+def _page_headers(response: Response, page: Page):
+    """Expose the next cursor and the total of a page as response headers."""
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+        response.headers["X-Total-Exact"] = "true" if page.total_exact else "false"
+
 
 @router.get("/", response_model=List[LicitacaoResponse])
-async def list_licitacoes(
-    skip: int = Query(0, ge=0),
+def list_licitacoes(
+    response: Response,
+    skip: int = Query(0, ge=0, description="OFFSET pagination (deprecated, use cursor)"),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    count: str = Query(COUNT_NONE, pattern=COUNT_PATTERN, description="Total in X-Total-Count"),
     db: Session = Depends(get_db)
 ):
-    """List all biddings with pagination."""
+    """List all biddings, newest first, with cursor pagination."""
     repo = LicitacaoRepository(db)
-    licitacoes = repo.get_all(skip=skip, limit=limit)
-    return licitacoes
+    try:
+        if skip:
+            check_offset(skip, settings.API_MAX_OFFSET)
+            return repo.get_all(skip=skip, limit=limit)
+        
+        page = repo.get_page(
+            cursor=cursor,
+            limit=limit,
+            count=count,
+            count_limit=settings.API_COUNT_LIMIT,
+            profile=LICITACAO_LISTA
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    _page_headers(response, page)
+    return page.items
 
 
 # IMPORTANTE: Rotas específicas ANTES de rotas com parâmetros genéricos
 @router.get("/stats/count")
-async def count_licitacoes(
+def count_licitacoes(
     municipio_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
@@ -44,48 +76,63 @@ async def count_licitacoes(
 
 
 @router.get("/controle/{numero_controle}", response_model=LicitacaoDetail)
-async def get_licitacao_by_controle(
+def get_licitacao_by_controle(
     numero_controle: str,
     db: Session = Depends(get_db)
 ):
     """Get bidding by control number."""
     repo = LicitacaoRepository(db)
-    licitacao = repo.get_by_numero_controle(numero_controle)
+    licitacao = repo.get_by_numero_controle(numero_controle, profile=LICITACAO_DETALHE)
     if not licitacao:
         raise HTTPException(status_code=404, detail="Licitação não encontrada")
     return licitacao
 
 
 @router.post("/search", response_model=List[LicitacaoResponse])
-async def search_licitacoes(
+def search_licitacoes(
     params: LicitacaoSearchParams,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    """Search biddings with filters."""
+    """Search biddings with filters, newest first, with cursor pagination."""
     repo = LicitacaoRepository(db)
-    licitacoes = repo.search(
+    filtros = dict(
         municipio_id=params.municipio_id,
         modalidade_id=params.modalidade_id,
         data_inicio=params.data_inicio,
         data_fim=params.data_fim,
         valor_min=params.valor_min,
         valor_max=params.valor_max,
-        palavra_chave=params.palavra_chave,
-        skip=params.skip,
-        limit=params.limit
+        palavra_chave=params.palavra_chave
     )
-    return licitacoes
+    try:
+        if params.skip:
+            check_offset(params.skip, settings.API_MAX_OFFSET)
+            return repo.search(**filtros, skip=params.skip, limit=params.limit)
+        
+        page = repo.search_page(
+            cursor=params.cursor,
+            limit=params.limit,
+            count=params.count,
+            count_limit=settings.API_COUNT_LIMIT,
+            profile=LICITACAO_LISTA,
+            **filtros
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    _page_headers(response, page)
+    return page.items
 
 
 # Rota com parâmetro genérico por ÚLTIMO
 @router.get("/{licitacao_id}", response_model=LicitacaoDetail)
-async def get_licitacao(
+def get_licitacao(
     licitacao_id: int,
     db: Session = Depends(get_db)
 ):
     """Get bidding by ID."""
     repo = LicitacaoRepository(db)
-    licitacao = repo.get_by_id(licitacao_id)
+    licitacao = repo.get_by_id(licitacao_id, profile=LICITACAO_DETALHE)
     if not licitacao:
         raise HTTPException(status_code=404, detail="Licitação não encontrada")
     return licitacao
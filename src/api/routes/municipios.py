@@ -12,7 +12,7 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[MunicipioResponse])
-async def list_municipios(
+def list_municipios(
     uf: str = Query(None, description="Filter by state"),
     db: Session = Depends(get_db)
 ):
@@ -26,7 +26,7 @@ async def list_municipios(
 
 
 @router.get("/{codigo_ibge}", response_model=MunicipioResponse)
-async def get_municipio(
+def get_municipio(
     codigo_ibge: str,
     db: Session = Depends(get_db)
 ):
@@ -39,7 +39,7 @@ async def get_municipio(
 
 
 @router.post("/", response_model=MunicipioResponse)
-async def create_municipio(
+def create_municipio(
     municipio: MunicipioCreate,
     db: Session = Depends(get_db)
 ):
@@ -4,7 +4,8 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from src.database.connection import get_db
+from src.database.connection import get_read_db
+from src.exceptions import ValidationError
 from src.services.analise_precos_service import AnalisePrecoService
 
 
@@ -12,10 +13,10 @@ router = APIRouter(prefix="/api/v1/precos", tags=["Preços"])
 
 
 @router.get("/historico", response_model=dict)
-async def historico_precos(
+def historico_precos(
     descricao: str = Query(..., description="Item description"),
     periodo_meses: int = Query(24, ge=1, le=60),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get price history for an item."""
     service = AnalisePrecoService(db)
@@ -29,15 +30,17 @@ async def historico_precos(
             'total_registros': len(timeline),
             'historico': timeline
         }
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/estatisticas", response_model=dict)
-async def estatisticas_precos(
+def estatisticas_precos(
     descricao: str = Query(..., description="Item description"),
     periodo_meses: int = Query(24, ge=1, le=60),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get price statistics for an item."""
     service = AnalisePrecoService(db)
@@ -46,14 +49,16 @@ async def estatisticas_precos(
         stats = service.calcular_estatisticas_item(descricao, periodo_meses)
         
         return stats
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/benchmark", response_model=dict)
-async def benchmark_precos(
+def benchmark_precos(
     descricao: str = Query(..., description="Item description"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get regional price benchmark."""
     service = AnalisePrecoService(db)
@@ -62,14 +67,16 @@ async def benchmark_precos(
         benchmark = service.benchmark_regional(descricao)
         
         return benchmark
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/sugestao", response_model=dict)
-async def sugestao_preco(
+def sugestao_preco(
     descricao: str = Query(..., description="Item description"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Suggest reference price."""
     service = AnalisePrecoService(db)
@@ -78,14 +85,16 @@ async def sugestao_preco(
         sugestao = service.sugerir_preco_referencia(descricao)
         
         return sugestao
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/outliers", response_model=dict)
-async def detectar_outliers(
+def detectar_outliers(
     descricao: str = Query(..., description="Item description"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Detect price outliers."""
     service = AnalisePrecoService(db)
@@ -98,15 +107,17 @@ async def detectar_outliers(
             'total_outliers': len(outliers),
             'outliers': outliers
         }
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/tendencia", response_model=dict)
-async def analisar_tendencia(
+def analisar_tendencia(
     descricao: str = Query(..., description="Item description"),
     periodo_meses: int = Query(12, ge=1, le=60),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Analyze price trend."""
     service = AnalisePrecoService(db)
@@ -115,12 +126,14 @@ async def analisar_tendencia(
         tendencia = service.analisar_tendencia(descricao, periodo_meses)
         
         return tendencia
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/item/{item_id}/comparar", response_model=dict)
-async def comparar_preco_item(item_id: int, db: Session = Depends(get_db)):
+def comparar_preco_item(item_id: int, db: Session = Depends(get_read_db)):
     """Compare item price with historical data."""
     service = AnalisePrecoService(db)
     
@@ -128,5 +141,7 @@ async def comparar_preco_item(item_id: int, db: Session = Depends(get_db)):
         comparacao = service.comparar_preco_historico(item_id)
         
         return comparacao
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
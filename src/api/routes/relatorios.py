@@ -26,7 +26,7 @@ class GerarRelatorioRequest(BaseModel):
 
 
 @router.post("/gerar")
-async def gerar_relatorio(request: GerarRelatorioRequest):
+def gerar_relatorio(request: GerarRelatorioRequest):
     """
     Generate a report based on specified parameters.
     
@@ -116,7 +116,7 @@ async def gerar_relatorio(request: GerarRelatorioRequest):
 
 
 @router.get("/download/{filename}")
-async def download_relatorio(filename: str):
+def download_relatorio(filename: str):
     """
     Download a generated report.
     
@@ -160,7 +160,7 @@ async def download_relatorio(filename: str):
 
 
 @router.get("/listar")
-async def listar_relatorios(
+def listar_relatorios(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0)
 ):
@@ -54,5 +54,7 @@ class LicitacaoSearchParams(BaseModel):
     valor_min: Optional[float] = Field(None, description="Minimum value")
     valor_max: Optional[float] = Field(None, description="Maximum value")
     palavra_chave: Optional[str] = Field(None, description="Keyword search")
-    skip: int = Field(0, ge=0, description="Pagination offset")
+    skip: int = Field(0, ge=0, description="Pagination offset (deprecated, use cursor)")
     limit: int = Field(100, ge=1, le=100, description="Pagination limit")
+    cursor: Optional[str] = Field(None, description="X-Next-Cursor of the previous page")
+    count: str = Field("none", pattern="^(exact|estimated|none)$", description="Total in X-Total-Count")
@@ -1,11 +1,21 @@
 """Data collectors package."""
 
+from src.collectors.adaptive import AdaptiveConcurrencyController, pncp_concurrency
+from src.collectors.archive import ResponseArchive, response_archive
 from src.collectors.base_collector import BaseCollector
+from src.collectors.http_client import HTTPClientManager, http_client_manager, pncp_rate_limiter
 from src.collectors.pncp_collector import PNCPCollector
 from src.collectors.pncp_resultados_collector import PNCPResultadosCollector
 
 __all__ = [
+    'AdaptiveConcurrencyController',
+    'pncp_concurrency',
+    'ResponseArchive',
+    'response_archive',
     'BaseCollector',
+    'HTTPClientManager',
+    'http_client_manager',
+    'pncp_rate_limiter',
     'PNCPCollector',
     'PNCPResultadosCollector',
 ]
@@ -0,0 +1,441 @@
+"""Adaptive (AIMD) concurrency control and circuit breaking per host."""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config.settings import settings
+from src.exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states
+CIRCUITO_FECHADO = "fechado"
+CIRCUITO_ABERTO = "aberto"
+CIRCUITO_MEIO_ABERTO = "meio_aberto"
+
+# Responses that mean the server is overloaded (as opposed to a bad request)
+OVERLOAD_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class CircuitBreaker:
+    """
+    Pause a host after consecutive overload failures.
+    
+    After ``failure_threshold`` failures in a row the circuit opens and
+    requests fail immediately with CircuitOpenError. Once ``open_seconds``
+    have passed a single probe request is let through: if it succeeds the
+    circuit closes, otherwise it opens again.
+    """
+    
+    def __init__(self, failure_threshold: int, open_seconds: float):
+        """
+        Initialize circuit breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit (0 disables it)
+            open_seconds: How long the circuit stays open before probing
+        """
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.estado = CIRCUITO_FECHADO
+        self.falhas_consecutivas = 0
+        self.aberturas = 0
+        self._aberto_ate = 0.0
+        self._sonda_em_andamento = False
+        self._lock = threading.Lock()
+    
+    def check(self, host: str):
+        """
+        Raise if the host is paused; may let a probe request through.
+        
+        Args:
+            host: Host name, used in the error message
+        
+        Raises:
+            CircuitOpenError: If requests to the host are paused
+        """
+        with self._lock:
+            if self.estado == CIRCUITO_FECHADO:
+                return
+            
+            agora = time.monotonic()
+            if self.estado == CIRCUITO_ABERTO and agora >= self._aberto_ate:
+                self.estado = CIRCUITO_MEIO_ABERTO
+            
+            if self.estado == CIRCUITO_MEIO_ABERTO and not self._sonda_em_andamento:
+                self._sonda_em_andamento = True
+                logger.info(f"Circuit half-open for {host}, sending probe request")
+                return
+            
+            retry_after = max(0.0, self._aberto_ate - agora)
+        
+        raise CircuitOpenError(f"Circuit open for {host}", api=host, retry_after=retry_after)
+    
+    def record_success(self):
+        """Register a request that reached a healthy server."""
+        with self._lock:
+            self.falhas_consecutivas = 0
+            self._sonda_em_andamento = False
+            if self.estado != CIRCUITO_FECHADO:
+                self.estado = CIRCUITO_FECHADO
+                logger.info("Circuit closed, host recovered")
+    
+    def record_failure(self):
+        """Register an overload failure (429/5xx, timeout, connection error)."""
+        with self._lock:
+            self.falhas_consecutivas += 1
+            probe_failed = self.estado == CIRCUITO_MEIO_ABERTO
+            self._sonda_em_andamento = False
+            
+            threshold_hit = 0 < self.failure_threshold <= self.falhas_consecutivas
+            if probe_failed or (self.estado == CIRCUITO_FECHADO and threshold_hit):
+                self.estado = CIRCUITO_ABERTO
+                self._aberto_ate = time.monotonic() + self.open_seconds
+                self.aberturas += 1
+                logger.warning(
+                    f"Circuit opened after {self.falhas_consecutivas} consecutive failures, "
+                    f"pausing for {self.open_seconds:.0f}s"
+                )
+    
+    def release_probe(self):
+        """Forget an in-flight probe that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            self._sonda_em_andamento = False
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the breaker state for monitoring.
+        
+        Returns:
+            Dictionary with state, consecutive failures and times opened
+        """
+        with self._lock:
+            return {
+                'estado': self.estado,
+                'falhas_consecutivas': self.falhas_consecutivas,
+                'aberturas': self.aberturas,
+                'reabre_em_s': round(max(0.0, self._aberto_ate - time.monotonic()), 1)
+                if self.estado == CIRCUITO_ABERTO else None
+            }
+
+
+class AIMDConcurrencyLimiter:
+    """
+    Concurrency limit that adapts to latency and error feedback (AIMD).
+    
+    After every full window of successful requests (as many as the current
+    limit) the limit grows by one if the p95 latency is within target, and
+    shrinks slightly if it is not. Overload signals (429/5xx, timeouts)
+    cut the limit multiplicatively, at most once per cooldown so that a
+    burst of failures from the same wave of requests counts once.
+    """
+    
+    DECREASE_COOLDOWN = 1.0
+    LATENCY_DECREASE = 0.9
+    
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        target_p95: float,
+        backoff: float = 0.5,
+        adaptive: bool = True,
+        window: int = 100
+    ):
+        """
+        Initialize limiter.
+        
+        Args:
+            initial: Starting limit
+            min_limit: Lowest limit
+            max_limit: Highest limit
+            target_p95: p95 latency (seconds) considered healthy
+            backoff: Factor applied to the limit on overload
+            adaptive: When False the limit stays at ``max_limit``
+            window: Number of recent latencies kept for the p95
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.adaptive = adaptive
+        inicial = initial if adaptive else self.max_limit
+        self.limit = float(min(self.max_limit, max(self.min_limit, inicial)))
+        self.target_p95 = target_p95
+        self.backoff = backoff
+        self.in_flight = 0
+        self.sucessos = 0
+        self.sobrecargas = 0
+        self._latencias: Deque[float] = deque(maxlen=window)
+        self._sucessos_na_janela = 0
+        self._ultima_reducao = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._lock = threading.Lock()
+    
+    @property
+    def p95(self) -> Optional[float]:
+        """p95 of the recent request latencies, in seconds."""
+        if not self._latencias:
+            return None
+        ordenadas = sorted(self._latencias)
+        return ordenadas[int(0.95 * (len(ordenadas) - 1))]
+    
+    async def acquire(self):
+        """Wait until a request slot is free."""
+        while True:
+            with self._lock:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+            
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    elif waiter.done() and not waiter.cancelled():
+                        # We were woken up but will not use the slot; pass it on
+                        self._wake()
+                raise
+    
+    def release(self):
+        """Free a request slot."""
+        with self._lock:
+            self.in_flight -= 1
+            self._wake()
+    
+    def _wake(self):
+        """
+        Wake as many waiters as there are free slots. Caller holds the lock.
+        
+        The limiter is shared by every event loop of the process (API, CLI,
+        worker threads), so each waiter is resolved by its own loop.
+        """
+        livres = int(self.limit) - self.in_flight
+        while livres > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            try:
+                waiter.get_loop().call_soon_threadsafe(self._set_if_pending, waiter)
+            except RuntimeError:
+                # Its loop is closed
+                continue
+            livres -= 1
+    
+    def _set_if_pending(self, waiter: asyncio.Future):
+        """Resolve a waiter on its loop, passing the slot on if it was cancelled meanwhile."""
+        if not waiter.done():
+            waiter.set_result(None)
+        elif waiter.cancelled():
+            with self._lock:
+                self._wake()
+    
+    def record_success(self, latency: float):
+        """
+        Register a successful request.
+        
+        Args:
+            latency: Request duration in seconds
+        """
+        with self._lock:
+            self.sucessos += 1
+            self._latencias.append(latency)
+            if not self.adaptive:
+                return
+            
+            self._sucessos_na_janela += 1
+            if self._sucessos_na_janela < int(self.limit):
+                return
+            self._sucessos_na_janela = 0
+            
+            p95 = self.p95
+            if p95 is not None and p95 <= self.target_p95:
+                self.limit = min(self.max_limit, self.limit + 1)
+            else:
+                self.limit = max(self.min_limit, self.limit * self.LATENCY_DECREASE)
+            self._wake()
+    
+    def record_overload(self):
+        """Register an overload signal (429/5xx, timeout, connection error)."""
+        with self._lock:
+            self.sobrecargas += 1
+            if not self.adaptive:
+                return
+            
+            agora = time.monotonic()
+            if agora - self._ultima_reducao < self.DECREASE_COOLDOWN:
+                return
+            
+            anterior = self.limit
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self._ultima_reducao = agora
+            self._sucessos_na_janela = 0
+            if int(self.limit) < int(anterior):
+                logger.warning(f"PNCP overloaded, concurrency reduced from {int(anterior)} to {int(self.limit)}")
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the limiter state for monitoring.
+        
+        Returns:
+            Dictionary with limit, in-flight requests, p95 and counters
+        """
+        with self._lock:
+            p95 = self.p95
+            return {
+                'limite': int(self.limit),
+                'limite_min': self.min_limit,
+                'limite_max': self.max_limit,
+                'em_andamento': self.in_flight,
+                'aguardando': len(self._waiters),
+                'latencia_p95_s': round(p95, 3) if p95 is not None else None,
+                'sucessos': self.sucessos,
+                'sobrecargas': self.sobrecargas
+            }
+
+
+class AdaptiveConcurrencyController:
+    """
+    Per-host concurrency limit and circuit breaker shared by all collectors.
+    
+    Wrap every request in ``slot(url)``: it fails fast while the host's
+    circuit is open, waits for a free slot, and feeds the outcome and
+    latency of the request back into the limiter and the breaker.
+    """
+    
+    def __init__(self):
+        """Initialize controller."""
+        self._limiters: Dict[str, AIMDConcurrencyLimiter] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _host(url: str) -> str:
+        """Get the host of a URL (or the URL itself if it is a bare host)."""
+        return urlsplit(url).netloc or url
+    
+    def limiter(self, url: str) -> AIMDConcurrencyLimiter:
+        """
+        Get the concurrency limiter of a URL's host.
+        
+        Args:
+            url: Request URL (or bare host)
+        
+        Returns:
+            Limiter for the host
+        """
+        host = self._host(url)
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = AIMDConcurrencyLimiter(
+                    initial=settings.PNCP_INITIAL_CONCURRENCY,
+                    min_limit=settings.PNCP_MIN_CONCURRENCY,
+                    max_limit=settings.PNCP_HOST_CONCURRENCY,
+                    target_p95=settings.PNCP_TARGET_P95_LATENCY,
+                    adaptive=settings.PNCP_ADAPTIVE_CONCURRENCY
+                )
+            return self._limiters[host]
+    
+    def breaker(self, url: str) -> CircuitBreaker:
+        """
+        Get the circuit breaker of a URL's host.
+        
+        Args:
+            url: Request URL (or bare host)
+        
+        Returns:
+            Circuit breaker for the host
+        """
+        host = self._host(url)
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(
+                    failure_threshold=settings.PNCP_BREAKER_FAILURE_THRESHOLD,
+                    open_seconds=settings.PNCP_BREAKER_OPEN_SECONDS
+                )
+            return self._breakers[host]
+    
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """
+        Run one request under the host's concurrency limit and breaker.
+        
+        The request (including ``raise_for_status``) must run inside the
+        block so its outcome can be classified.
+        
+        Args:
+            url: Request URL
+        
+        Raises:
+            CircuitOpenError: If the host's circuit is open
+        """
+        host = self._host(url)
+        breaker = self.breaker(url)
+        limiter = self.limiter(url)
+        
+        breaker.check(host)
+        try:
+            await limiter.acquire()
+        except BaseException:
+            breaker.release_probe()
+            raise
+        
+        inicio = time.monotonic()
+        resultado = None
+        try:
+            yield
+            resultado = "sucesso"
+        except httpx.HTTPStatusError as e:
+            resultado = "sobrecarga" if e.response.status_code in OVERLOAD_STATUS_CODES else "sucesso"
+            raise
+        except httpx.TransportError:
+            resultado = "sobrecarga"
+            raise
+        finally:
+            limiter.release()
+            if resultado == "sucesso":
+                limiter.record_success(time.monotonic() - inicio)
+                breaker.record_success()
+            elif resultado == "sobrecarga":
+                limiter.record_overload()
+                breaker.record_failure()
+            else:
+                breaker.release_probe()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the state of every host for monitoring.
+        
+        Returns:
+            Dictionary of host to concurrency and breaker state
+        """
+        with self._lock:
+            hosts = sorted(set(self._limiters) | set(self._breakers))
+        return {
+            host: {
+                'concorrencia': self.limiter(host).snapshot(),
+                'circuito': self.breaker(host).snapshot()
+            }
+            for host in hosts
+        }
+    
+    def reset(self):
+        """Drop all per-host state."""
+        with self._lock:
+            self._limiters = {}
+            self._breakers = {}
+
+
+# Global instance
+pncp_concurrency = AdaptiveConcurrencyController()
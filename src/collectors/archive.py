@@ -0,0 +1,205 @@
+"""Content-addressed archive of raw PNCP responses."""
+
+import os
+import gzip
+import json
+import hashlib
+import logging
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from config.settings import settings
+from src.utils.field_spec import json_loads
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIX = ".json.gz"
+
+
+class ResponseArchive:
+    """
+    On-disk archive of raw collector responses.
+    
+    Each response is stored gzip-compressed in its own file, addressed by
+    the SHA-256 of the endpoint path plus the query parameters, so fetching
+    the same page again overwrites the previous copy instead of piling up
+    duplicates. Files are grouped by the last segment of the endpoint
+    (``publicacao``, ``atualizacao``, ``itens``, ``resultados``) so a replay
+    can process one kind of response at a time::
+        
+        <root>/<categoria>/<key[:2]>/<key>.json.gz
+    
+    Every file holds an envelope with the endpoint, parameters, fetch time
+    and the untouched payload, which is all that is needed to re-run the
+    parsers offline.
+    """
+    
+    def __init__(self, root_dir: str, enabled: bool = True):
+        """
+        Initialize archive.
+        
+        Args:
+            root_dir: Directory where responses are stored
+            enabled: Whether ``save`` writes anything
+        """
+        self.root = Path(root_dir)
+        self.enabled = enabled
+    
+    @staticmethod
+    def endpoint_of(url: str) -> str:
+        """
+        Get the endpoint path of a request URL, without the API base path.
+        
+        Args:
+            url: Request URL
+        
+        Returns:
+            Endpoint path (e.g. ``/contratacoes/publicacao``)
+        """
+        path = urlsplit(url).path
+        base_path = urlsplit(settings.PNCP_BASE_URL).path.rstrip("/")
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+        return path or "/"
+    
+    @staticmethod
+    def categoria_of(endpoint: str) -> str:
+        """
+        Get the archive category of an endpoint (its last path segment).
+        
+        Args:
+            endpoint: Endpoint path
+        
+        Returns:
+            Category name
+        """
+        return endpoint.rstrip("/").rsplit("/", 1)[-1] or "raiz"
+    
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build the content address of a request.
+        
+        Args:
+            endpoint: Endpoint path
+            params: Query parameters
+        
+        Returns:
+            Hex SHA-256 digest
+        """
+        normalized = {str(k): str(v) for k, v in (params or {}).items() if v is not None}
+        raw = json.dumps({"endpoint": endpoint, "params": normalized}, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def path_for(self, url: str, params: Optional[Dict[str, Any]] = None) -> Path:
+        """
+        Get the archive file path of a request.
+        
+        Args:
+            url: Request URL
+            params: Query parameters
+        
+        Returns:
+            Path of the archived response
+        """
+        endpoint = self.endpoint_of(url)
+        key = self.make_key(endpoint, params)
+        return self.root / self.categoria_of(endpoint) / key[:2] / f"{key}{ARCHIVE_SUFFIX}"
+    
+    def save(self, url: str, params: Optional[Dict[str, Any]], payload: Any) -> Optional[Path]:
+        """
+        Store a response. Errors are logged and never propagated.
+        
+        Args:
+            url: Request URL
+            params: Query parameters
+            payload: Decoded JSON response
+        
+        Returns:
+            Path written, or None if the archive is disabled or the write failed
+        """
+        if not self.enabled:
+            return None
+        
+        path = self.path_for(url, params)
+        envelope = {
+            "endpoint": self.endpoint_of(url),
+            "url": url,
+            "params": params or {},
+            "fetched_at": datetime.utcnow().isoformat(),
+            "payload": payload
+        }
+        
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+                    f.write(json.dumps(envelope, ensure_ascii=False, default=str).encode("utf-8"))
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            return path
+        except Exception as e:
+            logger.error(f"Error archiving response for {url}: {e}")
+            return None
+    
+    def load(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load the archived envelope of a request.
+        
+        Args:
+            url: Request URL
+            params: Query parameters
+        
+        Returns:
+            Envelope dictionary, or None if not archived
+        """
+        path = self.path_for(url, params)
+        if not path.exists():
+            return None
+        return self.read(path)
+    
+    @staticmethod
+    def read(path: Path) -> Dict[str, Any]:
+        """
+        Read an archived envelope.
+        
+        Args:
+            path: Archive file path
+        
+        Returns:
+            Envelope dictionary
+        """
+        with gzip.open(path, "rb") as f:
+            return json_loads(f.read())
+    
+    def iter_paths(self, categorias: Optional[List[str]] = None) -> Iterator[Path]:
+        """
+        Iterate over archived files.
+        
+        Args:
+            categorias: Only these categories (all when None)
+        
+        Yields:
+            Archive file paths, sorted within each category
+        """
+        if not self.root.exists():
+            return
+        
+        if categorias is None:
+            categorias = sorted(p.name for p in self.root.iterdir() if p.is_dir())
+        
+        for categoria in categorias:
+            diretorio = self.root / categoria
+            if diretorio.is_dir():
+                yield from sorted(diretorio.glob(f"*/*{ARCHIVE_SUFFIX}"))
+
+
+# Global instance
+response_archive = ResponseArchive(settings.PNCP_ARCHIVE_DIR, enabled=settings.PNCP_ARCHIVE_ENABLED)
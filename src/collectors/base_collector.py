@@ -2,12 +2,17 @@
 
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
+import asyncio
 import logging
 import httpx
 from datetime import datetime
 
 from config.settings import settings
-from src.utils.helpers import retry_on_failure
+from src.collectors.adaptive import pncp_concurrency
+from src.collectors.archive import response_archive
+from src.collectors.http_client import http_client_manager, pncp_rate_limiter
+from src.utils.field_spec import json_loads
+from src.utils.retry import retry_with_decorrelated_jitter
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +27,13 @@ class BaseCollector(ABC):
         self.max_retries = settings.PNCP_MAX_RETRIES
         self.retry_delay = settings.PNCP_RETRY_DELAY
         
-    @retry_on_failure(max_attempts=3, delay=5)
+    @retry_with_decorrelated_jitter(
+        max_attempts=settings.PNCP_MAX_RETRIES,
+        base_delay=settings.PNCP_RETRY_DELAY,
+        max_delay=settings.PNCP_RETRY_MAX_DELAY,
+        exceptions=(httpx.TransportError,),
+        on_retry_after=pncp_rate_limiter.pause
+    )
     async def _make_request(
         self,
         url: str,
@@ -40,22 +51,34 @@ class BaseCollector(ABC):
         Returns:
             Response JSON data
         """
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
+        client = http_client_manager.get_async_client()
+        try:
+            await pncp_rate_limiter.acquire()
+            async with pncp_concurrency.slot(url):
                 logger.info(f"Making request to: {url}")
-                response = await client.get(url, params=params, headers=headers)
+                response = await client.get(url, params=params, headers=headers, timeout=self.timeout)
                 response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error {e.response.status_code}: {e}")
-                raise
-            except httpx.RequestError as e:
-                logger.error(f"Request error: {e}")
-                raise
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}")
-                raise
+            data = json_loads(response.content)
+            if response_archive.enabled:
+                await asyncio.to_thread(response_archive.save, url, params, data)
+            return data
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error {e.response.status_code}: {e}")
+            raise
+        except httpx.RequestError as e:
+            logger.error(f"Request error: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}")
+            raise
     
+    @retry_with_decorrelated_jitter(
+        max_attempts=settings.PNCP_MAX_RETRIES,
+        base_delay=settings.PNCP_RETRY_DELAY,
+        max_delay=settings.PNCP_RETRY_MAX_DELAY,
+        exceptions=(httpx.TransportError,),
+        on_retry_after=pncp_rate_limiter.pause
+    )
     def _make_sync_request(
         self,
         url: str,
@@ -73,21 +96,24 @@ class BaseCollector(ABC):
         Returns:
             Response JSON data
         """
-        with httpx.Client(timeout=self.timeout) as client:
-            try:
-                logger.info(f"Making request to: {url}")
-                response = client.get(url, params=params, headers=headers)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error {e.response.status_code}: {e}")
-                raise
-            except httpx.RequestError as e:
-                logger.error(f"Request error: {e}")
-                raise
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}")
-                raise
+        client = http_client_manager.get_sync_client()
+        try:
+            pncp_rate_limiter.acquire_sync()
+            logger.info(f"Making request to: {url}")
+            response = client.get(url, params=params, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            data = json_loads(response.content)
+            response_archive.save(url, params, data)
+            return data
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error {e.response.status_code}: {e}")
+            raise
+        except httpx.RequestError as e:
+            logger.error(f"Request error: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}")
+            raise
     
     @abstractmethod
     async def collect(self, **kwargs) -> List[Dict[str, Any]]:
@@ -0,0 +1,217 @@
+"""Shared HTTP client management for collectors."""
+
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional, Set
+
+import httpx
+
+from config.settings import settings
+from src.utils.rate_limiter import TokenBucketRateLimiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {"Accept": "application/json"}
+
+
+def _http2_available() -> bool:
+    """Check if the optional HTTP/2 dependency (h2) is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HTTPClientManager:
+    """
+    Process-wide pool of HTTP clients shared by all collectors.
+    
+    A single ``httpx.AsyncClient`` (and a single ``httpx.Client`` for the
+    synchronous path) is kept per process so that consecutive requests to
+    PNCP reuse keep-alive connections instead of paying a new TCP+TLS
+    handshake every time. Async clients are bound to the event loop that
+    created them; a new one is built transparently when the loop changes
+    (e.g. successive ``asyncio.run`` calls) and the stale one is closed.
+    
+    The clients belong to the process: code running inside a long-lived
+    application (API, scheduler) just uses them, and only the owner of the
+    process (the application lifespan, a CLI command) closes them.
+    
+    ``use_transport`` swaps the network layer of the async client, e.g. for
+    an ``httpx.MockTransport`` serving a local stand-in of PNCP.
+    """
+    
+    def __init__(self):
+        """Initialize client manager."""
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sync_client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+        self._closing: Set[asyncio.Future] = set()
+    
+    @property
+    def http2_enabled(self) -> bool:
+        """Whether HTTP/2 is requested in settings and available."""
+        if not settings.PNCP_HTTP2:
+            return False
+        if not _http2_available():
+            logger.warning("PNCP_HTTP2 is enabled but 'h2' is not installed. Falling back to HTTP/1.1.")
+            return False
+        return True
+    
+    def _limits(self) -> httpx.Limits:
+        """Build connection pool limits from settings."""
+        return httpx.Limits(
+            max_connections=settings.PNCP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.PNCP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.PNCP_KEEPALIVE_EXPIRY
+        )
+    
+    def get_async_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared async client for the running event loop.
+        
+        Returns:
+            Pooled async HTTP client
+        """
+        loop = asyncio.get_running_loop()
+        
+        with self._lock:
+            client = self._async_client
+            if client is None or client.is_closed or self._async_loop is not loop:
+                if client is not None and not client.is_closed:
+                    # The previous loop's connections cannot be reused here
+                    logger.debug("Event loop changed, creating a new pooled HTTP client")
+                    self._close_stale(client, self._async_loop, loop)
+                
+                http2 = self.http2_enabled
+                client = httpx.AsyncClient(
+                    timeout=settings.PNCP_TIMEOUT,
+                    limits=self._limits(),
+                    http2=http2,
+                    headers=DEFAULT_HEADERS,
+                    transport=self._transport
+                )
+                self._async_client = client
+                self._async_loop = loop
+                logger.info(
+                    f"Created pooled HTTP client (http2={http2}, "
+                    f"max_connections={settings.PNCP_MAX_CONNECTIONS})"
+                )
+        
+        return client
+    
+    def _close_stale(
+        self,
+        client: httpx.AsyncClient,
+        client_loop: Optional[asyncio.AbstractEventLoop],
+        loop: asyncio.AbstractEventLoop
+    ):
+        """
+        Close an async client left behind by another event loop.
+        
+        The close runs on the client's loop when it is still running (e.g. in
+        another thread), otherwise as a task on the current one.
+        
+        Args:
+            client: Stale client
+            client_loop: Loop the client was created on
+            loop: Running event loop
+        """
+        if client_loop is not None and client_loop.is_running() and not client_loop.is_closed():
+            future = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), client_loop))
+        else:
+            future = loop.create_task(client.aclose())
+        
+        self._closing.add(future)
+        future.add_done_callback(self._stale_closed)
+    
+    def _stale_closed(self, future: asyncio.Future):
+        """Forget a finished close of a stale client, logging its failure."""
+        self._closing.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug(f"Error closing stale HTTP client: {future.exception()}")
+    
+    def use_transport(self, transport: Optional[httpx.AsyncBaseTransport]):
+        """
+        Route async requests through a custom transport (None restores the network).
+        
+        The current async client is dropped, so the next request builds a
+        client on the new transport.
+        
+        Args:
+            transport: Transport for new async clients
+        """
+        with self._lock:
+            self._transport = transport
+            self._async_client = None
+            self._async_loop = None
+    
+    def get_sync_client(self) -> httpx.Client:
+        """
+        Get the shared synchronous client.
+        
+        Returns:
+            Pooled sync HTTP client
+        """
+        with self._lock:
+            if self._sync_client is None or self._sync_client.is_closed:
+                self._sync_client = httpx.Client(
+                    timeout=settings.PNCP_TIMEOUT,
+                    limits=self._limits(),
+                    http2=self.http2_enabled,
+                    headers=DEFAULT_HEADERS
+                )
+            return self._sync_client
+    
+    async def aclose(self):
+        """Close all pooled clients. Safe to call multiple times."""
+        with self._lock:
+            async_client, self._async_client = self._async_client, None
+            async_loop, self._async_loop = self._async_loop, None
+        
+        if async_client is not None and not async_client.is_closed:
+            if async_loop is asyncio.get_running_loop():
+                await async_client.aclose()
+                logger.info("Pooled HTTP client closed")
+            else:
+                logger.debug("Skipping close of HTTP client bound to a finished event loop")
+        
+        self.close()
+    
+    def close(self):
+        """Close the pooled synchronous client."""
+        with self._lock:
+            sync_client, self._sync_client = self._sync_client, None
+        
+        if sync_client is not None and not sync_client.is_closed:
+            sync_client.close()
+    
+    @asynccontextmanager
+    async def lifespan(self):
+        """
+        Context manager that closes the pooled clients on exit.
+        
+        For the owner of the process only (CLI commands, tests): jobs and
+        handlers running inside the API must not close the shared clients.
+        
+        Example:
+            async with http_client_manager.lifespan():
+                await service.collect_all_municipios()
+        """
+        try:
+            yield self
+        finally:
+            await self.aclose()
+
+
+# Global instances
+http_client_manager = HTTPClientManager()
+pncp_rate_limiter = TokenBucketRateLimiter(
+    rate=settings.PNCP_RATE_LIMIT,
+    capacity=settings.PNCP_RATE_BURST
+)
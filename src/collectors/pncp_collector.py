@@ -1,11 +1,15 @@
 """PNCP collector for bidding data."""
 
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
+import asyncio
 import logging
 
+from config.settings import settings
 from src.collectors.base_collector import BaseCollector
+from src.exceptions import DataCollectionError
 from src.utils.helpers import format_date_for_pncp, safe_get
+from src.utils.pncp_specs import LICITACAO_SPEC
 from src.utils.constants import (
     PNCP_CONTRATACOES_ENDPOINT,
     DEFAULT_PAGE_SIZE,
@@ -25,7 +29,8 @@ class PNCPCollector(BaseCollector):
         codigo_municipio_ibge: Optional[str] = None,
         codigo_modalidade: Optional[int] = None,
         pagina: int = 1,
-        tamanho_pagina: int = DEFAULT_PAGE_SIZE
+        tamanho_pagina: int = DEFAULT_PAGE_SIZE,
+        endpoint: str = PNCP_CONTRATACOES_ENDPOINT
     ) -> Dict[str, Any]:
         """
         Collect bidding data from PNCP API.
@@ -37,11 +42,51 @@ class PNCPCollector(BaseCollector):
             codigo_modalidade: Bidding modality code
             pagina: Page number
             tamanho_pagina: Page size
+            endpoint: Listing endpoint (by publication or by update date)
+        
+        Returns:
+            API response with bidding data
+        """
+        try:
+            return await self._fetch_page(
+                data_inicial=data_inicial,
+                data_final=data_final,
+                codigo_municipio_ibge=codigo_municipio_ibge,
+                codigo_modalidade=codigo_modalidade,
+                pagina=pagina,
+                tamanho_pagina=tamanho_pagina,
+                endpoint=endpoint
+            )
+        except Exception as e:
+            logger.error(f"Error collecting data from PNCP: {e}")
+            return {"data": [], "hasNext": False}
+    
+    async def _fetch_page(
+        self,
+        data_inicial: datetime,
+        data_final: datetime,
+        codigo_municipio_ibge: Optional[str] = None,
+        codigo_modalidade: Optional[int] = None,
+        pagina: int = 1,
+        tamanho_pagina: int = DEFAULT_PAGE_SIZE,
+        endpoint: str = PNCP_CONTRATACOES_ENDPOINT
+    ) -> Dict[str, Any]:
+        """
+        Fetch a single page of bidding data, propagating request errors.
+        
+        Args:
+            data_inicial: Start date
+            data_final: End date
+            codigo_municipio_ibge: Municipality IBGE code
+            codigo_modalidade: Bidding modality code
+            pagina: Page number
+            tamanho_pagina: Page size
+            endpoint: Listing endpoint (by publication or by update date)
             
         Returns:
             API response with bidding data
         """
-        url = f"{self.base_url}{PNCP_CONTRATACOES_ENDPOINT}"
+        url = f"{self.base_url}{endpoint}"
         
         params = {
             "dataInicial": format_date_for_pncp(data_inicial),
@@ -57,51 +102,185 @@ class PNCPCollector(BaseCollector):
         if codigo_modalidade:
             params["codigoModalidadeContratacao"] = codigo_modalidade
         
+        return await self._make_request(url, params=params)
+    
+    async def _get_page(self, pagina: int, strict: bool, **filtros) -> Dict[str, Any]:
+        """
+        Get a page either tolerating errors (empty page) or raising them.
+        
+        Args:
+            pagina: Page number
+            strict: Raise DataCollectionError instead of returning an empty page
+            **filtros: Filters forwarded to the request
+        
+        Returns:
+            API response with bidding data
+        """
+        if not strict:
+            return await self.collect(pagina=pagina, **filtros)
+        
         try:
-            response = await self._make_request(url, params=params)
-            return response
+            return await self._fetch_page(pagina=pagina, **filtros)
         except Exception as e:
-            logger.error(f"Error collecting data from PNCP: {e}")
-            return {"data": [], "hasNext": False}
+            raise DataCollectionError(f"Error collecting page {pagina}: {e}", source="PNCP") from e
     
     async def collect_all_pages(
         self,
         data_inicial: datetime,
         data_final: datetime,
         codigo_municipio_ibge: Optional[str] = None,
-        codigo_modalidade: Optional[int] = None
+        codigo_modalidade: Optional[int] = None,
+        concurrent: Optional[bool] = None,
+        endpoint: str = PNCP_CONTRATACOES_ENDPOINT,
+        strict: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Collect all pages of bidding data.
         
+        Prefer ``iter_pages`` for long windows: this method keeps every
+        record in memory before returning.
+        
         Args:
             data_inicial: Start date
             data_final: End date
             codigo_municipio_ibge: Municipality IBGE code
             codigo_modalidade: Bidding modality code
+            concurrent: Fetch pages concurrently after the first one.
+                Defaults to True when PNCP_PAGE_CONCURRENCY > 1.
+            endpoint: Listing endpoint (by publication or by update date)
+            strict: Raise DataCollectionError if any page could not be
+                fetched, instead of returning the pages that succeeded
             
         Returns:
-            List of all bidding records
+            List of all bidding records, in page order
         """
+        pages: Dict[int, List[Dict[str, Any]]] = {}
+        
+        async for pagina, data in self.iter_numbered_pages(
+            data_inicial=data_inicial,
+            data_final=data_final,
+            codigo_municipio_ibge=codigo_municipio_ibge,
+            codigo_modalidade=codigo_modalidade,
+            concurrent=concurrent,
+            endpoint=endpoint,
+            strict=strict
+        ):
+            pages[pagina] = data
+        
         all_data = []
-        pagina = 1
+        for pagina in sorted(pages):
+            all_data.extend(pages[pagina])
+        
+        return all_data
+    
+    async def iter_pages(
+        self,
+        data_inicial: datetime,
+        data_final: datetime,
+        codigo_municipio_ibge: Optional[str] = None,
+        codigo_modalidade: Optional[int] = None,
+        concurrent: Optional[bool] = None,
+        endpoint: str = PNCP_CONTRATACOES_ENDPOINT,
+        strict: bool = False
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream bidding records one page at a time.
+        
+        Pages are yielded as soon as they arrive (not necessarily in page
+        order). New requests are only issued while the consumer keeps
+        pulling, so a slow consumer throttles the fetching and at most
+        PNCP_PAGE_CONCURRENCY pages are held in memory.
+        
+        Args:
+            Same as ``collect_all_pages``
+        
+        Yields:
+            List of bidding records of one page
+        """
+        async for _, data in self.iter_numbered_pages(
+            data_inicial=data_inicial,
+            data_final=data_final,
+            codigo_municipio_ibge=codigo_municipio_ibge,
+            codigo_modalidade=codigo_modalidade,
+            concurrent=concurrent,
+            endpoint=endpoint,
+            strict=strict
+        ):
+            yield data
+    
+    async def iter_numbered_pages(
+        self,
+        data_inicial: datetime,
+        data_final: datetime,
+        codigo_municipio_ibge: Optional[str] = None,
+        codigo_modalidade: Optional[int] = None,
+        concurrent: Optional[bool] = None,
+        endpoint: str = PNCP_CONTRATACOES_ENDPOINT,
+        strict: bool = False
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Stream ``(page number, records)`` pairs.
+        
+        Args:
+            Same as ``collect_all_pages``
+        
+        Yields:
+            Tuple of (page number, bidding records of that page)
+        """
+        if concurrent is None:
+            concurrent = settings.PNCP_PAGE_CONCURRENCY > 1
+        
+        filtros = {
+            "data_inicial": data_inicial,
+            "data_final": data_final,
+            "codigo_municipio_ibge": codigo_municipio_ibge,
+            "codigo_modalidade": codigo_modalidade,
+            "endpoint": endpoint
+        }
+        
+        if concurrent:
+            pages = self._iter_pages_concurrently(strict=strict, **filtros)
+        else:
+            pages = self._iter_pages_sequentially(strict=strict, **filtros)
+        
+        async for pagina, data in pages:
+            yield pagina, data
+    
+    @staticmethod
+    def _page_records(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extract the record list from a page response."""
+        data = safe_get(response, "data", default=[])
+        return data if isinstance(data, list) else []
+    
+    async def _iter_pages_sequentially(
+        self,
+        pagina: int = 1,
+        strict: bool = False,
+        **filtros
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Walk pages one at a time following the hasNext flag.
+        
+        Args:
+            pagina: First page to fetch
+            strict: Raise on page errors instead of stopping silently
+            **filtros: Filters forwarded to the request
+        
+        Yields:
+            Tuple of (page number, bidding records)
+        """
+        total = 0
         has_next = True
         
         while has_next:
-            logger.info(f"Collecting page {pagina} for municipality {codigo_municipio_ibge or 'ALL'}")
+            logger.info(f"Collecting page {pagina} for municipality {filtros.get('codigo_municipio_ibge') or 'ALL'}")
             
-            response = await self.collect(
-                data_inicial=data_inicial,
-                data_final=data_final,
-                codigo_municipio_ibge=codigo_municipio_ibge,
-                codigo_modalidade=codigo_modalidade,
-                pagina=pagina
-            )
+            response = await self._get_page(pagina, strict, **filtros)
             
-            data = safe_get(response, "data", default=[])
-            if isinstance(data, list):
-                all_data.extend(data)
-                logger.info(f"Collected {len(data)} records from page {pagina}")
+            data = self._page_records(response)
+            total += len(data)
+            logger.info(f"Collected {len(data)} records from page {pagina}")
+            yield pagina, data
             
             # Check if there are more pages
             has_next = safe_get(response, "hasNext", default=False)
@@ -109,9 +288,127 @@ class PNCPCollector(BaseCollector):
             if has_next:
                 pagina += 1
             else:
-                logger.info(f"No more pages. Total records collected: {len(all_data)}")
+                logger.info(f"No more pages. Total records collected: {total}")
+    
+    async def _fetch_pages_bounded(
+        self,
+        paginas: List[int],
+        **filtros
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Fetch pages with at most PNCP_PAGE_CONCURRENCY requests in flight.
         
-        return all_data
+        A new request is only started after a finished one has been consumed,
+        so results never pile up faster than the caller processes them.
+        
+        Args:
+            paginas: Page numbers to fetch
+            **filtros: Filters forwarded to the request
+        
+        Yields:
+            Tuple of (page number, response or the exception raised)
+        """
+        limite = max(1, settings.PNCP_PAGE_CONCURRENCY)
+        restantes = iter(paginas)
+        tasks: Dict[asyncio.Task, int] = {}
+        
+        def schedule():
+            while len(tasks) < limite:
+                pagina = next(restantes, None)
+                if pagina is None:
+                    break
+                tasks[asyncio.ensure_future(self._fetch_page(pagina=pagina, **filtros))] = pagina
+        
+        try:
+            schedule()
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pagina = tasks.pop(task)
+                    yield pagina, task.exception() or task.result()
+                schedule()
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _iter_pages_concurrently(
+        self,
+        strict: bool = False,
+        **filtros
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Fetch the first page, then stream the remaining pages concurrently.
+        
+        The page count is read from ``totalPaginas`` in the first response.
+        Remaining pages are fetched with at most PNCP_PAGE_CONCURRENCY
+        requests in flight, and only the pages that failed are retried,
+        up to PNCP_PAGE_RETRY_ROUNDS extra rounds. Pages are yielded in
+        completion order.
+        
+        Args:
+            strict: Raise if some pages are still missing after the retries
+            **filtros: Filters forwarded to the request
+        
+        Yields:
+            Tuple of (page number, bidding records)
+        """
+        municipio_label = filtros.get('codigo_municipio_ibge') or 'ALL'
+        logger.info(f"Collecting page 1 for municipality {municipio_label}")
+        
+        first = await self._get_page(1, strict, **filtros)
+        total = len(self._page_records(first))
+        yield 1, self._page_records(first)
+        
+        total_paginas = safe_get(first, "totalPaginas")
+        if not isinstance(total_paginas, int):
+            if safe_get(first, "hasNext", default=False):
+                # No page count available, fall back to walking hasNext
+                logger.warning("Response without totalPaginas, falling back to sequential pagination")
+                async for pagina, data in self._iter_pages_sequentially(pagina=2, strict=strict, **filtros):
+                    yield pagina, data
+            return
+        
+        pending = list(range(2, total_paginas + 1))
+        if pending:
+            logger.info(
+                f"Fetching {len(pending)} remaining pages for municipality {municipio_label} "
+                f"with concurrency {settings.PNCP_PAGE_CONCURRENCY}"
+            )
+        
+        for rodada in range(settings.PNCP_PAGE_RETRY_ROUNDS + 1):
+            if not pending:
+                break
+            
+            failed = []
+            async for pagina, result in self._fetch_pages_bounded(pending, **filtros):
+                if isinstance(result, Exception):
+                    logger.warning(f"Page {pagina} failed for municipality {municipio_label}: {result}")
+                    failed.append(pagina)
+                else:
+                    data = self._page_records(result)
+                    total += len(data)
+                    yield pagina, data
+            
+            pending = sorted(failed)
+            if pending and rodada < settings.PNCP_PAGE_RETRY_ROUNDS:
+                logger.info(f"Retrying {len(pending)} failed pages: {pending}")
+        
+        if pending:
+            logger.error(f"Giving up on pages {pending} for municipality {municipio_label}")
+            if strict:
+                raise DataCollectionError(
+                    f"Pages {pending} could not be collected for municipality {municipio_label}",
+                    source="PNCP"
+                )
+        
+        total_registros = safe_get(first, "totalRegistros")
+        if isinstance(total_registros, int) and total_registros != total:
+            logger.warning(
+                f"Expected {total_registros} records but collected {total} "
+                f"for municipality {municipio_label}"
+            )
+        
+        logger.info(f"Total records collected: {total}")
     
     async def collect_by_municipality(
         self,
@@ -143,76 +440,12 @@ class PNCPCollector(BaseCollector):
         """
         Parse bidding data from API response.
         
+        Fields are mapped and typed by ``LICITACAO_SPEC``.
+        
         Args:
             data: Raw data from API
             
         Returns:
             Parsed bidding data
         """
-        orgao = safe_get(data, "orgaoEntidade", default={})
-        unidade = safe_get(data, "unidadeOrgao", default={})
-        amparo = safe_get(data, "amparoLegal", default={})
-        
-        return {
-            "sequencial_compra": safe_get(data, "sequencialCompra"),
-            "numero_compra": safe_get(data, "numeroCompra"),
-            "processo": safe_get(data, "processo"),
-            "ano_compra": safe_get(data, "anoCompra"),
-            "numero_controle_pncp": safe_get(data, "numeroControlePNCP"),
-            
-            # Orgão
-            "orgao_cnpj": safe_get(orgao, "cnpj"),
-            "orgao_razao_social": safe_get(orgao, "razaoSocial"),
-            "poder_id": safe_get(orgao, "poderId"),
-            "esfera_id": safe_get(orgao, "esferaId"),
-            
-            # Unidade
-            "unidade_codigo": safe_get(unidade, "codigoUnidade"),
-            "unidade_nome": safe_get(unidade, "nomeUnidade"),
-            "codigo_ibge": safe_get(unidade, "codigoIbge"),
-            
-            # Modalidade
-            "modalidade_id": safe_get(data, "modalidadeId"),
-            "modalidade_nome": safe_get(data, "modalidadeNome"),
-            
-            # Modo Disputa
-            "modo_disputa_id": safe_get(data, "modoDisputaId"),
-            "modo_disputa_nome": safe_get(data, "modoDisputaNome"),
-            
-            # Tipo Instrumento
-            "tipo_instrumento_convocatorio_nome": safe_get(data, "tipoInstrumentoConvocatorioNome"),
-            
-            # Amparo Legal
-            "amparo_legal_descricao": safe_get(amparo, "descricao"),
-            "amparo_legal_nome": safe_get(amparo, "nome"),
-            "amparo_legal_codigo": safe_get(amparo, "codigo"),
-            
-            # Objeto
-            "objeto_compra": safe_get(data, "objetoCompra"),
-            "informacao_complementar": safe_get(data, "informacaoComplementar"),
-            
-            # SRP
-            "srp": safe_get(data, "srp", default=False),
-            
-            # Datas
-            "data_publicacao_pncp": safe_get(data, "dataPublicacaoPncp"),
-            "data_abertura_proposta": safe_get(data, "dataAberturaProposta"),
-            "data_encerramento_proposta": safe_get(data, "dataEncerramentoProposta"),
-            "data_inclusao": safe_get(data, "dataInclusao"),
-            "data_atualizacao": safe_get(data, "dataAtualizacao"),
-            
-            # Situação
-            "situacao_compra_id": safe_get(data, "situacaoCompraId"),
-            "situacao_compra_nome": safe_get(data, "situacaoCompraNome"),
-            
-            # Valores
-            "valor_total_estimado": safe_get(data, "valorTotalEstimado"),
-            "valor_total_homologado": safe_get(data, "valorTotalHomologado"),
-            
-            # Links e Info
-            "link_sistema_origem": safe_get(data, "linkSistemaOrigem"),
-            "justificativa_presencial": safe_get(data, "justificativaPresencial"),
-            "existe_resultado": safe_get(data, "existeResultado", default=False),
-            "orcamento_sigiloso_codigo": safe_get(data, "orcamentoSigilosoCodigo"),
-            "usuario_nome": safe_get(data, "usuarioNome"),
-        }
+        return LICITACAO_SPEC.parse(data)
@@ -1,28 +1,59 @@
 """Database connection and session management."""
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
-from typing import Generator
+from typing import TYPE_CHECKING, AsyncGenerator, Generator, Optional
 import logging
 
-from config.settings import settings
+from config.settings import settings, get_database_replica_urls
+from src.database.routing import ReplicaRouter, RoutingSession
 from src.models import Base
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
 logger = logging.getLogger(__name__)
 
+# Async drivers replacing the sync ones in DATABASE_URL
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def _create_engine(url: str):
+    """Create a sync engine with the application's pool settings."""
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        echo=settings.DEBUG
+    )
+
+
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    echo=settings.DEBUG
-)
+engine = _create_engine(settings.DATABASE_URL)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only sessions: reads go to a healthy replica (or the primary)
+replica_router = ReplicaRouter(
+    engine,
+    [_create_engine(url) for url in get_database_replica_urls()],
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG,
+    check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL
+)
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, router=replica_router)
+
+# Async engine and session factory, created on first use so the async
+# driver is only needed by processes that serve async routes
+_async_engine: Optional['AsyncEngine'] = None
+_AsyncSessionLocal: Optional['async_sessionmaker'] = None
+
 
 def init_db():
     """Initialize database tables."""
@@ -61,3 +92,95 @@ def get_db_context() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """
+    Get read-only database session (dependency of dashboard/analytics routes).
+    
+    Reads go to a read replica when one is configured and healthy; a
+    session that writes switches to the primary (see ``RoutingSession``).
+    
+    Yields:
+        Database session
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def get_read_db_context() -> Generator[Session, None, None]:
+    """
+    Get read-only database session as context manager (see ``get_read_db``).
+    
+    Yields:
+        Database session
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def async_database_url(url: Optional[str] = None) -> str:
+    """
+    Get the URL of the async engine.
+    
+    Uses DATABASE_ASYNC_URL when set; otherwise swaps the driver of
+    DATABASE_URL for its async counterpart (asyncpg, aiosqlite).
+    
+    Args:
+        url: Sync URL to convert (default: DATABASE_URL)
+    
+    Returns:
+        Database URL with an async driver
+    """
+    if url is None and settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+    
+    parsed = make_url(url or settings.DATABASE_URL)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for {parsed.get_backend_name()} databases")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def get_async_engine() -> 'AsyncEngine':
+    """Get the async engine, creating it on first use."""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        
+        url = async_database_url()
+        pool = {}
+        if not url.startswith('sqlite'):
+            pool = {'pool_size': settings.DATABASE_POOL_SIZE, 'max_overflow': settings.DATABASE_MAX_OVERFLOW}
+        _async_engine = create_async_engine(url, pool_pre_ping=True, echo=settings.DEBUG, **pool)
+        # Objects stay readable after commit: lazy loads would need an await
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+async def get_async_db() -> AsyncGenerator['AsyncSession', None]:
+    """
+    Get async database session (dependency of the async routes).
+    
+    Yields:
+        Async database session
+    """
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    """Close the connections of the async engine, if it was created."""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _AsyncSessionLocal = None
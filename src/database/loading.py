@@ -0,0 +1,81 @@
+"""Named eager-loading profiles for repositories and services."""
+
+from typing import Dict, Tuple
+from sqlalchemy.orm import Query, joinedload, load_only, raiseload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from src.models import AlertaDisparado, Item, Licitacao, Resultado
+
+# Bidding list views: the columns of LicitacaoResponse only (no large Text
+# fields such as informacao_complementar), no relationships
+LICITACAO_LISTA = 'licitacao_lista'
+
+# Bidding detail views: every column, no relationships
+LICITACAO_DETALHE = 'licitacao_detalhe'
+
+# Biddings with their items, loaded with one extra SELECT ... IN
+LICITACAO_ITENS = 'licitacao_itens'
+
+# Biddings with órgão, município, items, results and suppliers
+LICITACAO_COMPLETA = 'licitacao_completa'
+
+# Triggered alerts with their configuration (joined)
+ALERTA_CONFIGURACAO = 'alerta_configuracao'
+
+PROFILES: Dict[str, Tuple[LoaderOption, ...]] = {
+    LICITACAO_LISTA: (
+        load_only(
+            Licitacao.id,
+            Licitacao.sequencial_compra,
+            Licitacao.numero_compra,
+            Licitacao.processo,
+            Licitacao.ano_compra,
+            Licitacao.numero_controle_pncp,
+            Licitacao.modalidade_nome,
+            Licitacao.objeto_compra,
+            Licitacao.valor_total_estimado,
+            Licitacao.valor_total_homologado,
+            Licitacao.situacao_compra_nome,
+            Licitacao.data_publicacao_pncp,
+            Licitacao.created_at
+        ),
+        raiseload('*'),
+    ),
+    LICITACAO_DETALHE: (
+        raiseload('*'),
+    ),
+    LICITACAO_ITENS: (
+        selectinload(Licitacao.itens),
+    ),
+    LICITACAO_COMPLETA: (
+        joinedload(Licitacao.orgao),
+        joinedload(Licitacao.municipio),
+        selectinload(Licitacao.itens).selectinload(Item.resultados).joinedload(Resultado.fornecedor),
+    ),
+    ALERTA_CONFIGURACAO: (
+        joinedload(AlertaDisparado.configuracao),
+    ),
+}
+
+
+def load_profile(query: Query, profile: str) -> Query:
+    """
+    Apply a named loading profile to a query.
+    
+    Profiles bundle the ``selectinload``/``joinedload`` options (and
+    ``load_only`` projections) of a use case, so a detail view or a batch
+    loop runs a fixed number of queries however many rows it touches.
+    Profiles ending in ``raiseload('*')`` turn any relationship access the
+    view did not plan for into an error instead of a hidden lazy load.
+    
+    Args:
+        query: Query of the profile's mapped class
+        profile: Profile name (e.g. ``LICITACAO_ITENS``)
+    
+    Returns:
+        Query with the profile's loader options
+    
+    Raises:
+        KeyError: If the profile does not exist
+    """
+    return query.options(*PROFILES[profile])
@@ -0,0 +1,21 @@
+-- Migration: Create coleta_estado table
+-- Description: Per-municipality collection watermarks for incremental collection
+
+CREATE TABLE IF NOT EXISTS coleta_estado (
+    id SERIAL PRIMARY KEY,
+    municipio_id INTEGER NOT NULL UNIQUE REFERENCES municipios(id) ON DELETE CASCADE,
+    janela_inicio TIMESTAMP,
+    janela_fim TIMESTAMP,
+    max_data_atualizacao TIMESTAMP,
+    modo VARCHAR(20),
+    total_registros INTEGER DEFAULT 0,
+    ultima_execucao TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_coleta_estado_municipio ON coleta_estado(municipio_id);
+
+COMMENT ON TABLE coleta_estado IS 'Última janela coletada com sucesso e marca d''água de atualização por município';
+COMMENT ON COLUMN coleta_estado.max_data_atualizacao IS 'Maior dataAtualizacao recebida do PNCP para o município';
+COMMENT ON COLUMN coleta_estado.modo IS 'Modo da última coleta: completa ou incremental';
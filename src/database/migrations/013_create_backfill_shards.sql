@@ -0,0 +1,28 @@
+-- Migration: Create backfill_shards table
+-- Description: Checkpoints of the sharded, resumable historical backfill
+
+CREATE TABLE IF NOT EXISTS backfill_shards (
+    id SERIAL PRIMARY KEY,
+    municipio_id INTEGER NOT NULL REFERENCES municipios(id) ON DELETE CASCADE,
+    granularidade VARCHAR(10) NOT NULL,
+    janela_inicio TIMESTAMP NOT NULL,
+    janela_fim TIMESTAMP NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER DEFAULT 0,
+    total_registros INTEGER DEFAULT 0,
+    total_licitacoes INTEGER DEFAULT 0,
+    max_data_atualizacao TIMESTAMP,
+    erro TEXT,
+    iniciado_em TIMESTAMP,
+    concluido_em TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_backfill_shard UNIQUE (municipio_id, granularidade, janela_inicio)
+);
+
+CREATE INDEX IF NOT EXISTS idx_backfill_shards_municipio ON backfill_shards(municipio_id);
+CREATE INDEX IF NOT EXISTS idx_backfill_shards_status ON backfill_shards(status);
+
+COMMENT ON TABLE backfill_shards IS 'Janelas (mês ou semana) do backfill histórico por município, usadas para retomar execuções interrompidas';
+COMMENT ON COLUMN backfill_shards.status IS 'pendente, executando, concluido ou erro';
+COMMENT ON COLUMN backfill_shards.janela_fim IS 'Fim da janela; na janela corrente é atualizado a cada planejamento';
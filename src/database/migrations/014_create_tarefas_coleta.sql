@@ -0,0 +1,29 @@
+-- Migration: Create tarefas_coleta table
+-- Description: Persistent work queue of collection units claimed by workers under time-bounded leases
+
+CREATE TABLE IF NOT EXISTS tarefas_coleta (
+    id SERIAL PRIMARY KEY,
+    tipo VARCHAR(20) NOT NULL,
+    chave VARCHAR(100) NOT NULL UNIQUE,
+    parametros JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER DEFAULT 0,
+    worker_id VARCHAR(100),
+    lease_expira_em TIMESTAMP,
+    heartbeat_em TIMESTAMP,
+    resultado JSONB,
+    erro TEXT,
+    iniciado_em TIMESTAMP,
+    concluido_em TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_tarefas_coleta_tipo ON tarefas_coleta(tipo);
+CREATE INDEX IF NOT EXISTS idx_tarefas_coleta_status ON tarefas_coleta(status);
+CREATE INDEX IF NOT EXISTS idx_tarefas_coleta_lease ON tarefas_coleta(lease_expira_em) WHERE status = 'executando';
+
+COMMENT ON TABLE tarefas_coleta IS 'Fila de unidades de coleta (janela de backfill ou itens/resultados de uma licitação) distribuída entre workers';
+COMMENT ON COLUMN tarefas_coleta.chave IS 'Identificador idempotente da unidade, ex.: janela:42 ou itens:1234';
+COMMENT ON COLUMN tarefas_coleta.status IS 'pendente, executando, concluida ou erro';
+COMMENT ON COLUMN tarefas_coleta.lease_expira_em IS 'Fim do lease do worker; renovado por heartbeat e devolvido à fila quando expira';
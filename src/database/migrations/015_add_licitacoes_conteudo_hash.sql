@@ -0,0 +1,6 @@
+-- Migration: Add content hash to licitacoes
+-- Description: Hash of the parsed PNCP record, so collections only rewrite biddings whose content changed
+
+ALTER TABLE licitacoes ADD COLUMN IF NOT EXISTS conteudo_hash VARCHAR(32);
+
+COMMENT ON COLUMN licitacoes.conteudo_hash IS 'Hash (blake2b) dos campos da licitação como recebidos do PNCP; só é regravada quando muda';
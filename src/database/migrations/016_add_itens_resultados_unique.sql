@@ -0,0 +1,37 @@
+-- Migration: Natural-key unique constraints on itens and resultados
+-- Description: Lets the item/result loader merge with ON CONFLICT, so re-collecting a bidding never duplicates rows
+
+-- Drop duplicates left by earlier collections (the newest row wins)
+DELETE FROM resultados r
+USING itens i, itens d
+WHERE r.item_id = i.id
+  AND d.licitacao_id = i.licitacao_id
+  AND d.numero_item = i.numero_item
+  AND d.id > i.id;
+
+DELETE FROM itens i
+USING itens d
+WHERE d.licitacao_id = i.licitacao_id
+  AND d.numero_item = i.numero_item
+  AND d.id > i.id;
+
+DELETE FROM resultados r
+USING resultados d
+WHERE d.item_id = r.item_id
+  AND d.fornecedor_id = r.fornecedor_id
+  AND d.sequencial_resultado = r.sequencial_resultado
+  AND d.id > r.id;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_itens_licitacao_numero') THEN
+        ALTER TABLE itens ADD CONSTRAINT uq_itens_licitacao_numero UNIQUE (licitacao_id, numero_item);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_resultados_item_fornecedor_sequencial') THEN
+        ALTER TABLE resultados ADD CONSTRAINT uq_resultados_item_fornecedor_sequencial
+            UNIQUE (item_id, fornecedor_id, sequencial_resultado);
+    END IF;
+END $$;
+
+COMMENT ON CONSTRAINT uq_itens_licitacao_numero ON itens IS 'Chave natural do item: número do item dentro da licitação';
+COMMENT ON CONSTRAINT uq_resultados_item_fornecedor_sequencial ON resultados IS 'Chave natural do resultado: item, fornecedor e sequencial do resultado no PNCP';
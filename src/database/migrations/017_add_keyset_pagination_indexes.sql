@@ -0,0 +1,12 @@
+-- Migration: Composite indexes for keyset pagination
+-- Description: Serve the cursor-paginated lists (sort key + id) with an index scan instead of OFFSET
+
+CREATE INDEX IF NOT EXISTS ix_licitacoes_data_publicacao_id ON licitacoes(data_publicacao_pncp, id);
+CREATE INDEX IF NOT EXISTS ix_anomalias_created_id ON anomalias(created_at, id);
+CREATE INDEX IF NOT EXISTS ix_anomalias_status_created_id ON anomalias(status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_alertas_disparados_created_id ON alertas_disparados(created_at, id);
+
+COMMENT ON INDEX ix_licitacoes_data_publicacao_id IS 'Paginação por cursor de /api/v1/licitacoes (data de publicação, id)';
+COMMENT ON INDEX ix_anomalias_created_id IS 'Paginação por cursor de /api/v1/anomalias (created_at, id)';
+COMMENT ON INDEX ix_anomalias_status_created_id IS 'Paginação por cursor de /api/v1/anomalias filtrada por status';
+COMMENT ON INDEX ix_alertas_disparados_created_id IS 'Paginação por cursor de /api/v1/alertas/disparados (created_at, id)';
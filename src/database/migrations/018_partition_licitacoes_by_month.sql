@@ -0,0 +1,253 @@
+-- Migration: Monthly range partitioning of licitacoes, itens and resultados
+-- Description: Partition the bidding tables by publication month (data_publicacao_pncp), so
+--              date-window queries only scan the months they ask for and old months can be
+--              detached and archived instead of deleted row by row.
+--
+-- itens and resultados carry a copy of the bidding's data_publicacao_pncp and are partitioned
+-- on it too (co-partitioned: a bidding, its items and their results live in the same month).
+-- PostgreSQL requires the partition key in every primary key and unique constraint, so:
+--   * primary keys become (id, data_publicacao_pncp); ids still come from the old sequences
+--   * numero_controle_pncp is unique per publication date (PNCP never changes the
+--     publication date of a compra); the upserts conflict on (numero_controle_pncp,
+--     data_publicacao_pncp) once this migration is applied
+--   * anomalias and alertas_disparados keep their licitacao_id column and index but lose the
+--     foreign key, which could only point at (id, data_publicacao_pncp)
+--
+-- Monthly partitions are created ahead of time by lap_criar_particoes (run daily by the
+-- scheduler, or with `python manage.py partitions`). Rows outside every monthly partition land
+-- in the *_default partitions and are moved into their month when it is created.
+--
+-- Items and results that cannot be placed (their bidding or item no longer exists) are moved to
+-- the itens_orfaos and resultados_orfaos tables, with a WARNING giving their counts; the tables
+-- are only left behind when there is something in them.
+--
+-- Take a backup before running it: the tables are rebuilt (copied) in one transaction.
+
+BEGIN;
+
+-- The partition key cannot be NULL
+UPDATE licitacoes
+SET data_publicacao_pncp = COALESCE(data_inclusao, created_at, now())
+WHERE data_publicacao_pncp IS NULL;
+
+-- Partitioned copies with the same columns and defaults (ids keep using the old sequences)
+CREATE TABLE licitacoes_nova (LIKE licitacoes INCLUDING DEFAULTS)
+    PARTITION BY RANGE (data_publicacao_pncp);
+ALTER TABLE licitacoes_nova ALTER COLUMN data_publicacao_pncp SET NOT NULL;
+
+CREATE TABLE itens_nova (LIKE itens INCLUDING DEFAULTS)
+    PARTITION BY RANGE (data_publicacao_pncp);
+ALTER TABLE itens_nova ADD COLUMN IF NOT EXISTS data_publicacao_pncp TIMESTAMP;
+ALTER TABLE itens_nova ALTER COLUMN data_publicacao_pncp SET NOT NULL;
+
+CREATE TABLE resultados_nova (LIKE resultados INCLUDING DEFAULTS)
+    PARTITION BY RANGE (data_publicacao_pncp);
+ALTER TABLE resultados_nova ADD COLUMN IF NOT EXISTS data_publicacao_pncp TIMESTAMP;
+ALTER TABLE resultados_nova ALTER COLUMN data_publicacao_pncp SET NOT NULL;
+
+CREATE TABLE licitacoes_default PARTITION OF licitacoes_nova DEFAULT;
+CREATE TABLE itens_default PARTITION OF itens_nova DEFAULT;
+CREATE TABLE resultados_default PARTITION OF resultados_nova DEFAULT;
+
+-- One partition per month that has data, up to three months ahead
+DO $$
+DECLARE
+    mes DATE;
+    tabela TEXT;
+    fim DATE := (date_trunc('month', now()) + interval '4 months')::date;
+BEGIN
+    SELECT COALESCE(date_trunc('month', min(data_publicacao_pncp)), date_trunc('month', now()))::date
+    INTO mes FROM licitacoes;
+
+    WHILE mes < fim LOOP
+        FOREACH tabela IN ARRAY ARRAY['licitacoes', 'itens', 'resultados'] LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                format('%s_p%s', tabela, to_char(mes, 'YYYY_MM')), tabela || '_nova',
+                mes, (mes + interval '1 month')::date
+            );
+        END LOOP;
+        mes := (mes + interval '1 month')::date;
+    END LOOP;
+END $$;
+
+INSERT INTO licitacoes_nova SELECT * FROM licitacoes;
+
+-- Items whose bidding is missing (and results whose item is missing or orphaned) have no
+-- publication date to be partitioned by: they are kept in holding tables instead of being
+-- dropped with the old tables
+CREATE TABLE itens_orfaos AS
+SELECT i.* FROM itens i
+WHERE NOT EXISTS (SELECT 1 FROM licitacoes l WHERE l.id = i.licitacao_id);
+
+INSERT INTO itens_nova
+SELECT i.*, l.data_publicacao_pncp
+FROM itens i JOIN licitacoes l ON l.id = i.licitacao_id;
+
+CREATE TABLE resultados_orfaos AS
+SELECT r.* FROM resultados r
+WHERE NOT EXISTS (SELECT 1 FROM itens_nova i WHERE i.id = r.item_id);
+
+INSERT INTO resultados_nova
+SELECT r.*, i.data_publicacao_pncp
+FROM resultados r JOIN itens_nova i ON i.id = r.item_id;
+
+DO $$
+DECLARE
+    total_itens BIGINT;
+    total_resultados BIGINT;
+BEGIN
+    SELECT count(*) INTO total_itens FROM itens_orfaos;
+    SELECT count(*) INTO total_resultados FROM resultados_orfaos;
+    IF total_itens + total_resultados > 0 THEN
+        RAISE WARNING '% itens without licitacao and % resultados without item were moved to itens_orfaos and resultados_orfaos',
+            total_itens, total_resultados;
+    ELSE
+        DROP TABLE itens_orfaos, resultados_orfaos;
+    END IF;
+END $$;
+
+-- Keep the id sequences when the old tables go
+DO $$
+DECLARE
+    tabela TEXT;
+BEGIN
+    FOREACH tabela IN ARRAY ARRAY['licitacoes', 'itens', 'resultados'] LOOP
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY NONE', pg_get_serial_sequence(tabela, 'id'));
+    END LOOP;
+END $$;
+
+-- CASCADE drops the foreign keys of anomalias and alertas_disparados (see above)
+DROP TABLE resultados, itens, licitacoes CASCADE;
+
+ALTER TABLE licitacoes_nova RENAME TO licitacoes;
+ALTER TABLE itens_nova RENAME TO itens;
+ALTER TABLE resultados_nova RENAME TO resultados;
+
+ALTER SEQUENCE licitacoes_id_seq OWNED BY licitacoes.id;
+ALTER SEQUENCE itens_id_seq OWNED BY itens.id;
+ALTER SEQUENCE resultados_id_seq OWNED BY resultados.id;
+
+-- Keys, natural keys and foreign keys (all including the partition key)
+ALTER TABLE licitacoes ADD PRIMARY KEY (id, data_publicacao_pncp);
+ALTER TABLE licitacoes ADD CONSTRAINT uq_licitacoes_numero_controle_data
+    UNIQUE (numero_controle_pncp, data_publicacao_pncp);
+ALTER TABLE licitacoes ADD FOREIGN KEY (orgao_id) REFERENCES orgaos(id);
+ALTER TABLE licitacoes ADD FOREIGN KEY (municipio_id) REFERENCES municipios(id);
+
+ALTER TABLE itens ADD PRIMARY KEY (id, data_publicacao_pncp);
+ALTER TABLE itens ADD CONSTRAINT uq_itens_licitacao_numero
+    UNIQUE (licitacao_id, numero_item, data_publicacao_pncp);
+ALTER TABLE itens ADD CONSTRAINT fk_itens_licitacao
+    FOREIGN KEY (licitacao_id, data_publicacao_pncp)
+    REFERENCES licitacoes(id, data_publicacao_pncp) ON DELETE CASCADE;
+
+ALTER TABLE resultados ADD PRIMARY KEY (id, data_publicacao_pncp);
+ALTER TABLE resultados ADD CONSTRAINT uq_resultados_item_fornecedor_sequencial
+    UNIQUE (item_id, fornecedor_id, sequencial_resultado, data_publicacao_pncp);
+ALTER TABLE resultados ADD CONSTRAINT fk_resultados_item
+    FOREIGN KEY (item_id, data_publicacao_pncp)
+    REFERENCES itens(id, data_publicacao_pncp) ON DELETE CASCADE;
+ALTER TABLE resultados ADD FOREIGN KEY (fornecedor_id) REFERENCES fornecedores(id);
+
+-- Indexes of migrations 002, 003, 005 and 017 (created on every partition)
+CREATE INDEX idx_licitacoes_numero_controle ON licitacoes(numero_controle_pncp);
+CREATE INDEX idx_licitacoes_orgao ON licitacoes(orgao_id);
+CREATE INDEX idx_licitacoes_municipio ON licitacoes(municipio_id);
+CREATE INDEX idx_licitacoes_data_publicacao ON licitacoes(data_publicacao_pncp);
+CREATE INDEX idx_licitacoes_modalidade ON licitacoes(modalidade_id);
+CREATE INDEX idx_licitacoes_ano ON licitacoes(ano_compra);
+CREATE INDEX ix_licitacoes_data_publicacao_id ON licitacoes(data_publicacao_pncp, id);
+
+CREATE INDEX idx_itens_licitacao ON itens(licitacao_id);
+CREATE INDEX idx_itens_numero ON itens(numero_item);
+CREATE INDEX idx_itens_descricao ON itens USING gin(to_tsvector('portuguese', descricao));
+CREATE INDEX idx_itens_data_publicacao ON itens(data_publicacao_pncp);
+
+CREATE INDEX idx_resultados_item ON resultados(item_id);
+CREATE INDEX idx_resultados_fornecedor ON resultados(fornecedor_id);
+CREATE INDEX idx_resultados_data ON resultados(data_resultado);
+CREATE INDEX idx_resultados_data_publicacao ON resultados(data_publicacao_pncp);
+
+-- Create the monthly partitions of [inicio, fim) that do not exist yet, moving rows of those
+-- months out of the default partitions. Returns the partitions created.
+CREATE OR REPLACE FUNCTION lap_criar_particoes(inicio DATE, fim DATE)
+RETURNS SETOF TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    mes DATE := date_trunc('month', inicio)::date;
+    proximo DATE;
+    tabela TEXT;
+    particao TEXT;
+BEGIN
+    WHILE mes < fim LOOP
+        proximo := (mes + interval '1 month')::date;
+        IF to_regclass(format('licitacoes_p%s', to_char(mes, 'YYYY_MM'))) IS NULL THEN
+            -- Build the month as plain tables, fill them from the defaults, then attach them
+            FOREACH tabela IN ARRAY ARRAY['licitacoes', 'itens', 'resultados'] LOOP
+                particao := format('%s_p%s', tabela, to_char(mes, 'YYYY_MM'));
+                EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', particao, tabela);
+                EXECUTE format(
+                    'INSERT INTO %I SELECT * FROM %I WHERE data_publicacao_pncp >= %L AND data_publicacao_pncp < %L',
+                    particao, tabela || '_default', mes, proximo
+                );
+            END LOOP;
+            FOREACH tabela IN ARRAY ARRAY['resultados', 'itens', 'licitacoes'] LOOP
+                EXECUTE format(
+                    'DELETE FROM %I WHERE data_publicacao_pncp >= %L AND data_publicacao_pncp < %L',
+                    tabela || '_default', mes, proximo
+                );
+            END LOOP;
+            FOREACH tabela IN ARRAY ARRAY['licitacoes', 'itens', 'resultados'] LOOP
+                particao := format('%s_p%s', tabela, to_char(mes, 'YYYY_MM'));
+                EXECUTE format(
+                    'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    tabela, particao, mes, proximo
+                );
+                RETURN NEXT particao;
+            END LOOP;
+        END IF;
+        mes := proximo;
+    END LOOP;
+END $$;
+
+-- Detach the monthly partitions of the months before `antes` (results, items, then biddings)
+-- and drop the foreign keys they keep, leaving standalone tables to archive (pg_dump -t) and
+-- drop. Returns the tables detached.
+CREATE OR REPLACE FUNCTION lap_desanexar_particoes(antes DATE)
+RETURNS SETOF TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    mes TEXT;
+    tabela TEXT;
+    particao TEXT;
+    restricao TEXT;
+BEGIN
+    FOR mes IN
+        SELECT substring(c.relname FROM '^licitacoes_p(\d{4}_\d{2})$')
+        FROM pg_inherits h JOIN pg_class c ON c.oid = h.inhrelid
+        WHERE h.inhparent = 'licitacoes'::regclass
+          AND c.relname ~ '^licitacoes_p\d{4}_\d{2}$'
+          AND to_date(substring(c.relname FROM '^licitacoes_p(\d{4}_\d{2})$'), 'YYYY_MM') < date_trunc('month', antes)
+        ORDER BY 1
+    LOOP
+        FOREACH tabela IN ARRAY ARRAY['resultados', 'itens', 'licitacoes'] LOOP
+            particao := format('%s_p%s', tabela, mes);
+            EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', tabela, particao);
+            FOR restricao IN
+                SELECT conname FROM pg_constraint WHERE conrelid = particao::regclass AND contype = 'f'
+            LOOP
+                EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', particao, restricao);
+            END LOOP;
+            RETURN NEXT particao;
+        END LOOP;
+    END LOOP;
+END $$;
+
+COMMENT ON TABLE licitacoes IS 'Licitações particionadas por mês de publicação no PNCP (data_publicacao_pncp)';
+COMMENT ON TABLE itens IS 'Itens particionados pelo mês de publicação da licitação (data_publicacao_pncp copiada dela)';
+COMMENT ON TABLE resultados IS 'Resultados particionados pelo mês de publicação da licitação (data_publicacao_pncp copiada dela)';
+COMMENT ON FUNCTION lap_criar_particoes(DATE, DATE) IS 'Cria as partições mensais ainda inexistentes de [inicio, fim), movendo linhas das partições default';
+COMMENT ON FUNCTION lap_desanexar_particoes(DATE) IS 'Desanexa as partições dos meses anteriores a antes, para arquivamento';
+
+COMMIT;
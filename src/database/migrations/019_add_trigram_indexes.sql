@@ -0,0 +1,21 @@
+-- Migration: Trigram indexes for substring search
+-- Description: Serve the ILIKE '%termo%' searches (item descriptions in price analysis and
+--              anomalies, bidding objects, supplier names) with pg_trgm GIN indexes instead
+--              of sequential scans. The to_tsvector index of migration 003 only serves
+--              full-text (@@) queries, which the application does not run.
+--
+-- Terms need at least 3 characters (one trigram) to use these indexes; src/database/search.py
+-- rejects shorter ones. On the partitioned tables (migration 018) the indexes are created on
+-- every partition, and on the partitions created later.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_itens_descricao_trgm ON itens USING gin (descricao gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_licitacoes_objeto_trgm ON licitacoes USING gin (objeto_compra gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_licitacoes_info_complementar_trgm ON licitacoes USING gin (informacao_complementar gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_fornecedores_razao_social_trgm ON fornecedores USING gin (razao_social gin_trgm_ops);
+
+COMMENT ON INDEX idx_itens_descricao_trgm IS 'Busca por trecho da descrição do item (análise de preços, anomalias)';
+COMMENT ON INDEX idx_licitacoes_objeto_trgm IS 'Busca por palavra-chave no objeto da licitação';
+COMMENT ON INDEX idx_licitacoes_info_complementar_trgm IS 'Busca por palavra-chave na informação complementar da licitação';
+COMMENT ON INDEX idx_fornecedores_razao_social_trgm IS 'Busca de fornecedores por trecho da razão social';
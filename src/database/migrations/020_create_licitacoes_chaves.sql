@@ -0,0 +1,71 @@
+-- Migration: numero_controle_pncp unique across the licitacoes partitions
+-- Description: Since migration 018 the unique constraint of licitacoes is (numero_controle_pncp,
+--              data_publicacao_pncp), so a bidding re-sent with another publication date would
+--              be stored twice, once in each month. licitacoes_chaves registers the publication
+--              date of every numero_controle_pncp, and a trigger rejects rows that disagree.
+--
+-- Apply it after 018. Keys stay registered after their bidding is deleted or its partition is
+-- detached; correcting the date of a stored bidding (UPDATE) moves its registration. Existing
+-- duplicates are registered with their earliest date: find them with
+--   SELECT numero_controle_pncp FROM licitacoes GROUP BY 1 HAVING count(*) > 1;
+-- and delete the wrong copies.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS licitacoes_chaves (
+    numero_controle_pncp VARCHAR(100) PRIMARY KEY,
+    data_publicacao_pncp TIMESTAMP NOT NULL
+);
+
+INSERT INTO licitacoes_chaves (numero_controle_pncp, data_publicacao_pncp)
+SELECT numero_controle_pncp, min(data_publicacao_pncp)
+FROM licitacoes
+WHERE numero_controle_pncp IS NOT NULL
+GROUP BY numero_controle_pncp
+ON CONFLICT (numero_controle_pncp) DO NOTHING;
+
+-- Register the key of an inserted bidding (or of a corrected publication date) and reject it
+-- when the key is already registered with another date.
+CREATE OR REPLACE FUNCTION lap_registrar_chave_licitacao()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    registrada TIMESTAMP;
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NEW.numero_controle_pncp IS NOT DISTINCT FROM OLD.numero_controle_pncp
+           AND NEW.data_publicacao_pncp = OLD.data_publicacao_pncp THEN
+            RETURN NEW;
+        END IF;
+        DELETE FROM licitacoes_chaves
+        WHERE numero_controle_pncp = OLD.numero_controle_pncp
+          AND data_publicacao_pncp = OLD.data_publicacao_pncp;
+    END IF;
+    IF NEW.numero_controle_pncp IS NULL THEN
+        RETURN NEW;
+    END IF;
+
+    INSERT INTO licitacoes_chaves (numero_controle_pncp, data_publicacao_pncp)
+    VALUES (NEW.numero_controle_pncp, NEW.data_publicacao_pncp)
+    ON CONFLICT (numero_controle_pncp) DO NOTHING;
+    SELECT data_publicacao_pncp INTO registrada
+    FROM licitacoes_chaves WHERE numero_controle_pncp = NEW.numero_controle_pncp;
+    IF registrada <> NEW.data_publicacao_pncp THEN
+        RAISE EXCEPTION 'numero_controle_pncp % already stored with data_publicacao_pncp %',
+            NEW.numero_controle_pncp, registrada
+            USING ERRCODE = 'unique_violation';
+    END IF;
+    RETURN NEW;
+END $$;
+
+-- Row triggers of partitioned tables are cloned to every partition, including the ones
+-- lap_criar_particoes attaches later
+DROP TRIGGER IF EXISTS trg_licitacoes_chave ON licitacoes;
+CREATE TRIGGER trg_licitacoes_chave
+    BEFORE INSERT OR UPDATE OF numero_controle_pncp, data_publicacao_pncp ON licitacoes
+    FOR EACH ROW EXECUTE FUNCTION lap_registrar_chave_licitacao();
+
+COMMENT ON TABLE licitacoes_chaves IS 'Data de publicação registrada de cada numero_controle_pncp (unicidade entre partições)';
+COMMENT ON FUNCTION lap_registrar_chave_licitacao() IS 'Registra a chave da licitação e rejeita datas de publicação divergentes';
+
+COMMIT;
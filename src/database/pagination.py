@@ -0,0 +1,284 @@
+"""Keyset (cursor) pagination and cheap totals for list queries."""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, false, func, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.types import Date, DateTime
+import logging
+
+from src.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Total modes of the list endpoints
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATED = 'estimated'
+COUNT_NONE = 'none'
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATED, COUNT_NONE)
+
+# Rows counted exactly before a total is reported as a lower bound
+COUNT_LIMIT = 10000
+
+# Deepest OFFSET served by the deprecated page/skip parameters
+MAX_OFFSET = 1000
+
+
+class Page:
+    """One page of a keyset-paginated query."""
+    
+    def __init__(
+        self,
+        items: List[Any],
+        next_cursor: Optional[str] = None,
+        total: Optional[int] = None,
+        total_exact: bool = True
+    ):
+        """
+        Initialize page.
+        
+        Args:
+            items: Rows of the page
+            next_cursor: Cursor of the following page (None on the last one)
+            total: Total rows matching the query (None when not counted)
+            total_exact: Whether ``total`` is exact rather than capped or estimated
+        """
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+        self.total_exact = total_exact
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort key values of a row as an opaque cursor.
+    
+    Args:
+        values: Sort key values, in key order
+    
+    Returns:
+        URL-safe cursor string
+    """
+    payload = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, keys: Sequence[Any]) -> List[Any]:
+    """
+    Decode a cursor built by ``encode_cursor`` for the given sort keys.
+    
+    Args:
+        cursor: Cursor string
+        keys: Sort key columns the cursor was built for
+    
+    Returns:
+        Sort key values, converted back to the column types
+    
+    Raises:
+        ValidationError: If the cursor is malformed or does not match the keys
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("wrong number of values")
+        return [_from_json(key, value) for key, value in zip(keys, values)]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValidationError(f"Invalid cursor: {e}", field='cursor')
+
+
+def _from_json(key: Any, value: Any) -> Any:
+    """Convert a decoded cursor value back to the type of its column."""
+    if value is None:
+        return None
+    if isinstance(key.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(key.type, Date):
+        return date.fromisoformat(value)
+    return value
+
+
+def _after(keys: Sequence[Any], values: Sequence[Any], descending: bool) -> Any:
+    """
+    Build the condition selecting the rows that sort after a cursor.
+    
+    NULLs sort as the largest value (PostgreSQL's default), so plain
+    b-tree indexes on the keys serve the ORDER BY in both directions.
+    """
+    key, value = keys[0], values[0]
+    rest = _after(keys[1:], values[1:], descending) if len(keys) > 1 else None
+    
+    if value is None:
+        passed = key.isnot(None) if descending else false()
+        same = key.is_(None)
+    else:
+        passed = key < value if descending else or_(key > value, key.is_(None))
+        same = key == value
+    
+    if rest is None:
+        return passed
+    return or_(passed, and_(same, rest))
+
+
+def order_keyset(query: Query, keys: Sequence[Any], descending: bool = True) -> Query:
+    """Order a query by the sort keys of its keyset pagination."""
+    if descending:
+        return query.order_by(*[key.desc().nulls_first() for key in keys])
+    return query.order_by(*[key.asc().nulls_last() for key in keys])
+
+
+def paginate_keyset(
+    query: Query,
+    keys: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True
+) -> Page:
+    """
+    Fetch one page of a query with keyset pagination.
+    
+    Instead of ``OFFSET``, each page starts right after the sort key values
+    of the previous page's last row, so deep pages cost the same as the
+    first one. The last key must be unique (e.g. the primary key) for the
+    order to be stable.
+    
+    Args:
+        query: Filtered, unordered query of a mapped class
+        keys: Sort key columns, the unique tiebreaker last
+        limit: Rows per page
+        cursor: ``next_cursor`` of the previous page (None for the first page)
+        descending: Newest (largest) keys first
+    
+    Returns:
+        Page with the rows and the cursor of the next page
+    
+    Raises:
+        ValidationError: If the cursor is invalid
+    """
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, keys), descending))
+    
+    # One extra row tells whether another page exists
+    rows = order_keyset(query, keys, descending).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], key.key) for key in keys])
+    return Page(rows, next_cursor)
+
+
+def paginate_offset(
+    query: Query,
+    keys: Sequence[Any],
+    offset: int,
+    limit: int,
+    max_offset: int = MAX_OFFSET,
+    field: str = 'page'
+) -> Page:
+    """
+    Fetch one page of a query with (deprecated) OFFSET pagination.
+    
+    The database still reads and discards every skipped row, so offsets
+    beyond ``max_offset`` are refused in favour of the cursor.
+    
+    Args:
+        query: Filtered, unordered query of a mapped class
+        keys: Sort key columns, the unique tiebreaker last
+        offset: Rows to skip
+        limit: Rows per page
+        max_offset: Deepest offset served
+        field: Name of the parameter, for the error
+    
+    Returns:
+        Page with the rows (no cursor)
+    
+    Raises:
+        ValidationError: If ``offset`` is beyond ``max_offset``
+    """
+    check_offset(offset, max_offset, field)
+    return Page(order_keyset(query, keys).offset(offset).limit(limit).all())
+
+
+def check_offset(offset: int, max_offset: int = MAX_OFFSET, field: str = 'skip'):
+    """
+    Refuse an OFFSET deeper than ``max_offset``.
+    
+    Args:
+        offset: Rows to skip
+        max_offset: Deepest offset served
+        field: Name of the parameter, for the error
+    
+    Raises:
+        ValidationError: If ``offset`` is beyond ``max_offset``
+    """
+    if offset > max_offset:
+        raise ValidationError(
+            f"OFFSET pagination stops at {max_offset} rows, use the cursor for deeper pages", field=field
+        )
+
+
+def count_total(query: Query, mode: str = COUNT_EXACT, limit: int = COUNT_LIMIT) -> Tuple[Optional[int], bool]:
+    """
+    Count the rows of a query without scanning all of them.
+    
+    ``exact`` counts up to ``limit`` rows and reports larger results as a
+    lower bound. ``estimated`` takes the planner's row estimate on
+    PostgreSQL, falling back to the capped exact count when the estimate
+    is small (or on other databases). ``none`` skips the count.
+    
+    Args:
+        query: Filtered query
+        mode: One of ``COUNT_MODES``
+        limit: Rows counted exactly
+    
+    Returns:
+        Tuple of (total or None, whether the total is exact)
+    """
+    if mode == COUNT_NONE:
+        return None, False
+    
+    query = query.order_by(None)
+    if mode == COUNT_ESTIMATED and query.session.get_bind().dialect.name == 'postgresql':
+        estimate = _estimate_rows(query)
+        if estimate is not None and estimate > limit:
+            return estimate, False
+    
+    total = query.session.query(func.count()).select_from(query.limit(limit + 1).subquery()).scalar()
+    if total > limit:
+        return limit, False
+    return total, True
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a statement, executed with its bound parameters."""
+    
+    inherit_cache = False
+    
+    def __init__(self, statement: Any):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler: Any, **kw: Any) -> str:
+    """Prefix the compiled statement, whose parameters stay bound, with EXPLAIN."""
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+def _estimate_rows(query: Query) -> Optional[int]:
+    """Get PostgreSQL's estimate of the rows a query returns (None on failure)."""
+    try:
+        # A failed statement must not abort the caller's transaction
+        with query.session.begin_nested():
+            plan = query.session.execute(_Explain(query.statement)).scalar()
+    except Exception as e:
+        logger.warning(f"Could not estimate row count: {e}")
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,211 @@
+"""Monthly range partitions of licitacoes, itens and resultados (migration 018)."""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import ColumnElement
+from sqlalchemy.orm import Session
+import logging
+import time
+
+from config.settings import settings
+from src.database.unit_of_work import finish_write
+
+logger = logging.getLogger(__name__)
+
+# Partition key of the three tables (itens/resultados carry the bidding's)
+PARTITION_KEY = 'data_publicacao_pncp'
+
+# Seconds an is_partitioned answer is trusted, so that running processes
+# notice migration 018 being applied
+PARTITIONED_CHECK_INTERVAL = 300.0
+
+# PostgreSQL error of an ON CONFLICT target that matches no unique constraint
+INVALID_CONFLICT_TARGET = '42P10'
+
+# Whether licitacoes is partitioned, by engine, and when that was checked
+_particionado: Dict[Any, bool] = {}
+_verificado_em: Dict[Any, float] = {}
+
+
+def is_partitioned(db: Session) -> bool:
+    """
+    Tell whether the bidding tables are partitioned.
+    
+    The answer is cached per engine for ``PARTITIONED_CHECK_INTERVAL``
+    seconds, and dropped earlier by ``forget_partitioning`` (called when
+    partitions are maintained and when an upsert names the wrong conflict
+    key).
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        True on PostgreSQL databases migrated to monthly partitions
+    """
+    engine = db.get_bind()
+    agora = time.monotonic()
+    if engine not in _particionado or agora - _verificado_em.get(engine, agora) >= PARTITIONED_CHECK_INTERVAL:
+        _particionado[engine] = engine.dialect.name == 'postgresql' and bool(db.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('licitacoes'))"
+        )).scalar())
+        _verificado_em[engine] = agora
+    return _particionado[engine]
+
+
+def forget_partitioning(engine: Any):
+    """
+    Drop the cached ``is_partitioned`` answer of an engine.
+    
+    Args:
+        engine: Engine (or connection) the answer was cached for
+    """
+    _particionado.pop(engine, None)
+    _verificado_em.pop(engine, None)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _conflict_target_error(context):
+    """Re-check the partitioning after an upsert named a conflict key the tables do not have."""
+    if getattr(context.original_exception, 'pgcode', None) == INVALID_CONFLICT_TARGET:
+        logger.warning("ON CONFLICT target does not match the bidding tables, re-checking their partitioning")
+        forget_partitioning(context.engine)
+
+
+def conflict_key(db: Session, key: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Get the ``ON CONFLICT`` columns of a natural key.
+    
+    Unique constraints of partitioned tables include the partition key, so
+    upserts into them must name it too.
+    
+    Args:
+        db: Database session
+        key: Natural key columns
+    
+    Returns:
+        ``key``, plus the partition key when the tables are partitioned
+    """
+    return key + (PARTITION_KEY,) if is_partitioned(db) else key
+
+
+def partition_window(db: Session, desde: datetime, *colunas: Any) -> List[ColumnElement]:
+    """
+    Get the filters that let PostgreSQL skip the partitions before a date.
+    
+    Queries already filter on ``Licitacao.data_publicacao_pncp``; the
+    copies in itens/resultados are what the planner prunes those tables
+    by. Unpartitioned databases may still hold NULL copies (rows written
+    before migration 018), so the filters are only added when pruning
+    applies.
+    
+    Args:
+        db: Database session
+        desde: First publication date of the window
+        *colunas: Partition key columns to filter (e.g. ``Item.data_publicacao_pncp``)
+    
+    Returns:
+        One ``coluna >= desde`` filter per column, or none when the tables
+        are not partitioned
+    """
+    if not is_partitioned(db):
+        return []
+    return [coluna >= desde for coluna in colunas]
+
+
+def add_months(mes: date, meses: int) -> date:
+    """
+    Get the first day of the month ``meses`` months after ``mes``.
+    
+    Args:
+        mes: Any day of the starting month
+        meses: Months to add (negative to go back)
+    
+    Returns:
+        First day of the resulting month
+    """
+    indice = mes.year * 12 + mes.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def create_partitions(db: Session, inicio: Optional[date] = None, fim: Optional[date] = None) -> List[str]:
+    """
+    Create the missing monthly partitions of a period.
+    
+    Rows already stored in the default partitions for those months are moved
+    into them.
+    
+    Args:
+        db: Database session
+        inicio: First month (default: current month)
+        fim: Month after the last one (default: ``DATABASE_PARTITION_MONTHS_AHEAD``
+            months after the current one)
+    
+    Returns:
+        Partitions created (empty when the tables are not partitioned)
+    """
+    if not is_partitioned(db):
+        return []
+    
+    hoje = date.today()
+    inicio = inicio or add_months(hoje, 0)
+    fim = fim or add_months(hoje, settings.DATABASE_PARTITION_MONTHS_AHEAD + 1)
+    criadas = [
+        particao for particao, in db.execute(
+            text("SELECT lap_criar_particoes(:inicio, :fim)"), {'inicio': inicio, 'fim': fim}
+        )
+    ]
+    finish_write(db, rows=len(criadas))
+    if criadas:
+        logger.info(f"Created partitions {', '.join(criadas)}")
+    return criadas
+
+
+def detach_partitions(db: Session, antes: date) -> List[str]:
+    """
+    Detach the monthly partitions of the months before ``antes``.
+    
+    The detached tables keep their rows (without foreign keys) until they
+    are archived, e.g. with ``pg_dump -t``, and dropped.
+    
+    Args:
+        db: Database session
+        antes: First month to keep attached
+    
+    Returns:
+        Tables detached (empty when the tables are not partitioned)
+    """
+    if not is_partitioned(db):
+        return []
+    
+    desanexadas = [
+        particao for particao, in db.execute(
+            text("SELECT lap_desanexar_particoes(:antes)"), {'antes': antes}
+        )
+    ]
+    finish_write(db, rows=len(desanexadas))
+    if desanexadas:
+        logger.info(f"Detached partitions {', '.join(desanexadas)}")
+    return desanexadas
+
+
+def maintain_partitions(db: Session) -> Dict[str, List[str]]:
+    """
+    Create the partitions of the coming months and, when
+    ``DATABASE_PARTITION_RETENTION_MONTHS`` is set, detach the expired ones.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Dictionary with the partitions ``criadas`` and ``desanexadas``
+    """
+    # Notices a migration applied while the process was running
+    forget_partitioning(db.get_bind())
+    stats = {'criadas': create_partitions(db), 'desanexadas': []}
+    if settings.DATABASE_PARTITION_RETENTION_MONTHS > 0:
+        stats['desanexadas'] = detach_partitions(
+            db, add_months(date.today(), -settings.DATABASE_PARTITION_RETENTION_MONTHS)
+        )
+    return stats
@@ -3,11 +3,31 @@
 from src.database.repositories.municipio_repository import MunicipioRepository
 from src.database.repositories.licitacao_repository import LicitacaoRepository
 from src.database.repositories.item_repository import ItemRepository
+from src.database.repositories.item_resultado_loader import ItemResultadoLoader
 from src.database.repositories.fornecedor_repository import FornecedorRepository
+from src.database.repositories.coleta_estado_repository import ColetaEstadoRepository
+from src.database.repositories.backfill_shard_repository import BackfillShardRepository
+from src.database.repositories.tarefa_coleta_repository import TarefaColetaRepository
+from src.database.repositories.async_repository import (
+    AsyncRepository,
+    AsyncMunicipioRepository,
+    AsyncLicitacaoRepository,
+    AsyncItemRepository,
+    AsyncFornecedorRepository
+)
 
 __all__ = [
     'MunicipioRepository',
     'LicitacaoRepository',
     'ItemRepository',
+    'ItemResultadoLoader',
     'FornecedorRepository',
+    'ColetaEstadoRepository',
+    'BackfillShardRepository',
+    'TarefaColetaRepository',
+    'AsyncRepository',
+    'AsyncMunicipioRepository',
+    'AsyncLicitacaoRepository',
+    'AsyncItemRepository',
+    'AsyncFornecedorRepository',
 ]
@@ -0,0 +1,73 @@
+"""Async variants of the repositories, for routes on the async engine."""
+
+from typing import Any, Callable, Type
+import logging
+
+from src.database.repositories.municipio_repository import MunicipioRepository
+from src.database.repositories.licitacao_repository import LicitacaoRepository
+from src.database.repositories.item_repository import ItemRepository
+from src.database.repositories.fornecedor_repository import FornecedorRepository
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRepository:
+    """
+    Awaitable facade over a synchronous repository.
+    
+    Every method of ``repository_class`` becomes a coroutine that runs the
+    sync method through ``AsyncSession.run_sync``: the queries go through
+    the async driver (asyncpg) and yield to the event loop while waiting on
+    the database, while the query code stays in one place. Results are
+    loaded before returning; relationships that were not loaded must not be
+    touched afterwards (lazy loads need the session's greenlet).
+    
+    Example:
+        repo = AsyncLicitacaoRepository(db)
+        licitacao = await repo.get_by_id(licitacao_id)
+    """
+    
+    repository_class: Type = None
+    
+    def __init__(self, db: Any):
+        """
+        Initialize repository with async database session.
+        
+        Args:
+            db: ``AsyncSession``
+        """
+        self.db = db
+    
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        metodo = getattr(self.repository_class, name)
+        if name.startswith('_') or not callable(metodo):
+            raise AttributeError(name)
+        
+        async def chamar(*args, **kwargs):
+            return await self.db.run_sync(
+                lambda session: metodo(self.repository_class(session), *args, **kwargs)
+            )
+        
+        chamar.__name__ = name
+        chamar.__doc__ = metodo.__doc__
+        return chamar
+
+
+class AsyncMunicipioRepository(AsyncRepository):
+    """Async repository for municipality operations."""
+    repository_class = MunicipioRepository
+
+
+class AsyncLicitacaoRepository(AsyncRepository):
+    """Async repository for bidding operations."""
+    repository_class = LicitacaoRepository
+
+
+class AsyncItemRepository(AsyncRepository):
+    """Async repository for item operations."""
+    repository_class = ItemRepository
+
+
+class AsyncFornecedorRepository(AsyncRepository):
+    """Async repository for supplier operations."""
+    repository_class = FornecedorRepository
@@ -0,0 +1,135 @@
+"""Repository for backfill shard data access."""
+
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from datetime import datetime
+import logging
+
+from src.models import BackfillShard
+from src.utils.constants import SHARD_PENDENTE, SHARD_EXECUTANDO, SHARD_CONCLUIDO, SHARD_ERRO
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillShardRepository:
+    """Repository for backfill shard operations."""
+    
+    def __init__(self, db: Session):
+        """Initialize repository with database session."""
+        self.db = db
+    
+    def get_by_id(self, shard_id: int) -> Optional[BackfillShard]:
+        """Get shard by ID."""
+        return self.db.query(BackfillShard).filter(BackfillShard.id == shard_id).first()
+    
+    def get_by_municipio(self, municipio_id: int) -> List[BackfillShard]:
+        """Get all shards of a municipality, oldest window first."""
+        return self.db.query(BackfillShard).filter(
+            BackfillShard.municipio_id == municipio_id
+        ).order_by(BackfillShard.janela_inicio).all()
+    
+    def planejar(
+        self,
+        municipio_id: int,
+        granularidade: str,
+        janelas: List[Tuple[datetime, datetime]]
+    ) -> int:
+        """
+        Create the shards that do not exist yet for a municipality.
+        
+        Shards are identified by their window start. Unfinished shards get
+        their window end refreshed, so the open (current) window grows with
+        each run. A finished shard whose window grew (the current month,
+        finished before the month ended) is reopened to read the rest of it;
+        other finished shards are left untouched.
+        
+        Returns:
+            Number of shards created
+        """
+        existentes = {
+            shard.janela_inicio: shard
+            for shard in self.db.query(BackfillShard).filter(
+                BackfillShard.municipio_id == municipio_id,
+                BackfillShard.granularidade == granularidade
+            )
+        }
+        
+        criados = 0
+        reabertos = 0
+        for janela_inicio, janela_fim in janelas:
+            shard = existentes.get(janela_inicio)
+            if shard is None:
+                self.db.add(BackfillShard(
+                    municipio_id=municipio_id,
+                    granularidade=granularidade,
+                    janela_inicio=janela_inicio,
+                    janela_fim=janela_fim,
+                    status=SHARD_PENDENTE
+                ))
+                criados += 1
+            elif shard.status != SHARD_CONCLUIDO:
+                shard.janela_fim = janela_fim
+            elif janela_fim > shard.janela_fim:
+                shard.janela_fim = janela_fim
+                shard.status = SHARD_PENDENTE
+                reabertos += 1
+        
+        self.db.commit()
+        if reabertos:
+            logger.info(f"Reopened {reabertos} finished backfill shards of municipio {municipio_id} whose window grew")
+        return criados
+    
+    def get_inacabados(self, municipio_ids: Optional[List[int]] = None) -> List[BackfillShard]:
+        """
+        Get shards that still have to run, most recent window first.
+        
+        Shards left as "executando" by an interrupted run are included.
+        """
+        query = self.db.query(BackfillShard).filter(BackfillShard.status != SHARD_CONCLUIDO)
+        if municipio_ids is not None:
+            query = query.filter(BackfillShard.municipio_id.in_(municipio_ids))
+        return query.order_by(BackfillShard.janela_inicio.desc(), BackfillShard.municipio_id).all()
+    
+    def marcar_executando(self, shard_id: int) -> Optional[BackfillShard]:
+        """Mark a shard as running."""
+        shard = self.get_by_id(shard_id)
+        if shard:
+            shard.status = SHARD_EXECUTANDO
+            shard.tentativas = (shard.tentativas or 0) + 1
+            shard.iniciado_em = datetime.now()
+            shard.erro = None
+            self.db.commit()
+        return shard
+    
+    def marcar_concluido(
+        self,
+        shard_id: int,
+        total_registros: int,
+        total_licitacoes: int,
+        max_data_atualizacao: Optional[datetime]
+    ) -> Optional[BackfillShard]:
+        """Mark a shard as finished and store its counters."""
+        shard = self.get_by_id(shard_id)
+        if shard:
+            shard.status = SHARD_CONCLUIDO
+            shard.total_registros = total_registros
+            shard.total_licitacoes = total_licitacoes
+            shard.max_data_atualizacao = max_data_atualizacao
+            shard.concluido_em = datetime.now()
+            self.db.commit()
+        return shard
+    
+    def marcar_erro(self, shard_id: int, erro: str) -> Optional[BackfillShard]:
+        """Mark a shard as failed."""
+        shard = self.get_by_id(shard_id)
+        if shard:
+            shard.status = SHARD_ERRO
+            shard.erro = erro
+            self.db.commit()
+        return shard
+    
+    def resumo(self) -> Dict[str, int]:
+        """Count shards by status."""
+        rows = self.db.query(BackfillShard.status, func.count(BackfillShard.id)).group_by(BackfillShard.status).all()
+        return {status: total for status, total in rows}
@@ -0,0 +1,60 @@
+"""Repository for collection state data access."""
+
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from datetime import datetime
+import logging
+
+from src.models import ColetaEstado
+
+logger = logging.getLogger(__name__)
+
+
+class ColetaEstadoRepository:
+    """Repository for collection state operations."""
+    
+    def __init__(self, db: Session):
+        """Initialize repository with database session."""
+        self.db = db
+    
+    def get_by_municipio(self, municipio_id: int) -> Optional[ColetaEstado]:
+        """Get collection state for a municipality."""
+        return self.db.query(ColetaEstado).filter(ColetaEstado.municipio_id == municipio_id).first()
+    
+    def get_all(self) -> List[ColetaEstado]:
+        """Get collection state for all municipalities."""
+        return self.db.query(ColetaEstado).all()
+    
+    def registrar_sucesso(
+        self,
+        municipio_id: int,
+        janela_inicio: datetime,
+        janela_fim: datetime,
+        max_data_atualizacao: Optional[datetime],
+        modo: str,
+        total_registros: int
+    ) -> ColetaEstado:
+        """
+        Record a successfully collected window for a municipality.
+        
+        The watermark only moves forward: a window whose records are older
+        than the stored watermark keeps the previous value.
+        """
+        estado = self.get_by_municipio(municipio_id)
+        if not estado:
+            estado = ColetaEstado(municipio_id=municipio_id)
+            self.db.add(estado)
+        
+        estado.janela_inicio = janela_inicio
+        estado.janela_fim = janela_fim
+        if max_data_atualizacao and (
+            not estado.max_data_atualizacao or max_data_atualizacao > estado.max_data_atualizacao
+        ):
+            estado.max_data_atualizacao = max_data_atualizacao
+        estado.modo = modo
+        estado.total_registros = total_registros
+        estado.ultima_execucao = datetime.now()
+        
+        self.db.commit()
+        self.db.refresh(estado)
+        return estado
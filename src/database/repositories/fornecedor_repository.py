@@ -5,6 +5,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 import logging
 
+from src.database.search import contains
+from src.database.unit_of_work import finish_write
 from src.models import Fornecedor
 from src.utils.helpers import clean_cnpj_cpf
 
@@ -40,8 +42,7 @@ class FornecedorRepository:
         
         fornecedor = Fornecedor(**fornecedor_data)
         self.db.add(fornecedor)
-        self.db.commit()
-        self.db.refresh(fornecedor)
+        finish_write(self.db, fornecedor)
         return fornecedor
     
     def get_or_create(self, cnpj_cpf: str, **kwargs) -> Fornecedor:
@@ -59,8 +60,7 @@ class FornecedorRepository:
         if fornecedor:
             for key, value in fornecedor_data.items():
                 setattr(fornecedor, key, value)
-            self.db.commit()
-            self.db.refresh(fornecedor)
+            finish_write(self.db, fornecedor)
         return fornecedor
     
     def delete(self, fornecedor_id: int) -> bool:
@@ -68,14 +68,14 @@ class FornecedorRepository:
         fornecedor = self.get_by_id(fornecedor_id)
         if fornecedor:
             self.db.delete(fornecedor)
-            self.db.commit()
+            finish_write(self.db)
             return True
         return False
     
     def search_by_name(self, name: str, limit: int = 100) -> List[Fornecedor]:
         """Search suppliers by name."""
         return self.db.query(Fornecedor).filter(
-            Fornecedor.razao_social.ilike(f"%{name}%")
+            contains(Fornecedor.razao_social, name, field='name')
         ).limit(limit).all()
     
     def get_by_uf(self, uf: str) -> List[Fornecedor]:
@@ -5,7 +5,10 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 import logging
 
-from src.models import Item
+from src.database.search import contains
+from src.database.unit_of_work import finish_write
+from src.models import Item, Licitacao
+from src.utils.pncp_specs import ITEM_SPEC
 
 logger = logging.getLogger(__name__)
 
@@ -25,29 +28,43 @@ class ItemRepository:
         """Get all items for a bidding."""
         return self.db.query(Item).filter(Item.licitacao_id == licitacao_id).all()
     
+    def get_by_numero(self, licitacao_id: int, numero_item: int) -> Optional[Item]:
+        """Get item of a bidding by its item number."""
+        return self.db.query(Item).filter(
+            Item.licitacao_id == licitacao_id,
+            Item.numero_item == numero_item
+        ).first()
+    
     def create(self, item_data: dict) -> Item:
         """Create new item."""
-        item = Item(**item_data)
+        item = Item(**ITEM_SPEC.coerce(item_data))
         self.db.add(item)
-        self.db.commit()
-        self.db.refresh(item)
+        finish_write(self.db, item)
         return item
     
     def create_bulk(self, items_data: List[dict]) -> int:
         """Create multiple items."""
-        items = [Item(**data) for data in items_data]
+        items = [Item(**ITEM_SPEC.coerce(data)) for data in items_data]
+        
+        # bulk_save_objects skips the mapper event copying the partition key
+        datas = dict(self.db.query(Licitacao.id, Licitacao.data_publicacao_pncp).filter(
+            Licitacao.id.in_({item.licitacao_id for item in items})
+        ))
+        for item in items:
+            if item.data_publicacao_pncp is None:
+                item.data_publicacao_pncp = datas.get(item.licitacao_id)
+        
         self.db.bulk_save_objects(items)
-        self.db.commit()
+        finish_write(self.db, rows=len(items))
         return len(items)
     
     def update(self, item_id: int, item_data: dict) -> Optional[Item]:
         """Update item."""
         item = self.get_by_id(item_id)
         if item:
-            for key, value in item_data.items():
+            for key, value in ITEM_SPEC.coerce(item_data).items():
                 setattr(item, key, value)
-            self.db.commit()
-            self.db.refresh(item)
+            finish_write(self.db, item)
         return item
     
     def delete(self, item_id: int) -> bool:
@@ -55,14 +72,14 @@ class ItemRepository:
         item = self.get_by_id(item_id)
         if item:
             self.db.delete(item)
-            self.db.commit()
+            finish_write(self.db)
             return True
         return False
     
     def search_by_description(self, keyword: str, limit: int = 100) -> List[Item]:
         """Search items by description."""
         return self.db.query(Item).filter(
-            Item.descricao.ilike(f"%{keyword}%")
+            contains(Item.descricao, keyword, field='keyword')
         ).limit(limit).all()
     
     def count_by_licitacao(self, licitacao_id: int) -> int:
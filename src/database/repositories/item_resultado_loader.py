@@ -0,0 +1,335 @@
+"""Bulk loader of bidding items and results."""
+
+import io
+import itertools
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import or_, text
+from sqlalchemy.orm import Session
+import logging
+
+from src.database.partitioning import PARTITION_KEY, conflict_key, is_partitioned
+from src.database.unit_of_work import finish_write, savepoint
+from src.models import Item, Licitacao, Resultado
+from src.utils.pncp_specs import ITEM_SPEC, RESULTADO_SPEC
+
+logger = logging.getLogger(__name__)
+
+# Below this many rows a load is merged with executemany upserts; above it
+# PostgreSQL loads go through COPY into staging tables
+COPY_MIN_ROWS = 1000
+
+# Rows per COPY buffer / executemany statement
+LOAD_CHUNK_SIZE = 5000
+
+# Keys per SELECT ... IN / DELETE ... IN
+KEY_BATCH_SIZE = 1000
+
+# Items and results carry their bidding's publication date (the partition key)
+ITEM_COLUMNS = ('licitacao_id', PARTITION_KEY) + tuple(ITEM_SPEC.columns)
+RESULTADO_COLUMNS = ('fornecedor_id', PARTITION_KEY) + tuple(RESULTADO_SPEC.columns)
+
+# Natural keys (unique constraints added by migration 016)
+ITEM_KEY = ('licitacao_id', 'numero_item')
+RESULTADO_KEY = ('item_id', 'fornecedor_id', 'sequencial_resultado')
+
+
+def _copy_value(value: Any) -> str:
+    """Format a value for COPY's text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+def _batches(values: List[Any], size: int = KEY_BATCH_SIZE) -> Iterable[List[Any]]:
+    """Split a list in slices of at most ``size`` values."""
+    for inicio in range(0, len(values), size):
+        yield values[inicio:inicio + size]
+
+
+class ItemResultadoLoader:
+    """
+    Set-based loader of items and results, keyed on their natural keys.
+    
+    Items are identified by ``(licitacao_id, numero_item)`` and results by
+    ``(item_id, fornecedor_id, sequencial_resultado)``, so loading the same
+    bidding twice updates its rows instead of duplicating them. Results
+    reference their item by ``licitacao_id``/``numero_item``, which lets
+    items and results of many biddings be loaded in one call.
+    
+    Large PostgreSQL loads are streamed with ``COPY`` into temporary staging
+    tables and merged with ``INSERT ... SELECT ... ON CONFLICT DO UPDATE``;
+    smaller loads (and SQLite) use executemany upserts. Either way rows
+    whose content did not change are left untouched.
+    """
+    
+    def __init__(self, db: Session, copy_min_rows: int = COPY_MIN_ROWS, chunk_size: int = LOAD_CHUNK_SIZE):
+        """
+        Initialize loader with database session.
+        
+        Args:
+            db: Database session
+            copy_min_rows: Rows from which PostgreSQL loads use COPY
+            chunk_size: Rows per COPY buffer or upsert statement
+        """
+        self.db = db
+        self.copy_min_rows = copy_min_rows
+        self.chunk_size = chunk_size
+    
+    def carregar(
+        self,
+        itens: List[Dict[str, Any]],
+        resultados: Optional[List[Dict[str, Any]]] = None,
+        substituir: bool = False,
+        manter_resultados: Iterable[Tuple[int, int]] = ()
+    ) -> Dict[str, int]:
+        """
+        Merge items and results, committing once at the end (or leaving the
+        commit to the active ``UnitOfWork``).
+        
+        Args:
+            itens: Parsed items with ``licitacao_id``
+            resultados: Parsed results with ``licitacao_id``, ``numero_item``
+                and ``fornecedor_id``. Results of items that are neither in
+                ``itens`` nor stored are skipped. None leaves the results of
+                the loaded items alone.
+            substituir: Drop stored items of the loaded biddings that are
+                not in ``itens``, and (unless ``resultados`` is None) stored
+                results of the loaded items, those in ``itens`` or referenced
+                by ``resultados``, that are not in ``resultados``
+            manter_resultados: ``(licitacao_id, numero_item)`` of loaded items
+                whose stored results ``substituir`` must keep, e.g. because
+                their results could not be fetched
+        
+        Returns:
+            Dictionary with the ``itens`` and ``resultados`` loaded, the
+            ``resultados_sem_item`` skipped and the ``removidos`` rows
+        """
+        itens_rows = self._deduplicar(
+            ({**ITEM_SPEC.model_values(item), 'licitacao_id': item['licitacao_id']} for item in itens),
+            ITEM_KEY
+        )
+        resultados_rows = self._deduplicar(
+            (
+                {
+                    **RESULTADO_SPEC.model_values(resultado),
+                    'licitacao_id': resultado['licitacao_id'],
+                    'numero_item': resultado['numero_item'],
+                    'fornecedor_id': resultado['fornecedor_id']
+                }
+                for resultado in resultados or []
+            ),
+            ('licitacao_id', 'numero_item', 'fornecedor_id', 'sequencial_resultado')
+        )
+        stats = {'itens': len(itens_rows), 'resultados': 0, 'resultados_sem_item': 0, 'removidos': 0}
+        if not itens_rows and not resultados_rows:
+            return stats
+        
+        licitacao_ids = {row['licitacao_id'] for row in itens_rows} | {
+            row['licitacao_id'] for row in resultados_rows
+        }
+        datas = self._datas_publicacao(licitacao_ids)
+        for row in itertools.chain(itens_rows, resultados_rows):
+            row[PARTITION_KEY] = datas.get(row['licitacao_id'])
+        
+        with savepoint(self.db):
+            dialect = self.db.get_bind().dialect.name
+            usar_copy = (
+                dialect == 'postgresql'
+                and len(itens_rows) + len(resultados_rows) >= self.copy_min_rows
+            )
+            
+            if usar_copy:
+                self._copiar_staging(itens_rows, resultados_rows)
+                self._merge_staging()
+            elif itens_rows:
+                self._upsert(Item, itens_rows, ITEM_KEY, dialect)
+            
+            item_ids = self._item_ids(licitacao_ids, datas)
+            
+            com_item = [row for row in resultados_rows if (row['licitacao_id'], row['numero_item']) in item_ids]
+            stats['resultados'] = len(com_item)
+            stats['resultados_sem_item'] = len(resultados_rows) - len(com_item)
+            if not usar_copy and com_item:
+                self._upsert(Resultado, [
+                    {
+                        'item_id': item_ids[(row['licitacao_id'], row['numero_item'])],
+                        **{coluna: row[coluna] for coluna in RESULTADO_COLUMNS}
+                    }
+                    for row in com_item
+                ], RESULTADO_KEY, dialect)
+            
+            if substituir:
+                stats['removidos'] = self._remover_obsoletos(
+                    itens_rows, com_item, item_ids,
+                    substituir_resultados=resultados is not None,
+                    manter_resultados=set(manter_resultados)
+                )
+            
+            finish_write(self.db, rows=len(itens_rows) + len(com_item))
+        
+        logger.debug(
+            f"Loaded {stats['itens']} items and {stats['resultados']} results "
+            f"({'COPY' if usar_copy else 'upsert'}, {stats['removidos']} removed)"
+        )
+        return stats
+    
+    @staticmethod
+    def _deduplicar(rows: Iterable[Dict[str, Any]], chave: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        """Keep the last row of every natural key."""
+        return list({tuple(row[coluna] for coluna in chave): row for row in rows}.values())
+    
+    def _upsert(self, model: Any, rows: List[Dict[str, Any]], chave: Tuple[str, ...], dialect: str):
+        """Merge rows with executemany ``INSERT ... ON CONFLICT DO UPDATE``."""
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise NotImplementedError(f"Bulk item/result loads are not supported on {dialect}")
+        
+        tabela = model.__table__
+        agora = datetime.utcnow()
+        chave = conflict_key(self.db, chave)
+        stmt = insert(tabela)
+        atualizadas = [coluna for coluna in rows[0] if coluna not in chave]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(chave),
+            set_={**{coluna: stmt.excluded[coluna] for coluna in atualizadas}, 'updated_at': agora},
+            # Rows whose content did not change are left untouched
+            where=or_(*(tabela.c[coluna].is_distinct_from(stmt.excluded[coluna]) for coluna in atualizadas))
+        )
+        for lote in _batches(rows, self.chunk_size):
+            self.db.execute(stmt, [{**row, 'created_at': agora, 'updated_at': agora} for row in lote])
+    
+    def _copiar_staging(self, itens_rows: List[Dict[str, Any]], resultados_rows: List[Dict[str, Any]]):
+        """Create the staging tables of this transaction and COPY the rows into them."""
+        colunas_itens = ', '.join(ITEM_COLUMNS)
+        colunas_resultados = ', '.join(f"r.{coluna}" for coluna in RESULTADO_COLUMNS)
+        self.db.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS stg_itens ON COMMIT DROP AS "
+            f"SELECT {colunas_itens} FROM itens WITH NO DATA"
+        ))
+        self.db.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS stg_resultados ON COMMIT DROP AS "
+            f"SELECT i.licitacao_id, i.numero_item, {colunas_resultados} "
+            f"FROM resultados r, itens i WITH NO DATA"
+        ))
+        # A unit of work may run several loads before the tables are dropped
+        self.db.execute(text("TRUNCATE stg_itens, stg_resultados"))
+        
+        cursor = self.db.connection().connection.cursor()
+        try:
+            self._copy(cursor, 'stg_itens', ITEM_COLUMNS, itens_rows)
+            self._copy(cursor, 'stg_resultados', ('licitacao_id', 'numero_item') + RESULTADO_COLUMNS, resultados_rows)
+        finally:
+            cursor.close()
+    
+    def _copy(self, cursor: Any, tabela: str, colunas: Tuple[str, ...], rows: List[Dict[str, Any]]):
+        """Stream rows into a table with ``COPY FROM STDIN``, one buffer per chunk."""
+        comando = f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN"
+        for lote in _batches(rows, self.chunk_size):
+            buffer = io.StringIO()
+            for row in lote:
+                buffer.write('\t'.join(_copy_value(row[coluna]) for coluna in colunas))
+                buffer.write('\n')
+            buffer.seek(0)
+            cursor.copy_expert(comando, buffer)
+    
+    def _merge_staging(self):
+        """Merge the staging tables into ``itens`` and ``resultados``."""
+        item_key = conflict_key(self.db, ITEM_KEY)
+        resultado_key = conflict_key(self.db, RESULTADO_KEY)
+        itens_set = [coluna for coluna in ITEM_COLUMNS if coluna not in item_key]
+        self.db.execute(text(
+            f"INSERT INTO itens ({', '.join(ITEM_COLUMNS)}, created_at, updated_at) "
+            f"SELECT {', '.join(ITEM_COLUMNS)}, now(), now() FROM stg_itens "
+            f"ON CONFLICT ({', '.join(item_key)}) DO UPDATE SET "
+            + ', '.join(f"{coluna} = EXCLUDED.{coluna}" for coluna in itens_set)
+            + ", updated_at = EXCLUDED.updated_at "
+            f"WHERE ({', '.join(f'itens.{c}' for c in itens_set)}) "
+            f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in itens_set)})"
+        ))
+        
+        resultados_set = [coluna for coluna in RESULTADO_COLUMNS if coluna not in resultado_key]
+        self.db.execute(text(
+            f"INSERT INTO resultados (item_id, {', '.join(RESULTADO_COLUMNS)}, created_at, updated_at) "
+            f"SELECT i.id, {', '.join(f's.{c}' for c in RESULTADO_COLUMNS)}, now(), now() "
+            f"FROM stg_resultados s JOIN itens i "
+            f"ON i.licitacao_id = s.licitacao_id AND i.numero_item = s.numero_item "
+            f"AND i.{PARTITION_KEY} = s.{PARTITION_KEY} "
+            f"ON CONFLICT ({', '.join(resultado_key)}) DO UPDATE SET "
+            + ', '.join(f"{coluna} = EXCLUDED.{coluna}" for coluna in resultados_set)
+            + ", updated_at = EXCLUDED.updated_at "
+            f"WHERE ({', '.join(f'resultados.{c}' for c in resultados_set)}) "
+            f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in resultados_set)})"
+        ))
+    
+    def _datas_publicacao(self, licitacao_ids: Set[int]) -> Dict[int, Optional[datetime]]:
+        """Get the publication dates of biddings by ID."""
+        datas = {}
+        for lote in _batches(sorted(licitacao_ids)):
+            datas.update(self.db.query(Licitacao.id, Licitacao.data_publicacao_pncp).filter(Licitacao.id.in_(lote)))
+        return datas
+    
+    def _item_ids(self, licitacao_ids: Set[int], datas: Dict[int, Optional[datetime]]) -> Dict[Tuple[int, int], int]:
+        """Get the stored item IDs of biddings by ``(licitacao_id, numero_item)``."""
+        # On partitioned tables the publication dates restrict the lookup to their months
+        particionado = is_partitioned(self.db)
+        item_ids = {}
+        for lote in _batches(sorted(licitacao_ids)):
+            query = self.db.query(Item.id, Item.licitacao_id, Item.numero_item).filter(Item.licitacao_id.in_(lote))
+            if particionado:
+                query = query.filter(Item.data_publicacao_pncp.in_(
+                    {datas[licitacao_id] for licitacao_id in lote if licitacao_id in datas}
+                ))
+            for item_id, licitacao_id, numero_item in query:
+                item_ids[(licitacao_id, numero_item)] = item_id
+        return item_ids
+    
+    def _remover_obsoletos(
+        self,
+        itens_rows: List[Dict[str, Any]],
+        resultados_rows: List[Dict[str, Any]],
+        item_ids: Dict[Tuple[int, int], int],
+        substituir_resultados: bool = True,
+        manter_resultados: Set[Tuple[int, int]] = frozenset()
+    ) -> int:
+        """Delete the stored items and results left out of a replacing load."""
+        carregados = {(row['licitacao_id'], row['numero_item']) for row in itens_rows}
+        licitacoes_carregadas = {licitacao_id for licitacao_id, _ in carregados}
+        itens_obsoletos = [
+            item_id for chave, item_id in item_ids.items()
+            if chave[0] in licitacoes_carregadas and chave not in carregados
+        ]
+        
+        escopo = (
+            carregados | {(row['licitacao_id'], row['numero_item']) for row in resultados_rows}
+        ) - manter_resultados
+        escopo_ids = [item_ids[chave] for chave in escopo if chave in item_ids] if substituir_resultados else []
+        resultados_carregados = {
+            (item_ids[(row['licitacao_id'], row['numero_item'])], row['fornecedor_id'], row['sequencial_resultado'])
+            for row in resultados_rows
+        }
+        resultados_obsoletos = []
+        for lote in _batches(escopo_ids):
+            resultados_obsoletos.extend(
+                resultado_id for resultado_id, *chave in self.db.query(
+                    Resultado.id, Resultado.item_id, Resultado.fornecedor_id, Resultado.sequencial_resultado
+                ).filter(Resultado.item_id.in_(lote))
+                if tuple(chave) not in resultados_carregados
+            )
+        
+        removidos = 0
+        for lote in _batches(resultados_obsoletos):
+            removidos += self.db.query(Resultado).filter(Resultado.id.in_(lote)).delete(synchronize_session=False)
+        for lote in _batches(itens_obsoletos):
+            removidos += self.db.query(Resultado).filter(Resultado.item_id.in_(lote)).delete(synchronize_session=False)
+            removidos += self.db.query(Item).filter(Item.id.in_(lote)).delete(synchronize_session=False)
+        return removidos
+
@@ -1,16 +1,31 @@
 """Repository for bidding data access."""
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, literal_column
 from datetime import datetime
 import logging
 
+from src.database.loading import load_profile
+from src.database.pagination import COUNT_LIMIT, COUNT_NONE, Page, count_total, order_keyset, paginate_keyset
+from src.database.partitioning import PARTITION_KEY, conflict_key, is_partitioned
+from src.database.search import contains
+from src.database.unit_of_work import finish_write
 from src.models import Licitacao, Orgao, Municipio
-from src.utils.helpers import parse_pncp_datetime
+from src.utils.pncp_specs import LICITACAO_SPEC
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT statement. ~40 columns × 500 rows stays well below the
+# bind-parameter limits of PostgreSQL (65535) and SQLite (32766).
+UPSERT_CHUNK_SIZE = 500
+
+# Columns an upsert never overwrites
+UPSERT_IMMUTABLE_COLUMNS = ('id', 'numero_controle_pncp', 'created_at')
+
+# Sort keys of bidding lists: newest publication first, ID breaking ties
+LIST_SORT_KEYS = (Licitacao.data_publicacao_pncp, Licitacao.id)
+
 
 class LicitacaoRepository:
     """Repository for bidding operations."""
@@ -19,51 +34,319 @@ class LicitacaoRepository:
         """Initialize repository with database session."""
         self.db = db
     
-    def get_by_id(self, licitacao_id: int) -> Optional[Licitacao]:
+    def _query(self, profile: Optional[str] = None):
+        """Query biddings, with a loading profile (see ``src.database.loading``)."""
+        query = self.db.query(Licitacao)
+        return load_profile(query, profile) if profile else query
+    
+    def get_by_id(self, licitacao_id: int, profile: Optional[str] = None) -> Optional[Licitacao]:
         """Get bidding by ID."""
-        return self.db.query(Licitacao).filter(Licitacao.id == licitacao_id).first()
+        return self._query(profile).filter(Licitacao.id == licitacao_id).first()
     
-    def get_by_numero_controle(self, numero_controle: str) -> Optional[Licitacao]:
+    def get_by_numero_controle(self, numero_controle: str, profile: Optional[str] = None) -> Optional[Licitacao]:
         """Get bidding by control number."""
-        return self.db.query(Licitacao).filter(Licitacao.numero_controle_pncp == numero_controle).first()
+        return self._query(profile).filter(Licitacao.numero_controle_pncp == numero_controle).first()
+    
+    def get_by_compra(self, cnpj: str, ano: int, sequencial: str) -> Optional[Licitacao]:
+        """Get bidding by purchasing organization CNPJ, year and sequential number."""
+        return self.db.query(Licitacao).join(Orgao, Licitacao.orgao_id == Orgao.id).filter(
+            Orgao.cnpj == cnpj,
+            Licitacao.ano_compra == ano,
+            Licitacao.sequencial_compra == str(sequencial)
+        ).first()
     
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Licitacao]:
-        """Get all biddings with pagination."""
-        return self.db.query(Licitacao).offset(skip).limit(limit).all()
+        """Get all biddings with OFFSET pagination (prefer ``get_page``)."""
+        return order_keyset(self.db.query(Licitacao), LIST_SORT_KEYS).offset(skip).limit(limit).all()
+    
+    def get_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        count: str = COUNT_NONE,
+        count_limit: int = COUNT_LIMIT,
+        profile: Optional[str] = None
+    ) -> Page:
+        """Get a page of all biddings with keyset pagination (see ``search_page``)."""
+        return self.search_page(cursor=cursor, limit=limit, count=count, count_limit=count_limit, profile=profile)
+    
+    def get_ids_sem_itens(self, municipio_ids: Optional[List[int]] = None) -> List[int]:
+        """Get IDs of biddings that have no items stored yet."""
+        query = self.db.query(Licitacao.id).filter(~Licitacao.itens.any())
+        if municipio_ids is not None:
+            query = query.filter(Licitacao.municipio_id.in_(municipio_ids))
+        return [licitacao_id for licitacao_id, in query.order_by(Licitacao.id)]
     
     def create(self, licitacao_data: dict) -> Licitacao:
         """Create new bidding."""
-        # Parse datetime fields
-        datetime_fields = [
-            'data_publicacao_pncp', 'data_abertura_proposta', 
-            'data_encerramento_proposta', 'data_inclusao', 'data_atualizacao'
-        ]
-        for field in datetime_fields:
-            if field in licitacao_data and licitacao_data[field]:
-                licitacao_data[field] = parse_pncp_datetime(licitacao_data[field])
+        LICITACAO_SPEC.coerce(licitacao_data)
         
         licitacao = Licitacao(**licitacao_data)
         self.db.add(licitacao)
-        self.db.commit()
-        self.db.refresh(licitacao)
+        finish_write(self.db, licitacao)
         return licitacao
     
     def update(self, licitacao_id: int, licitacao_data: dict) -> Optional[Licitacao]:
         """Update bidding."""
         licitacao = self.get_by_id(licitacao_id)
         if licitacao:
+            LICITACAO_SPEC.coerce(licitacao_data)
             for key, value in licitacao_data.items():
                 setattr(licitacao, key, value)
-            self.db.commit()
-            self.db.refresh(licitacao)
+            finish_write(self.db, licitacao)
         return licitacao
     
+    def upsert_many(
+        self,
+        licitacoes: List[Dict[str, Any]],
+        atualizar: bool = True,
+        somente_mais_recentes: bool = True,
+        chunk_size: int = UPSERT_CHUNK_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Insert or update biddings in bulk, keyed on ``numero_controle_pncp``.
+        
+        Rows are written with multi-row ``INSERT ... ON CONFLICT
+        (numero_controle_pncp) DO UPDATE`` statements (``DO NOTHING`` when
+        ``atualizar`` is False) and committed in a single transaction (or
+        left to the active ``UnitOfWork``). On partitioned databases the
+        conflict key also holds ``data_publicacao_pncp``, so rows without it,
+        and rows whose stored copy has another publication date (which would
+        land a second copy in another partition), are held back and logged
+        instead (see ``_reter_fora_da_particao``).
+        
+        A stored bidding is only rewritten when its content changed: the
+        update is guarded by the ``conteudo_hash`` of the row (computed here
+        when missing) and, unless ``somente_mais_recentes`` is False, by
+        ``data_atualizacao`` not going backwards. Inserted and updated rows
+        come back through ``RETURNING`` (told apart by ``xmax = 0`` on
+        PostgreSQL and by the keys already stored elsewhere); databases
+        without ``ON CONFLICT`` support fall back to the ORM.
+        
+        Args:
+            licitacoes: Column dictionaries (``orgao_id``/``municipio_id``
+                already resolved). When a key repeats, the last row wins.
+            atualizar: Overwrite changed biddings instead of skipping them
+            somente_mais_recentes: Keep the stored row when it has a newer
+                ``data_atualizacao`` than the incoming one
+            chunk_size: Rows per statement
+        
+        Returns:
+            Dictionary with ``inseridos``, ``atualizados``, ``inalterados``
+            and ``retidos`` counts and the IDs of the updated biddings in
+            ``ids_atualizados``
+        """
+        stats: Dict[str, Any] = {
+            'inseridos': 0, 'atualizados': 0, 'inalterados': 0, 'retidos': 0, 'ids_atualizados': []
+        }
+        rows = self._preparar_upsert(licitacoes)
+        if rows and is_partitioned(self.db):
+            rows, stats['retidos'] = self._reter_fora_da_particao(rows, chunk_size)
+        if not rows:
+            return stats
+        
+        dialect = self.db.get_bind().dialect.name
+        for inicio in range(0, len(rows), chunk_size):
+            chunk = rows[inicio:inicio + chunk_size]
+            inseridos, ids_atualizados = self._upsert_chunk(chunk, dialect, atualizar, somente_mais_recentes)
+            stats['inseridos'] += inseridos
+            stats['atualizados'] += len(ids_atualizados)
+            stats['inalterados'] += len(chunk) - inseridos - len(ids_atualizados)
+            stats['ids_atualizados'].extend(ids_atualizados)
+        
+        finish_write(self.db, rows=len(rows))
+        return stats
+    
+    def _reter_fora_da_particao(
+        self,
+        rows: List[Dict[str, Any]],
+        chunk_size: int = UPSERT_CHUNK_SIZE
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Hold back the rows a partitioned upsert cannot write safely.
+        
+        Unique constraints of partitioned tables include the partition key,
+        so ``numero_controle_pncp`` alone is only unique within a month: a
+        row without publication date has no partition, and a row whose
+        stored copy was published on another date would be inserted as a
+        second bidding. Both are logged and left out (migration 020 rejects
+        the latter in the database too).
+        
+        Args:
+            rows: Prepared rows
+            chunk_size: Keys per lookup query
+        
+        Returns:
+            Tuple of (rows to write, rows held back)
+        """
+        retidas = [row for row in rows if row.get(PARTITION_KEY) is None]
+        if retidas:
+            logger.warning(
+                f"Holding {len(retidas)} biddings without data_publicacao_pncp: "
+                f"{', '.join(str(row.get('numero_controle_pncp')) for row in retidas[:10])}"
+            )
+        rows = [row for row in rows if row.get(PARTITION_KEY) is not None]
+        
+        chaves = [row['numero_controle_pncp'] for row in rows if row.get('numero_controle_pncp')]
+        armazenadas: Dict[str, Set[datetime]] = {}
+        for inicio in range(0, len(chaves), chunk_size):
+            for numero, data in self.db.query(
+                Licitacao.numero_controle_pncp, Licitacao.data_publicacao_pncp
+            ).filter(Licitacao.numero_controle_pncp.in_(chaves[inicio:inicio + chunk_size])):
+                armazenadas.setdefault(numero, set()).add(data)
+        
+        gravar = []
+        for row in rows:
+            datas = armazenadas.get(row.get('numero_controle_pncp'), set())
+            if datas - {row[PARTITION_KEY]}:
+                logger.warning(
+                    f"Holding licitacao {row['numero_controle_pncp']}: published on "
+                    f"{row[PARTITION_KEY]}, stored with {', '.join(str(d) for d in sorted(datas))}"
+                )
+                retidas.append(row)
+            else:
+                gravar.append(row)
+        return gravar, len(retidas)
+    
+    @staticmethod
+    def _preparar_upsert(licitacoes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Coerce, hash, deduplicate and align the rows of an upsert."""
+        agora = datetime.utcnow()
+        por_chave: Dict[str, Dict[str, Any]] = {}
+        sem_chave: List[Dict[str, Any]] = []
+        colunas: Dict[str, None] = {}
+        
+        for data in licitacoes:
+            row = LICITACAO_SPEC.coerce(dict(data))
+            if not row.get('conteudo_hash'):
+                row['conteudo_hash'] = LICITACAO_SPEC.fingerprint(row)
+            row.setdefault('created_at', agora)
+            row['updated_at'] = agora
+            colunas.update(dict.fromkeys(row))
+            
+            # PostgreSQL rejects a statement that updates the same row twice
+            chave = row.get('numero_controle_pncp')
+            if chave:
+                por_chave[chave] = row
+            else:
+                sem_chave.append(row)
+        
+        # Multi-row VALUES need the same columns in every row
+        return [{coluna: row.get(coluna) for coluna in colunas} for row in [*por_chave.values(), *sem_chave]]
+    
+    def _upsert_chunk(
+        self,
+        rows: List[Dict[str, Any]],
+        dialect: str,
+        atualizar: bool,
+        somente_mais_recentes: bool
+    ) -> Tuple[int, List[int]]:
+        """
+        Upsert one chunk of prepared rows.
+        
+        Returns:
+            Tuple of (rows inserted, IDs of the rows updated)
+        """
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            return self._upsert_chunk_orm(rows, atualizar, somente_mais_recentes)
+        
+        # executemany: the statement is compiled once and SQLAlchemy batches
+        # the rows into multi-row VALUES ("insertmanyvalues")
+        tabela = Licitacao.__table__
+        chave = list(conflict_key(self.db, ('numero_controle_pncp',)))
+        stmt = insert(tabela)
+        if atualizar:
+            alterada = tabela.c.conteudo_hash.is_distinct_from(stmt.excluded.conteudo_hash)
+            if somente_mais_recentes:
+                alterada = and_(alterada, or_(
+                    tabela.c.data_atualizacao.is_(None),
+                    stmt.excluded.data_atualizacao.is_(None),
+                    stmt.excluded.data_atualizacao >= tabela.c.data_atualizacao
+                ))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=chave,
+                set_={
+                    coluna: stmt.excluded[coluna]
+                    for coluna in rows[0] if coluna not in UPSERT_IMMUTABLE_COLUMNS
+                },
+                where=alterada
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=chave)
+        
+        # Only inserted and updated rows are returned; unchanged ones are skipped
+        if dialect == 'postgresql':
+            # xmax is 0 for freshly inserted row versions
+            gravadas = self.db.execute(
+                stmt.returning(tabela.c.id, literal_column("xmax = 0")), rows
+            ).all()
+            ids_atualizados = [licitacao_id for licitacao_id, inserida in gravadas if not inserida]
+        else:
+            existentes = self._chaves_existentes(rows)
+            gravadas = self.db.execute(
+                stmt.returning(tabela.c.id, tabela.c.numero_controle_pncp), rows
+            ).all()
+            ids_atualizados = [licitacao_id for licitacao_id, chave in gravadas if chave in existentes]
+        
+        return len(gravadas) - len(ids_atualizados), ids_atualizados
+    
+    def _upsert_chunk_orm(
+        self,
+        rows: List[Dict[str, Any]],
+        atualizar: bool,
+        somente_mais_recentes: bool
+    ) -> Tuple[int, List[int]]:
+        """Upsert a chunk row by row, for databases without ON CONFLICT."""
+        chaves = [row['numero_controle_pncp'] for row in rows if row.get('numero_controle_pncp')]
+        existentes = {
+            licitacao.numero_controle_pncp: licitacao
+            for licitacao in self.db.query(Licitacao).filter(Licitacao.numero_controle_pncp.in_(chaves))
+        } if chaves else {}
+        
+        inseridos = 0
+        atualizadas = []
+        for row in rows:
+            licitacao = existentes.get(row.get('numero_controle_pncp'))
+            if licitacao is None:
+                self.db.add(Licitacao(**row))
+                inseridos += 1
+                continue
+            
+            mais_antiga = (
+                somente_mais_recentes
+                and licitacao.data_atualizacao and row.get('data_atualizacao')
+                and row['data_atualizacao'] < licitacao.data_atualizacao
+            )
+            if atualizar and licitacao.conteudo_hash != row['conteudo_hash'] and not mais_antiga:
+                for key, value in row.items():
+                    if key not in UPSERT_IMMUTABLE_COLUMNS:
+                        setattr(licitacao, key, value)
+                atualizadas.append(licitacao)
+        
+        self.db.flush()
+        return inseridos, [licitacao.id for licitacao in atualizadas]
+    
+    def _chaves_existentes(self, rows: List[Dict[str, Any]]) -> Set[str]:
+        """Get the control numbers of a chunk that are already stored."""
+        chaves = [row['numero_controle_pncp'] for row in rows if row.get('numero_controle_pncp')]
+        if not chaves:
+            return set()
+        return {
+            chave for chave, in self.db.query(Licitacao.numero_controle_pncp).filter(
+                Licitacao.numero_controle_pncp.in_(chaves)
+            )
+        }
+    
     def delete(self, licitacao_id: int) -> bool:
         """Delete bidding."""
         licitacao = self.get_by_id(licitacao_id)
         if licitacao:
             self.db.delete(licitacao)
-            self.db.commit()
+            finish_write(self.db)
             return True
         return False
     
@@ -79,7 +362,61 @@ class LicitacaoRepository:
         skip: int = 0,
         limit: int = 100
     ) -> List[Licitacao]:
-        """Search biddings with filters."""
+        """Search biddings with filters and OFFSET pagination (prefer ``search_page``)."""
+        query = self._search_query(
+            municipio_id=municipio_id,
+            modalidade_id=modalidade_id,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            valor_min=valor_min,
+            valor_max=valor_max,
+            palavra_chave=palavra_chave
+        )
+        return order_keyset(query, LIST_SORT_KEYS).offset(skip).limit(limit).all()
+    
+    def search_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        count: str = COUNT_NONE,
+        count_limit: int = COUNT_LIMIT,
+        profile: Optional[str] = None,
+        **filtros
+    ) -> Page:
+        """
+        Search biddings with keyset pagination on (data_publicacao_pncp, id).
+        
+        Args:
+            cursor: ``next_cursor`` of the previous page (None for the first page)
+            limit: Biddings per page
+            count: Total mode (``exact``, ``estimated`` or ``none``)
+            count_limit: Rows counted exactly before the total is capped
+            profile: Loading profile of the rows (e.g. ``LICITACAO_LISTA``)
+            filtros: Filters of ``search``
+        
+        Returns:
+            Page of biddings, newest publication first
+        
+        Raises:
+            ValidationError: If the cursor is invalid
+        """
+        query = self._search_query(**filtros)
+        linhas = load_profile(query, profile) if profile else query
+        page = paginate_keyset(linhas, LIST_SORT_KEYS, limit, cursor)
+        page.total, page.total_exact = count_total(query, count, count_limit)
+        return page
+    
+    def _search_query(
+        self,
+        municipio_id: Optional[int] = None,
+        modalidade_id: Optional[int] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        valor_min: Optional[float] = None,
+        valor_max: Optional[float] = None,
+        palavra_chave: Optional[str] = None
+    ):
+        """Build the filtered, unordered query of a bidding search."""
         query = self.db.query(Licitacao)
         
         if municipio_id:
@@ -103,12 +440,12 @@ class LicitacaoRepository:
         if palavra_chave:
             query = query.filter(
                 or_(
-                    Licitacao.objeto_compra.ilike(f"%{palavra_chave}%"),
-                    Licitacao.informacao_complementar.ilike(f"%{palavra_chave}%")
+                    contains(Licitacao.objeto_compra, palavra_chave, field='palavra_chave'),
+                    contains(Licitacao.informacao_complementar, palavra_chave, field='palavra_chave')
                 )
             )
         
-        return query.offset(skip).limit(limit).all()
+        return query
     
     def get_or_create_orgao(self, cnpj: str, razao_social: str, **kwargs) -> Orgao:
         """Get or create organization."""
@@ -116,14 +453,18 @@ class LicitacaoRepository:
         if not orgao:
             orgao = Orgao(cnpj=cnpj, razao_social=razao_social, **kwargs)
             self.db.add(orgao)
-            self.db.commit()
-            self.db.refresh(orgao)
+            finish_write(self.db, orgao)
         return orgao
     
     def count(self) -> int:
         """Count total biddings."""
         return self.db.query(func.count(Licitacao.id)).scalar()
     
+    def count_por_municipio(self) -> Dict[int, int]:
+        """Count biddings of every municipality."""
+        rows = self.db.query(Licitacao.municipio_id, func.count(Licitacao.id)).group_by(Licitacao.municipio_id).all()
+        return {municipio_id: total for municipio_id, total in rows if municipio_id is not None}
+    
     def count_by_municipio(self, municipio_id: int) -> int:
         """Count biddings by municipality."""
         return self.db.query(func.count(Licitacao.id)).filter(
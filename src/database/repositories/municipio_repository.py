@@ -4,6 +4,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 import logging
 
+from src.database.unit_of_work import UnitOfWork, finish_write, savepoint
 from src.models import Municipio
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,10 @@ class MunicipioRepository:
         """Initialize repository with database session."""
         self.db = db
     
+    def get_by_id(self, municipio_id: int) -> Optional[Municipio]:
+        """Get municipality by ID."""
+        return self.db.query(Municipio).filter(Municipio.id == municipio_id).first()
+    
     def get_by_codigo_ibge(self, codigo_ibge: str) -> Optional[Municipio]:
         """Get municipality by IBGE code."""
         return self.db.query(Municipio).filter(Municipio.codigo_ibge == codigo_ibge).first()
@@ -32,22 +37,24 @@ class MunicipioRepository:
         """Create new municipality."""
         municipio = Municipio(**municipio_data)
         self.db.add(municipio)
-        self.db.commit()
-        self.db.refresh(municipio)
+        finish_write(self.db, municipio)
         return municipio
     
     def create_bulk(self, municipios_data: List[dict]) -> int:
-        """Create multiple municipalities."""
+        """Create the municipalities not stored yet, in one transaction."""
+        existentes = {codigo for codigo, in self.db.query(Municipio.codigo_ibge)}
         count = 0
-        for data in municipios_data:
-            try:
-                # Check if already exists
-                existing = self.get_by_codigo_ibge(data.get("codigo_ibge"))
-                if not existing:
-                    self.create(data)
+        with UnitOfWork(self.db):
+            for data in municipios_data:
+                if data.get("codigo_ibge") in existentes:
+                    continue
+                try:
+                    with savepoint(self.db):
+                        self.create(data)
+                    existentes.add(data.get("codigo_ibge"))
                     count += 1
-            except Exception as e:
-                logger.error(f"Error creating municipality {data.get('municipio')}: {e}")
+                except Exception as e:
+                    logger.error(f"Error creating municipality {data.get('municipio')}: {e}")
         return count
     
     def update(self, codigo_ibge: str, municipio_data: dict) -> Optional[Municipio]:
@@ -56,8 +63,7 @@ class MunicipioRepository:
         if municipio:
             for key, value in municipio_data.items():
                 setattr(municipio, key, value)
-            self.db.commit()
-            self.db.refresh(municipio)
+            finish_write(self.db, municipio)
         return municipio
     
     def delete(self, codigo_ibge: str) -> bool:
@@ -65,6 +71,6 @@ class MunicipioRepository:
         municipio = self.get_by_codigo_ibge(codigo_ibge)
         if municipio:
             self.db.delete(municipio)
-            self.db.commit()
+            finish_write(self.db)
             return True
         return False
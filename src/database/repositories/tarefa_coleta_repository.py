@@ -0,0 +1,223 @@
+"""Repository for collection work queue data access."""
+
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_
+from datetime import datetime, timedelta
+import logging
+
+from src.database.unit_of_work import finish_write
+from src.models import TarefaColeta
+from src.utils.constants import TAREFA_PENDENTE, TAREFA_EXECUTANDO, TAREFA_CONCLUIDA, TAREFA_ERRO
+
+logger = logging.getLogger(__name__)
+
+
+class TarefaColetaRepository:
+    """
+    Repository for collection work queue operations.
+    
+    Every state change of a claimed task is guarded by the claiming
+    worker's id, so a worker whose lease expired (and whose task was handed
+    to someone else) can no longer complete or fail it.
+    """
+    
+    def __init__(self, db: Session):
+        """Initialize repository with database session."""
+        self.db = db
+    
+    def get_by_id(self, tarefa_id: int) -> Optional[TarefaColeta]:
+        """Get task by ID."""
+        return self.db.query(TarefaColeta).filter(TarefaColeta.id == tarefa_id).first()
+    
+    def enfileirar(self, tarefas: List[Dict[str, Any]], reabrir_concluidas: bool = False) -> int:
+        """
+        Add tasks to the queue, skipping keys that are already queued.
+        
+        Tasks that previously failed are put back as pending.
+        
+        Args:
+            tarefas: Dictionaries with ``tipo``, ``chave`` and ``parametros``
+            reabrir_concluidas: Also put finished tasks back as pending, for
+                work that must be redone (e.g. a bidding changed upstream)
+        
+        Returns:
+            Number of tasks created or reopened
+        """
+        reabriveis = (TAREFA_ERRO, TAREFA_CONCLUIDA) if reabrir_concluidas else (TAREFA_ERRO,)
+        chaves = [t['chave'] for t in tarefas]
+        existentes = {
+            tarefa.chave: tarefa
+            for tarefa in self.db.query(TarefaColeta).filter(TarefaColeta.chave.in_(chaves))
+        } if chaves else {}
+        
+        enfileiradas = 0
+        for dados in tarefas:
+            tarefa = existentes.get(dados['chave'])
+            if tarefa is None:
+                tarefa = TarefaColeta(status=TAREFA_PENDENTE, tentativas=0, **dados)
+                self.db.add(tarefa)
+                existentes[dados['chave']] = tarefa
+                enfileiradas += 1
+            elif tarefa.status in reabriveis:
+                tarefa.status = TAREFA_PENDENTE
+                tarefa.parametros = dados['parametros']
+                tarefa.tentativas = 0
+                tarefa.erro = None
+                enfileiradas += 1
+        
+        finish_write(self.db, rows=enfileiradas)
+        return enfileiradas
+    
+    def reivindicar(
+        self,
+        worker_id: str,
+        lease_seconds: int,
+        tipos: Optional[List[str]] = None
+    ) -> Optional[TarefaColeta]:
+        """
+        Claim the oldest pending task under a lease.
+        
+        The candidate row is locked with ``FOR UPDATE SKIP LOCKED`` (on
+        PostgreSQL) so concurrent workers pick different tasks, and the
+        claim itself is a conditional update, so a task is never handed to
+        two workers even where row locks are not available.
+        
+        Args:
+            worker_id: Claiming worker
+            lease_seconds: Lease duration
+            tipos: Only claim these task types (any when None)
+        
+        Returns:
+            Claimed task, or None if the queue has no pending task
+        """
+        for _ in range(3):
+            query = self.db.query(TarefaColeta.id).filter(TarefaColeta.status == TAREFA_PENDENTE)
+            if tipos:
+                query = query.filter(TarefaColeta.tipo.in_(tipos))
+            candidata = query.order_by(TarefaColeta.id).with_for_update(skip_locked=True).first()
+            if candidata is None:
+                self.db.commit()
+                return None
+            
+            agora = datetime.now()
+            claimed = self.db.query(TarefaColeta).filter(
+                TarefaColeta.id == candidata.id,
+                TarefaColeta.status == TAREFA_PENDENTE
+            ).update({
+                TarefaColeta.status: TAREFA_EXECUTANDO,
+                TarefaColeta.worker_id: worker_id,
+                TarefaColeta.tentativas: func.coalesce(TarefaColeta.tentativas, 0) + 1,
+                TarefaColeta.lease_expira_em: agora + timedelta(seconds=lease_seconds),
+                TarefaColeta.heartbeat_em: agora,
+                TarefaColeta.iniciado_em: agora,
+                TarefaColeta.erro: None
+            }, synchronize_session=False)
+            self.db.commit()
+            
+            if claimed:
+                return self.get_by_id(candidata.id)
+        
+        return None
+    
+    def renovar_lease(self, tarefa_id: int, worker_id: str, lease_seconds: int) -> bool:
+        """
+        Extend the lease of a running task (heartbeat).
+        
+        Returns:
+            False if the task is no longer held by this worker
+        """
+        agora = datetime.now()
+        renovadas = self.db.query(TarefaColeta).filter(
+            TarefaColeta.id == tarefa_id,
+            TarefaColeta.worker_id == worker_id,
+            TarefaColeta.status == TAREFA_EXECUTANDO
+        ).update({
+            TarefaColeta.lease_expira_em: agora + timedelta(seconds=lease_seconds),
+            TarefaColeta.heartbeat_em: agora
+        }, synchronize_session=False)
+        self.db.commit()
+        return bool(renovadas)
+    
+    def concluir(self, tarefa_id: int, worker_id: str, resultado: Dict[str, Any]) -> bool:
+        """
+        Mark a running task as finished.
+        
+        Returns:
+            False if the task is no longer held by this worker
+        """
+        concluidas = self.db.query(TarefaColeta).filter(
+            TarefaColeta.id == tarefa_id,
+            TarefaColeta.worker_id == worker_id,
+            TarefaColeta.status == TAREFA_EXECUTANDO
+        ).update({
+            TarefaColeta.status: TAREFA_CONCLUIDA,
+            TarefaColeta.resultado: resultado,
+            TarefaColeta.lease_expira_em: None,
+            TarefaColeta.concluido_em: datetime.now()
+        }, synchronize_session=False)
+        self.db.commit()
+        return bool(concluidas)
+    
+    def falhar(self, tarefa_id: int, worker_id: str, erro: str, max_tentativas: int) -> Optional[str]:
+        """
+        Record a failed attempt, requeueing the task while attempts remain.
+        
+        Returns:
+            New status, or None if the task is no longer held by this worker
+        """
+        tarefa = self.get_by_id(tarefa_id)
+        if not tarefa or tarefa.worker_id != worker_id or tarefa.status != TAREFA_EXECUTANDO:
+            return None
+        
+        tarefa.status = TAREFA_ERRO if (tarefa.tentativas or 0) >= max_tentativas else TAREFA_PENDENTE
+        tarefa.erro = erro
+        tarefa.lease_expira_em = None
+        self.db.commit()
+        return tarefa.status
+    
+    def requeue_expirados(self, max_tentativas: int) -> int:
+        """
+        Put back tasks whose worker stopped heartbeating.
+        
+        Tasks that already used all their attempts are marked as failed.
+        
+        Returns:
+            Number of expired leases released
+        """
+        agora = datetime.now()
+        expirada = [
+            TarefaColeta.status == TAREFA_EXECUTANDO,
+            or_(TarefaColeta.lease_expira_em.is_(None), TarefaColeta.lease_expira_em < agora)
+        ]
+        
+        esgotadas = self.db.query(TarefaColeta).filter(
+            *expirada, TarefaColeta.tentativas >= max_tentativas
+        ).update({
+            TarefaColeta.status: TAREFA_ERRO,
+            TarefaColeta.erro: "Lease expired",
+            TarefaColeta.lease_expira_em: None
+        }, synchronize_session=False)
+        
+        devolvidas = self.db.query(TarefaColeta).filter(*expirada).update({
+            TarefaColeta.status: TAREFA_PENDENTE,
+            TarefaColeta.erro: "Lease expired",
+            TarefaColeta.lease_expira_em: None
+        }, synchronize_session=False)
+        self.db.commit()
+        
+        total = esgotadas + devolvidas
+        if total:
+            logger.warning(f"Released {total} expired task leases ({devolvidas} requeued, {esgotadas} failed)")
+        return total
+    
+    def resumo(self) -> Dict[str, Dict[str, int]]:
+        """Count tasks by type and status."""
+        rows = self.db.query(
+            TarefaColeta.tipo, TarefaColeta.status, func.count(TarefaColeta.id)
+        ).group_by(TarefaColeta.tipo, TarefaColeta.status).all()
+        
+        resumo: Dict[str, Dict[str, int]] = {}
+        for tipo, status, total in rows:
+            resumo.setdefault(tipo, {})[status] = total
+        return resumo
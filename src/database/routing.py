@@ -0,0 +1,213 @@
+"""Read-replica routing: sessions whose reads go to a healthy replica."""
+
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Replication lag of a PostgreSQL standby, in seconds (0 on a primary, or
+# when the standby has replayed everything it received)
+PG_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class Replica:
+    """A read replica and its last health check."""
+    
+    def __init__(self, engine: Engine):
+        """
+        Initialize replica.
+        
+        Args:
+            engine: Engine connected to the replica
+        """
+        self.engine = engine
+        self.lag: Optional[float] = None
+        self.verificado_em: Optional[float] = None
+        self.verificando = False
+        self.erro: Optional[str] = None
+
+
+class ReplicaRouter:
+    """
+    Pick the engine that serves a read-only session.
+    
+    Replicas are handed out round-robin. Each one is checked at most every
+    ``check_interval`` seconds, in a background thread so that a slow or
+    unreachable replica never blocks the session picking it: sessions use
+    the result of the last check, and a replica not checked yet, one that
+    cannot be reached, or one whose replication lag is above ``max_lag``
+    seconds is skipped until a later check finds it healthy again. With no
+    healthy replica (or none configured) reads go to the primary.
+    """
+    
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: Optional[List[Engine]] = None,
+        max_lag: float = 30.0,
+        check_interval: float = 10.0
+    ):
+        """
+        Initialize router.
+        
+        Args:
+            primary: Engine of the primary database
+            replicas: Engines of the read replicas
+            max_lag: Largest replication lag (seconds) a replica may serve reads with
+            check_interval: Seconds between health checks of a replica
+        """
+        self.primary = primary
+        self.replicas = [Replica(engine) for engine in replicas or []]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._proxima = itertools.count()
+        self._lock = threading.Lock()
+    
+    def engine_for_read(self) -> Engine:
+        """
+        Get the engine of the next healthy replica, or the primary.
+        
+        Returns:
+            Engine to read from
+        """
+        if not self.replicas:
+            return self.primary
+        
+        inicio = next(self._proxima)
+        for deslocamento in range(len(self.replicas)):
+            replica = self.replicas[(inicio + deslocamento) % len(self.replicas)]
+            if self._saudavel(replica):
+                return replica.engine
+        
+        logger.warning("No healthy read replica, reading from the primary")
+        return self.primary
+    
+    def _saudavel(self, replica: Replica) -> bool:
+        """Tell whether a replica may serve reads, starting a check when the last one is too old."""
+        agora = time.monotonic()
+        with self._lock:
+            verificar = not replica.verificando and (
+                replica.verificado_em is None or agora - replica.verificado_em >= self.check_interval
+            )
+            if verificar:
+                # Claimed before checking, so concurrent sessions do not all probe it
+                replica.verificado_em = agora
+                replica.verificando = True
+        
+        if verificar:
+            threading.Thread(
+                target=self._verificar, args=(replica,), name="replica-health", daemon=True
+            ).start()
+        
+        return replica.lag is not None and replica.lag <= self.max_lag
+    
+    def verificar(self):
+        """Check every replica now, in the calling thread."""
+        for replica in self.replicas:
+            with self._lock:
+                replica.verificado_em = time.monotonic()
+                replica.verificando = True
+            self._verificar(replica)
+    
+    def _verificar(self, replica: Replica):
+        """Measure the lag of a replica and store the result."""
+        try:
+            replica.lag = self.medir_lag(replica.engine)
+            replica.erro = None
+        except Exception as e:
+            replica.lag = None
+            replica.erro = str(e)
+            logger.warning(f"Read replica {replica.engine.url.host} unavailable: {e}")
+        else:
+            if replica.lag > self.max_lag:
+                logger.warning(
+                    f"Read replica {replica.engine.url.host} lagging {replica.lag:.1f}s "
+                    f"(max {self.max_lag}s), skipping it"
+                )
+        finally:
+            replica.verificando = False
+    
+    @staticmethod
+    def medir_lag(engine: Engine) -> float:
+        """
+        Measure the replication lag of a database.
+        
+        Args:
+            engine: Engine of the replica
+        
+        Returns:
+            Lag in seconds (0 for databases without replication)
+        """
+        with engine.connect() as conn:
+            if conn.dialect.name != 'postgresql':
+                conn.execute(text("SELECT 1"))
+                return 0.0
+            return float(conn.execute(text(PG_LAG_SQL)).scalar() or 0)
+    
+    def status(self) -> List[Dict[str, Any]]:
+        """
+        Get the last health check of every replica.
+        
+        Returns:
+            Host, lag, health (None until first checked) and last error of each replica
+        """
+        return [
+            {
+                'host': replica.engine.url.host,
+                'lag_s': replica.lag,
+                'saudavel': (
+                    replica.lag is not None and replica.lag <= self.max_lag
+                ) if replica.lag is not None or replica.erro is not None else None,
+                'erro': replica.erro,
+            }
+            for replica in self.replicas
+        ]
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica until it writes.
+    
+    The replica is picked once per session, so all its reads see the same
+    replica. Flushes and INSERT/UPDATE/DELETE statements go to the primary,
+    and from then on every statement of the session does too, so it reads
+    its own writes. Call ``pin_primary`` before reads that must see writes
+    made elsewhere (e.g. by the request that just redirected here).
+    """
+    
+    def __init__(self, *args, router: ReplicaRouter, **kwargs):
+        """
+        Initialize session.
+        
+        Args:
+            router: Router choosing the replica
+        """
+        super().__init__(*args, **kwargs)
+        self.router = router
+        self.na_primaria = False
+        self._replica: Optional[Engine] = None
+    
+    def pin_primary(self):
+        """Send every following statement of the session to the primary."""
+        self.na_primaria = True
+    
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.na_primaria or self._flushing or isinstance(clause, UpdateBase):
+            self.na_primaria = True
+            return self.router.primary
+        if self._replica is None:
+            self._replica = self.router.engine_for_read()
+        return self._replica
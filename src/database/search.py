@@ -0,0 +1,80 @@
+"""Substring search served by trigram indexes (migration 019)."""
+
+from typing import Optional
+from sqlalchemy.sql.elements import ColumnElement
+import logging
+
+from src.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Shortest search term: pg_trgm indexes only serve patterns with at least
+# one full trigram, shorter ones fall back to a sequential scan
+MIN_PATTERN_LENGTH = 3
+
+# Escape character of the LIKE patterns built here
+LIKE_ESCAPE = '\\'
+
+
+def escape_like(termo: str) -> str:
+    """
+    Escape the LIKE wildcards of a search term.
+    
+    Args:
+        termo: Search term as typed by the user
+    
+    Returns:
+        Term matching ``%``, ``_`` and the escape character literally
+    """
+    return (
+        termo.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace('%', LIKE_ESCAPE + '%')
+        .replace('_', LIKE_ESCAPE + '_')
+    )
+
+
+def search_term(termo: Optional[str], field: str = 'termo') -> str:
+    """
+    Normalize and validate a substring search term.
+    
+    Args:
+        termo: Search term
+        field: Name of the parameter, for the error
+    
+    Returns:
+        Term without surrounding whitespace
+    
+    Raises:
+        ValidationError: If the term is shorter than MIN_PATTERN_LENGTH
+    """
+    termo = (termo or '').strip()
+    if len(termo) < MIN_PATTERN_LENGTH:
+        raise ValidationError(
+            f"Search term must have at least {MIN_PATTERN_LENGTH} characters", field=field
+        )
+    return termo
+
+
+def contains(column: ColumnElement, termo: Optional[str], field: str = 'termo') -> ColumnElement:
+    """
+    Build a case-insensitive substring filter an index can serve.
+    
+    Produces ``column ILIKE '%termo%'`` with the wildcards of the term
+    escaped, so user input never turns into an unanchored pattern, and
+    rejects terms too short for the column's ``gin_trgm_ops`` index.
+    
+    Args:
+        column: Column with a trigram index
+        termo: Search term
+        field: Name of the parameter, for the error
+    
+    Returns:
+        Filter expression
+    
+    Raises:
+        ValidationError: If the term is shorter than MIN_PATTERN_LENGTH
+    
+    Example:
+        query.filter(contains(Item.descricao, descricao, field='descricao'))
+    """
+    return column.ilike(f"%{escape_like(search_term(termo, field))}%", escape=LIKE_ESCAPE)
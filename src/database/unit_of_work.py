@@ -0,0 +1,196 @@
+"""Unit of work: batching repository writes into fewer transactions."""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Generator, List, Optional
+from sqlalchemy.orm import Session
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Key of the active unit of work in ``Session.info``
+UOW_KEY = 'unit_of_work'
+
+
+class UnitOfWork:
+    """
+    Group the writes of many repository calls into a few transactions.
+    
+    Outside a unit of work every repository write commits on its own.
+    Inside one, writes only flush (IDs and constraints are still checked
+    right away); the session is committed every ``batch_size`` written rows
+    and once more when the block exits, or rolled back if it raises. A
+    unit opened while another one is active on the same session joins it.
+    
+    Code that must survive the failure of a single step without losing the
+    pending rows of the others wraps that step in ``savepoint``.
+    
+    Example:
+        with UnitOfWork(db, batch_size=settings.INGEST_REPLAY_COMMIT_ROWS):
+            for lote in lotes:
+                LicitacaoRepository(db).upsert_many(lote)
+    """
+    
+    def __init__(self, db: Session, batch_size: Optional[int] = None):
+        """
+        Initialize unit of work.
+        
+        Args:
+            db: Database session
+            batch_size: Written rows per commit (None or 0 commits only at the end)
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.pending = 0
+        self.commits = 0
+        self._outer: Optional['UnitOfWork'] = None
+        self._savepoints = 0
+        self._after_commit: List[Callable[[], Any]] = []
+    
+    def __enter__(self) -> 'UnitOfWork':
+        self._outer = current_unit_of_work(self.db)
+        if self._outer is not None:
+            return self._outer
+        self.db.info[UOW_KEY] = self
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if self._outer is not None:
+            return False
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            self.db.info.pop(UOW_KEY, None)
+        return False
+    
+    def write(self, rows: int = 1):
+        """
+        Record a repository write: flush it, and commit when the batch is full.
+        
+        Args:
+            rows: Rows written
+        """
+        self.db.flush()
+        self.pending += rows
+        self.checkpoint()
+    
+    def checkpoint(self) -> bool:
+        """
+        Commit if at least ``batch_size`` rows are pending.
+        
+        Pipeline stages call it at the end of each step, so a transaction
+        is not left open while the next step is being fetched.
+        
+        Returns:
+            Whether a commit was made
+        """
+        if self.batch_size and self.pending >= self.batch_size and not self._savepoints:
+            self.commit()
+            return True
+        return False
+    
+    def commit(self):
+        """Commit the pending writes and run the callbacks waiting for them."""
+        self.db.commit()
+        logger.debug(f"Unit of work committed {self.pending} rows")
+        self.pending = 0
+        self.commits += 1
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+    
+    def rollback(self):
+        """Discard the pending writes and their callbacks."""
+        self.db.rollback()
+        self.pending = 0
+        self._after_commit = []
+    
+    def after_commit(self, callback: Callable[[], Any]):
+        """
+        Run a callback once the current pending writes are committed.
+        
+        Used for state that must not outlive a rollback, e.g. caches of
+        newly created IDs. Dropped if the writes are rolled back.
+        """
+        self._after_commit.append(callback)
+    
+    @contextmanager
+    def savepoint(self) -> Generator[None, None, None]:
+        """
+        Run a block in a SAVEPOINT, so its failure only undoes its own writes.
+        
+        On SQLite a SAVEPOINT opens a deferred transaction whose reads then
+        deadlock concurrent writers, so there the pending writes are
+        committed first and a failure rolls back the block alone.
+        """
+        if self.db.get_bind().dialect.name == 'sqlite':
+            if self.pending:
+                self.commit()
+            try:
+                yield
+            except Exception:
+                self.rollback()
+                raise
+            self.checkpoint()
+            return
+        
+        callbacks = len(self._after_commit)
+        self._savepoints += 1
+        try:
+            with self.db.begin_nested():
+                yield
+        except Exception:
+            del self._after_commit[callbacks:]
+            raise
+        finally:
+            self._savepoints -= 1
+        self.checkpoint()
+
+
+def current_unit_of_work(db: Session) -> Optional[UnitOfWork]:
+    """Get the unit of work active on a session, if any."""
+    return db.info.get(UOW_KEY)
+
+
+def finish_write(db: Session, *instances: Any, rows: int = 1):
+    """
+    End a repository write.
+    
+    Commits (and refreshes ``instances``) when no unit of work is active;
+    otherwise only flushes and leaves the commit to the unit of work.
+    
+    Args:
+        db: Database session
+        instances: Objects to refresh after a commit
+        rows: Rows written
+    """
+    uow = current_unit_of_work(db)
+    if uow is not None:
+        uow.write(rows)
+        return
+    db.commit()
+    for instance in instances:
+        db.refresh(instance)
+
+
+@contextmanager
+def savepoint(db: Session) -> Generator[None, None, None]:
+    """
+    Isolate a write that may fail.
+    
+    Inside a unit of work the block runs in a SAVEPOINT, so a failure keeps
+    the other pending writes; outside one the session is rolled back. The
+    exception is re-raised either way.
+    """
+    uow = current_unit_of_work(db)
+    if uow is not None:
+        with uow.savepoint():
+            yield
+        return
+    try:
+        yield
+    except Exception:
+        db.rollback()
+        raise
@@ -120,6 +120,23 @@ class ExternalAPIError(LAPException):
         self.status_code = status_code
 
 
+class CircuitOpenError(ExternalAPIError):
+    """Exception raised when requests to a host are paused by the circuit breaker."""
+    
+    def __init__(self, message: str, api: str = None, retry_after: float = None):
+        """
+        Initialize circuit open error.
+        
+        Args:
+            message: Error message
+            api: Optional API name or host
+            retry_after: Optional seconds until the host is probed again
+        """
+        super().__init__(message, api=api)
+        self.code = "CIRCUIT_OPEN"
+        self.retry_after = retry_after
+
+
 class ConfigurationError(LAPException):
     """Exception raised for configuration errors."""
     
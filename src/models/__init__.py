@@ -1,6 +1,6 @@
 """Database models for the LAP system."""
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Numeric, Date, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Numeric, Date, JSON, UniqueConstraint, Index, event, select
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -43,6 +43,9 @@ class Orgao(Base):
 class Licitacao(Base):
     """Model for bidding processes."""
     __tablename__ = "licitacoes"
+    __table_args__ = (
+        Index("ix_licitacoes_data_publicacao_id", "data_publicacao_pncp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     sequencial_compra = Column(String(20))
@@ -99,6 +102,7 @@ class Licitacao(Base):
     existe_resultado = Column(Boolean, default=False)
     orcamento_sigiloso_codigo = Column(String(10))
     usuario_nome = Column(String(255))
+    conteudo_hash = Column(String(32))
     
     # Unidade Orgão
     unidade_codigo = Column(String(20))
@@ -117,9 +121,14 @@ class Licitacao(Base):
 class Item(Base):
     """Model for bidding items."""
     __tablename__ = "itens"
+    __table_args__ = (
+        UniqueConstraint("licitacao_id", "numero_item", name="uq_itens_licitacao_numero"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     licitacao_id = Column(Integer, ForeignKey("licitacoes.id"), nullable=False)
+    # Copied from the bidding: partition key of itens (migration 018)
+    data_publicacao_pncp = Column(DateTime, index=True)
     
     numero_item = Column(Integer, nullable=False)
     material_ou_servico = Column(String(1))  # M = Material, S = Serviço
@@ -195,10 +204,15 @@ class Fornecedor(Base):
 class Resultado(Base):
     """Model for bidding results."""
     __tablename__ = "resultados"
+    __table_args__ = (
+        UniqueConstraint("item_id", "fornecedor_id", "sequencial_resultado", name="uq_resultados_item_fornecedor_sequencial"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     item_id = Column(Integer, ForeignKey("itens.id"), nullable=False)
     fornecedor_id = Column(Integer, ForeignKey("fornecedores.id"), nullable=False)
+    # Copied from the bidding: partition key of resultados (migration 018)
+    data_publicacao_pncp = Column(DateTime, index=True)
     
     # Data e Sequencial
     data_resultado = Column(Date)
@@ -231,6 +245,10 @@ class Resultado(Base):
 class Anomalia(Base):
     """Model for detected anomalies in biddings."""
     __tablename__ = "anomalias"
+    __table_args__ = (
+        Index("ix_anomalias_created_id", "created_at", "id"),
+        Index("ix_anomalias_status_created_id", "status", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     licitacao_id = Column(Integer, ForeignKey("licitacoes.id"))
@@ -274,6 +292,9 @@ class AlertaConfiguracao(Base):
 class AlertaDisparado(Base):
     """Model for triggered alerts."""
     __tablename__ = "alertas_disparados"
+    __table_args__ = (
+        Index("ix_alertas_disparados_created_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     configuracao_id = Column(Integer, ForeignKey("alertas_configuracao.id"), nullable=False, index=True)
@@ -323,3 +344,97 @@ class GovernancaMunicipio(Base):
     valor_total = Column(Numeric(15, 2))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ColetaEstado(Base):
+    """Model for per-municipality collection watermarks."""
+    __tablename__ = "coleta_estado"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    municipio_id = Column(Integer, ForeignKey("municipios.id"), unique=True, nullable=False, index=True)
+    
+    # Última janela coletada com sucesso
+    janela_inicio = Column(DateTime)
+    janela_fim = Column(DateTime)
+    
+    # Marca d'água
+    max_data_atualizacao = Column(DateTime)
+    
+    modo = Column(String(20))  # completa, incremental
+    total_registros = Column(Integer, default=0)
+    ultima_execucao = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BackfillShard(Base):
+    """Model for one date window of a municipality's historical backfill."""
+    __tablename__ = "backfill_shards"
+    __table_args__ = (
+        UniqueConstraint("municipio_id", "granularidade", "janela_inicio", name="uq_backfill_shard"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    municipio_id = Column(Integer, ForeignKey("municipios.id"), nullable=False, index=True)
+    
+    # Janela
+    granularidade = Column(String(10), nullable=False)  # mes, semana
+    janela_inicio = Column(DateTime, nullable=False)
+    janela_fim = Column(DateTime, nullable=False)
+    
+    # Execução
+    status = Column(String(20), nullable=False, default="pendente", index=True)  # pendente, executando, concluido, erro
+    tentativas = Column(Integer, default=0)
+    total_registros = Column(Integer, default=0)
+    total_licitacoes = Column(Integer, default=0)
+    max_data_atualizacao = Column(DateTime)
+    erro = Column(Text)
+    iniciado_em = Column(DateTime)
+    concluido_em = Column(DateTime)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class TarefaColeta(Base):
+    """Model for one unit of collection work claimed by workers under a lease."""
+    __tablename__ = "tarefas_coleta"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String(20), nullable=False, index=True)  # janela, itens
+    chave = Column(String(100), unique=True, nullable=False)
+    parametros = Column(JSON, nullable=False)
+    
+    # Execução
+    status = Column(String(20), nullable=False, default="pendente", index=True)  # pendente, executando, concluida, erro
+    tentativas = Column(Integer, default=0)
+    worker_id = Column(String(100))
+    lease_expira_em = Column(DateTime, index=True)
+    heartbeat_em = Column(DateTime)
+    resultado = Column(JSON)
+    erro = Column(Text)
+    iniciado_em = Column(DateTime)
+    concluido_em = Column(DateTime)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+@event.listens_for(Item, "before_insert")
+def _item_data_publicacao(mapper, connection, target):
+    """Copy the bidding's publication date into a new item (its partition key)."""
+    if target.data_publicacao_pncp is None:
+        licitacao = target.__dict__.get("licitacao")
+        target.data_publicacao_pncp = licitacao.data_publicacao_pncp if licitacao is not None else connection.scalar(
+            select(Licitacao.data_publicacao_pncp).where(Licitacao.id == target.licitacao_id)
+        )
+
+
+@event.listens_for(Resultado, "before_insert")
+def _resultado_data_publicacao(mapper, connection, target):
+    """Copy the item's publication date into a new result (its partition key)."""
+    if target.data_publicacao_pncp is None:
+        item = target.__dict__.get("item")
+        target.data_publicacao_pncp = item.data_publicacao_pncp if item is not None else connection.scalar(
+            select(Item.data_publicacao_pncp).where(Item.id == target.item_id)
+        )
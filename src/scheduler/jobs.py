@@ -6,7 +6,10 @@ from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime
 
 from config.settings import settings, get_collection_times
+from src.database.connection import get_db_context
+from src.database.partitioning import maintain_partitions
 from src.services.coleta_service import ColetaService
+from src.utils.constants import COLLECTION_YEARS
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +18,29 @@ scheduler = AsyncIOScheduler(timezone=settings.SCHEDULER_TIMEZONE)
 
 
 async def collect_all_municipios_job():
-    """Job to collect biddings for all municipalities."""
-    logger.info("Starting scheduled collection for all municipalities")
+    """Job to collect what changed since the last run for all municipalities."""
+    logger.info("Starting scheduled incremental collection for all municipalities")
     try:
+        # The pooled HTTP client is shared with the API; the application
+        # lifespan closes it
         service = ColetaService()
-        stats = await service.collect_all_municipios(years=2)
-        logger.info(f"Collection completed: {stats}")
+        stats = await service.collect_all_municipios(years=COLLECTION_YEARS, incremental=True)
+        resumo = {k: v for k, v in stats.items() if k != 'municipios'}
+        logger.info(f"Collection completed: {resumo}")
     except Exception as e:
         logger.error(f"Error in collection job: {e}")
 
 
+def maintain_partitions_job():
+    """Job to create the coming monthly partitions and detach the expired ones."""
+    try:
+        with get_db_context() as db:
+            stats = maintain_partitions(db)
+        logger.info(f"Partition maintenance completed: {stats}")
+    except Exception as e:
+        logger.error(f"Error in partition maintenance job: {e}")
+
+
 def setup_scheduler():
     """Setup scheduler jobs."""
     if not settings.SCHEDULER_ENABLED:
@@ -51,6 +67,15 @@ def setup_scheduler():
         except Exception as e:
             logger.error(f"Error scheduling job for {time_str}: {e}")
     
+    hour, minute = settings.DATABASE_PARTITION_MAINTENANCE_TIME.split(':')
+    scheduler.add_job(
+        maintain_partitions_job,
+        CronTrigger(hour=int(hour), minute=int(minute)),
+        id='maintain_partitions',
+        name='Maintain monthly partitions',
+        replace_existing=True
+    )
+    
     return scheduler
 
 
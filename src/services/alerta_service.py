@@ -3,9 +3,11 @@
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import or_
 
 from src.models import AlertaConfiguracao, AlertaDisparado, Licitacao
+from src.database.loading import ALERTA_CONFIGURACAO, load_profile
+from src.database.unit_of_work import UnitOfWork, finish_write
 
 
 class AlertaService:
@@ -44,19 +46,20 @@ class AlertaService:
             AlertaConfiguracao.ativo == True
         ).all()
         
+        # Configurations already triggered by this bidding, in one query
+        ja_disparados = {
+            configuracao_id for (configuracao_id,) in self.db.query(
+                AlertaDisparado.configuracao_id
+            ).filter(
+                AlertaDisparado.licitacao_id == licitacao.id
+            ).all()
+        }
+        
         for config in configs:
             deve_disparar = self._verificar_criterios(licitacao, config)
             
             if deve_disparar:
-                # Check if already triggered
-                ja_disparado = self.db.query(AlertaDisparado).filter(
-                    and_(
-                        AlertaDisparado.configuracao_id == config.id,
-                        AlertaDisparado.licitacao_id == licitacao.id
-                    )
-                ).first()
-                
-                if not ja_disparado:
+                if config.id not in ja_disparados:
                     mensagem = self._gerar_mensagem(licitacao, config)
                     
                     alerta = AlertaDisparado(
@@ -123,11 +126,11 @@ class AlertaService:
             # For now, just mark as sent
             alerta.enviado = True
             alerta.enviado_em = datetime.now()
-            self.db.commit()
+            finish_write(self.db)
             return True
         except Exception as e:
             alerta.erro = str(e)
-            self.db.commit()
+            finish_write(self.db)
             return False
     
     def enviar_notificacao_telegram(self, alerta: AlertaDisparado) -> bool:
@@ -138,24 +141,31 @@ class AlertaService:
             # For now, just mark as sent
             alerta.enviado = True
             alerta.enviado_em = datetime.now()
-            self.db.commit()
+            finish_write(self.db)
             return True
         except Exception as e:
             alerta.erro = str(e)
-            self.db.commit()
+            finish_write(self.db)
             return False
     
     def executar_verificacao_periodica(self):
-        """Job to check alerts periodically."""
+        """
+        Job to check alerts periodically.
+        
+        Pending alerts are loaded with their configurations in one query and
+        marked as sent in a single commit.
+        """
         # Get recent biddings not yet checked
-        alertas_pendentes = self.db.query(AlertaDisparado).filter(
-            AlertaDisparado.enviado == False
+        alertas_pendentes = load_profile(
+            self.db.query(AlertaDisparado).filter(AlertaDisparado.enviado == False),
+            ALERTA_CONFIGURACAO
         ).all()
         
-        for alerta in alertas_pendentes:
-            config = alerta.configuracao
-            
-            if config.canal_notificacao == 'email':
-                self.enviar_notificacao_email(alerta)
-            elif config.canal_notificacao == 'telegram':
-                self.enviar_notificacao_telegram(alerta)
+        with UnitOfWork(self.db):
+            for alerta in alertas_pendentes:
+                config = alerta.configuracao
+                
+                if config.canal_notificacao == 'email':
+                    self.enviar_notificacao_email(alerta)
+                elif config.canal_notificacao == 'telegram':
+                    self.enviar_notificacao_telegram(alerta)
@@ -7,6 +7,8 @@ from sqlalchemy import func, and_, desc
 from decimal import Decimal
 import statistics
 
+from src.database.partitioning import partition_window
+from src.database.search import MIN_PATTERN_LENGTH, contains
 from src.models import Item, Licitacao, Resultado
 
 
@@ -32,10 +34,12 @@ class AnalisePrecoService:
             Licitacao, Licitacao.id == Item.licitacao_id
         ).filter(
             and_(
-                Item.descricao.ilike(f'%{descricao}%'),
+                contains(Item.descricao, descricao, field='descricao'),
                 Item.valor_unitario_estimado.isnot(None),
                 Item.valor_unitario_estimado > 0,
-                Licitacao.data_publicacao_pncp >= data_limite
+                Licitacao.data_publicacao_pncp >= data_limite,
+                # Lets PostgreSQL skip the itens partitions outside the window
+                *partition_window(self.db, data_limite, Item.data_publicacao_pncp)
             )
         ).all()
         
@@ -80,7 +84,8 @@ class AnalisePrecoService:
         """Compare item price with historical data."""
         item = self.db.query(Item).filter(Item.id == item_id).first()
         
-        if not item or not item.valor_unitario_estimado:
+        # Descriptions too short to search for have no comparable items
+        if not item or not item.valor_unitario_estimado or len(item.descricao.strip()) < MIN_PATTERN_LENGTH:
             return {
                 'item_id': item_id,
                 'comparacao': None
@@ -141,7 +146,7 @@ class AnalisePrecoService:
             Item, Item.licitacao_id == Licitacao.id
         ).filter(
             and_(
-                Item.descricao.ilike(f'%{descricao}%'),
+                contains(Item.descricao, descricao, field='descricao'),
                 Item.valor_unitario_estimado.isnot(None),
                 Item.valor_unitario_estimado > 0
             )
@@ -206,7 +211,7 @@ class AnalisePrecoService:
             Licitacao, Licitacao.id == Item.licitacao_id
         ).filter(
             and_(
-                Item.descricao.ilike(f'%{descricao}%'),
+                contains(Item.descricao, descricao, field='descricao'),
                 Item.valor_unitario_estimado.isnot(None),
                 or_(
                     Item.valor_unitario_estimado < lower_bound,
@@ -274,10 +279,11 @@ class AnalisePrecoService:
             Licitacao, Licitacao.id == Item.licitacao_id
         ).filter(
             and_(
-                Item.descricao.ilike(f'%{descricao}%'),
+                contains(Item.descricao, descricao, field='descricao'),
                 Item.valor_unitario_estimado.isnot(None),
                 Item.valor_unitario_estimado > 0,
-                Licitacao.data_publicacao_pncp >= data_limite
+                Licitacao.data_publicacao_pncp >= data_limite,
+                *partition_window(self.db, data_limite, Item.data_publicacao_pncp)
             )
         ).order_by(
             Licitacao.data_publicacao_pncp
@@ -335,10 +341,11 @@ class AnalisePrecoService:
             Licitacao, Licitacao.id == Item.licitacao_id
         ).filter(
             and_(
-                Item.descricao.ilike(f'%{descricao}%'),
+                contains(Item.descricao, descricao, field='descricao'),
                 Item.valor_unitario_estimado.isnot(None),
                 Item.valor_unitario_estimado > 0,
-                Licitacao.data_publicacao_pncp >= data_limite
+                Licitacao.data_publicacao_pncp >= data_limite,
+                *partition_window(self.db, data_limite, Item.data_publicacao_pncp)
             )
         ).order_by(
             Licitacao.data_publicacao_pncp
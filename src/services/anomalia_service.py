@@ -8,6 +8,9 @@ from decimal import Decimal
 
 from src.models import Anomalia, Licitacao, Item, Resultado, Fornecedor
 from src.database.connection import get_db
+from src.database.partitioning import partition_window
+from src.database.loading import LICITACAO_ITENS, load_profile
+from src.database.search import MIN_PATTERN_LENGTH, contains
 
 
 class AnomaliaService:
@@ -30,10 +33,17 @@ class AnomaliaService:
     
     def detectar_anomalias_preco(self, item_id: int) -> List[Anomalia]:
         """Detect price anomalies by comparing with historical data."""
-        anomalias = []
-        
         item = self.db.query(Item).filter(Item.id == item_id).first()
-        if not item or not item.valor_unitario_estimado:
+        if not item:
+            return []
+        return self._anomalias_preco(item)
+    
+    def _anomalias_preco(self, item: Item) -> List[Anomalia]:
+        """Detect price anomalies of a loaded item."""
+        anomalias = []
+        item_id = item.id
+        # Descriptions too short to search for have no comparable items
+        if not item.valor_unitario_estimado or len(item.descricao[:50].strip()) < MIN_PATTERN_LENGTH:
             return anomalias
         
         # Get historical prices for similar items
@@ -42,7 +52,7 @@ class AnomaliaService:
             func.stddev(Item.valor_unitario_estimado).label('desvio')
         ).filter(
             and_(
-                Item.descricao.ilike(f'%{item.descricao[:50]}%'),
+                contains(Item.descricao, item.descricao[:50]),
                 Item.id != item_id,
                 Item.valor_unitario_estimado > 0
             )
@@ -104,7 +114,9 @@ class AnomaliaService:
         ).filter(
             and_(
                 Licitacao.orgao_id == orgao_id,
-                Licitacao.data_publicacao_pncp >= data_inicio
+                Licitacao.data_publicacao_pncp >= data_inicio,
+                # Lets PostgreSQL skip the itens/resultados partitions outside the window
+                *partition_window(self.db, data_inicio, Item.data_publicacao_pncp, Resultado.data_publicacao_pncp)
             )
         ).group_by(
             Fornecedor.id, Fornecedor.razao_social
@@ -140,15 +152,33 @@ class AnomaliaService:
     
     def detectar_baixa_competicao(self, licitacao_id: int) -> Optional[Anomalia]:
         """Detect biddings with few participants."""
-        # Count unique suppliers for this bidding
-        num_fornecedores = self.db.query(
-            func.count(func.distinct(Resultado.fornecedor_id))
-        ).join(
-            Item, Item.id == Resultado.item_id
-        ).filter(
-            Item.licitacao_id == licitacao_id
-        ).scalar()
+        return self._baixa_competicao(licitacao_id, self._contar_fornecedores([licitacao_id]).get(licitacao_id))
+    
+    def _contar_fornecedores(self, licitacao_ids) -> Dict[int, int]:
+        """
+        Count the distinct suppliers of many biddings with one query.
+        
+        Args:
+            licitacao_ids: Bidding IDs (a list or a subquery of IDs)
         
+        Returns:
+            Supplier count by bidding ID (biddings without results are left out)
+        """
+        return dict(
+            self.db.query(
+                Item.licitacao_id,
+                func.count(func.distinct(Resultado.fornecedor_id))
+            ).join(
+                Item, Item.id == Resultado.item_id
+            ).filter(
+                Item.licitacao_id.in_(licitacao_ids)
+            ).group_by(
+                Item.licitacao_id
+            ).all()
+        )
+    
+    def _baixa_competicao(self, licitacao_id: int, num_fornecedores: Optional[int]) -> Optional[Anomalia]:
+        """Build the low competition anomaly of a bidding, if its supplier count is low."""
         if num_fornecedores and num_fornecedores < 3:
             score = 60.0 if num_fornecedores == 1 else 40.0
             
@@ -166,8 +196,14 @@ class AnomaliaService:
     def detectar_prazo_curto(self, licitacao_id: int) -> Optional[Anomalia]:
         """Detect biddings with very short proposal deadline."""
         licitacao = self.db.query(Licitacao).filter(Licitacao.id == licitacao_id).first()
-        
-        if not licitacao or not licitacao.data_publicacao_pncp or not licitacao.data_abertura_proposta:
+        if not licitacao:
+            return None
+        return self._prazo_curto(licitacao)
+    
+    def _prazo_curto(self, licitacao: Licitacao) -> Optional[Anomalia]:
+        """Detect a very short proposal deadline on a loaded bidding."""
+        licitacao_id = licitacao.id
+        if not licitacao.data_publicacao_pncp or not licitacao.data_abertura_proposta:
             return None
         
         prazo_dias = (licitacao.data_abertura_proposta - licitacao.data_publicacao_pncp).days
@@ -200,50 +236,57 @@ class AnomaliaService:
         return min(total_score / len(anomalias), 100.0)
     
     def executar_analise_completa(self, licitacao_id: Optional[int] = None) -> List[Anomalia]:
-        """Execute complete anomaly analysis."""
+        """
+        Execute complete anomaly analysis.
+        
+        Biddings and their items, supplier counts and already stored
+        anomalies are each loaded with one query for the whole batch; only
+        the historical price comparison still runs once per item.
+        """
         anomalias = []
         
         # If specific licitacao_id, analyze only that one
         if licitacao_id:
-            licitacoes = [self.db.query(Licitacao).filter(Licitacao.id == licitacao_id).first()]
+            query = self.db.query(Licitacao).filter(Licitacao.id == licitacao_id)
         else:
             # Analyze recent biddings (last 30 days)
             data_limite = datetime.now() - timedelta(days=30)
-            licitacoes = self.db.query(Licitacao).filter(
+            query = self.db.query(Licitacao).filter(
                 Licitacao.data_publicacao_pncp >= data_limite
-            ).all()
+            )
+        
+        licitacoes = load_profile(query, LICITACAO_ITENS).all()
+        ids = query.with_entities(Licitacao.id).statement
+        fornecedores = self._contar_fornecedores(ids) if licitacoes else {}
         
         for licitacao in licitacoes:
-            if not licitacao:
-                continue
-            
             # Check short deadline
-            prazo_anomalia = self.detectar_prazo_curto(licitacao.id)
+            prazo_anomalia = self._prazo_curto(licitacao)
             if prazo_anomalia:
                 anomalias.append(prazo_anomalia)
             
             # Check low competition
-            competicao_anomalia = self.detectar_baixa_competicao(licitacao.id)
+            competicao_anomalia = self._baixa_competicao(licitacao.id, fornecedores.get(licitacao.id))
             if competicao_anomalia:
                 anomalias.append(competicao_anomalia)
             
             # Check price anomalies for items
             for item in licitacao.itens:
-                preco_anomalias = self.detectar_anomalias_preco(item.id)
+                preco_anomalias = self._anomalias_preco(item)
                 anomalias.extend(preco_anomalias)
         
-        # Save anomalies to database
+        # Save anomalies to database, skipping the ones already stored
+        existentes = set()
+        if anomalias:
+            existentes = set(
+                self.db.query(Anomalia.licitacao_id, Anomalia.item_id, Anomalia.tipo).filter(
+                    Anomalia.licitacao_id.in_(ids)
+                ).all()
+            )
         for anomalia in anomalias:
-            # Check if already exists
-            existe = self.db.query(Anomalia).filter(
-                and_(
-                    Anomalia.licitacao_id == anomalia.licitacao_id,
-                    Anomalia.item_id == anomalia.item_id,
-                    Anomalia.tipo == anomalia.tipo
-                )
-            ).first()
-            
-            if not existe:
+            chave = (anomalia.licitacao_id, anomalia.item_id, anomalia.tipo)
+            if chave not in existentes:
+                existentes.add(chave)
                 self.db.add(anomalia)
         
         self.db.commit()
@@ -0,0 +1,254 @@
+"""Sharded, resumable historical backfill."""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from src.database.connection import get_db_context
+from src.database.partitioning import create_partitions
+from src.database.repositories import (
+    MunicipioRepository,
+    ColetaEstadoRepository,
+    BackfillShardRepository
+)
+from src.models import Municipio
+from src.services.coleta_service import ColetaService
+from src.utils.constants import MODO_COLETA_COMPLETA, SHARD_CONCLUIDO
+from src.utils.helpers import split_date_range
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillService:
+    """
+    Historical backfill split in month (or week) shards per municipality.
+    
+    Planning records one row per shard in ``backfill_shards``; execution
+    runs every unfinished shard with bounded parallelism and checkpoints
+    each one as it finishes. An interrupted run therefore resumes with only
+    the shards that are missing, and widening the number of years just
+    plans the older shards. Once every shard of a municipality is done, its
+    window and watermark are recorded in ``coleta_estado`` so incremental
+    collection can take over.
+    """
+    
+    def __init__(self, coleta_service: Optional[ColetaService] = None):
+        """
+        Initialize backfill service.
+        
+        Args:
+            coleta_service: Collection service used to ingest each shard
+        """
+        self.coleta_service = coleta_service or ColetaService()
+    
+    @staticmethod
+    def _municipios(db: Session, codigos_ibge: Optional[List[str]] = None) -> List[Municipio]:
+        """Get the municipalities to backfill (all when no codes are given)."""
+        municipios = MunicipioRepository(db).get_all()
+        if codigos_ibge is None:
+            return municipios
+        
+        selecionados = [m for m in municipios if m.codigo_ibge in codigos_ibge]
+        encontrados = {m.codigo_ibge for m in selecionados}
+        for codigo in codigos_ibge:
+            if codigo not in encontrados:
+                logger.warning(f"Municipality {codigo} not found in database")
+        return selecionados
+    
+    def planejar(
+        self,
+        years: int = 2,
+        granularidade: Optional[str] = None,
+        codigos_ibge: Optional[List[str]] = None
+    ) -> int:
+        """
+        Plan the shards covering the last ``years`` years.
+        
+        Finished shards whose window grew since they ran (the current month)
+        are reopened, so a new full run also reads the rest of that month.
+        On partitioned databases the monthly partitions of the period are
+        created too, so the backfilled biddings skip the default partition.
+        
+        Args:
+            years: Number of years to cover
+            granularidade: Shard size, "mes" or "semana" (defaults to BACKFILL_GRANULARITY)
+            codigos_ibge: Municipalities to plan (all when None)
+        
+        Returns:
+            Number of new shards
+        """
+        granularidade = granularidade or settings.BACKFILL_GRANULARITY
+        data_final = datetime.now()
+        data_inicial = data_final - timedelta(days=365 * years)
+        janelas = split_date_range(data_inicial, data_final, granularidade)
+        
+        with get_db_context() as db:
+            create_partitions(db, inicio=data_inicial.date())
+            repo = BackfillShardRepository(db)
+            criados = sum(
+                repo.planejar(municipio.id, granularidade, janelas)
+                for municipio in self._municipios(db, codigos_ibge)
+            )
+        
+        logger.info(f"Planned {criados} new backfill shards ({granularidade}, {years} years)")
+        return criados
+    
+    async def executar(
+        self,
+        paralelismo: Optional[int] = None,
+        codigos_ibge: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run every unfinished shard.
+        
+        Args:
+            paralelismo: Shards running at once (defaults to BACKFILL_PARALLELISM)
+            codigos_ibge: Restrict to these municipalities (all when None)
+        
+        Returns:
+            Dictionary with execution statistics
+        """
+        paralelismo = max(1, paralelismo or settings.BACKFILL_PARALLELISM)
+        
+        with get_db_context() as db:
+            municipios = ColetaService.ordenar_por_volume(db, self._municipios(db, codigos_ibge))
+            codigos = {m.id: m.codigo_ibge for m in municipios}
+            posicao = {m.id: i for i, m in enumerate(municipios)}
+            shards = [
+                (s.id, s.municipio_id, s.janela_inicio, s.janela_fim)
+                for s in BackfillShardRepository(db).get_inacabados(list(codigos))
+            ]
+        # Most recent window first; within a window, largest municipalities first
+        shards.sort(key=lambda shard: (-shard[2].timestamp(), posicao[shard[1]]))
+        
+        stats = {
+            'shards_executados': len(shards),
+            'shards_concluidos': 0,
+            'shards_com_erro': 0,
+            'total_licitacoes': 0,
+            'municipios_concluidos': 0
+        }
+        if not shards:
+            logger.info("No unfinished backfill shards")
+            return stats
+        
+        logger.info(f"Running {len(shards)} backfill shards with parallelism {paralelismo}")
+        semaphore = asyncio.Semaphore(paralelismo)
+        
+        async def run(shard_id, municipio_id, janela_inicio, janela_fim):
+            async with semaphore:
+                return await self._executar_shard(
+                    shard_id, municipio_id, codigos[municipio_id], janela_inicio, janela_fim
+                )
+        
+        resultados = await asyncio.gather(*(run(*shard) for shard in shards))
+        for sucesso, count in resultados:
+            stats['shards_concluidos' if sucesso else 'shards_com_erro'] += 1
+            stats['total_licitacoes'] += count
+        
+        for municipio_id in {shard[1] for shard in shards}:
+            if self._registrar_estado(municipio_id):
+                stats['municipios_concluidos'] += 1
+        
+        logger.info(f"Backfill run finished: {stats}")
+        return stats
+    
+    async def backfill(
+        self,
+        years: int = 2,
+        granularidade: Optional[str] = None,
+        paralelismo: Optional[int] = None,
+        codigos_ibge: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Plan and run the backfill of the last ``years`` years.
+        
+        Args:
+            years: Number of years to cover
+            granularidade: Shard size, "mes" or "semana"
+            paralelismo: Shards running at once
+            codigos_ibge: Municipalities to backfill (all when None)
+        
+        Returns:
+            Dictionary with backfill statistics
+        """
+        criados = self.planejar(years, granularidade, codigos_ibge)
+        stats = await self.executar(paralelismo, codigos_ibge)
+        stats['shards_planejados'] = criados
+        return stats
+    
+    async def _executar_shard(
+        self,
+        shard_id: int,
+        municipio_id: int,
+        codigo_ibge: str,
+        janela_inicio: datetime,
+        janela_fim: datetime
+    ) -> Tuple[bool, int]:
+        """
+        Ingest one shard and checkpoint the outcome.
+        
+        Pages are fetched in strict mode, so a shard is only marked as
+        finished when its whole window was read.
+        
+        Returns:
+            Tuple of (success, biddings stored)
+        """
+        with get_db_context() as db:
+            BackfillShardRepository(db).marcar_executando(shard_id)
+        
+        try:
+            count, max_data_atualizacao, total_registros = await self.coleta_service._ingest_window(
+                codigo_ibge, municipio_id, janela_inicio, janela_fim, strict=True
+            )
+        except Exception as e:
+            logger.error(
+                f"Backfill shard {janela_inicio:%Y-%m-%d}..{janela_fim:%Y-%m-%d} "
+                f"failed for municipality {codigo_ibge}: {e}"
+            )
+            with get_db_context() as db:
+                BackfillShardRepository(db).marcar_erro(shard_id, str(e))
+            return False, 0
+        
+        with get_db_context() as db:
+            BackfillShardRepository(db).marcar_concluido(
+                shard_id, total_registros, count, max_data_atualizacao
+            )
+        return True, count
+    
+    def _registrar_estado(self, municipio_id: int) -> bool:
+        """
+        Record the backfilled window once all shards of a municipality are done.
+        
+        Returns:
+            True if the municipality's backfill is complete
+        """
+        with get_db_context() as db:
+            shards = BackfillShardRepository(db).get_by_municipio(municipio_id)
+            if not shards or any(s.status != SHARD_CONCLUIDO for s in shards):
+                return False
+            
+            marcas = [s.max_data_atualizacao for s in shards if s.max_data_atualizacao]
+            ColetaEstadoRepository(db).registrar_sucesso(
+                municipio_id=municipio_id,
+                janela_inicio=min(s.janela_inicio for s in shards),
+                janela_fim=max(s.janela_fim for s in shards),
+                max_data_atualizacao=max(marcas) if marcas else None,
+                modo=MODO_COLETA_COMPLETA,
+                total_registros=sum(s.total_registros or 0 for s in shards)
+            )
+        return True
+    
+    def resumo(self) -> Dict[str, int]:
+        """
+        Count backfill shards by status.
+        
+        Returns:
+            Dictionary of status to number of shards
+        """
+        with get_db_context() as db:
+            return BackfillShardRepository(db).resumo()
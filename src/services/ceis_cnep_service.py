@@ -16,7 +16,13 @@ class CEISCNEPService:
     CEIS_URL = "https://portaldatransparencia.gov.br/api-de-dados/ceis"
     CNEP_URL = "https://portaldatransparencia.gov.br/api-de-dados/cnep"
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Optional[Session] = None):
+        """
+        Initialize service.
+        
+        Args:
+            db: Database session (not needed by the online queries)
+        """
         self.db = db
         self.timeout = 30
     
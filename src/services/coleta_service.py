@@ -1,23 +1,44 @@
 """Collection service for gathering bidding data."""
 
 import json
+import time
+import asyncio
 import logging
-from typing import List, Dict, Any
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime, timedelta
 
+from sqlalchemy.orm import Session
+
+from config.settings import settings
 from src.collectors import PNCPCollector, PNCPResultadosCollector
 from src.database.connection import get_db_context
+from src.database.unit_of_work import UnitOfWork, savepoint
 from src.database.repositories import (
     MunicipioRepository,
     LicitacaoRepository,
-    ItemRepository,
-    FornecedorRepository
+    ItemResultadoLoader,
+    ColetaEstadoRepository,
+    TarefaColetaRepository
+)
+from src.utils.field_spec import to_datetime
+from src.utils.helpers import get_date_range, clean_cnpj_cpf, safe_get
+from src.utils.pncp_specs import LICITACAO_SPEC
+from src.utils.constants import (
+    PNCP_CONTRATACOES_ENDPOINT,
+    PNCP_CONTRATACOES_ATUALIZACAO_ENDPOINT,
+    MODO_COLETA_COMPLETA,
+    MODO_COLETA_INCREMENTAL,
+    TAREFA_ITENS,
+    TAREFA_ANOMALIAS
 )
-from src.utils.helpers import get_date_range, clean_cnpj_cpf
-from src.models import Resultado
+from src.models import Municipio
+from src.services.identity_resolver import fornecedor_resolver, orgao_resolver
+from src.services.ingest_pipeline import IngestPipeline
 
 logger = logging.getLogger(__name__)
 
+MUNICIPIOS_CONFIG_PATH = 'config/municipios_200km.json'
+
 
 class ColetaService:
     """Service for collecting bidding data."""
@@ -26,11 +47,13 @@ class ColetaService:
         """Initialize collection service."""
         self.pncp_collector = PNCPCollector()
         self.resultados_collector = PNCPResultadosCollector()
+        self.orgaos = orgao_resolver()
+        self.fornecedores = fornecedor_resolver()
     
     async def load_municipios_from_config(self):
         """Load municipalities from configuration file."""
         try:
-            with open('config/municipios_200km.json', 'r', encoding='utf-8') as f:
+            with open(MUNICIPIOS_CONFIG_PATH, 'r', encoding='utf-8') as f:
                 municipios_data = json.load(f)
             
             with get_db_context() as db:
@@ -48,7 +71,10 @@ class ColetaService:
         years: int = 2
     ) -> int:
         """
-        Collect biddings for a municipality.
+        Collect biddings for a municipality (full backfill).
+        
+        The window is split in resumable shards (see ``BackfillService``),
+        so an interrupted backfill continues where it stopped.
         
         Args:
             codigo_ibge: Municipality IBGE code
@@ -57,145 +83,688 @@ class ColetaService:
         Returns:
             Number of biddings collected
         """
-        logger.info(f"Starting collection for municipality {codigo_ibge}")
+        from src.services.backfill_service import BackfillService
         
-        # Collect data from PNCP
-        licitacoes_data = await self.pncp_collector.collect_by_municipality(
-            codigo_ibge, years
-        )
+        stats = await BackfillService(self).backfill(years=years, codigos_ibge=[codigo_ibge])
+        return stats['total_licitacoes']
+    
+    async def collect_incremental_for_municipio(
+        self,
+        codigo_ibge: str,
+        years: int = 2,
+        overlap_days: Optional[int] = None
+    ) -> int:
+        """
+        Collect only what changed since the municipality's last collection.
         
-        count = 0
-        with get_db_context() as db:
-            municipio_repo = MunicipioRepository(db)
-            licitacao_repo = LicitacaoRepository(db)
+        The delta window starts at the stored watermark minus a small overlap
+        and is queried by update date, so records changed after a previous run
+        are picked up too. Municipalities without a watermark fall back to a
+        full backfill of ``years`` years.
+        
+        Args:
+            codigo_ibge: Municipality IBGE code
+            years: Number of years for the fallback full backfill
+            overlap_days: Days to re-read before the watermark
+                (defaults to COLLECTION_OVERLAP_DAYS)
             
-            # Get municipality
-            municipio = municipio_repo.get_by_codigo_ibge(codigo_ibge)
+        Returns:
+            Number of biddings collected
+        """
+        if overlap_days is None:
+            overlap_days = settings.COLLECTION_OVERLAP_DAYS
+        
+        with get_db_context() as db:
+            municipio = MunicipioRepository(db).get_by_codigo_ibge(codigo_ibge)
             if not municipio:
                 logger.warning(f"Municipality {codigo_ibge} not found in database")
                 return 0
             
-            for licitacao_raw in licitacoes_data:
-                try:
-                    # Parse licitacao data
-                    parsed = self.pncp_collector.parse_licitacao(licitacao_raw)
-                    
-                    # Check if already exists
-                    numero_controle = parsed.get('numero_controle_pncp')
-                    if numero_controle and licitacao_repo.get_by_numero_controle(numero_controle):
-                        logger.debug(f"Licitação {numero_controle} already exists, skipping")
-                        continue
-                    
-                    # Get or create orgao
-                    orgao = licitacao_repo.get_or_create_orgao(
-                        cnpj=parsed.get('orgao_cnpj'),
-                        razao_social=parsed.get('orgao_razao_social', 'N/A'),
-                        poder_id=parsed.get('poder_id'),
-                        esfera_id=parsed.get('esfera_id')
-                    )
-                    
-                    # Create licitacao
-                    licitacao_data = {
-                        'sequencial_compra': parsed.get('sequencial_compra'),
-                        'numero_compra': parsed.get('numero_compra'),
-                        'processo': parsed.get('processo'),
-                        'ano_compra': parsed.get('ano_compra'),
-                        'numero_controle_pncp': numero_controle,
-                        'orgao_id': orgao.id,
-                        'municipio_id': municipio.id,
-                        'modalidade_id': parsed.get('modalidade_id'),
-                        'modalidade_nome': parsed.get('modalidade_nome'),
-                        'modo_disputa_id': parsed.get('modo_disputa_id'),
-                        'modo_disputa_nome': parsed.get('modo_disputa_nome'),
-                        'tipo_instrumento_convocatorio_nome': parsed.get('tipo_instrumento_convocatorio_nome'),
-                        'amparo_legal_descricao': parsed.get('amparo_legal_descricao'),
-                        'amparo_legal_nome': parsed.get('amparo_legal_nome'),
-                        'amparo_legal_codigo': parsed.get('amparo_legal_codigo'),
-                        'objeto_compra': parsed.get('objeto_compra'),
-                        'informacao_complementar': parsed.get('informacao_complementar'),
-                        'srp': parsed.get('srp'),
-                        'data_publicacao_pncp': parsed.get('data_publicacao_pncp'),
-                        'data_abertura_proposta': parsed.get('data_abertura_proposta'),
-                        'data_encerramento_proposta': parsed.get('data_encerramento_proposta'),
-                        'data_inclusao': parsed.get('data_inclusao'),
-                        'data_atualizacao': parsed.get('data_atualizacao'),
-                        'situacao_compra_id': parsed.get('situacao_compra_id'),
-                        'situacao_compra_nome': parsed.get('situacao_compra_nome'),
-                        'valor_total_estimado': parsed.get('valor_total_estimado'),
-                        'valor_total_homologado': parsed.get('valor_total_homologado'),
-                        'link_sistema_origem': parsed.get('link_sistema_origem'),
-                        'justificativa_presencial': parsed.get('justificativa_presencial'),
-                        'existe_resultado': parsed.get('existe_resultado'),
-                        'orcamento_sigiloso_codigo': parsed.get('orcamento_sigiloso_codigo'),
-                        'usuario_nome': parsed.get('usuario_nome'),
-                        'unidade_codigo': parsed.get('unidade_codigo'),
-                        'unidade_nome': parsed.get('unidade_nome'),
-                    }
-                    
-                    licitacao_repo.create(licitacao_data)
-                    count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error processing licitacao: {e}")
-                    continue
+            estado = ColetaEstadoRepository(db).get_by_municipio(municipio.id)
+            watermark = None
+            if estado:
+                marcas = [m for m in (estado.max_data_atualizacao, estado.janela_fim) if m]
+                watermark = max(marcas) if marcas else None
+        
+        if watermark is None:
+            logger.info(f"No collection state for municipality {codigo_ibge}, running full backfill")
+            return await self.collect_licitacoes_for_municipio(codigo_ibge, years)
+        
+        data_final = datetime.now()
+        data_inicial = watermark - timedelta(days=overlap_days)
+        
+        return await self._collect_window(
+            codigo_ibge,
+            data_inicial,
+            data_final,
+            modo=MODO_COLETA_INCREMENTAL,
+            endpoint=PNCP_CONTRATACOES_ATUALIZACAO_ENDPOINT
+        )
+    
+    async def _collect_window(
+        self,
+        codigo_ibge: str,
+        data_inicial: datetime,
+        data_final: datetime,
+        modo: str,
+        endpoint: str = PNCP_CONTRATACOES_ENDPOINT
+    ) -> int:
+        """
+        Collect and store biddings of a municipality for a date window.
+        
+        On success the window and the highest ``data_atualizacao`` seen are
+        recorded in ``coleta_estado``. The window is always read in strict
+        mode: a missing page aborts it, so the watermark never moves past
+        data that was not read.
+        
+        Args:
+            codigo_ibge: Municipality IBGE code
+            data_inicial: Window start
+            data_final: Window end
+            modo: Collection mode recorded in the state table
+            endpoint: PNCP listing endpoint
+        
+        Returns:
+            Number of biddings collected
+        """
+        logger.info(
+            f"Starting {modo} collection for municipality {codigo_ibge} "
+            f"from {data_inicial} to {data_final}"
+        )
+        
+        with get_db_context() as db:
+            municipio = MunicipioRepository(db).get_by_codigo_ibge(codigo_ibge)
+            if not municipio:
+                logger.warning(f"Municipality {codigo_ibge} not found in database")
+                return 0
+            municipio_id = municipio.id
+        
+        count, max_data_atualizacao, total_registros = await self._ingest_window(
+            codigo_ibge, municipio_id, data_inicial, data_final, endpoint, strict=True
+        )
+        
+        with get_db_context() as db:
+            ColetaEstadoRepository(db).registrar_sucesso(
+                municipio_id=municipio_id,
+                janela_inicio=data_inicial,
+                janela_fim=data_final,
+                max_data_atualizacao=max_data_atualizacao,
+                modo=modo,
+                total_registros=total_registros
+            )
         
         logger.info(f"Collected {count} biddings for municipality {codigo_ibge}")
         return count
     
-    async def collect_all_municipios(self, years: int = 2) -> Dict[str, int]:
+    async def _ingest_window(
+        self,
+        codigo_ibge: str,
+        municipio_id: int,
+        data_inicial: datetime,
+        data_final: datetime,
+        endpoint: str = PNCP_CONTRATACOES_ENDPOINT,
+        strict: bool = False
+    ) -> Tuple[int, Optional[datetime], int]:
         """
-        Collect biddings for all municipalities.
+        Stream a municipality's biddings for a date window into the database.
         
         Args:
-            years: Number of years to collect
+            codigo_ibge: Municipality IBGE code
+            municipio_id: Municipality ID
+            data_inicial: Window start
+            data_final: Window end
+            endpoint: PNCP listing endpoint
+            strict: Fail if any page could not be fetched
+        
+        Returns:
+            Tuple of (biddings stored, highest data_atualizacao seen, records received)
+        """
+        marcas: List[datetime] = []
+        
+        def gravar(lote: List[Dict[str, Any]]) -> int:
+            # One transaction per write batch (organizations, biddings and
+            # refresh tasks), committed before the next page is awaited
+            with get_db_context() as db, UnitOfWork(db):
+                count, max_data_atualizacao = self._save_licitacoes(
+                    db, db.get(Municipio, municipio_id), lote
+                )
+            if max_data_atualizacao:
+                marcas.append(max_data_atualizacao)
+            return count
+        
+        # Stream pages from PNCP straight into the database
+        pipeline = IngestPipeline(parse=self.pncp_collector.parse_licitacao, write=gravar)
+        pipeline_stats = await pipeline.run(self.pncp_collector.iter_pages(
+            data_inicial=data_inicial,
+            data_final=data_final,
+            codigo_municipio_ibge=codigo_ibge,
+            endpoint=endpoint,
+            strict=strict
+        ))
+        
+        return (
+            pipeline_stats['gravados'],
+            max(marcas) if marcas else None,
+            pipeline_stats['registros']
+        )
+    
+    def _save_licitacoes(
+        self,
+        db: Session,
+        municipio: Municipio,
+        licitacoes: List[Dict[str, Any]],
+        atualizar_existentes: bool = False
+    ) -> Tuple[int, Optional[datetime]]:
+        """
+        Store parsed PNCP biddings for a municipality.
+        
+        The batch is written with one bulk upsert (see
+        ``LicitacaoRepository.upsert_many``); if it fails, the records are
+        retried one at a time so a single bad row does not lose the batch.
+        
+        Biddings already stored are only rewritten when their content hash
+        changed, and those are queued for an item/result refresh and a new
+        anomaly analysis (see ``_enfileirar_alteradas``). A scheduled run
+        that re-reads unchanged biddings writes nothing.
+        
+        Args:
+            db: Database session
+            municipio: Municipality the biddings belong to
+            licitacoes: Records already converted by ``PNCPCollector.parse_licitacao``
+            atualizar_existentes: Rewrite changed biddings even when the stored
+                copy has a newer ``data_atualizacao`` (used when reprocessing
+                archived responses)
+        
+        Returns:
+            Tuple of (biddings inserted or updated, highest data_atualizacao seen)
+        """
+        municipio_id = municipio.id
+        max_data_atualizacao = None
+        
+        for parsed in licitacoes:
+            data_atualizacao = to_datetime(parsed.get('data_atualizacao'))
+            if data_atualizacao:
+                # Compare naive timestamps, as stored in the database
+                data_atualizacao = data_atualizacao.replace(tzinfo=None)
+                if not max_data_atualizacao or data_atualizacao > max_data_atualizacao:
+                    max_data_atualizacao = data_atualizacao
+        
+        count = 0
+        ids_atualizados: List[int] = []
+        try:
+            with savepoint(db):
+                stats = self._upsert_licitacoes(db, municipio_id, licitacoes, atualizar_existentes)
+            count = stats['inseridos'] + stats['atualizados']
+            ids_atualizados = stats['ids_atualizados']
+        except Exception as e:
+            logger.warning(f"Batch upsert of {len(licitacoes)} biddings failed, retrying one by one: {e}")
             
+            # Isolate the rows that broke the batch
+            for parsed in licitacoes:
+                try:
+                    with savepoint(db):
+                        stats = self._upsert_licitacoes(db, municipio_id, [parsed], atualizar_existentes)
+                    count += stats['inseridos'] + stats['atualizados']
+                    ids_atualizados.extend(stats['ids_atualizados'])
+                except Exception as e:
+                    logger.error(f"Error processing licitacao {parsed.get('numero_controle_pncp')}: {e}")
+        
+        if ids_atualizados:
+            self._enfileirar_alteradas(db, ids_atualizados)
+        
+        return count, max_data_atualizacao
+    
+    @staticmethod
+    def _enfileirar_alteradas(db: Session, licitacao_ids: List[int]) -> int:
+        """
+        Queue the follow-up work of biddings that changed upstream.
+        
+        Each bidding gets an item/result refresh (replacing the stored items)
+        and an anomaly re-analysis in the collection work queue; finished
+        tasks of the same bidding are reopened. Disabled by
+        COLLECTION_QUEUE_CHANGED.
+        
+        Args:
+            db: Database session
+            licitacao_ids: IDs of the updated biddings
+        
+        Returns:
+            Number of tasks enqueued
+        """
+        if not settings.COLLECTION_QUEUE_CHANGED:
+            return 0
+        
+        tarefas = []
+        for licitacao_id in licitacao_ids:
+            tarefas.append({
+                'tipo': TAREFA_ITENS,
+                'chave': f"{TAREFA_ITENS}:{licitacao_id}",
+                'parametros': {'licitacao_id': licitacao_id}
+            })
+            tarefas.append({
+                'tipo': TAREFA_ANOMALIAS,
+                'chave': f"{TAREFA_ANOMALIAS}:{licitacao_id}",
+                'parametros': {'licitacao_id': licitacao_id}
+            })
+        
+        try:
+            with savepoint(db):
+                enfileiradas = TarefaColetaRepository(db).enfileirar(tarefas, reabrir_concluidas=True)
+        except Exception as e:
+            # The biddings are already stored; the refresh can be queued later
+            logger.error(f"Error queueing refresh of {len(licitacao_ids)} changed biddings: {e}")
+            return 0
+        
+        logger.info(f"{len(licitacao_ids)} biddings changed upstream, queued {enfileiradas} refresh tasks")
+        return enfileiradas
+    
+    def _upsert_licitacoes(
+        self,
+        db: Session,
+        municipio_id: int,
+        licitacoes: List[Dict[str, Any]],
+        atualizar_existentes: bool
+    ) -> Dict[str, Any]:
+        """
+        Resolve the organizations of parsed biddings and upsert them in one transaction.
+        
+        Args:
+            db: Database session
+            municipio_id: Municipality ID
+            licitacoes: Parsed records
+            atualizar_existentes: Ignore the ``data_atualizacao`` guard
+        
+        Returns:
+            Upsert statistics (see ``LicitacaoRepository.upsert_many``)
+        """
+        orgaos: Dict[str, Dict[str, Any]] = {}
+        for parsed in licitacoes:
+            cnpj = parsed.get('orgao_cnpj')
+            if cnpj and cnpj not in orgaos:
+                orgaos[cnpj] = {
+                    'razao_social': parsed.get('orgao_razao_social') or 'N/A',
+                    'poder_id': parsed.get('poder_id'),
+                    'esfera_id': parsed.get('esfera_id')
+                }
+        orgao_ids = self.orgaos.resolver(db, orgaos)
+        
+        rows = []
+        for parsed in licitacoes:
+            if not parsed.get('orgao_cnpj'):
+                logger.error(f"Licitação {parsed.get('numero_controle_pncp')} has no organization CNPJ, skipping")
+                continue
+            licitacao_data = LICITACAO_SPEC.model_values(parsed)
+            licitacao_data['orgao_id'] = orgao_ids[parsed['orgao_cnpj']]
+            licitacao_data['municipio_id'] = municipio_id
+            rows.append(licitacao_data)
+        
+        return LicitacaoRepository(db).upsert_many(rows, somente_mais_recentes=not atualizar_existentes)
+    
+    def load_codigos_ibge(self) -> Set[str]:
+        """
+        Load the IBGE codes of the municipalities inside the collection radius.
+        
+        Returns:
+            Set of IBGE codes from the configuration file
+        """
+        with open(MUNICIPIOS_CONFIG_PATH, 'r', encoding='utf-8') as f:
+            municipios_data = json.load(f)
+        
+        return {str(m['codigo_ibge']) for m in municipios_data if m.get('codigo_ibge')}
+    
+    @staticmethod
+    def codigo_ibge_registro(licitacao_raw: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the IBGE code of the purchasing unit of a raw PNCP record.
+        
+        Args:
+            licitacao_raw: Raw record from PNCP
+        
+        Returns:
+            IBGE code as a string, or None if missing
+        """
+        codigo = safe_get(licitacao_raw, 'unidadeOrgao', 'codigoIbge')
+        return str(codigo) if codigo is not None else None
+    
+    @staticmethod
+    def route_by_municipio(
+        licitacoes_data: List[Dict[str, Any]],
+        codigos_ibge: Set[str]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], int]:
+        """
+        Group raw UF-wide records by the municipality of their purchasing unit.
+        
+        Records whose ``unidadeOrgao.codigoIbge`` is not in ``codigos_ibge``
+        are dropped here, before any parsing work is spent on them.
+        
+        Args:
+            licitacoes_data: Raw records from a UF-wide sweep
+            codigos_ibge: IBGE codes to keep
+        
+        Returns:
+            Tuple of (records per IBGE code, number of records dropped)
+        """
+        grupos: Dict[str, List[Dict[str, Any]]] = {}
+        descartados = 0
+        
+        for licitacao_raw in licitacoes_data:
+            codigo = ColetaService.codigo_ibge_registro(licitacao_raw)
+            if codigo not in codigos_ibge:
+                descartados += 1
+                continue
+            grupos.setdefault(codigo, []).append(licitacao_raw)
+        
+        return grupos, descartados
+    
+    async def collect_uf_sweep(
+        self,
+        years: int = 2,
+        incremental: bool = False,
+        overlap_days: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Collect biddings for all municipalities with a single UF-wide sweep.
+        
+        Instead of one paginated query per municipality, the whole UF is paged
+        once for the window and each record is routed to its municipality by
+        ``unidadeOrgao.codigoIbge``. Records from outside the collection radius
+        are discarded. The window is recorded in ``coleta_estado`` for every
+        municipality covered, including those that had no records.
+        
+        The sweep is always read in strict mode: a page that cannot be
+        fetched aborts it before any state is recorded, so no watermark moves
+        past records that were never read.
+        
+        In incremental mode the window starts at the oldest watermark among the
+        municipalities minus the overlap; if any municipality has no watermark
+        yet, a full backfill of ``years`` years is swept instead.
+        
+        Args:
+            years: Number of years to collect (full mode, or first incremental run)
+            incremental: Only collect the delta since the oldest watermark
+            overlap_days: Days to re-read before the watermark
+                (defaults to COLLECTION_OVERLAP_DAYS)
+        
         Returns:
             Dictionary with collection statistics
         """
+        if overlap_days is None:
+            overlap_days = settings.COLLECTION_OVERLAP_DAYS
+        
+        codigos_config = self.load_codigos_ibge()
+        
+        with get_db_context() as db:
+            municipios = [
+                m for m in MunicipioRepository(db).get_all()
+                if m.codigo_ibge in codigos_config
+            ]
+            estado_repo = ColetaEstadoRepository(db)
+            watermarks = []
+            for municipio in municipios:
+                estado = estado_repo.get_by_municipio(municipio.id)
+                marcas = [m for m in (estado.max_data_atualizacao, estado.janela_fim) if m] if estado else []
+                watermarks.append(max(marcas) if marcas else None)
+            municipios_por_codigo = {m.codigo_ibge: m.id for m in municipios}
+        
+        data_final = datetime.now()
+        if incremental and watermarks and all(watermarks):
+            modo = MODO_COLETA_INCREMENTAL
+            data_inicial = min(watermarks) - timedelta(days=overlap_days)
+            endpoint = PNCP_CONTRATACOES_ATUALIZACAO_ENDPOINT
+        else:
+            if incremental:
+                logger.info("Some municipalities have no collection state, sweeping full backfill")
+            modo = MODO_COLETA_COMPLETA
+            data_inicial = data_final - timedelta(days=365 * years)
+            endpoint = PNCP_CONTRATACOES_ENDPOINT
+        
         stats = {
-            'total_municipios': 0,
+            'modo': modo,
+            'varredura_uf': True,
+            'total_municipios': len(municipios_por_codigo),
             'total_licitacoes': 0,
+            'registros_recebidos': 0,
+            'registros_descartados': 0,
             'errors': 0
         }
         
+        if not municipios_por_codigo:
+            logger.warning("No configured municipalities found in database, skipping UF sweep")
+            return stats
+        
+        logger.info(
+            f"Starting {modo} UF sweep for {len(municipios_por_codigo)} municipalities "
+            f"from {data_inicial} to {data_final}"
+        )
+        
+        registros_por_codigo = {codigo: 0 for codigo in municipios_por_codigo}
+        marcas: Dict[str, datetime] = {}
+        falhas: Set[str] = set()
+        
+        def rotear(licitacao_raw: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+            # Drop out-of-radius records before spending time parsing them
+            codigo = self.codigo_ibge_registro(licitacao_raw)
+            if codigo not in municipios_por_codigo:
+                return None
+            registros_por_codigo[codigo] += 1
+            return codigo, self.pncp_collector.parse_licitacao(licitacao_raw)
+        
+        def gravar(lote: List[Tuple[str, Dict[str, Any]]]) -> int:
+            grupos: Dict[str, List[Dict[str, Any]]] = {}
+            for codigo, parsed in lote:
+                grupos.setdefault(codigo, []).append(parsed)
+            
+            total = 0
+            with get_db_context() as db, UnitOfWork(db):
+                for codigo, licitacoes in grupos.items():
+                    try:
+                        with savepoint(db):
+                            municipio = db.get(Municipio, municipios_por_codigo[codigo])
+                            count, max_data_atualizacao = self._save_licitacoes(db, municipio, licitacoes)
+                        total += count
+                        if max_data_atualizacao and (codigo not in marcas or max_data_atualizacao > marcas[codigo]):
+                            marcas[codigo] = max_data_atualizacao
+                    except Exception as e:
+                        logger.error(f"Error storing UF sweep records for municipality {codigo}: {e}")
+                        falhas.add(codigo)
+            return total
+        
+        pipeline = IngestPipeline(parse=rotear, write=gravar)
+        pipeline_stats = await pipeline.run(self.pncp_collector.iter_pages(
+            data_inicial=data_inicial,
+            data_final=data_final,
+            codigo_municipio_ibge=None,
+            endpoint=endpoint,
+            strict=True
+        ))
+        stats['total_licitacoes'] = pipeline_stats['gravados']
+        stats['registros_recebidos'] = pipeline_stats['registros']
+        stats['registros_descartados'] = pipeline_stats['descartados']
+        stats['errors'] = len(falhas)
+        stats['pipeline'] = pipeline_stats['etapas']
+        
+        # Municipalities whose records failed to store keep their old watermark
         with get_db_context() as db:
-            repo = MunicipioRepository(db)
-            municipios = repo.get_all()
-            stats['total_municipios'] = len(municipios)
-        
-        for municipio in municipios:
-            try:
-                count = await self.collect_licitacoes_for_municipio(
-                    municipio.codigo_ibge, years
+            estado_repo = ColetaEstadoRepository(db)
+            for codigo_ibge, municipio_id in municipios_por_codigo.items():
+                if codigo_ibge in falhas:
+                    continue
+                estado_repo.registrar_sucesso(
+                    municipio_id=municipio_id,
+                    janela_inicio=data_inicial,
+                    janela_fim=data_final,
+                    max_data_atualizacao=marcas.get(codigo_ibge),
+                    modo=modo,
+                    total_registros=registros_por_codigo[codigo_ibge]
                 )
-                stats['total_licitacoes'] += count
-            except Exception as e:
-                logger.error(f"Error collecting for {municipio.municipio}: {e}")
-                stats['errors'] += 1
         
+        logger.info(
+            f"UF sweep complete: {stats['registros_recebidos']} records received, "
+            f"{stats['registros_descartados']} outside the radius, {stats['total_licitacoes']} new biddings"
+        )
         return stats
     
+    async def collect_all_municipios(
+        self,
+        years: int = 2,
+        incremental: bool = False,
+        sweep: Optional[bool] = None,
+        concorrencia: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Collect biddings for all municipalities.
+        
+        Incremental collections run several municipalities at once, largest
+        first; the statistics include the biddings, duration and error of
+        each municipality under ``municipios``.
+        
+        Args:
+            years: Number of years to collect (full mode, or first incremental run)
+            incremental: Only collect the delta since each municipality's watermark
+            sweep: Use a single UF-wide sweep instead of one query per
+                municipality (defaults to COLLECTION_UF_SWEEP)
+            concorrencia: Municipalities collected at once
+                (defaults to COLLECTION_MUNICIPIO_CONCURRENCY)
+            
+        Returns:
+            Dictionary with collection statistics
+        """
+        if sweep is None:
+            sweep = settings.COLLECTION_UF_SWEEP
+        if sweep:
+            return await self.collect_uf_sweep(years, incremental)
+        
+        if not incremental:
+            from src.services.backfill_service import BackfillService
+            
+            backfill_stats = await BackfillService(self).backfill(years=years, paralelismo=concorrencia)
+            with get_db_context() as db:
+                total_municipios = len(MunicipioRepository(db).get_all())
+            return {
+                'modo': MODO_COLETA_COMPLETA,
+                'total_municipios': total_municipios,
+                'total_licitacoes': backfill_stats['total_licitacoes'],
+                'errors': backfill_stats['shards_com_erro'],
+                'backfill': backfill_stats
+            }
+        
+        with get_db_context() as db:
+            municipios = self.ordenar_por_volume(db, MunicipioRepository(db).get_all())
+            alvos = [(m.codigo_ibge, m.municipio) for m in municipios]
+        
+        por_municipio = await self._collect_concurrently(
+            alvos,
+            lambda codigo_ibge: self.collect_incremental_for_municipio(codigo_ibge, years),
+            concorrencia
+        )
+        
+        return {
+            'modo': MODO_COLETA_INCREMENTAL,
+            'total_municipios': len(alvos),
+            'total_licitacoes': sum(m['licitacoes'] for m in por_municipio.values()),
+            'errors': sum(1 for m in por_municipio.values() if m['erro']),
+            'municipios': por_municipio
+        }
+    
+    @staticmethod
+    def ordenar_por_volume(db: Session, municipios: List[Municipio]) -> List[Municipio]:
+        """
+        Order municipalities by expected collection volume, largest first.
+        
+        The volume is estimated by the biddings already stored; before the
+        first collection (or on ties) municipalities closer to Goiânia come
+        first, which puts the capital and its metropolitan area ahead.
+        
+        Args:
+            db: Database session
+            municipios: Municipalities to order
+        
+        Returns:
+            Ordered list
+        """
+        volumes = LicitacaoRepository(db).count_por_municipio()
+        return sorted(
+            municipios,
+            key=lambda m: (
+                -volumes.get(m.id, 0),
+                m.distancia_km if m.distancia_km is not None else float('inf'),
+                m.municipio
+            )
+        )
+    
+    async def _collect_concurrently(
+        self,
+        alvos: List[Tuple[str, str]],
+        collect: Callable[[str], Awaitable[int]],
+        concorrencia: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Collect several municipalities at once.
+        
+        Municipalities start in the given order, at most ``concorrencia`` at
+        a time; PNCP requests of all of them share the per-host concurrency
+        budget, so running more municipalities at once never means more
+        requests in flight than PNCP tolerates. Starting the largest ones
+        first keeps the capital from becoming the tail of the run while the
+        small municipalities fill the remaining slots.
+        
+        Args:
+            alvos: (IBGE code, name) pairs, in start order
+            collect: Coroutine function collecting one municipality
+            concorrencia: Municipalities at once (defaults to COLLECTION_MUNICIPIO_CONCURRENCY)
+        
+        Returns:
+            Dictionary of IBGE code to biddings, duration and error
+        """
+        concorrencia = max(1, concorrencia or settings.COLLECTION_MUNICIPIO_CONCURRENCY)
+        semaphore = asyncio.Semaphore(concorrencia)
+        resultados: Dict[str, Dict[str, Any]] = {}
+        
+        async def run(codigo_ibge: str, nome: str):
+            async with semaphore:
+                inicio = time.monotonic()
+                resultado = {'municipio': nome, 'licitacoes': 0, 'duracao_s': 0.0, 'erro': None}
+                try:
+                    resultado['licitacoes'] = await collect(codigo_ibge)
+                except Exception as e:
+                    logger.error(f"Error collecting for {nome}: {e}")
+                    resultado['erro'] = str(e)
+                resultado['duracao_s'] = round(time.monotonic() - inicio, 2)
+                resultados[codigo_ibge] = resultado
+        
+        logger.info(f"Collecting {len(alvos)} municipalities, {concorrencia} at a time")
+        await asyncio.gather(*(run(codigo_ibge, nome) for codigo_ibge, nome in alvos))
+        
+        mais_lentos = sorted(resultados.values(), key=lambda r: r['duracao_s'], reverse=True)[:5]
+        logger.info(
+            "Slowest municipalities: "
+            + ", ".join(f"{r['municipio']} ({r['duracao_s']:.1f}s)" for r in mais_lentos)
+        )
+        return {codigo_ibge: resultados[codigo_ibge] for codigo_ibge, _ in alvos}
+    
     async def collect_itens_and_resultados(
         self,
-        licitacao_id: int
+        licitacao_id: int,
+        substituir: bool = False
     ) -> Dict[str, int]:
         """
         Collect items and results for a bidding.
         
         Args:
             licitacao_id: Bidding ID
+            substituir: Also drop the stored items and results PNCP no
+                longer returns (items and results are matched on their
+                natural keys, so re-runs never duplicate them). Stored
+                results of items whose results could not be fetched are kept.
             
         Returns:
             Dictionary with collection statistics
         """
-        stats = {'itens': 0, 'resultados': 0}
+        stats = {'itens': 0, 'resultados': 0, 'erros_itens': 0}
         
+        # No session (nor transaction) is held across the network fetch
         with get_db_context() as db:
-            licitacao_repo = LicitacaoRepository(db)
-            item_repo = ItemRepository(db)
-            fornecedor_repo = FornecedorRepository(db)
-            
-            licitacao = licitacao_repo.get_by_id(licitacao_id)
+            licitacao = LicitacaoRepository(db).get_by_id(licitacao_id)
             if not licitacao:
                 logger.error(f"Licitação {licitacao_id} not found")
                 return stats
@@ -208,67 +777,95 @@ class ColetaService:
             cnpj = clean_cnpj_cpf(licitacao.orgao.cnpj)
             ano = licitacao.ano_compra
             sequencial = licitacao.sequencial_compra
-            
-            if not all([cnpj, ano, sequencial]):
-                logger.error(f"Missing required data for licitacao {licitacao_id}")
-                return stats
-            
-            # Collect items and results
-            data = await self.resultados_collector.collect_all_itens_and_resultados(
-                cnpj, ano, sequencial
+        
+        if not all([cnpj, ano, sequencial]):
+            logger.error(f"Missing required data for licitacao {licitacao_id}")
+            return stats
+        
+        # Collect items and results
+        data = await self.resultados_collector.collect_all_itens_and_resultados(
+            cnpj, ano, sequencial
+        )
+        stats['erros_itens'] = len(data.get('errors', []))
+        
+        itens = []
+        resultados = []
+        sem_resultados = []
+        for item_data in data.get('items_with_results', []):
+            item_parsed = self.resultados_collector.parse_item(item_data['item'])
+            item_parsed['licitacao_id'] = licitacao_id
+            itens.append(item_parsed)
+            if item_data.get('erro'):
+                # Results not read: keep the stored ones
+                sem_resultados.append((licitacao_id, item_parsed['numero_item']))
+            for resultado in item_data.get('resultados', []):
+                resultado_parsed = self.resultados_collector.parse_resultado(resultado)
+                resultado_parsed['licitacao_id'] = licitacao_id
+                resultado_parsed['numero_item'] = item_parsed['numero_item']
+                resultados.append(resultado_parsed)
+        
+        # New suppliers, items and results are committed together
+        with get_db_context() as db, UnitOfWork(db):
+            carga = ItemResultadoLoader(db).carregar(
+                itens,
+                self._resultados_com_fornecedor(db, resultados),
+                substituir=substituir,
+                manter_resultados=sem_resultados
             )
-            
-            for item_data in data.get('items_with_results', []):
-                try:
-                    # Parse and create item
-                    item_parsed = self.resultados_collector.parse_item(item_data['item'])
-                    item_parsed['licitacao_id'] = licitacao_id
-                    
-                    item = item_repo.create(item_parsed)
-                    stats['itens'] += 1
-                    
-                    # Process results
-                    for resultado_raw in item_data.get('resultados', []):
-                        try:
-                            resultado_parsed = self.resultados_collector.parse_resultado(resultado_raw)
-                            
-                            # Get or create fornecedor
-                            fornecedor = fornecedor_repo.get_or_create(
-                                cnpj_cpf=resultado_parsed['ni_fornecedor'],
-                                razao_social=resultado_parsed['nome_razao_social_fornecedor'],
-                                tipo_pessoa=resultado_parsed.get('tipo_pessoa'),
-                                porte_fornecedor_id=resultado_parsed.get('porte_fornecedor_id'),
-                                porte_fornecedor_nome=resultado_parsed.get('porte_fornecedor_nome'),
-                                codigo_pais=resultado_parsed.get('codigo_pais')
-                            )
-                            
-                            # Create resultado
-                            resultado = Resultado(
-                                item_id=item.id,
-                                fornecedor_id=fornecedor.id,
-                                data_resultado=resultado_parsed.get('data_resultado'),
-                                sequencial_resultado=resultado_parsed.get('sequencial_resultado'),
-                                numero_controle_pncp_compra=resultado_parsed.get('numero_controle_pncp_compra'),
-                                indicador_subcontratacao=resultado_parsed.get('indicador_subcontratacao'),
-                                percentual_desconto=resultado_parsed.get('percentual_desconto'),
-                                quantidade_homologada=resultado_parsed.get('quantidade_homologada'),
-                                valor_unitario_homologado=resultado_parsed.get('valor_unitario_homologado'),
-                                valor_total_homologado=resultado_parsed.get('valor_total_homologado'),
-                                situacao_compra_item_resultado_id=resultado_parsed.get('situacao_compra_item_resultado_id'),
-                                data_inclusao=resultado_parsed.get('data_inclusao'),
-                                data_atualizacao=resultado_parsed.get('data_atualizacao')
-                            )
-                            db.add(resultado)
-                            db.commit()
-                            stats['resultados'] += 1
-                            
-                        except Exception as e:
-                            logger.error(f"Error processing resultado: {e}")
-                            continue
-                    
-                except Exception as e:
-                    logger.error(f"Error processing item: {e}")
-                    continue
+        stats['itens'] = carga['itens']
+        stats['resultados'] = carga['resultados']
         
         logger.info(f"Collected {stats['itens']} items and {stats['resultados']} results for licitacao {licitacao_id}")
         return stats
+    
+    @staticmethod
+    def _dados_fornecedor(resultado_parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Supplier attributes carried by a parsed result."""
+        return {
+            'razao_social': resultado_parsed['nome_razao_social_fornecedor'],
+            'tipo_pessoa': resultado_parsed.get('tipo_pessoa'),
+            'porte_fornecedor_id': resultado_parsed.get('porte_fornecedor_id'),
+            'porte_fornecedor_nome': resultado_parsed.get('porte_fornecedor_nome'),
+            'codigo_pais': resultado_parsed.get('codigo_pais')
+        }
+    
+    def _resolver_fornecedores(self, db: Session, resultados: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Resolve the suppliers of parsed results in one batch.
+        
+        Args:
+            db: Database session (new suppliers are committed)
+            resultados: Records converted by ``PNCPResultadosCollector.parse_resultado``
+        
+        Returns:
+            Supplier IDs by cleaned CNPJ/CPF
+        """
+        return self.fornecedores.resolver(db, {
+            r['ni_fornecedor']: self._dados_fornecedor(r) for r in resultados if r.get('ni_fornecedor')
+        })
+    
+    def _resultados_com_fornecedor(
+        self,
+        db: Session,
+        resultados: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fill in the ``fornecedor_id`` of parsed results, creating suppliers if needed.
+        
+        Args:
+            db: Database session (new suppliers are committed)
+            resultados: Records converted by ``PNCPResultadosCollector.parse_resultado``
+        
+        Returns:
+            The results with a supplier (those without a CNPJ/CPF are dropped)
+        """
+        fornecedor_ids = self._resolver_fornecedores(db, resultados)
+        com_fornecedor = []
+        for resultado in resultados:
+            fornecedor_id = fornecedor_ids.get(clean_cnpj_cpf(resultado.get('ni_fornecedor') or ''))
+            if fornecedor_id is None:
+                logger.warning(f"Skipping resultado without supplier: {resultado.get('sequencial_resultado')}")
+                continue
+            resultado['fornecedor_id'] = fornecedor_id
+            com_fornecedor.append(resultado)
+        return com_fornecedor
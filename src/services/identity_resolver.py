@@ -0,0 +1,210 @@
+"""Cached natural-key -> ID resolution of órgãos and fornecedores during ingest."""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from src.database.unit_of_work import current_unit_of_work
+from src.models import Fornecedor, Orgao
+from src.utils.helpers import clean_cnpj_cpf
+
+logger = logging.getLogger(__name__)
+
+# Keys per SELECT ... IN / INSERT batch
+RESOLVE_BATCH_SIZE = 1000
+
+
+class IdentityResolver:
+    """
+    In-memory map from a natural key (CNPJ, CNPJ/CPF) to the row ID.
+    
+    The whole key -> ID map of the table is preloaded on first use, so the
+    same few hundred órgãos and thousands of suppliers that repeat in every
+    page are resolved without touching the database. Misses are created in
+    batches with ``INSERT ... ON CONFLICT DO NOTHING RETURNING``; keys
+    another worker created concurrently come back empty from the insert and
+    are read with one SELECT, so parallel collections never race on the
+    unique constraint.
+    
+    Rows created here are committed right away, so a cached ID never points
+    at a row rolled back with the caller's transaction; resolve the keys of
+    a batch before writing the records that reference them. Inside a
+    ``UnitOfWork`` they are only flushed and join the map when the unit
+    commits. The map is shared by the event loop and the ingest writer
+    thread and is guarded by a lock.
+    """
+    
+    def __init__(
+        self,
+        model: Any,
+        chave: str,
+        normalizar: Optional[Callable[[str], Optional[str]]] = None,
+        preload: bool = True
+    ):
+        """
+        Initialize resolver.
+        
+        Args:
+            model: Mapped class of the table
+            chave: Natural key column (must be unique)
+            normalizar: Normalization applied to incoming keys
+            preload: Load the full key -> ID map on first use
+        """
+        self.model = model
+        self.chave = chave
+        self.normalizar = normalizar
+        self.preload = preload
+        self._coluna = model.__table__.c[chave]
+        self._ids: Dict[str, int] = {}
+        self._carregado = False
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.criados = 0
+    
+    def _normalizar(self, chave: Optional[str]) -> Optional[str]:
+        """Normalize a key (None for empty keys)."""
+        if chave is None:
+            return None
+        chave = self.normalizar(chave) if self.normalizar else str(chave)
+        return chave or None
+    
+    def carregar(self, db: Session) -> int:
+        """
+        Load the key -> ID map of the whole table.
+        
+        Args:
+            db: Database session
+        
+        Returns:
+            Number of keys loaded
+        """
+        ids = {chave: row_id for row_id, chave in db.query(self.model.id, self._coluna)}
+        with self._lock:
+            self._ids.update(ids)
+            self._carregado = True
+        logger.debug(f"Preloaded {len(ids)} {self.model.__tablename__} identities")
+        return len(ids)
+    
+    def resolver(self, db: Session, registros: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Resolve keys to IDs, creating the rows that do not exist yet.
+        
+        Args:
+            db: Database session
+            registros: Attributes of each row by key, used for the rows
+                that must be created (the key column is filled in here)
+        
+        Returns:
+            IDs by normalized key (empty keys are left out)
+        """
+        if self.preload and not self._carregado:
+            self.carregar(db)
+        
+        normalizados: Dict[str, Dict[str, Any]] = {}
+        for chave, atributos in registros.items():
+            chave = self._normalizar(chave)
+            if chave and chave not in normalizados:
+                normalizados[chave] = atributos
+        
+        with self._lock:
+            resolvidos = {chave: self._ids[chave] for chave in normalizados if chave in self._ids}
+            self.acertos += len(resolvidos)
+        
+        # Sorted so that concurrent transactions lock the unique keys in the same order
+        faltantes = sorted(chave for chave in normalizados if chave not in resolvidos)
+        for inicio in range(0, len(faltantes), RESOLVE_BATCH_SIZE):
+            lote = faltantes[inicio:inicio + RESOLVE_BATCH_SIZE]
+            resolvidos.update(self._criar(db, {chave: normalizados[chave] for chave in lote}))
+        
+        return resolvidos
+    
+    def resolver_um(self, db: Session, chave: str, **atributos) -> Optional[int]:
+        """
+        Resolve a single key.
+        
+        Returns:
+            Row ID, or None for an empty key
+        """
+        return self.resolver(db, {chave: atributos}).get(self._normalizar(chave))
+    
+    def _criar(self, db: Session, registros: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """Create missing rows (or read the ones created concurrently) and cache their IDs."""
+        # Every row of an executemany needs the same keys
+        colunas = {coluna for atributos in registros.values() for coluna in atributos}
+        # Inserts stay open until the unit of work commits: taking the unique
+        # index locks in key order keeps overlapping batches from deadlocking
+        chaves = sorted(registros)
+        rows = [
+            {self.chave: chave, **{coluna: registros[chave].get(coluna) for coluna in colunas}}
+            for chave in chaves
+        ]
+        
+        dialect = db.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(self.model.__table__).on_conflict_do_nothing(
+                index_elements=[self.chave]
+            ).returning(self.model.__table__.c.id, self._coluna)
+            ids = {chave: row_id for row_id, chave in db.execute(stmt, rows)}
+        else:
+            existentes = {chave for chave, in db.query(self._coluna).filter(self._coluna.in_(chaves))}
+            objetos = [self.model(**row) for row in rows if row[self.chave] not in existentes]
+            db.add_all(objetos)
+            db.flush()
+            ids = {getattr(objeto, self.chave): objeto.id for objeto in objetos}
+        criados = len(ids)
+        
+        # Keys skipped by the insert already existed (e.g. created by another worker)
+        existentes = [chave for chave in chaves if chave not in ids]
+        if existentes:
+            ids.update(
+                (chave, row_id)
+                for row_id, chave in db.query(self.model.id, self._coluna).filter(self._coluna.in_(existentes))
+            )
+        
+        uow = current_unit_of_work(db)
+        if uow is None:
+            db.commit()
+            self._cachear(ids, criados)
+        else:
+            # Cached once the unit of work commits, so a rollback never
+            # leaves IDs of rows that do not exist in the map
+            uow.after_commit(lambda: self._cachear(ids, criados))
+            uow.write(criados)
+        return ids
+    
+    def _cachear(self, ids: Dict[str, int], criados: int):
+        """Add committed IDs to the map."""
+        with self._lock:
+            self._ids.update(ids)
+            self.criados += criados
+    
+    def limpar(self):
+        """Forget the cached IDs (e.g. after rows were deleted)."""
+        with self._lock:
+            self._ids.clear()
+            self._carregado = False
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get resolver counters.
+        
+        Returns:
+            Dictionary with cached keys, cache hits and rows created
+        """
+        return {'em_cache': len(self._ids), 'acertos': self.acertos, 'criados': self.criados}
+
+
+def orgao_resolver(preload: bool = True) -> IdentityResolver:
+    """Build a resolver of órgãos by CNPJ."""
+    return IdentityResolver(Orgao, 'cnpj', preload=preload)
+
+
+def fornecedor_resolver(preload: bool = True) -> IdentityResolver:
+    """Build a resolver of fornecedores by CNPJ/CPF."""
+    return IdentityResolver(Fornecedor, 'cnpj_cpf', normalizar=clean_cnpj_cpf, preload=preload)
@@ -0,0 +1,225 @@
+"""Streaming fetch -> parse -> write pipeline for PNCP ingestion."""
+
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a queue
+_FIM = object()
+
+
+class StageCounter:
+    """Throughput counters for one pipeline stage."""
+    
+    def __init__(self, name: str):
+        """
+        Initialize counters.
+        
+        Args:
+            name: Stage name
+        """
+        self.name = name
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert counters to a dictionary.
+        
+        Returns:
+            Dictionary with items, errors, busy time and items per second
+        """
+        return {
+            'itens': self.items,
+            'erros': self.errors,
+            'tempo_ocupado_s': round(self.busy_seconds, 3),
+            'itens_por_segundo': round(self.items / self.busy_seconds, 1) if self.busy_seconds else None
+        }
+
+
+class IngestPipeline:
+    """
+    Bounded producer/consumer pipeline connecting PNCP pages to the database.
+    
+    Three stages run concurrently and are connected by bounded
+    ``asyncio.Queue`` objects:
+    
+    - fetch: pulls pages from an async iterator (e.g. ``PNCPCollector.iter_pages``)
+    - parse: turns raw records into rows and groups them in write batches
+    - write: hands each batch to a synchronous writer, in a worker thread
+      by default so the event loop keeps fetching while the database works
+    
+    When a downstream stage falls behind, the queues fill up and the
+    upstream stages wait, so memory use is bounded by the queue sizes and
+    not by the length of the collection window.
+    
+    Example:
+        pipeline = IngestPipeline(parse=collector.parse_licitacao, write=salvar_lote)
+        stats = await pipeline.run(collector.iter_pages(data_inicial, data_final))
+    """
+    
+    def __init__(
+        self,
+        parse: Callable[[Any], Optional[Any]],
+        write: Callable[[List[Any]], int],
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        offload_writes: Optional[bool] = None
+    ):
+        """
+        Initialize pipeline.
+        
+        Args:
+            parse: Converts a raw record; returning None drops the record
+            write: Stores a batch of parsed records and returns how many were written
+            queue_size: Maximum queued pages and batches per stage
+                (defaults to INGEST_QUEUE_SIZE)
+            batch_size: Parsed records per write batch
+                (defaults to INGEST_WRITE_BATCH_SIZE)
+            offload_writes: Run the writer in a worker thread
+                (defaults to INGEST_OFFLOAD_WRITES)
+        """
+        self.parse = parse
+        self.write = write
+        self.queue_size = max(1, queue_size or settings.INGEST_QUEUE_SIZE)
+        self.batch_size = max(1, batch_size or settings.INGEST_WRITE_BATCH_SIZE)
+        self.offload_writes = (
+            settings.INGEST_OFFLOAD_WRITES if offload_writes is None else offload_writes
+        )
+        
+        self.fetch_counter = StageCounter('fetch')
+        self.parse_counter = StageCounter('parse')
+        self.write_counter = StageCounter('write')
+        self.paginas = 0
+        self.descartados = 0
+        self.gravados = 0
+    
+    async def _fetch(self, pages: AsyncIterator[List[Any]], saida: asyncio.Queue):
+        """Pull pages from the source and queue them for parsing."""
+        try:
+            inicio = time.monotonic()
+            async for page in pages:
+                self.fetch_counter.busy_seconds += time.monotonic() - inicio
+                self.paginas += 1
+                self.fetch_counter.items += len(page)
+                await saida.put(page)
+                inicio = time.monotonic()
+        finally:
+            aclose = getattr(pages, 'aclose', None)
+            if aclose is not None:
+                await aclose()
+        
+        await saida.put(_FIM)
+    
+    async def _parse(self, entrada: asyncio.Queue, saida: asyncio.Queue):
+        """Parse queued pages and queue the rows in write batches."""
+        lote = []
+        
+        while True:
+            page = await entrada.get()
+            if page is _FIM:
+                break
+            
+            inicio = time.monotonic()
+            for registro in page:
+                try:
+                    parsed = self.parse(registro)
+                except Exception as e:
+                    logger.error(f"Error parsing record: {e}")
+                    self.parse_counter.errors += 1
+                    continue
+                
+                if parsed is None:
+                    self.descartados += 1
+                    continue
+                
+                self.parse_counter.items += 1
+                lote.append(parsed)
+            self.parse_counter.busy_seconds += time.monotonic() - inicio
+            
+            while len(lote) >= self.batch_size:
+                await saida.put(lote[:self.batch_size])
+                lote = lote[self.batch_size:]
+        
+        if lote:
+            await saida.put(lote)
+        await saida.put(_FIM)
+    
+    async def _write(self, entrada: asyncio.Queue):
+        """Store queued batches."""
+        while True:
+            lote = await entrada.get()
+            if lote is _FIM:
+                break
+            
+            inicio = time.monotonic()
+            if self.offload_writes:
+                gravados = await asyncio.to_thread(self.write, lote)
+            else:
+                gravados = self.write(lote)
+            self.write_counter.busy_seconds += time.monotonic() - inicio
+            self.write_counter.items += len(lote)
+            self.gravados += gravados or 0
+    
+    async def run(self, pages: AsyncIterator[List[Any]]) -> Dict[str, Any]:
+        """
+        Run the pipeline until the page source is exhausted.
+        
+        If any stage fails, the other stages are cancelled and the error
+        is re-raised; batches already written stay written.
+        
+        Args:
+            pages: Async iterator of pages (lists of raw records)
+        
+        Returns:
+            Dictionary with pipeline statistics
+        """
+        paginas_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        lotes_q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        inicio = time.monotonic()
+        
+        tasks = [
+            asyncio.ensure_future(self._fetch(pages, paginas_q)),
+            asyncio.ensure_future(self._parse(paginas_q, lotes_q)),
+            asyncio.ensure_future(self._write(lotes_q))
+        ]
+        
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        
+        stats = self.stats()
+        stats['duracao_s'] = round(time.monotonic() - inicio, 3)
+        logger.info(
+            f"Ingest pipeline finished: {self.paginas} pages, {self.fetch_counter.items} records, "
+            f"{self.gravados} written in {stats['duracao_s']}s"
+        )
+        return stats
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pipeline statistics.
+        
+        Returns:
+            Dictionary with per-stage counters and totals
+        """
+        return {
+            'paginas': self.paginas,
+            'registros': self.fetch_counter.items,
+            'descartados': self.descartados,
+            'gravados': self.gravados,
+            'etapas': {
+                counter.name: counter.to_dict()
+                for counter in (self.fetch_counter, self.parse_counter, self.write_counter)
+            }
+        }
@@ -56,10 +56,10 @@ class RelatorioService:
                     modalidade,
                     COUNT(*) as count_modalidade
                 FROM licitacoes
-                WHERE DATE(data_publicacao_pncp) = %s
+                WHERE data_publicacao_pncp >= %s::date AND data_publicacao_pncp < %s::date + 1
                 GROUP BY modalidade
                 ORDER BY count_modalidade DESC
-            """, (data,))
+            """, (data, data))
             
             modalidades = cursor.fetchall()
             
@@ -73,10 +73,10 @@ class RelatorioService:
                     l.modalidade
                 FROM licitacoes l
                 JOIN municipios m ON l.municipio_id = m.id
-                WHERE DATE(l.data_publicacao_pncp) = %s
+                WHERE l.data_publicacao_pncp >= %s::date AND l.data_publicacao_pncp < %s::date + 1
                 ORDER BY l.valor_total_estimado DESC
                 LIMIT 10
-            """, (data,))
+            """, (data, data))
             
             licitacoes = cursor.fetchall()
             cursor.close()
@@ -161,7 +161,7 @@ class RelatorioService:
                     l.data_publicacao_pncp
                 FROM licitacoes l
                 JOIN municipios m ON l.municipio_id = m.id
-                WHERE DATE(l.data_publicacao_pncp) BETWEEN %s AND %s
+                WHERE l.data_publicacao_pncp >= %s::date AND l.data_publicacao_pncp < %s::date + 1
             """
             params = [data_inicio, data_fim]
             
@@ -0,0 +1,331 @@
+"""Offline reprocessing of archived PNCP responses."""
+
+import os
+import re
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from src.collectors import PNCPCollector, PNCPResultadosCollector
+from src.collectors.archive import ResponseArchive, response_archive
+from src.database.connection import get_db_context
+from src.database.unit_of_work import UnitOfWork, savepoint
+from src.database.repositories import (
+    MunicipioRepository,
+    LicitacaoRepository,
+    ItemResultadoLoader
+)
+from src.services.coleta_service import ColetaService
+
+logger = logging.getLogger(__name__)
+
+# Archive categories, in the order they are replayed
+CATEGORIAS_LICITACOES = ['publicacao', 'atualizacao']
+CATEGORIAS_ITENS = ['itens']
+CATEGORIAS_RESULTADOS = ['resultados']
+
+ITENS_PATTERN = re.compile(
+    r"^/orgaos/(?P<cnpj>[^/]+)/compras/(?P<ano>\d+)/(?P<sequencial>[^/]+)/itens$"
+)
+RESULTADOS_PATTERN = re.compile(
+    r"^/orgaos/(?P<cnpj>[^/]+)/compras/(?P<ano>\d+)/(?P<sequencial>[^/]+)"
+    r"/itens/(?P<numero_item>\d+)/resultados$"
+)
+
+# Files handed to the worker pool at a time
+REPLAY_BATCH_SIZE = 1000
+
+# Items/results merged per load
+REPLAY_LOAD_SIZE = 10000
+
+# Parsers, created once per worker process
+_pncp_collector: Optional[PNCPCollector] = None
+_resultados_collector: Optional[PNCPResultadosCollector] = None
+
+
+def _registros(payload: Any) -> List[Dict[str, Any]]:
+    """Extract the record list from an archived payload."""
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict) and isinstance(payload.get('data'), list):
+        return payload['data']
+    return []
+
+
+def parse_archived_response(path: str) -> Dict[str, Any]:
+    """
+    Decompress and parse one archived response.
+    
+    Runs in worker processes, so it only touches the file and the parsers,
+    never the database.
+    
+    Args:
+        path: Archive file path
+    
+    Returns:
+        Dictionary with the response type, its key and the parsed records
+    """
+    global _pncp_collector, _resultados_collector
+    if _pncp_collector is None:
+        _pncp_collector = PNCPCollector()
+        _resultados_collector = PNCPResultadosCollector()
+    
+    envelope = ResponseArchive.read(Path(path))
+    endpoint = envelope.get('endpoint', '')
+    resultado = {'path': path, 'tipo': None, 'chave': None, 'registros': [], 'erros': 0}
+    
+    match_resultados = RESULTADOS_PATTERN.match(endpoint)
+    match_itens = ITENS_PATTERN.match(endpoint)
+    if match_resultados:
+        resultado['tipo'] = 'resultados'
+        resultado['chave'] = (
+            match_resultados['cnpj'], int(match_resultados['ano']),
+            match_resultados['sequencial'], int(match_resultados['numero_item'])
+        )
+        parse = _resultados_collector.parse_resultado
+    elif match_itens:
+        resultado['tipo'] = 'itens'
+        resultado['chave'] = (match_itens['cnpj'], int(match_itens['ano']), match_itens['sequencial'])
+        parse = _resultados_collector.parse_item
+    elif ResponseArchive.categoria_of(endpoint) in CATEGORIAS_LICITACOES:
+        resultado['tipo'] = 'licitacoes'
+        
+        def parse(registro):
+            return ColetaService.codigo_ibge_registro(registro), _pncp_collector.parse_licitacao(registro)
+    else:
+        return resultado
+    
+    for registro in _registros(envelope.get('payload')):
+        try:
+            resultado['registros'].append(parse(registro))
+        except Exception as e:
+            logger.error(f"Error parsing archived record from {path}: {e}")
+            resultado['erros'] += 1
+    
+    return resultado
+
+
+class ReplayService:
+    """
+    Rebuild licitações, itens and resultados from the response archive.
+    
+    Decompressing and parsing is CPU-bound and runs in a pool of worker
+    processes; the parsed rows are written by the calling process through
+    the same code paths used by the live collection. Nothing is fetched
+    from PNCP.
+    """
+    
+    def __init__(self, archive: Optional[ResponseArchive] = None):
+        """
+        Initialize replay service.
+        
+        Args:
+            archive: Archive to read (defaults to the configured one)
+        """
+        self.archive = archive or response_archive
+        self.coleta_service = ColetaService()
+    
+    def _paths(self, categorias: List[str]) -> List[str]:
+        """
+        List archived files of some categories, oldest fetch first.
+        
+        When a page was fetched more than once, the newest copy is the one
+        on disk; ordering by modification time makes later snapshots of the
+        same bidding win.
+        """
+        paths = list(self.archive.iter_paths(categorias))
+        paths.sort(key=lambda p: p.stat().st_mtime)
+        return [str(p) for p in paths]
+    
+    def _parse_all(self, paths: List[str], workers: int) -> Iterator[Dict[str, Any]]:
+        """
+        Parse archived files, in parallel when more than one worker is used.
+        
+        Files are submitted in batches so parsed results never pile up
+        much faster than they are written.
+        """
+        if workers <= 1:
+            yield from map(parse_archived_response, paths)
+            return
+        
+        chunksize = max(1, REPLAY_BATCH_SIZE // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for lote in _batches(paths, REPLAY_BATCH_SIZE):
+                yield from executor.map(parse_archived_response, lote, chunksize=chunksize)
+    
+    def replay(self, workers: Optional[int] = None) -> Dict[str, int]:
+        """
+        Reprocess the whole archive.
+        
+        Licitações are upserted by control number. Items of every bidding
+        with an archived item list are replaced, and so are the results of
+        every item with an archived result list.
+        
+        Args:
+            workers: Parser processes (defaults to the number of CPUs)
+        
+        Returns:
+            Dictionary with replay statistics
+        """
+        workers = workers or os.cpu_count() or 1
+        stats = {
+            'arquivos': 0,
+            'licitacoes': 0,
+            'itens': 0,
+            'resultados': 0,
+            'ignorados': 0,
+            'erros': 0
+        }
+        
+        logger.info(f"Replaying response archive at {self.archive.root} with {workers} workers")
+        
+        with get_db_context() as db, UnitOfWork(db, batch_size=settings.INGEST_REPLAY_COMMIT_ROWS):
+            municipios = {m.codigo_ibge: m for m in MunicipioRepository(db).get_all()}
+            
+            for parsed in self._parse_all(self._paths(CATEGORIAS_LICITACOES), workers):
+                self._count(parsed, stats)
+                self._replay_licitacoes(db, municipios, parsed, stats)
+            
+            # Items and results of many files are merged per load
+            licitacao_ids: Dict[Tuple[str, int, str], Optional[int]] = {}
+            itens: List[Dict[str, Any]] = []
+            for parsed in self._parse_all(self._paths(CATEGORIAS_ITENS), workers):
+                self._count(parsed, stats)
+                itens.extend(self._replay_itens(db, licitacao_ids, parsed, stats))
+                if len(itens) >= REPLAY_LOAD_SIZE:
+                    self._carregar(db, stats, itens=itens)
+                    itens = []
+            self._carregar(db, stats, itens=itens)
+            
+            resultados: List[Dict[str, Any]] = []
+            for parsed in self._parse_all(self._paths(CATEGORIAS_RESULTADOS), workers):
+                self._count(parsed, stats)
+                resultados.extend(self._replay_resultados(db, licitacao_ids, parsed, stats))
+                if len(resultados) >= REPLAY_LOAD_SIZE:
+                    self._carregar(db, stats, resultados=resultados)
+                    resultados = []
+            self._carregar(db, stats, resultados=resultados)
+        
+        logger.info(f"Replay complete: {stats}")
+        return stats
+    
+    @staticmethod
+    def _count(parsed: Dict[str, Any], stats: Dict[str, int]):
+        """Update file and parse error counters."""
+        stats['arquivos'] += 1
+        stats['erros'] += parsed['erros']
+    
+    def _replay_licitacoes(
+        self,
+        db: Session,
+        municipios: Dict[str, Any],
+        parsed: Dict[str, Any],
+        stats: Dict[str, int]
+    ):
+        """Upsert the biddings of one archived listing page."""
+        grupos: Dict[str, List[Dict[str, Any]]] = {}
+        for codigo_ibge, licitacao in parsed['registros']:
+            if codigo_ibge not in municipios:
+                stats['ignorados'] += 1
+                continue
+            grupos.setdefault(codigo_ibge, []).append(licitacao)
+        
+        for codigo_ibge, licitacoes in grupos.items():
+            count, _ = self.coleta_service._save_licitacoes(
+                db, municipios[codigo_ibge], licitacoes, atualizar_existentes=True
+            )
+            stats['licitacoes'] += count
+    
+    @staticmethod
+    def _licitacao_id(
+        db: Session,
+        licitacao_ids: Dict[Tuple[str, int, str], Optional[int]],
+        chave: Tuple[str, int, str]
+    ) -> Optional[int]:
+        """Look up a bidding by (CNPJ, year, sequential number), caching the answer."""
+        if chave not in licitacao_ids:
+            licitacao = LicitacaoRepository(db).get_by_compra(*chave)
+            licitacao_ids[chave] = licitacao.id if licitacao else None
+        return licitacao_ids[chave]
+    
+    def _replay_itens(
+        self,
+        db: Session,
+        licitacao_ids: Dict[Tuple[str, int, str], Optional[int]],
+        parsed: Dict[str, Any],
+        stats: Dict[str, int]
+    ) -> List[Dict[str, Any]]:
+        """Attach the archived item list of one bidding to its stored bidding."""
+        licitacao_id = self._licitacao_id(db, licitacao_ids, parsed['chave'])
+        if licitacao_id is None:
+            logger.debug(f"Bidding {parsed['chave']} not found, skipping archived items")
+            stats['ignorados'] += len(parsed['registros'])
+            return []
+        
+        for item_parsed in parsed['registros']:
+            item_parsed['licitacao_id'] = licitacao_id
+        return parsed['registros']
+    
+    def _replay_resultados(
+        self,
+        db: Session,
+        licitacao_ids: Dict[Tuple[str, int, str], Optional[int]],
+        parsed: Dict[str, Any],
+        stats: Dict[str, int]
+    ) -> List[Dict[str, Any]]:
+        """Attach the archived result list of one item to its stored bidding."""
+        cnpj, ano, sequencial, numero_item = parsed['chave']
+        licitacao_id = self._licitacao_id(db, licitacao_ids, (cnpj, ano, sequencial))
+        if licitacao_id is None:
+            logger.debug(f"Bidding of item {parsed['chave']} not found, skipping archived results")
+            stats['ignorados'] += len(parsed['registros'])
+            return []
+        
+        for resultado_parsed in parsed['registros']:
+            resultado_parsed['licitacao_id'] = licitacao_id
+            resultado_parsed['numero_item'] = numero_item
+        return parsed['registros']
+    
+    def _carregar(
+        self,
+        db: Session,
+        stats: Dict[str, int],
+        itens: Optional[List[Dict[str, Any]]] = None,
+        resultados: Optional[List[Dict[str, Any]]] = None
+    ):
+        """
+        Merge replayed items or results, replacing the stored ones.
+        
+        Items replace the item list of their biddings (keeping the results of
+        items that are still there); results replace the result list of
+        their items. Results of items that are not stored are skipped.
+        """
+        if not itens and not resultados:
+            return
+        
+        try:
+            with savepoint(db):
+                if resultados is not None:
+                    resultados = self.coleta_service._resultados_com_fornecedor(db, resultados)
+                carga = ItemResultadoLoader(db).carregar(itens or [], resultados, substituir=True)
+            stats['itens'] += carga['itens']
+            stats['resultados'] += carga['resultados']
+            stats['ignorados'] += carga['resultados_sem_item']
+        except Exception as e:
+            logger.error(f"Error loading replayed items/results: {e}")
+            stats['erros'] += 1
+
+
+def _batches(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Split an iterable in lists of at most ``size`` items."""
+    iterator = iter(items)
+    while True:
+        lote = list(islice(iterator, size))
+        if not lote:
+            return
+        yield lote
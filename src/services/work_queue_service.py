@@ -0,0 +1,309 @@
+"""Persistent, lease-based collection work queue shared by worker nodes."""
+
+import os
+import socket
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from src.database.connection import get_db_context
+from src.database.repositories import (
+    BackfillShardRepository,
+    LicitacaoRepository,
+    MunicipioRepository,
+    TarefaColetaRepository
+)
+from src.exceptions import DataCollectionError
+from src.services.anomalia_service import AnomaliaService
+from src.services.backfill_service import BackfillService
+from src.services.coleta_service import ColetaService
+from src.utils.constants import TAREFA_JANELA, TAREFA_ITENS, TAREFA_ANOMALIAS
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLostError(Exception):
+    """Raised inside a worker when its lease was taken over by another worker."""
+
+
+class WorkQueueService:
+    """
+    Enqueue collection units in the ``tarefas_coleta`` table.
+    
+    Three kinds of unit exist: a backfill window of one municipality
+    (backed by its ``backfill_shards`` row, so progress and watermarks are
+    shared with ``manage.py backfill``), the item/result harvest of one
+    licitação, and the anomaly analysis of one licitação (queued by the
+    collection when a bidding changes upstream). Every unit has a stable
+    key, so enqueueing the same work twice is a no-op.
+    """
+    
+    def __init__(self, backfill_service: Optional[BackfillService] = None):
+        """
+        Initialize work queue service.
+        
+        Args:
+            backfill_service: Service used to plan the backfill shards
+        """
+        self.backfill_service = backfill_service or BackfillService()
+    
+    def enfileirar_backfill(
+        self,
+        years: int = 2,
+        granularidade: Optional[str] = None,
+        codigos_ibge: Optional[List[str]] = None
+    ) -> int:
+        """
+        Plan the backfill and enqueue one task per unfinished shard.
+        
+        Args:
+            years: Number of years to cover
+            granularidade: Shard size, "mes" or "semana"
+            codigos_ibge: Municipalities to backfill (all when None)
+        
+        Returns:
+            Number of tasks enqueued
+        """
+        self.backfill_service.planejar(years, granularidade, codigos_ibge)
+        
+        with get_db_context() as db:
+            municipios = BackfillService._municipios(db, codigos_ibge)
+            shards = BackfillShardRepository(db).get_inacabados([m.id for m in municipios])
+            tarefas = [
+                {
+                    'tipo': TAREFA_JANELA,
+                    'chave': f"{TAREFA_JANELA}:{shard.id}",
+                    'parametros': {'shard_id': shard.id, 'municipio_id': shard.municipio_id}
+                }
+                for shard in shards
+            ]
+            # A reopened shard (its window grew) runs again under the same key
+            enfileiradas = TarefaColetaRepository(db).enfileirar(tarefas, reabrir_concluidas=True)
+        
+        logger.info(f"Enqueued {enfileiradas} backfill window tasks")
+        return enfileiradas
+    
+    def enfileirar_itens(self, codigos_ibge: Optional[List[str]] = None) -> int:
+        """
+        Enqueue the item/result harvest of every bidding without items.
+        
+        Args:
+            codigos_ibge: Restrict to these municipalities (all when None)
+        
+        Returns:
+            Number of tasks enqueued
+        """
+        with get_db_context() as db:
+            municipio_ids = None
+            if codigos_ibge is not None:
+                municipio_ids = [m.id for m in BackfillService._municipios(db, codigos_ibge)]
+            
+            tarefas = [
+                {
+                    'tipo': TAREFA_ITENS,
+                    'chave': f"{TAREFA_ITENS}:{licitacao_id}",
+                    'parametros': {'licitacao_id': licitacao_id}
+                }
+                for licitacao_id in LicitacaoRepository(db).get_ids_sem_itens(municipio_ids)
+            ]
+            enfileiradas = TarefaColetaRepository(db).enfileirar(tarefas)
+        
+        logger.info(f"Enqueued {enfileiradas} item harvest tasks")
+        return enfileiradas
+    
+    def resumo(self) -> Dict[str, Dict[str, int]]:
+        """
+        Count queued tasks by type and status.
+        
+        Returns:
+            Dictionary of type to status counts
+        """
+        with get_db_context() as db:
+            return TarefaColetaRepository(db).resumo()
+
+
+class ColetaWorker:
+    """
+    Worker that claims and runs queued collection units.
+    
+    Any number of workers, on any number of machines sharing the database,
+    can run at once. Each claimed task is held under a time-bounded lease
+    that is renewed by a heartbeat while the unit runs; the lease of a
+    worker that dies simply expires and the task goes back to the queue.
+    Units are idempotent, so a unit that ran twice leaves the same data
+    behind: backfill windows upsert biddings on ``numero_controle_pncp``
+    and only rewrite the ones whose content changed, queueing item refresh
+    and anomaly tasks for those under per-bidding keys (a second run finds
+    nothing changed and queues nothing); item harvests merge items and
+    results on their natural keys; anomaly analyses skip the anomalies
+    already stored.
+    """
+    
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        coleta_service: Optional[ColetaService] = None,
+        lease_seconds: Optional[int] = None,
+        max_tentativas: Optional[int] = None,
+        tipos: Optional[List[str]] = None
+    ):
+        """
+        Initialize worker.
+        
+        Args:
+            worker_id: Unique worker name (defaults to host:pid)
+            coleta_service: Collection service used to run the units
+            lease_seconds: Lease duration (defaults to WORK_QUEUE_LEASE_SECONDS)
+            max_tentativas: Attempts before a task is marked as failed
+                (defaults to WORK_QUEUE_MAX_ATTEMPTS)
+            tipos: Only run these task types (any when None)
+        """
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.coleta_service = coleta_service or ColetaService()
+        self.backfill_service = BackfillService(self.coleta_service)
+        self.lease_seconds = lease_seconds or settings.WORK_QUEUE_LEASE_SECONDS
+        self.max_tentativas = max_tentativas or settings.WORK_QUEUE_MAX_ATTEMPTS
+        self.tipos = tipos
+    
+    async def run(
+        self,
+        concorrencia: Optional[int] = None,
+        max_tarefas: Optional[int] = None,
+        aguardar: bool = False
+    ) -> Dict[str, int]:
+        """
+        Claim and run tasks until the queue is empty.
+        
+        Args:
+            concorrencia: Tasks run at once by this worker (defaults to WORK_QUEUE_CONCURRENCY)
+            max_tarefas: Stop after this many tasks (no limit when None)
+            aguardar: Keep polling for new tasks instead of stopping when the queue is empty
+        
+        Returns:
+            Dictionary with worker statistics
+        """
+        concorrencia = max(1, concorrencia or settings.WORK_QUEUE_CONCURRENCY)
+        stats = {'tarefas_concluidas': 0, 'tarefas_com_erro': 0, 'leases_perdidos': 0}
+        reservadas = 0
+        
+        logger.info(f"Worker {self.worker_id} started with concurrency {concorrencia}")
+        
+        async def loop():
+            nonlocal reservadas
+            while max_tarefas is None or reservadas < max_tarefas:
+                reservadas += 1
+                resultado = await self.executar_proxima()
+                if resultado is None:
+                    reservadas -= 1
+                    if not aguardar:
+                        return
+                    await asyncio.sleep(settings.WORK_QUEUE_POLL_INTERVAL)
+                    continue
+                stats[resultado] += 1
+        
+        await asyncio.gather(*(loop() for _ in range(concorrencia)))
+        
+        logger.info(f"Worker {self.worker_id} finished: {stats}")
+        return stats
+    
+    async def executar_proxima(self) -> Optional[str]:
+        """
+        Claim one task and run it.
+        
+        Returns:
+            Name of the statistic to increment, or None if no task was available
+        """
+        with get_db_context() as db:
+            repo = TarefaColetaRepository(db)
+            repo.requeue_expirados(self.max_tentativas)
+            tarefa = repo.reivindicar(self.worker_id, self.lease_seconds, self.tipos)
+            if tarefa is None:
+                return None
+            tarefa_id, tipo, parametros = tarefa.id, tarefa.tipo, dict(tarefa.parametros)
+        
+        logger.info(f"Worker {self.worker_id} running task {tarefa_id} ({tipo})")
+        trabalho = asyncio.ensure_future(self._executar(tipo, parametros))
+        heartbeat = asyncio.ensure_future(self._heartbeat(tarefa_id, trabalho))
+        
+        try:
+            resultado = await trabalho
+        except asyncio.CancelledError:
+            if heartbeat.done() and isinstance(heartbeat.exception(), LeaseLostError):
+                logger.warning(f"Worker {self.worker_id} lost the lease of task {tarefa_id}, abandoning it")
+                return 'leases_perdidos'
+            raise
+        except Exception as e:
+            logger.error(f"Task {tarefa_id} ({tipo}) failed: {e}")
+            with get_db_context() as db:
+                TarefaColetaRepository(db).falhar(tarefa_id, self.worker_id, str(e), self.max_tentativas)
+            return 'tarefas_com_erro'
+        finally:
+            heartbeat.cancel()
+        
+        with get_db_context() as db:
+            if not TarefaColetaRepository(db).concluir(tarefa_id, self.worker_id, resultado):
+                logger.warning(f"Task {tarefa_id} finished after its lease expired")
+                return 'leases_perdidos'
+        return 'tarefas_concluidas'
+    
+    async def _heartbeat(self, tarefa_id: int, trabalho: asyncio.Future):
+        """Renew the lease of a running task, cancelling it if the lease was lost."""
+        intervalo = max(1.0, self.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(intervalo)
+            with get_db_context() as db:
+                renovado = TarefaColetaRepository(db).renovar_lease(tarefa_id, self.worker_id, self.lease_seconds)
+            if not renovado:
+                trabalho.cancel()
+                raise LeaseLostError(f"Lease of task {tarefa_id} lost")
+    
+    async def _executar(self, tipo: str, parametros: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run one unit of work.
+        
+        Returns:
+            Result stored with the finished task
+        
+        Raises:
+            Exception: If the unit failed and should be retried
+        """
+        if tipo == TAREFA_JANELA:
+            return await self._executar_janela(parametros['shard_id'])
+        if tipo == TAREFA_ITENS:
+            stats = await self.coleta_service.collect_itens_and_resultados(
+                parametros['licitacao_id'], substituir=True
+            )
+            if stats['erros_itens']:
+                # What was read is stored; retry for the missing results
+                raise DataCollectionError(
+                    f"Results of {stats['erros_itens']} items could not be collected", source="PNCP"
+                )
+            return stats
+        if tipo == TAREFA_ANOMALIAS:
+            return self._executar_anomalias(parametros['licitacao_id'])
+        raise ValueError(f"Unknown task type: {tipo}")
+    
+    @staticmethod
+    def _executar_anomalias(licitacao_id: int) -> Dict[str, Any]:
+        """Re-run the anomaly analysis of a bidding."""
+        with get_db_context() as db:
+            anomalias = AnomaliaService(db).executar_analise_completa(licitacao_id)
+        return {'anomalias': len(anomalias)}
+    
+    async def _executar_janela(self, shard_id: int) -> Dict[str, Any]:
+        """Run a backfill shard and record the municipality's state once all its shards are done."""
+        with get_db_context() as db:
+            shard = BackfillShardRepository(db).get_by_id(shard_id)
+            if shard is None:
+                raise ValueError(f"Backfill shard {shard_id} not found")
+            municipio = MunicipioRepository(db).get_by_id(shard.municipio_id)
+            args = (shard.id, shard.municipio_id, municipio.codigo_ibge, shard.janela_inicio, shard.janela_fim)
+        
+        sucesso, count = await self.backfill_service._executar_shard(*args)
+        if not sucesso:
+            with get_db_context() as db:
+                raise RuntimeError(BackfillShardRepository(db).get_by_id(shard_id).erro or "Shard failed")
+        
+        self.backfill_service._registrar_estado(args[1])
+        return {'total_licitacoes': count}
@@ -2,6 +2,7 @@
 
 # PNCP API Endpoints
 PNCP_CONTRATACOES_ENDPOINT = "/contratacoes/publicacao"
+PNCP_CONTRATACOES_ATUALIZACAO_ENDPOINT = "/contratacoes/atualizacao"
 PNCP_ITENS_ENDPOINT = "/orgaos/{cnpj}/compras/{ano}/{sequencial}/itens"
 PNCP_RESULTADOS_ENDPOINT = "/orgaos/{cnpj}/compras/{ano}/{sequencial}/itens/{numero_item}/resultados"
 
@@ -20,6 +21,27 @@ UF_GOIAS = "GO"
 # Collection period (2 years)
 COLLECTION_YEARS = 2
 
+# Collection modes
+MODO_COLETA_COMPLETA = "completa"
+MODO_COLETA_INCREMENTAL = "incremental"
+
+# Backfill shards
+GRANULARIDADE_MES = "mes"
+GRANULARIDADE_SEMANA = "semana"
+SHARD_PENDENTE = "pendente"
+SHARD_EXECUTANDO = "executando"
+SHARD_CONCLUIDO = "concluido"
+SHARD_ERRO = "erro"
+
+# Collection work queue
+TAREFA_JANELA = "janela"
+TAREFA_ITENS = "itens"
+TAREFA_ANOMALIAS = "anomalias"
+TAREFA_PENDENTE = "pendente"
+TAREFA_EXECUTANDO = "executando"
+TAREFA_CONCLUIDA = "concluida"
+TAREFA_ERRO = "erro"
+
 # Material ou Serviço
 MATERIAL = "M"
 SERVICO = "S"
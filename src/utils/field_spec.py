@@ -0,0 +1,260 @@
+"""Compiled field-mapping specs for decoding and coercing API records."""
+
+import json
+import hashlib
+import logging
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from src.utils.helpers import parse_pncp_datetime
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """
+    Decode JSON, with orjson when it is installed.
+    
+    Args:
+        data: Raw JSON document
+    
+    Returns:
+        Decoded value
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Coercions. All of them map None to None and accept values that already
+# have the target type, so coercing a record twice is harmless.
+
+def to_datetime(value: Any) -> Optional[datetime]:
+    """Coerce a PNCP timestamp string to datetime."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return parse_pncp_datetime(value)
+
+
+def to_date(value: Any) -> Optional[date]:
+    """Coerce a PNCP date (or timestamp) string to date."""
+    if value is None or type(value) is date:
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    parsed = parse_pncp_datetime(value)
+    return parsed.date() if parsed else None
+
+
+def to_decimal(value: Any) -> Optional[Decimal]:
+    """Coerce a number or numeric string to Decimal."""
+    if value is None or isinstance(value, Decimal):
+        return value
+    if value == "" or isinstance(value, bool):
+        return None
+    try:
+        # Going through str keeps 0.1 as Decimal("0.1") instead of its binary expansion
+        return Decimal(str(value))
+    except InvalidOperation:
+        logger.warning(f"Could not parse decimal: {value}")
+        return None
+
+
+def to_int(value: Any) -> Optional[int]:
+    """Coerce a number or numeric string to int."""
+    if value is None or type(value) is int:
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Could not parse integer: {value}")
+        return None
+
+
+def to_bool(value: Any) -> Optional[bool]:
+    """Coerce PNCP flags (true/false, "S"/"N", 1/0) to bool."""
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "s", "sim", "1")
+    return bool(value)
+
+
+def to_str(value: Any) -> Optional[str]:
+    """Coerce scalars to str (e.g. numeric codes sent as numbers)."""
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+class Field:
+    """One output field of an entity spec."""
+    
+    __slots__ = ('name', 'path', 'coerce', 'default', 'column')
+    
+    def __init__(
+        self,
+        name: str,
+        path: Union[str, Sequence[str]],
+        coerce: Optional[Callable[[Any], Any]] = None,
+        default: Any = None,
+        column: bool = True
+    ):
+        """
+        Initialize field.
+        
+        Args:
+            name: Output key (the model column name)
+            path: Source key, or keys for a nested value
+            coerce: Type coercion applied to the value
+            default: Value used when the source key is missing
+            column: Whether the field is a column of the entity's table
+                (False for values used to resolve related rows, e.g. the
+                organization CNPJ of a bidding)
+        """
+        self.name = name
+        self.path = (path,) if isinstance(path, str) else tuple(path)
+        self.coerce = coerce
+        self.default = default
+        self.column = column
+
+
+class EntitySpec:
+    """
+    Declarative mapping from a raw API record to a database row.
+    
+    The field list is compiled once into a single Python function that
+    reads every source key, walks each nested object once, and applies the
+    type coercions in the same pass, so parsing a record costs one call
+    instead of one ``safe_get`` per field. The same spec produces dicts for
+    the ORM (``parse``, ``model_values``) and positional tuples for bulk
+    inserts (``columns``, ``rows``).
+    """
+    
+    def __init__(self, name: str, fields: List[Field]):
+        """
+        Initialize and compile spec.
+        
+        Args:
+            name: Entity name, used in the generated function name
+            fields: Output fields, in column order
+        """
+        self.name = name
+        self.fields = fields
+        self.columns: Tuple[str, ...] = tuple(f.name for f in fields if f.column)
+        self.coercions: Dict[str, Callable[[Any], Any]] = {f.name: f.coerce for f in fields if f.coerce}
+        self.parse = self._compile()
+    
+    def _compile(self) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """Generate the parse function of the spec."""
+        namespace: Dict[str, Any] = {}
+        lines = [f"def parse_{self.name}(raw):"]
+        parents: Dict[Tuple[str, ...], str] = {(): "raw"}
+        
+        def parent_var(prefix: Tuple[str, ...]) -> str:
+            # Nested objects are fetched once and replaced by {} when missing or null
+            if prefix not in parents:
+                outer = parent_var(prefix[:-1])
+                var = f"_p{len(parents)}"
+                lines.append(f"    {var} = {outer}.get({prefix[-1]!r})")
+                lines.append(f"    if not isinstance({var}, dict): {var} = {{}}")
+                parents[prefix] = var
+            return parents[prefix]
+        
+        valores = []
+        for i, field in enumerate(self.fields):
+            var = parent_var(field.path[:-1])
+            default = f"_d{i}"
+            namespace[default] = field.default
+            expr = f"{var}.get({field.path[-1]!r}, {default})"
+            if field.coerce is not None:
+                namespace[f"_c{i}"] = field.coerce
+                expr = f"_c{i}({expr})"
+            valores.append(f"        {field.name!r}: {expr},")
+        
+        lines.append("    return {")
+        lines.extend(valores)
+        lines.append("    }")
+        
+        exec(compile("\n".join(lines), f"<spec {self.name}>", "exec"), namespace)
+        return namespace[f"parse_{self.name}"]
+    
+    def parse_many(self, raws: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Parse a batch of raw records.
+        
+        Args:
+            raws: Raw API records
+        
+        Returns:
+            Parsed records
+        """
+        parse = self.parse
+        return [parse(raw) for raw in raws]
+    
+    def model_values(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Keep only the table columns of a parsed record.
+        
+        Args:
+            parsed: Record returned by ``parse``
+        
+        Returns:
+            Keyword arguments for the model
+        """
+        return {column: parsed.get(column) for column in self.columns}
+    
+    def rows(self, parsed: Iterable[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+        """
+        Convert parsed records to tuples in ``columns`` order.
+        
+        Args:
+            parsed: Records returned by ``parse``
+        
+        Returns:
+            Ready-to-insert row tuples
+        """
+        columns = self.columns
+        return [tuple(record.get(column) for column in columns) for record in parsed]
+    
+    def fingerprint(self, parsed: Dict[str, Any]) -> str:
+        """
+        Hash the column values of a parsed record.
+        
+        Two parses of the same PNCP content give the same hash, so comparing
+        it with the stored one tells whether a record changed without
+        reading the stored row.
+        
+        Args:
+            parsed: Record returned by ``parse`` (or coerced column values)
+        
+        Returns:
+            32-character hex digest
+        """
+        conteudo = repr(tuple(parsed.get(column) for column in self.columns))
+        return hashlib.blake2b(conteudo.encode(), digest_size=16).hexdigest()
+    
+    def coerce(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply the spec's coercions to a column dict, in place.
+        
+        Used by repositories so rows built by hand (e.g. with PNCP date
+        strings) get the same types as parsed records.
+        
+        Args:
+            data: Column values
+        
+        Returns:
+            The same dictionary
+        """
+        for name, value in data.items():
+            coerce = self.coercions.get(name)
+            if coerce is not None and value is not None:
+                data[name] = coerce(value)
+        return data
@@ -1,12 +1,19 @@
 """Helper utility functions."""
 
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+import asyncio
+import inspect
 import logging
 import time
 from functools import wraps
 
-from src.utils.constants import PNCP_DATE_FORMAT, DISPLAY_DATE_FORMAT
+from src.utils.constants import (
+    PNCP_DATE_FORMAT,
+    DISPLAY_DATE_FORMAT,
+    GRANULARIDADE_MES,
+    GRANULARIDADE_SEMANA
+)
 
 logger = logging.getLogger(__name__)
 
@@ -115,6 +122,48 @@ def get_date_range(years: int = 2) -> tuple[datetime, datetime]:
     return start_date, end_date
 
 
+def split_date_range(
+    start_date: datetime,
+    end_date: datetime,
+    granularidade: str = GRANULARIDADE_MES
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Split a date range in calendar-aligned windows.
+    
+    Windows start at midnight on the first day of a month (or on a Monday,
+    for weeks), so splitting overlapping ranges on different days yields
+    the same window starts. The first window is widened back to its
+    calendar boundary and the last one is cut at ``end_date``.
+    
+    Args:
+        start_date: Range start
+        end_date: Range end
+        granularidade: GRANULARIDADE_MES or GRANULARIDADE_SEMANA
+    
+    Returns:
+        List of (window_start, window_end) tuples, oldest first
+    """
+    inicio = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularidade == GRANULARIDADE_MES:
+        inicio = inicio.replace(day=1)
+    elif granularidade == GRANULARIDADE_SEMANA:
+        inicio -= timedelta(days=inicio.weekday())
+    else:
+        raise ValueError(f"Unknown granularity: {granularidade}")
+    
+    janelas = []
+    while inicio <= end_date:
+        if granularidade == GRANULARIDADE_MES:
+            proximo = (inicio.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            proximo = inicio + timedelta(days=7)
+        fim = min(proximo - timedelta(seconds=1), end_date)
+        janelas.append((inicio, fim))
+        inicio = proximo
+    
+    return janelas
+
+
 def retry_on_failure(max_attempts: int = 3, delay: int = 5):
     """
     Decorator to retry function on failure.
@@ -138,6 +187,24 @@ def retry_on_failure(max_attempts: int = 3, delay: int = 5):
                     logger.warning(f"Attempt {attempts} failed, retrying in {delay}s: {e}")
                     time.sleep(delay)
             return None
+        
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            attempts = 0
+            while attempts < max_attempts:
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    attempts += 1
+                    if attempts >= max_attempts:
+                        logger.error(f"Failed after {max_attempts} attempts: {e}")
+                        raise
+                    logger.warning(f"Attempt {attempts} failed, retrying in {delay}s: {e}")
+                    await asyncio.sleep(delay)
+            return None
+        
+        if inspect.iscoroutinefunction(func):
+            return async_wrapper
         return wrapper
     return decorator
 
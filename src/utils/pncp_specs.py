@@ -0,0 +1,141 @@
+"""Field-mapping specs of the PNCP entities (licitação, item, resultado)."""
+
+from src.utils.field_spec import (
+    EntitySpec,
+    Field,
+    to_bool,
+    to_date,
+    to_datetime,
+    to_decimal,
+    to_int,
+    to_str
+)
+
+LICITACAO_SPEC = EntitySpec("licitacao", [
+    Field("sequencial_compra", "sequencialCompra", to_str),
+    Field("numero_compra", "numeroCompra", to_str),
+    Field("processo", "processo", to_str),
+    Field("ano_compra", "anoCompra", to_int),
+    Field("numero_controle_pncp", "numeroControlePNCP", to_str),
+    
+    # Orgão (resolved to orgao_id when stored)
+    Field("orgao_cnpj", ("orgaoEntidade", "cnpj"), to_str, column=False),
+    Field("orgao_razao_social", ("orgaoEntidade", "razaoSocial"), column=False),
+    Field("poder_id", ("orgaoEntidade", "poderId"), to_str, column=False),
+    Field("esfera_id", ("orgaoEntidade", "esferaId"), to_str, column=False),
+    
+    # Unidade
+    Field("unidade_codigo", ("unidadeOrgao", "codigoUnidade"), to_str),
+    Field("unidade_nome", ("unidadeOrgao", "nomeUnidade")),
+    Field("codigo_ibge", ("unidadeOrgao", "codigoIbge"), to_str, column=False),
+    
+    # Modalidade
+    Field("modalidade_id", "modalidadeId", to_int),
+    Field("modalidade_nome", "modalidadeNome"),
+    
+    # Modo Disputa
+    Field("modo_disputa_id", "modoDisputaId", to_int),
+    Field("modo_disputa_nome", "modoDisputaNome"),
+    
+    # Tipo Instrumento
+    Field("tipo_instrumento_convocatorio_nome", "tipoInstrumentoConvocatorioNome"),
+    
+    # Amparo Legal
+    Field("amparo_legal_descricao", ("amparoLegal", "descricao")),
+    Field("amparo_legal_nome", ("amparoLegal", "nome")),
+    Field("amparo_legal_codigo", ("amparoLegal", "codigo"), to_str),
+    
+    # Objeto
+    Field("objeto_compra", "objetoCompra"),
+    Field("informacao_complementar", "informacaoComplementar"),
+    
+    # SRP
+    Field("srp", "srp", to_bool, default=False),
+    
+    # Datas
+    Field("data_publicacao_pncp", "dataPublicacaoPncp", to_datetime),
+    Field("data_abertura_proposta", "dataAberturaProposta", to_datetime),
+    Field("data_encerramento_proposta", "dataEncerramentoProposta", to_datetime),
+    Field("data_inclusao", "dataInclusao", to_datetime),
+    Field("data_atualizacao", "dataAtualizacao", to_datetime),
+    
+    # Situação
+    Field("situacao_compra_id", "situacaoCompraId", to_int),
+    Field("situacao_compra_nome", "situacaoCompraNome"),
+    
+    # Valores
+    Field("valor_total_estimado", "valorTotalEstimado", to_decimal),
+    Field("valor_total_homologado", "valorTotalHomologado", to_decimal),
+    
+    # Links e Info
+    Field("link_sistema_origem", "linkSistemaOrigem"),
+    Field("justificativa_presencial", "justificativaPresencial"),
+    Field("existe_resultado", "existeResultado", to_bool, default=False),
+    Field("orcamento_sigiloso_codigo", "orcamentoSigilosoCodigo", to_str),
+    Field("usuario_nome", "usuarioNome"),
+])
+
+ITEM_SPEC = EntitySpec("item", [
+    Field("numero_item", "numeroItem", to_int),
+    Field("material_ou_servico", "materialOuServico", to_str),
+    
+    # Tipo Benefício
+    Field("tipo_beneficio_id", "tipoBeneficioId", to_int),
+    Field("tipo_beneficio_nome", "tipoBeneficioNome"),
+    
+    # Incentivos
+    Field("incentivo_produtivo_basico", "incentivoProdutivoBasico", to_bool, default=False),
+    
+    # Descrição
+    Field("descricao", "descricao"),
+    Field("quantidade", "quantidade", to_decimal),
+    Field("unidade_medida", "unidadeMedida"),
+    
+    # Valores
+    Field("valor_unitario_estimado", "valorUnitarioEstimado", to_decimal),
+    Field("valor_total", "valorTotal", to_decimal),
+    
+    # Situação
+    Field("situacao_compra_item_id", "situacaoCompraItemId", to_int),
+    Field("situacao_compra_item_nome", "situacaoCompraItemNome"),
+    
+    # Critério
+    Field("criterio_julgamento_id", "criterioJulgamentoId", to_int),
+    Field("criterio_julgamento_nome", "criterioJulgamentoNome"),
+    
+    # Código e Categoria
+    Field("codigo_produto", "codigoProduto", to_str),
+    Field("orcamento_sigiloso", "orcamentoSigiloso", to_bool, default=False),
+    Field("item_categoria_id", "itemCategoriaId", to_int),
+    Field("item_categoria_nome", "itemCategoriaNome"),
+])
+
+RESULTADO_SPEC = EntitySpec("resultado", [
+    Field("data_resultado", "dataResultado", to_date),
+    Field("sequencial_resultado", "sequencialResultado", to_int),
+    
+    # Fornecedor (resolved to fornecedor_id when stored)
+    Field("ni_fornecedor", "niFornecedor", to_str, column=False),
+    Field("nome_razao_social_fornecedor", "nomeRazaoSocialFornecedor", column=False),
+    Field("tipo_pessoa", "tipoPessoa", column=False),
+    Field("porte_fornecedor_id", "porteFornecedorId", to_int, column=False),
+    Field("porte_fornecedor_nome", "porteFornecedorNome", column=False),
+    Field("codigo_pais", "codigoPais", to_str, column=False),
+    
+    # Compra
+    Field("numero_controle_pncp_compra", "numeroControlePNCPCompra", to_str),
+    Field("indicador_subcontratacao", "indicadorSubcontratacao", to_bool, default=False),
+    
+    # Valores
+    Field("percentual_desconto", "percentualDesconto", to_decimal),
+    Field("quantidade_homologada", "quantidadeHomologada", to_decimal),
+    Field("valor_unitario_homologado", "valorUnitarioHomologado", to_decimal),
+    Field("valor_total_homologado", "valorTotalHomologado", to_decimal),
+    
+    # Situação
+    Field("situacao_compra_item_resultado_id", "situacaoCompraItemResultadoId", to_int),
+    
+    # Datas
+    Field("data_inclusao", "dataInclusao", to_datetime),
+    Field("data_atualizacao", "dataAtualizacao", to_datetime),
+])
@@ -0,0 +1,100 @@
+"""Token bucket rate limiter shared by concurrent callers."""
+
+import time
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket rate limiter usable from async and sync code.
+    
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Callers reserve a token and then sleep for the time needed to pay it
+    back, so waiting never holds a lock and the limiter is safe to share
+    across event loops and threads. A rate of 0 disables limiting.
+    """
+    
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        Initialize rate limiter.
+        
+        Args:
+            rate: Tokens added per second (0 disables the limiter)
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether the limiter is active."""
+        return self.rate > 0
+    
+    def _reserve(self, tokens: int = 1) -> float:
+        """
+        Reserve tokens and compute how long the caller must wait.
+        
+        Args:
+            tokens: Number of tokens to reserve
+        
+        Returns:
+            Wait time in seconds
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+            
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+    
+    async def acquire(self, tokens: int = 1):
+        """
+        Wait asynchronously until tokens are available.
+        
+        Args:
+            tokens: Number of tokens to acquire
+        """
+        if not self.enabled:
+            return
+        
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def acquire_sync(self, tokens: int = 1):
+        """
+        Block until tokens are available.
+        
+        Args:
+            tokens: Number of tokens to acquire
+        """
+        if not self.enabled:
+            return
+        
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+    
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens for a while, e.g. after a Retry-After.
+        
+        Args:
+            seconds: Pause duration in seconds
+        """
+        with self._lock:
+            paused_until = time.monotonic() + seconds
+            if paused_until > self._paused_until:
+                self._paused_until = paused_until
+                logger.warning(f"Rate limiter paused for {seconds:.2f}s")
@@ -1,9 +1,12 @@
 """Retry decorator with exponential backoff for handling transient failures."""
 
 import time
+import random
 import logging
 import asyncio
 import inspect
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from functools import wraps
 from typing import Callable, Type, Tuple, Optional
 from src.exceptions import ExternalAPIError
@@ -231,3 +234,186 @@ def retry_on_http_error(
             return sync_wrapper
     
     return decorator
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+    
+    Args:
+        value: Header value, either delay-seconds or an HTTP-date
+    
+    Returns:
+        Delay in seconds, or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def decorrelated_jitter(previous_delay: float, base_delay: float, max_delay: float) -> float:
+    """
+    Compute the next backoff delay using decorrelated jitter.
+    
+    Each delay is drawn uniformly between ``base_delay`` and three times the
+    previous delay, capped at ``max_delay``. This spreads retries of many
+    concurrent callers instead of having them wake up in lockstep.
+    
+    Args:
+        previous_delay: Delay used on the previous attempt
+        base_delay: Minimum delay
+        max_delay: Maximum delay
+    
+    Returns:
+        Next delay in seconds
+    """
+    upper = max(base_delay, previous_delay * 3)
+    return min(max_delay, random.uniform(base_delay, upper))
+
+
+def retry_with_decorrelated_jitter(
+    max_attempts: int = 3,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    status_codes: Tuple[int, ...] = (429, 500, 502, 503, 504),
+    retry_after_status_codes: Tuple[int, ...] = (429, 503),
+    exceptions: Tuple[Type[Exception], ...] = (),
+    on_retry_after: Optional[Callable[[float], None]] = None
+):
+    """
+    Decorator that retries HTTP calls with decorrelated jitter.
+    
+    Errors carrying an HTTP status code in ``status_codes`` and errors that
+    are instances of ``exceptions`` (e.g. network errors) are retried. When
+    the response status is in ``retry_after_status_codes`` and it carries a
+    ``Retry-After`` header, that delay (capped at ``max_delay``) is used
+    instead of the jittered one. Async functions sleep with
+    ``asyncio.sleep`` so the event loop is never blocked.
+    
+    Args:
+        max_attempts: Maximum number of attempts
+        base_delay: Minimum delay in seconds between attempts
+        max_delay: Maximum delay in seconds between attempts
+        status_codes: HTTP status codes to retry on
+        retry_after_status_codes: Status codes whose Retry-After is honored
+        exceptions: Exception types that are always retried
+        on_retry_after: Optional callback receiving the Retry-After delay,
+            e.g. to pause a shared rate limiter
+    
+    Returns:
+        Decorated function with retry logic
+    
+    Example:
+        @retry_with_decorrelated_jitter(max_attempts=5, exceptions=(httpx.TransportError,))
+        async def fetch_from_api():
+            response = await client.get(url)
+            response.raise_for_status()
+            return response.json()
+    """
+    def get_status_code(e: Exception) -> Optional[int]:
+        """Extract the HTTP status code from an exception, if any."""
+        if hasattr(e, 'response') and hasattr(e.response, 'status_code'):
+            return e.response.status_code
+        if isinstance(e, ExternalAPIError) and e.status_code:
+            return e.status_code
+        return None
+    
+    def should_retry(e: Exception) -> bool:
+        """Check if exception should trigger a retry."""
+        if exceptions and isinstance(e, exceptions):
+            return True
+        status_code = get_status_code(e)
+        return status_code is not None and status_code in status_codes
+    
+    def next_delay(e: Exception, previous_delay: float) -> float:
+        """Compute the delay before the next attempt."""
+        delay = decorrelated_jitter(previous_delay, base_delay, max_delay)
+        
+        if get_status_code(e) in retry_after_status_codes:
+            headers = getattr(e.response, 'headers', None) or {}
+            retry_after = parse_retry_after(headers.get('Retry-After'))
+            if retry_after is not None:
+                delay = min(max(delay, retry_after), max_delay)
+                if on_retry_after:
+                    on_retry_after(delay)
+        
+        return delay
+    
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            """Async wrapper for jittered retry logic."""
+            delay = base_delay
+            
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    if not should_retry(e):
+                        raise
+                    
+                    if attempt >= max_attempts:
+                        logger.error(
+                            f"Function {func.__name__} failed after {max_attempts} attempts: {e}"
+                        )
+                        raise
+                    
+                    delay = next_delay(e, delay)
+                    logger.warning(
+                        f"Attempt {attempt}/{max_attempts} failed for {func.__name__}: {e}. "
+                        f"Retrying in {delay:.2f}s..."
+                    )
+                    
+                    await asyncio.sleep(delay)
+            
+            raise Exception(f"Max retries ({max_attempts}) exceeded")
+        
+        @wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            """Sync wrapper for jittered retry logic."""
+            delay = base_delay
+            
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    if not should_retry(e):
+                        raise
+                    
+                    if attempt >= max_attempts:
+                        logger.error(
+                            f"Function {func.__name__} failed after {max_attempts} attempts: {e}"
+                        )
+                        raise
+                    
+                    delay = next_delay(e, delay)
+                    logger.warning(
+                        f"Attempt {attempt}/{max_attempts} failed for {func.__name__}: {e}. "
+                        f"Retrying in {delay:.2f}s..."
+                    )
+                    
+                    time.sleep(delay)
+            
+            raise Exception(f"Max retries ({max_attempts}) exceeded")
+        
+        # Detect if function is async or sync
+        if inspect.iscoroutinefunction(func):
+            return async_wrapper
+        else:
+            return sync_wrapper
+    
+    return decorator
@@ -0,0 +1,227 @@
+"""Local stand-in for the PNCP API, served through ``httpx.MockTransport``."""
+
+import re
+import math
+import zlib
+import random
+import asyncio
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import httpx
+
+from src.collectors.http_client import HTTPClientManager, http_client_manager
+
+LISTAGEM_PATTERN = re.compile(r"/contratacoes/(publicacao|atualizacao)$")
+ITENS_PATTERN = re.compile(r"/orgaos/(?P<cnpj>\d+)/compras/(?P<ano>\d+)/(?P<sequencial>\d+)/itens$")
+RESULTADOS_PATTERN = re.compile(
+    r"/orgaos/(?P<cnpj>\d+)/compras/(?P<ano>\d+)/(?P<sequencial>\d+)/itens/(?P<numero_item>\d+)/resultados$"
+)
+
+
+class FakePNCP:
+    """
+    Synthetic PNCP serving listings, items and results.
+    
+    Every listing query (municipality × date window) returns
+    ``licitacoes_por_consulta`` biddings, paged by ``tamanhoPagina``; queries
+    without a municipality spread the same volume over all configured
+    municipalities, like the UF-wide sweep. Records are deterministic, so
+    the same query always returns the same biddings.
+    
+    Latency, 429 responses and 5xx errors are injected per request, and
+    every request is counted for the benchmark reports.
+    """
+    
+    def __init__(
+        self,
+        codigos_ibge: List[str],
+        licitacoes_por_consulta: int = 120,
+        volume: Optional[Dict[str, int]] = None,
+        itens_por_licitacao: int = 3,
+        resultados_por_item: int = 1,
+        latencia: float = 0.0,
+        taxa_429: float = 0.0,
+        taxa_erro: float = 0.0,
+        seed: int = 42
+    ):
+        """
+        Initialize fake server.
+        
+        Args:
+            codigos_ibge: Municipalities with biddings
+            licitacoes_por_consulta: Biddings per listing query
+            volume: Per-municipality override of ``licitacoes_por_consulta``
+            itens_por_licitacao: Items of each bidding
+            resultados_por_item: Results of each item
+            latencia: Seconds added to every response
+            taxa_429: Fraction of requests answered with 429
+            taxa_erro: Fraction of requests answered with 503
+            seed: Seed of the failure injection
+        """
+        self.codigos_ibge = codigos_ibge
+        self.licitacoes_por_consulta = licitacoes_por_consulta
+        self.volume = volume or {}
+        self.itens_por_licitacao = itens_por_licitacao
+        self.resultados_por_item = resultados_por_item
+        self.latencia = latencia
+        self.taxa_429 = taxa_429
+        self.taxa_erro = taxa_erro
+        self._random = random.Random(seed)
+        self.requests: Counter = Counter()
+        self.respostas: Counter = Counter()
+        self.registros_servidos = 0
+    
+    @property
+    def total_requests(self) -> int:
+        """Number of requests received."""
+        return sum(self.requests.values())
+    
+    def transport(self) -> httpx.MockTransport:
+        """Build a transport serving this fake."""
+        return httpx.MockTransport(self.handle)
+    
+    @contextmanager
+    def mounted(self, manager: HTTPClientManager = http_client_manager):
+        """
+        Route the collectors' HTTP client through this fake.
+        
+        Example:
+            with FakePNCP(["5208707"]).mounted():
+                await service.collect_all_municipios(incremental=True)
+        """
+        manager.use_transport(self.transport())
+        try:
+            yield self
+        finally:
+            manager.use_transport(None)
+    
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer one request."""
+        path = request.url.path
+        endpoint = self._endpoint(path)
+        self.requests[endpoint] += 1
+        
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+        
+        sorteio = self._random.random()
+        if sorteio < self.taxa_429:
+            return self._responder(request, 429, headers={"Retry-After": "0"})
+        if sorteio < self.taxa_429 + self.taxa_erro:
+            return self._responder(request, 503)
+        
+        if endpoint == "listagem":
+            return self._responder(request, 200, self._listagem(request.url.params))
+        
+        match = RESULTADOS_PATTERN.search(path)
+        if match:
+            registros = [
+                self._resultado(match, sequencial)
+                for sequencial in range(1, self.resultados_por_item + 1)
+            ]
+            self.registros_servidos += len(registros)
+            return self._responder(request, 200, registros)
+        
+        match = ITENS_PATTERN.search(path)
+        if match:
+            registros = [self._item(numero) for numero in range(1, self.itens_por_licitacao + 1)]
+            self.registros_servidos += len(registros)
+            return self._responder(request, 200, registros)
+        
+        return self._responder(request, 404, {"message": "Not found"})
+    
+    @staticmethod
+    def _endpoint(path: str) -> str:
+        """Classify a request path."""
+        if LISTAGEM_PATTERN.search(path):
+            return "listagem"
+        if RESULTADOS_PATTERN.search(path):
+            return "resultados"
+        if ITENS_PATTERN.search(path):
+            return "itens"
+        return "outro"
+    
+    def _responder(self, request: httpx.Request, status: int, json=None, headers=None) -> httpx.Response:
+        """Build a response and count its status."""
+        self.respostas[status] += 1
+        return httpx.Response(status, json=json, headers=headers, request=request)
+    
+    def _listagem(self, params: httpx.QueryParams) -> Dict:
+        """Build one listing page."""
+        codigo = params.get("codigoMunicipioIbge")
+        pagina = int(params.get("pagina", 1))
+        tamanho = int(params.get("tamanhoPagina", 50))
+        janela = f"{params.get('dataInicial', '')}{params.get('dataFinal', '')}"
+        
+        codigos = [codigo] if codigo else self.codigos_ibge
+        total = sum(self.volume.get(c, self.licitacoes_por_consulta) for c in codigos if c in self.codigos_ibge)
+        total_paginas = max(1, math.ceil(total / tamanho))
+        
+        inicio = (pagina - 1) * tamanho
+        registros = [
+            self._licitacao(codigos, indice, janela)
+            for indice in range(inicio, min(inicio + tamanho, total))
+        ]
+        self.registros_servidos += len(registros)
+        return {
+            "data": registros,
+            "totalRegistros": total,
+            "totalPaginas": total_paginas,
+            "numeroPagina": pagina,
+            "paginasRestantes": max(0, total_paginas - pagina),
+            "empty": not registros,
+            "hasNext": pagina < total_paginas
+        }
+    
+    def _licitacao(self, codigos: List[str], indice: int, janela: str) -> Dict:
+        """Build a synthetic bidding."""
+        codigo = codigos[indice % len(codigos)]
+        # Unique per (window, position), and stable across runs
+        sequencial = (zlib.crc32(janela.encode()) % 100000) * 100000 + indice + 1
+        cnpj = f"{int(codigo):08d}000100"[:14]
+        return {
+            "numeroControlePNCP": f"{cnpj}-1-{sequencial:010d}/2024",
+            "sequencialCompra": sequencial,
+            "numeroCompra": f"{sequencial}/2024",
+            "processo": f"PROC-{sequencial}",
+            "anoCompra": 2024,
+            "orgaoEntidade": {"cnpj": cnpj, "razaoSocial": f"Prefeitura {codigo}", "poderId": "E", "esferaId": "M"},
+            "unidadeOrgao": {"codigoUnidade": "1", "nomeUnidade": "Administração", "codigoIbge": codigo},
+            "modalidadeId": 6,
+            "modalidadeNome": "Pregão - Eletrônico",
+            "objetoCompra": f"Aquisição de materiais diversos, lote {indice}",
+            "srp": indice % 2 == 0,
+            "dataPublicacaoPncp": "2024-03-01T09:00:00",
+            "dataAtualizacao": "2024-03-10T10:00:00",
+            "valorTotalEstimado": 1000.0 + indice,
+            "existeResultado": True
+        }
+    
+    def _item(self, numero: int) -> Dict:
+        """Build a synthetic item."""
+        return {
+            "numeroItem": numero,
+            "materialOuServico": "M",
+            "descricao": f"Item {numero}",
+            "quantidade": 10,
+            "unidadeMedida": "UN",
+            "valorUnitarioEstimado": 12.5,
+            "valorTotal": 125.0,
+            "temResultado": True
+        }
+    
+    def _resultado(self, match: re.Match, sequencial: int) -> Dict:
+        """Build a synthetic result."""
+        numero_item = int(match["numero_item"])
+        return {
+            "sequencialResultado": sequencial,
+            "dataResultado": "2024-04-01",
+            "niFornecedor": f"{11222333000100 + numero_item * 10 + sequencial:014d}",
+            "nomeRazaoSocialFornecedor": f"Fornecedor {numero_item}-{sequencial}",
+            "tipoPessoa": "PJ",
+            "quantidadeHomologada": 10,
+            "valorUnitarioHomologado": 11.9,
+            "valorTotalHomologado": 119.0
+        }
@@ -5,6 +5,7 @@ from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch
 
 from src.api.main import app
+from src.database.pagination import Page
 from src.models import Municipio, Licitacao
 
 
@@ -33,11 +34,12 @@ class TestLicitacoesAPI:
     def test_list_licitacoes(self, client):
         """Test listing biddings."""
         with patch('src.api.routes.licitacoes.LicitacaoRepository') as mock_repo:
-            mock_repo.return_value.get_all.return_value = []
+            mock_repo.return_value.get_page.return_value = Page([], next_cursor="abc")
             
             response = client.get("/api/v1/licitacoes/")
             assert response.status_code == 200
             assert isinstance(response.json(), list)
+            assert response.headers["X-Next-Cursor"] == "abc"
     
     def test_count_licitacoes(self, client):
         """Test counting biddings."""
@@ -64,3 +66,10 @@ class TestHealthEndpoints:
         response = client.get("/health")
         assert response.status_code == 200
         assert response.json()["status"] == "healthy"
+    
+    def test_health_coleta(self, client):
+        """Test collection health endpoint."""
+        response = client.get("/health/coleta")
+        assert response.status_code == 200
+        assert response.json()["status"] in ("healthy", "degraded")
+        assert isinstance(response.json()["hosts"], dict)
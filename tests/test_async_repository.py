@@ -0,0 +1,102 @@
+"""Tests for the async database layer."""
+
+import inspect
+import pytest
+
+from src.database.connection import async_database_url
+from src.database.repositories import AsyncLicitacaoRepository, AsyncMunicipioRepository
+
+
+class SyncBackedSession:
+    """Stand-in for AsyncSession.run_sync over a sync session."""
+    
+    def __init__(self, session):
+        self.session = session
+        self.calls = 0
+    
+    async def run_sync(self, fn, *args, **kwargs):
+        self.calls += 1
+        return fn(self.session, *args, **kwargs)
+
+
+class TestAsyncDatabaseUrl:
+    """Tests for the async engine URL."""
+    
+    def test_sync_drivers_are_swapped(self):
+        """Test converting sync URLs to their async drivers."""
+        assert async_database_url("postgresql://u:p@db:5432/lap") == "postgresql+asyncpg://u:p@db:5432/lap"
+        assert async_database_url("postgresql+psycopg2://u:p@db/lap") == "postgresql+asyncpg://u:p@db/lap"
+        assert async_database_url("sqlite:///lap.db") == "sqlite+aiosqlite:///lap.db"
+    
+    def test_unknown_backend_is_rejected(self):
+        """Test that databases without an async driver fail loudly."""
+        with pytest.raises(ValueError):
+            async_database_url("mssql+pyodbc://u:p@db/lap")
+
+
+class TestAsyncRepository:
+    """Tests for the awaitable repository facade."""
+    
+    @pytest.mark.asyncio
+    async def test_methods_run_through_run_sync(self, db_session, sample_municipio_data):
+        """Test that repository methods become coroutines on the session."""
+        db = SyncBackedSession(db_session)
+        repo = AsyncMunicipioRepository(db)
+        
+        municipio = await repo.create(sample_municipio_data)
+        encontrado = await repo.get_by_codigo_ibge("5208707")
+        
+        assert encontrado.id == municipio.id
+        assert db.calls == 2
+    
+    def test_private_members_are_not_exposed(self, db_session):
+        """Test that only public repository methods are proxied."""
+        repo = AsyncLicitacaoRepository(SyncBackedSession(db_session))
+        
+        with pytest.raises(AttributeError):
+            repo._preparar_upsert
+        with pytest.raises(AttributeError):
+            repo.nao_existe
+    
+    @pytest.mark.asyncio
+    async def test_async_engine_end_to_end(self, tmp_path, sample_licitacao_data):
+        """Test a repository call on a real async engine."""
+        pytest.importorskip("aiosqlite")
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+        from src.models import Base
+        
+        engine = create_async_engine(async_database_url(f"sqlite:///{tmp_path / 'lap.db'}"))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            repo = AsyncLicitacaoRepository(db)
+            await repo.upsert_many([sample_licitacao_data])
+            page = await repo.get_page(count="exact")
+        await engine.dispose()
+        
+        assert (len(page.items), page.total) == (1, 1)
+
+
+class TestRouteHandlers:
+    """Tests for how route handlers reach the database."""
+    
+    def test_async_handlers_do_not_use_the_sync_session(self):
+        """Test that no async def handler depends on the sync Session (it would block the event loop)."""
+        from fastapi.routing import APIRoute
+        from src.api.main import app
+        from src.database.connection import get_db, get_read_db
+        
+        def dependencias(dependant):
+            for sub in dependant.dependencies:
+                yield sub.call
+                yield from dependencias(sub)
+        
+        bloqueantes = [
+            route.path for route in app.routes
+            if isinstance(route, APIRoute)
+            and inspect.iscoroutinefunction(route.endpoint)
+            and {get_db, get_read_db} & set(dependencias(route.dependant))
+        ]
+        
+        assert bloqueantes == []
@@ -1,11 +1,27 @@
 """Tests for collectors."""
 
+import asyncio
+import threading
+import time
+import httpx
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 from datetime import datetime
 
 from src.collectors.pncp_collector import PNCPCollector
 from src.collectors.pncp_resultados_collector import PNCPResultadosCollector
+from src.collectors.http_client import HTTPClientManager, http_client_manager
+from src.collectors.archive import ResponseArchive
+from src.collectors.adaptive import (
+    AIMDConcurrencyLimiter,
+    AdaptiveConcurrencyController,
+    CircuitBreaker,
+    CIRCUITO_ABERTO,
+    CIRCUITO_FECHADO,
+    CIRCUITO_MEIO_ABERTO
+)
+from src.exceptions import CircuitOpenError
+from tests.fake_pncp import FakePNCP
 
 
 class TestPNCPCollector:
@@ -50,6 +66,79 @@ class TestPNCPCollector:
         assert parsed["orgao_cnpj"] == "12345678000190"
         assert parsed["modalidade_id"] == 6
         assert parsed["objeto_compra"] == "Aquisição de materiais"
+    
+    @pytest.mark.asyncio
+    async def test_collect_all_pages_concurrently_in_order(self, collector):
+        """Test concurrent pagination reassembles pages in order and retries failures."""
+        attempts = {}
+        
+        async def fake_request(url, params=None, headers=None):
+            pagina = params["pagina"]
+            attempts[pagina] = attempts.get(pagina, 0) + 1
+            if pagina == 3 and attempts[pagina] == 1:
+                raise Exception("Temporary failure")
+            return {
+                "data": [{"pagina": pagina}],
+                "totalPaginas": 4,
+                "totalRegistros": 4,
+                "hasNext": pagina < 4
+            }
+        
+        collector._make_request = AsyncMock(side_effect=fake_request)
+        
+        data = await collector.collect_all_pages(
+            data_inicial=datetime(2024, 1, 1),
+            data_final=datetime(2024, 1, 31),
+            concurrent=True
+        )
+        
+        assert [d["pagina"] for d in data] == [1, 2, 3, 4]
+        assert attempts == {1: 1, 2: 1, 3: 2, 4: 1}
+    
+    @pytest.mark.asyncio
+    async def test_collect_all_pages_sequential(self, collector):
+        """Test sequential pagination follows hasNext."""
+        async def fake_request(url, params=None, headers=None):
+            pagina = params["pagina"]
+            return {"data": [{"pagina": pagina}], "hasNext": pagina < 3}
+        
+        collector._make_request = AsyncMock(side_effect=fake_request)
+        
+        data = await collector.collect_all_pages(
+            data_inicial=datetime(2024, 1, 1),
+            data_final=datetime(2024, 1, 31),
+            concurrent=False
+        )
+        
+        assert [d["pagina"] for d in data] == [1, 2, 3]
+    
+    @pytest.mark.asyncio
+    async def test_iter_pages_bounds_requests_in_flight(self, collector):
+        """Test that streamed pagination never exceeds the page concurrency."""
+        em_andamento = 0
+        pico = 0
+        
+        async def fake_request(url, params=None, headers=None):
+            nonlocal em_andamento, pico
+            em_andamento += 1
+            pico = max(pico, em_andamento)
+            await asyncio.sleep(0.01)
+            em_andamento -= 1
+            return {"data": [{"pagina": params["pagina"]}], "totalPaginas": 12}
+        
+        collector._make_request = AsyncMock(side_effect=fake_request)
+        
+        with patch('config.settings.settings.PNCP_PAGE_CONCURRENCY', 3):
+            paginas = [
+                pagina[0]["pagina"]
+                async for pagina in collector.iter_pages(
+                    data_inicial=datetime(2024, 1, 1),
+                    data_final=datetime(2024, 1, 31)
+                )
+            ]
+        
+        assert sorted(paginas) == list(range(1, 13))
+        assert pico <= 3
 
 
 class TestPNCPResultadosCollector:
@@ -97,3 +186,306 @@ class TestPNCPResultadosCollector:
         assert parsed["nome_razao_social_fornecedor"] == "Fornecedor XYZ Ltda"
         assert parsed["quantidade_homologada"] == 100
         assert parsed["valor_total_homologado"] == 2400.00
+    
+    @pytest.mark.asyncio
+    async def test_collect_all_itens_and_resultados_partial_failure(self, collector):
+        """Test that results are fetched per item and failures are reported per item."""
+        async def fake_request(url, params=None, headers=None):
+            if url.endswith("/itens"):
+                return [{"numeroItem": 1}, {"numeroItem": 2}, {"numeroItem": 3}]
+            if "/itens/2/" in url:
+                raise Exception("Timeout")
+            return [{"sequencialResultado": 1}]
+        
+        collector._make_request = AsyncMock(side_effect=fake_request)
+        
+        data = await collector.collect_all_itens_and_resultados("12345678000190", 2024, "1")
+        
+        items = data["items_with_results"]
+        assert [i["item"]["numeroItem"] for i in items] == [1, 2, 3]
+        assert items[0]["resultados"] == [{"sequencialResultado": 1}]
+        assert items[1]["resultados"] == []
+        assert items[1]["erro"] == "Timeout"
+        assert data["errors"] == [{"numero_item": 2, "erro": "Timeout"}]
+
+
+class TestHTTPClientManager:
+    """Tests for the shared HTTP client manager."""
+    
+    @pytest.mark.asyncio
+    async def test_reuses_client_within_loop(self):
+        """Test that the same pooled client is returned within an event loop."""
+        manager = HTTPClientManager()
+        
+        first = manager.get_async_client()
+        second = manager.get_async_client()
+        
+        assert first is second
+        await manager.aclose()
+        assert first.is_closed
+    
+    @pytest.mark.asyncio
+    async def test_new_client_after_close(self):
+        """Test that a closed client is replaced on next use."""
+        manager = HTTPClientManager()
+        
+        async with manager.lifespan():
+            first = manager.get_async_client()
+        
+        second = manager.get_async_client()
+        assert second is not first
+        assert not second.is_closed
+        await manager.aclose()
+    
+    def test_stale_client_closed_on_loop_change(self):
+        """Test that the client of a finished event loop is closed when replaced."""
+        manager = HTTPClientManager()
+        
+        async def get_client():
+            return manager.get_async_client()
+        
+        async def replace_client():
+            client = manager.get_async_client()
+            await asyncio.sleep(0)
+            return client
+        
+        first = asyncio.run(get_client())
+        second = asyncio.run(replace_client())
+        
+        assert second is not first
+        assert first.is_closed
+        manager.close()
+    
+    def test_sync_client_reused(self):
+        """Test that the sync client is shared and closable."""
+        manager = HTTPClientManager()
+        
+        client = manager.get_sync_client()
+        assert manager.get_sync_client() is client
+        
+        manager.close()
+        assert client.is_closed
+
+
+class TestResponseArchive:
+    """Tests for the raw response archive."""
+    
+    def test_key_ignores_param_order_and_host(self):
+        """Test that the content address depends only on endpoint and params."""
+        archive = ResponseArchive("unused")
+        
+        a = archive.path_for("https://pncp.gov.br/api/consulta/v1/contratacoes/publicacao", {"pagina": 1, "uf": "GO"})
+        b = archive.path_for("http://mirror/api/consulta/v1/contratacoes/publicacao", {"uf": "GO", "pagina": "1"})
+        c = archive.path_for("https://pncp.gov.br/api/consulta/v1/contratacoes/publicacao", {"pagina": 2, "uf": "GO"})
+        
+        assert a == b
+        assert a != c
+        assert a.parent.parent.name == "publicacao"
+    
+    def test_save_and_load_roundtrip(self, tmp_path):
+        """Test that a saved response is read back with its envelope."""
+        archive = ResponseArchive(str(tmp_path))
+        url = "https://pncp.gov.br/api/consulta/v1/orgaos/123/compras/2024/1/itens"
+        
+        path = archive.save(url, None, [{"numeroItem": 1}])
+        envelope = archive.load(url)
+        
+        assert path.name.endswith(".json.gz")
+        assert envelope["endpoint"] == "/orgaos/123/compras/2024/1/itens"
+        assert envelope["payload"] == [{"numeroItem": 1}]
+        assert list(archive.iter_paths(["itens"])) == [path]
+    
+    def test_disabled_archive_writes_nothing(self, tmp_path):
+        """Test that a disabled archive is a no-op."""
+        archive = ResponseArchive(str(tmp_path), enabled=False)
+        
+        assert archive.save("https://pncp.gov.br/x", {}, {"data": []}) is None
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestAdaptiveConcurrency:
+    """Tests for adaptive concurrency limiter and circuit breaker."""
+    
+    def test_limit_grows_while_latency_is_healthy(self):
+        """Test additive increase after a full window of fast successes."""
+        limiter = AIMDConcurrencyLimiter(initial=2, min_limit=1, max_limit=4, target_p95=1.0)
+        
+        for _ in range(2):
+            limiter.record_success(0.1)
+        assert limiter.limit == 3
+        
+        for _ in range(20):
+            limiter.record_success(0.1)
+        assert limiter.limit == 4
+    
+    def test_limit_shrinks_when_latency_is_high(self):
+        """Test that a p95 above target lowers the limit."""
+        limiter = AIMDConcurrencyLimiter(initial=4, min_limit=1, max_limit=8, target_p95=1.0)
+        
+        for _ in range(4):
+            limiter.record_success(2.0)
+        assert limiter.limit < 4
+    
+    def test_overload_halves_limit_once_per_cooldown(self):
+        """Test multiplicative decrease on overload, ignoring bursts."""
+        limiter = AIMDConcurrencyLimiter(initial=8, min_limit=1, max_limit=8, target_p95=1.0)
+        
+        limiter.record_overload()
+        limiter.record_overload()
+        assert limiter.limit == 4
+        assert limiter.sobrecargas == 2
+    
+    def test_fixed_limit_when_not_adaptive(self):
+        """Test that a non-adaptive limiter stays at its maximum."""
+        limiter = AIMDConcurrencyLimiter(
+            initial=2, min_limit=1, max_limit=6, target_p95=1.0, adaptive=False
+        )
+        limiter.record_overload()
+        limiter.record_success(9.0)
+        assert limiter.limit == 6
+    
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_free_slot(self):
+        """Test that requests beyond the limit wait for a release."""
+        limiter = AIMDConcurrencyLimiter(initial=1, min_limit=1, max_limit=1, target_p95=1.0)
+        
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        
+        limiter.release()
+        await asyncio.wait_for(waiter, timeout=1)
+        assert limiter.in_flight == 1
+    
+    def test_waiters_on_other_threads_loops_are_woken(self):
+        """Test that a release wakes waiters of event loops running in other threads."""
+        limiter = AIMDConcurrencyLimiter(initial=1, min_limit=1, max_limit=1, target_p95=1.0)
+        asyncio.run(limiter.acquire())
+        
+        async def usar_slot():
+            await limiter.acquire()
+            limiter.release()
+        
+        threads = [threading.Thread(target=asyncio.run, args=(usar_slot(),), daemon=True) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        prazo = time.monotonic() + 1
+        while len(limiter._waiters) < 2 and time.monotonic() < prazo:
+            time.sleep(0.01)
+        assert len(limiter._waiters) == 2
+        
+        limiter.release()
+        for thread in threads:
+            thread.join(timeout=2)
+        assert not any(thread.is_alive() for thread in threads)
+        assert limiter.in_flight == 0
+    
+    def test_breaker_opens_and_recovers_with_probe(self):
+        """Test open after consecutive failures, then a single half-open probe."""
+        breaker = CircuitBreaker(failure_threshold=2, open_seconds=0)
+        
+        breaker.record_failure()
+        assert breaker.estado == CIRCUITO_FECHADO
+        breaker.record_failure()
+        assert breaker.estado == CIRCUITO_ABERTO
+        
+        breaker.check("pncp.gov.br")
+        assert breaker.estado == CIRCUITO_MEIO_ABERTO
+        with pytest.raises(CircuitOpenError):
+            breaker.check("pncp.gov.br")
+        
+        breaker.record_success()
+        assert breaker.estado == CIRCUITO_FECHADO
+        breaker.check("pncp.gov.br")
+    
+    def test_breaker_rejects_while_open(self):
+        """Test that an open circuit fails fast with a retry hint."""
+        breaker = CircuitBreaker(failure_threshold=1, open_seconds=60)
+        breaker.record_failure()
+        
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.check("pncp.gov.br")
+        assert exc_info.value.retry_after > 0
+    
+    @pytest.mark.asyncio
+    async def test_slot_classifies_outcomes(self):
+        """Test that server errors feed back as overload and 404s do not."""
+        controller = AdaptiveConcurrencyController()
+        url = "https://pncp.gov.br/api/consulta/v1/contratacoes/publicacao"
+        request = httpx.Request("GET", url)
+        
+        for status in (404, 503):
+            response = httpx.Response(status, request=request)
+            with pytest.raises(httpx.HTTPStatusError):
+                async with controller.slot(url):
+                    response.raise_for_status()
+        
+        async with controller.slot(url):
+            pass
+        
+        estado = controller.snapshot()["pncp.gov.br"]
+        assert estado["concorrencia"]["sobrecargas"] == 1
+        assert estado["concorrencia"]["sucessos"] == 2
+        assert estado["concorrencia"]["em_andamento"] == 0
+        assert estado["circuito"]["falhas_consecutivas"] == 0
+
+
+class TestFakePNCP:
+    """Tests for the local PNCP stand-in used by the ingest benchmarks."""
+    
+    @pytest.mark.asyncio
+    async def test_collector_pages_through_fake(self):
+        """Test that the collectors read every page served by the fake."""
+        fake = FakePNCP(["5208707"], licitacoes_por_consulta=120)
+        collector = PNCPCollector()
+        
+        with fake.mounted():
+            registros = []
+            async for page in collector.iter_pages(
+                datetime(2024, 3, 1), datetime(2024, 3, 31), codigo_municipio_ibge="5208707"
+            ):
+                registros.extend(page)
+            await http_client_manager.aclose()
+        
+        assert len(registros) == 120
+        assert len({r["numeroControlePNCP"] for r in registros}) == 120
+        assert all(r["unidadeOrgao"]["codigoIbge"] == "5208707" for r in registros)
+        assert fake.requests["listagem"] == fake.total_requests
+    
+    @pytest.mark.asyncio
+    async def test_items_and_results_served(self):
+        """Test item and result endpoints of the fake."""
+        fake = FakePNCP(["5208707"], itens_por_licitacao=2, resultados_por_item=1)
+        collector = PNCPResultadosCollector()
+        
+        with fake.mounted():
+            data = await collector.collect_all_itens_and_resultados("52087070001000", 2024, "1")
+            await http_client_manager.aclose()
+        
+        assert len(data["items_with_results"]) == 2
+        assert all(len(i["resultados"]) == 1 for i in data["items_with_results"])
+        assert fake.requests == {"itens": 1, "resultados": 2}
+    
+    @pytest.mark.asyncio
+    async def test_injects_rate_limit_responses(self):
+        """Test 429 injection with a Retry-After header."""
+        fake = FakePNCP(["5208707"], taxa_429=1.0)
+        
+        async with httpx.AsyncClient(transport=fake.transport()) as client:
+            response = await client.get("https://pncp.gov.br/api/consulta/v1/contratacoes/publicacao")
+        
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "0"
+        assert fake.respostas[429] == 1
+    
+    def test_unmount_restores_network_client(self):
+        """Test that leaving the fake drops the transport-bound client."""
+        manager = HTTPClientManager()
+        fake = FakePNCP(["5208707"])
+        
+        with fake.mounted(manager):
+            assert manager._transport is not None
+        
+        assert manager._transport is None
+        assert manager._async_client is None
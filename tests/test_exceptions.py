@@ -10,6 +10,7 @@ from src.exceptions import (
     AuthorizationError,
     NotFoundError,
     ExternalAPIError,
+    CircuitOpenError,
     ConfigurationError
 )
 
@@ -137,6 +138,18 @@ class TestExternalAPIError:
         assert exc.status_code == 429
 
 
+class TestCircuitOpenError:
+    """Tests for circuit open error."""
+    
+    def test_circuit_open_error(self):
+        """Test circuit open error is an external API error."""
+        exc = CircuitOpenError("Circuit open", api="pncp.gov.br", retry_after=12.5)
+        assert isinstance(exc, ExternalAPIError)
+        assert exc.code == "CIRCUIT_OPEN"
+        assert exc.api == "pncp.gov.br"
+        assert exc.retry_after == 12.5
+
+
 class TestConfigurationError:
     """Tests for configuration error."""
     
@@ -0,0 +1,75 @@
+"""Tests for compiled field-mapping specs."""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from src.utils.field_spec import EntitySpec, Field, json_loads, to_bool, to_decimal, to_int
+from src.utils.pncp_specs import LICITACAO_SPEC, RESULTADO_SPEC
+
+
+class TestEntitySpec:
+    """Tests for entity spec compilation and coercion."""
+    
+    SPEC = EntitySpec("teste", [
+        Field("codigo", "codigo", to_int),
+        Field("cnpj", ("orgao", "cnpj"), column=False),
+        Field("valor", "valor", to_decimal),
+        Field("ativo", "ativo", to_bool, default=False)
+    ])
+    
+    def test_parse_maps_nested_keys_and_coerces(self):
+        """Test that one call maps, walks nested objects and coerces types."""
+        parsed = self.SPEC.parse({"codigo": "7", "orgao": {"cnpj": "123"}, "valor": 10.1})
+        
+        assert parsed == {"codigo": 7, "cnpj": "123", "valor": Decimal("10.1"), "ativo": False}
+    
+    def test_parse_tolerates_missing_and_null_objects(self):
+        """Test that missing or null nested objects yield None."""
+        assert self.SPEC.parse({"orgao": None})["cnpj"] is None
+        assert self.SPEC.parse({})["codigo"] is None
+    
+    def test_rows_follow_column_order(self):
+        """Test that row tuples only carry table columns, in order."""
+        parsed = self.SPEC.parse_many([{"codigo": 1, "ativo": "S"}, {"codigo": 2, "valor": "3.50"}])
+        
+        assert self.SPEC.columns == ("codigo", "valor", "ativo")
+        assert self.SPEC.rows(parsed) == [(1, None, True), (2, Decimal("3.50"), False)]
+    
+    def test_coerce_is_idempotent(self):
+        """Test that coercing already-typed values keeps them."""
+        dados = {"codigo": 5, "valor": Decimal("1.00"), "outro": "x"}
+        assert self.SPEC.coerce(dict(dados)) == dados
+    
+    def test_json_loads_accepts_bytes(self):
+        """Test decoding raw response bodies."""
+        assert json_loads(b'{"data": [1, 2]}') == {"data": [1, 2]}
+
+
+class TestPNCPSpecs:
+    """Tests for the PNCP entity specs."""
+    
+    def test_licitacao_spec_types(self):
+        """Test that bidding dates, values and flags are typed when parsed."""
+        parsed = LICITACAO_SPEC.parse({
+            "sequencialCompra": 12,
+            "dataAtualizacao": "2024-03-10T10:00:00",
+            "valorTotalEstimado": 50000.5,
+            "srp": True,
+            "unidadeOrgao": {"codigoIbge": 5208707}
+        })
+        
+        assert parsed["sequencial_compra"] == "12"
+        assert parsed["data_atualizacao"] == datetime(2024, 3, 10, 10, 0)
+        assert parsed["valor_total_estimado"] == Decimal("50000.5")
+        assert parsed["srp"] is True
+        assert parsed["existe_resultado"] is False
+        assert parsed["codigo_ibge"] == "5208707"
+        assert "codigo_ibge" not in LICITACAO_SPEC.columns
+    
+    def test_resultado_spec_separates_supplier_fields(self):
+        """Test that supplier fields are parsed but not part of the result row."""
+        parsed = RESULTADO_SPEC.parse({"dataResultado": "2024-05-02", "niFornecedor": "11222333000181"})
+        
+        assert parsed["data_resultado"] == date(2024, 5, 2)
+        assert parsed["ni_fornecedor"] == "11222333000181"
+        assert "ni_fornecedor" not in RESULTADO_SPEC.model_values(parsed)
@@ -0,0 +1,69 @@
+"""Tests for the ingest identity resolver."""
+
+from src.models import Fornecedor, Orgao
+from src.services.identity_resolver import fornecedor_resolver, orgao_resolver
+
+
+class TestIdentityResolver:
+    """Tests for cached natural-key resolution."""
+    
+    def test_preloaded_keys_are_resolved_from_cache(self, db_session):
+        """Test that known keys need no insert."""
+        orgao = Orgao(cnpj="11111111000111", razao_social="Prefeitura A")
+        db_session.add(orgao)
+        db_session.commit()
+        resolver = orgao_resolver()
+        
+        ids = resolver.resolver(db_session, {"11111111000111": {"razao_social": "Prefeitura A"}})
+        
+        assert ids == {"11111111000111": orgao.id}
+        assert resolver.stats() == {"em_cache": 1, "acertos": 1, "criados": 0}
+    
+    def test_misses_are_created_in_one_batch(self, db_session):
+        """Test creating missing rows, keeping each row's attributes."""
+        resolver = orgao_resolver()
+        
+        ids = resolver.resolver(db_session, {
+            "11111111000111": {"razao_social": "Prefeitura A"},
+            "22222222000122": {"razao_social": "Prefeitura B", "esfera_id": "M"}
+        })
+        
+        assert len(ids) == 2
+        assert db_session.get(Orgao, ids["22222222000122"]).esfera_id == "M"
+        assert resolver.stats()["criados"] == 2
+        
+        # Second lookup is a cache hit
+        assert resolver.resolver_um(db_session, "22222222000122", razao_social="B") == ids["22222222000122"]
+        assert db_session.query(Orgao).count() == 2
+    
+    def test_misses_are_inserted_in_key_order(self, db_session):
+        """Test that new keys are inserted sorted, whatever order they arrive in."""
+        resolver = orgao_resolver()
+        
+        ids = resolver.resolver(db_session, {
+            cnpj: {"razao_social": cnpj} for cnpj in ("33333333000133", "11111111000111", "22222222000122")
+        })
+        
+        assert sorted(ids, key=ids.get) == ["11111111000111", "22222222000122", "33333333000133"]
+    
+    def test_rows_created_by_another_worker(self, db_session):
+        """Test that keys created after the preload are read instead of duplicated."""
+        resolver = fornecedor_resolver()
+        resolver.carregar(db_session)
+        
+        outro = Fornecedor(cnpj_cpf="11222333000144", razao_social="Fornecedor X")
+        db_session.add(outro)
+        db_session.commit()
+        
+        fornecedor_id = resolver.resolver_um(db_session, "11.222.333/0001-44", razao_social="Fornecedor X")
+        
+        assert fornecedor_id == outro.id
+        assert db_session.query(Fornecedor).count() == 1
+        assert resolver.stats()["criados"] == 0
+    
+    def test_empty_keys_are_ignored(self, db_session):
+        """Test that records without a document are left unresolved."""
+        resolver = fornecedor_resolver()
+        
+        assert resolver.resolver(db_session, {"": {"razao_social": "?"}}) == {}
+        assert resolver.resolver_um(db_session, None, razao_social="?") is None
@@ -0,0 +1,92 @@
+"""Tests for the streaming ingest pipeline."""
+
+import asyncio
+import threading
+import pytest
+
+from src.services.ingest_pipeline import IngestPipeline
+
+
+async def gerar_paginas(total, por_pagina=3, produzidas=None):
+    """Yield ``total`` pages of integer records."""
+    for pagina in range(total):
+        if produzidas is not None:
+            produzidas.append(pagina)
+        yield [pagina * por_pagina + i for i in range(por_pagina)]
+
+
+class TestIngestPipeline:
+    """Tests for fetch/parse/write pipeline."""
+    
+    @pytest.mark.asyncio
+    async def test_parses_batches_and_writes_everything(self):
+        """Test that every parsed record reaches the writer in bounded batches."""
+        lotes = []
+        
+        def write(lote):
+            lotes.append(lote)
+            return len(lote)
+        
+        pipeline = IngestPipeline(
+            parse=lambda r: None if r % 5 == 0 else r * 10,
+            write=write,
+            batch_size=4,
+            offload_writes=False
+        )
+        stats = await pipeline.run(gerar_paginas(5))
+        
+        gravados = [r for lote in lotes for r in lote]
+        assert gravados == [r * 10 for r in range(15) if r % 5 != 0]
+        assert all(len(lote) <= 4 for lote in lotes)
+        assert stats['paginas'] == 5
+        assert stats['registros'] == 15
+        assert stats['descartados'] == 3
+        assert stats['gravados'] == 12
+        assert stats['etapas']['write']['itens'] == 12
+    
+    @pytest.mark.asyncio
+    async def test_backpressure_limits_pages_in_flight(self):
+        """Test that a slow writer stops the fetch stage from running ahead."""
+        produzidas = []
+        liberar = threading.Event()
+        
+        def write(lote):
+            liberar.wait(timeout=5)
+            return len(lote)
+        
+        pipeline = IngestPipeline(parse=lambda r: r, write=write, queue_size=1, batch_size=3)
+        tarefa = asyncio.ensure_future(pipeline.run(gerar_paginas(50, produzidas=produzidas)))
+        await asyncio.sleep(0.1)
+        
+        # Only the pages held by the bounded queues and stages were pulled
+        assert len(produzidas) < 10
+        
+        liberar.set()
+        stats = await tarefa
+        assert stats['gravados'] == 150
+    
+    @pytest.mark.asyncio
+    async def test_writer_error_cancels_pipeline(self):
+        """Test that a failing stage stops the other stages and re-raises."""
+        def write(lote):
+            raise RuntimeError("database down")
+        
+        pipeline = IngestPipeline(parse=lambda r: r, write=write, batch_size=1, offload_writes=False)
+        
+        with pytest.raises(RuntimeError):
+            await pipeline.run(gerar_paginas(100))
+    
+    @pytest.mark.asyncio
+    async def test_offloaded_writes_run_in_thread(self):
+        """Test that writes can be offloaded to a worker thread."""
+        threads = set()
+        
+        def write(lote):
+            threads.add(threading.get_ident())
+            return len(lote)
+        
+        pipeline = IngestPipeline(parse=lambda r: r, write=write, offload_writes=True)
+        stats = await pipeline.run(gerar_paginas(3))
+        
+        assert stats['gravados'] == 9
+        assert threading.get_ident() not in threads
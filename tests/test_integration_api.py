@@ -8,7 +8,7 @@ from unittest.mock import patch
 
 from src.api.main import app
 from src.models import Base
-from src.database.connection import get_db
+from src.database.connection import get_db, get_read_db
 
 
 @pytest.fixture(scope="function")
@@ -40,6 +40,7 @@ def client(test_db):
             db.close()
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     
     # Mock init_db to prevent production DB connection attempts during tests
     with patch('src.api.main.init_db'):
@@ -193,6 +194,33 @@ class TestAnomaliaAPIIntegration:
             assert isinstance(data, dict)
             assert 'items' in data
             assert isinstance(data['items'], list)
+    
+    def test_page_anomalies_by_cursor(self, client, test_db):
+        """Test walking the anomaly list with next_cursor."""
+        from src.models import Anomalia
+        
+        db = test_db()
+        db.add_all([Anomalia(tipo="preco_elevado", status="pendente") for _ in range(5)])
+        db.commit()
+        db.close()
+        
+        ids, cursor = [], None
+        for _ in range(5):
+            url = "/api/v1/anomalias/?per_page=2" + (f"&cursor={cursor}" if cursor else "")
+            data = client.get(url).json()
+            ids.extend(item['id'] for item in data['items'])
+            assert (data['total'], data['total_exact']) == (5, True)
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        
+        assert sorted(ids, reverse=True) == ids and len(set(ids)) == 5
+        assert client.get("/api/v1/anomalias/?cursor=%%%").status_code == 400
+        
+        # Deprecated OFFSET pages stop at API_MAX_OFFSET rows
+        with patch('config.settings.settings.API_MAX_OFFSET', 2):
+            assert [i['id'] for i in client.get("/api/v1/anomalias/?page=2&per_page=2").json()['items']] == ids[2:4]
+            assert client.get("/api/v1/anomalias/?page=3&per_page=2").status_code == 400
 
 
 class TestEstatisticasAPIIntegration:
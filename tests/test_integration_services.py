@@ -1,13 +1,26 @@
 """Integration tests for services layer."""
 
+import asyncio
 import pytest
-from unittest.mock import Mock, MagicMock, patch
+from contextlib import contextmanager
+from unittest.mock import Mock, MagicMock, AsyncMock, patch
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from src.models import Base, Municipio, Licitacao, Orgao, AlertaConfiguracao
+from config.settings import settings
+from src.collectors.archive import ResponseArchive
+from src.exceptions import DataCollectionError
+from src.models import (
+    Base, Municipio, Licitacao, Orgao, Item, Resultado, Fornecedor, AlertaConfiguracao, ColetaEstado, BackfillShard,
+    TarefaColeta
+)
 from src.services.alerta_service import AlertaService
+from src.services.backfill_service import BackfillService
+from src.services.coleta_service import ColetaService
+from src.services.replay_service import ReplayService
+from src.services.work_queue_service import ColetaWorker, WorkQueueService
+from src.utils.constants import PNCP_CONTRATACOES_ATUALIZACAO_ENDPOINT
 
 
 @pytest.fixture
@@ -139,6 +152,461 @@ class TestAlertaServiceIntegration:
         assert len(configs) == 3
 
 
+def mock_pages(service, paginas):
+    """Make the service's collector stream the given pages."""
+    async def iter_pages(**kwargs):
+        for pagina in paginas:
+            yield pagina
+    
+    service.pncp_collector.iter_pages = MagicMock(side_effect=iter_pages)
+
+
+@pytest.fixture
+def coleta_service(db_session):
+    """Create a collection service bound to the test database."""
+    @contextmanager
+    def test_db_context():
+        yield db_session
+    
+    # In-memory SQLite connections cannot be shared with a writer thread
+    with patch('src.services.coleta_service.get_db_context', test_db_context), \
+            patch('src.services.backfill_service.get_db_context', test_db_context), \
+            patch('src.services.work_queue_service.get_db_context', test_db_context), \
+            patch('config.settings.settings.INGEST_OFFLOAD_WRITES', False):
+        service = ColetaService()
+        mock_pages(service, [[
+            {
+                "numeroControlePNCP": "01612092000123-1-000001/2024",
+                "anoCompra": 2024,
+                "sequencialCompra": 1,
+                "orgaoEntidade": {"cnpj": "01612092000123", "razaoSocial": "Prefeitura"},
+                "objetoCompra": "Aquisição de materiais",
+                "dataAtualizacao": "2024-03-10T10:00:00"
+            }
+        ]])
+        yield service
+
+
+class TestColetaServiceIntegration:
+    """Integration tests for collection service."""
+    
+    @pytest.mark.asyncio
+    async def test_full_collection_records_watermark(self, db_session, sample_municipio, coleta_service):
+        """Test that a full collection stores the window and watermark."""
+        count = await coleta_service.collect_licitacoes_for_municipio("5208707", years=1)
+        
+        assert count == 1
+        estado = db_session.query(ColetaEstado).filter_by(municipio_id=sample_municipio.id).one()
+        assert estado.modo == "completa"
+        assert estado.max_data_atualizacao == datetime(2024, 3, 10, 10, 0)
+    
+    @pytest.mark.asyncio
+    async def test_incremental_collection_uses_delta_window(self, db_session, sample_municipio, coleta_service):
+        """Test that incremental collection only requests the window since the watermark."""
+        janela_fim = datetime.now() - timedelta(hours=6)
+        db_session.add(ColetaEstado(
+            municipio_id=sample_municipio.id,
+            janela_inicio=janela_fim - timedelta(days=730),
+            janela_fim=janela_fim,
+            max_data_atualizacao=janela_fim - timedelta(hours=1),
+            modo="completa"
+        ))
+        db_session.commit()
+        
+        await coleta_service.collect_incremental_for_municipio("5208707", overlap_days=1)
+        
+        kwargs = coleta_service.pncp_collector.iter_pages.call_args.kwargs
+        assert kwargs["data_inicial"] == janela_fim - timedelta(days=1)
+        assert kwargs["endpoint"] == PNCP_CONTRATACOES_ATUALIZACAO_ENDPOINT
+        assert kwargs["strict"] is True
+        
+        estado = db_session.query(ColetaEstado).filter_by(municipio_id=sample_municipio.id).one()
+        assert estado.modo == "incremental"
+        assert estado.max_data_atualizacao == janela_fim - timedelta(hours=1)
+    
+    @pytest.mark.asyncio
+    async def test_failed_incremental_window_keeps_watermark(self, db_session, sample_municipio, coleta_service):
+        """Test that a page given up on aborts the window without moving the watermark."""
+        janela_fim = datetime.now() - timedelta(hours=6)
+        db_session.add(ColetaEstado(
+            municipio_id=sample_municipio.id,
+            janela_inicio=janela_fim - timedelta(days=730),
+            janela_fim=janela_fim,
+            modo="completa"
+        ))
+        db_session.commit()
+        
+        async def falha(**kwargs):
+            raise DataCollectionError("Pages [2] could not be collected", source="PNCP")
+            yield
+        
+        coleta_service.pncp_collector.iter_pages = MagicMock(side_effect=falha)
+        
+        with pytest.raises(DataCollectionError):
+            await coleta_service.collect_incremental_for_municipio("5208707")
+        
+        estado = db_session.query(ColetaEstado).filter_by(municipio_id=sample_municipio.id).one()
+        assert estado.janela_fim == janela_fim
+        assert estado.modo == "completa"
+    
+    @pytest.mark.asyncio
+    async def test_incremental_without_state_falls_back_to_full(self, db_session, sample_municipio, coleta_service):
+        """Test that municipalities without a watermark get a sharded full backfill."""
+        await coleta_service.collect_incremental_for_municipio("5208707", years=2)
+        
+        shards = db_session.query(BackfillShard).filter_by(municipio_id=sample_municipio.id).all()
+        assert len(shards) == coleta_service.pncp_collector.iter_pages.call_count
+        assert min(s.janela_inicio for s in shards) <= datetime.now() - timedelta(days=730)
+        assert all(s.status == "concluido" for s in shards)
+        assert all(c.kwargs["strict"] is True for c in coleta_service.pncp_collector.iter_pages.call_args_list)
+    
+    @pytest.mark.asyncio
+    async def test_backfill_resumes_only_unfinished_shards(self, db_session, sample_municipio, coleta_service):
+        """Test that an interrupted backfill only re-runs the shards that did not finish."""
+        backfill = BackfillService(coleta_service)
+        backfill.planejar(years=1, granularidade="mes")
+        shards = db_session.query(BackfillShard).order_by(BackfillShard.janela_inicio).all()
+        for shard in shards[:-2]:
+            shard.status = "concluido"
+        shards[-1].status = "executando"  # left behind by a killed run
+        db_session.commit()
+        
+        stats = await backfill.executar(paralelismo=2)
+        
+        assert stats['shards_executados'] == 2
+        assert coleta_service.pncp_collector.iter_pages.call_count == 2
+        assert stats['municipios_concluidos'] == 1
+        assert db_session.query(ColetaEstado).filter_by(municipio_id=sample_municipio.id).one().modo == "completa"
+        
+        # Planning again (e.g. on the next run) creates no duplicate shards
+        assert backfill.planejar(years=1, granularidade="mes") == 0
+    
+    def test_finished_open_window_is_reopened(self, db_session, sample_municipio, coleta_service):
+        """Test that a current-window shard finished mid-window is extended and run again."""
+        backfill = BackfillService(coleta_service)
+        backfill.planejar(years=1, granularidade="mes")
+        shards = db_session.query(BackfillShard).order_by(BackfillShard.janela_inicio).all()
+        for shard in shards:
+            shard.status = "concluido"
+        atual = shards[-1]
+        atual.janela_fim = atual.janela_inicio
+        db_session.commit()
+        
+        assert backfill.planejar(years=1, granularidade="mes") == 0
+        
+        db_session.refresh(atual)
+        assert atual.status == "pendente"
+        assert atual.janela_fim > atual.janela_inicio
+        assert db_session.query(BackfillShard).filter_by(status="pendente").count() == 1
+    
+    @pytest.mark.asyncio
+    async def test_failed_shard_is_checkpointed_as_error(self, db_session, sample_municipio, coleta_service):
+        """Test that a failing shard is recorded and blocks the watermark."""
+        async def falha(**kwargs):
+            raise DataCollectionError("Pages [2] could not be collected", source="PNCP")
+            yield
+        
+        coleta_service.pncp_collector.iter_pages = MagicMock(side_effect=falha)
+        
+        stats = await BackfillService(coleta_service).backfill(years=1, granularidade="mes", codigos_ibge=["5208707"])
+        
+        assert stats['shards_com_erro'] == stats['shards_executados']
+        assert stats['municipios_concluidos'] == 0
+        shard = db_session.query(BackfillShard).first()
+        assert shard.status == "erro" and shard.tentativas == 1
+        assert db_session.query(ColetaEstado).count() == 0
+    
+    @pytest.mark.asyncio
+    async def test_collect_all_runs_municipalities_concurrently_by_volume(self, db_session, sample_licitacao, coleta_service):
+        """Test volume ordering, overlap and per-municipality statistics."""
+        for codigo, nome, distancia in [("5201405", "Aparecida de Goiânia", 18), ("5200050", "Abadia de Goiás", 30)]:
+            db_session.add(Municipio(codigo_ibge=codigo, municipio=nome, uf="GO", distancia_km=distancia))
+        db_session.commit()
+        
+        iniciados = []
+        em_andamento = [0, 0]
+        
+        async def coletar(codigo_ibge, years):
+            iniciados.append(codigo_ibge)
+            em_andamento[0] += 1
+            em_andamento[1] = max(em_andamento[1], em_andamento[0])
+            await asyncio.sleep(0.01)
+            em_andamento[0] -= 1
+            if codigo_ibge == "5200050":
+                raise RuntimeError("timeout")
+            return 3
+        
+        coleta_service.collect_incremental_for_municipio = AsyncMock(side_effect=coletar)
+        stats = await coleta_service.collect_all_municipios(years=1, incremental=True, concorrencia=2)
+        
+        # Goiânia has stored biddings, then the closest municipality first
+        assert iniciados == ["5208707", "5201405", "5200050"]
+        assert em_andamento[1] == 2
+        assert stats['total_licitacoes'] == 6
+        assert stats['errors'] == 1
+        assert stats['municipios']["5200050"]['erro'] == "timeout"
+        assert stats['municipios']["5208707"]['duracao_s'] >= 0
+    
+    def test_route_by_municipio_drops_records_outside_radius(self):
+        """Test that UF-wide records are grouped by codigoIbge and out-of-radius ones dropped."""
+        registros = [
+            {"numeroControlePNCP": "a", "unidadeOrgao": {"codigoIbge": "5208707"}},
+            {"numeroControlePNCP": "b", "unidadeOrgao": {"codigoIbge": "5300108"}},
+            {"numeroControlePNCP": "c", "unidadeOrgao": {"codigoIbge": "5208707"}},
+            {"numeroControlePNCP": "d"}
+        ]
+        
+        grupos, descartados = ColetaService.route_by_municipio(registros, {"5208707", "5201405"})
+        
+        assert [r["numeroControlePNCP"] for r in grupos["5208707"]] == ["a", "c"]
+        assert "5201405" not in grupos
+        assert descartados == 2
+    
+    @pytest.mark.asyncio
+    async def test_uf_sweep_routes_records_and_records_state(self, db_session, sample_municipio, coleta_service):
+        """Test that a UF sweep issues one UF-wide query and stores records per municipality."""
+        outro = Municipio(codigo_ibge="5201405", municipio="Aparecida de Goiânia", uf="GO", distancia_km=10)
+        db_session.add(outro)
+        db_session.commit()
+        mock_pages(coleta_service, [[
+            {
+                "numeroControlePNCP": "01612092000123-1-000001/2024",
+                "orgaoEntidade": {"cnpj": "01612092000123", "razaoSocial": "Prefeitura"},
+                "unidadeOrgao": {"codigoIbge": "5208707"},
+                "dataAtualizacao": "2024-03-10T10:00:00"
+            },
+            {
+                "numeroControlePNCP": "99999999000199-1-000001/2024",
+                "orgaoEntidade": {"cnpj": "99999999000199", "razaoSocial": "Prefeitura distante"},
+                "unidadeOrgao": {"codigoIbge": "5300108"},
+                "dataAtualizacao": "2024-03-11T10:00:00"
+            }
+        ]])
+        
+        stats = await coleta_service.collect_all_municipios(years=1, sweep=True)
+        
+        coleta_service.pncp_collector.iter_pages.assert_called_once()
+        assert coleta_service.pncp_collector.iter_pages.call_args.kwargs["codigo_municipio_ibge"] is None
+        assert stats["total_licitacoes"] == 1
+        assert stats["registros_descartados"] == 1
+        assert stats["total_municipios"] == 2
+        
+        estados = {e.municipio_id: e for e in db_session.query(ColetaEstado).all()}
+        assert estados[sample_municipio.id].max_data_atualizacao == datetime(2024, 3, 10, 10, 0)
+        assert estados[outro.id].total_registros == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_uf_sweep_records_no_state(self, db_session, sample_municipio, coleta_service):
+        """Test that a full sweep with a page given up on aborts without recording windows."""
+        async def falha(**kwargs):
+            assert kwargs["strict"] is True
+            raise DataCollectionError("Pages [7] could not be collected", source="PNCP")
+            yield
+        
+        coleta_service.pncp_collector.iter_pages = MagicMock(side_effect=falha)
+        
+        with pytest.raises(DataCollectionError):
+            await coleta_service.collect_uf_sweep(years=1)
+        
+        assert db_session.query(ColetaEstado).count() == 0
+    
+    
+    def test_only_changed_biddings_are_rewritten_and_queued(self, db_session, sample_municipio, coleta_service):
+        """Test change detection on re-collection and the refresh queued for changed biddings."""
+        raw = {
+            "numeroControlePNCP": "01612092000123-1-000001/2024",
+            "anoCompra": 2024,
+            "sequencialCompra": 1,
+            "orgaoEntidade": {"cnpj": "01612092000123", "razaoSocial": "Prefeitura"},
+            "situacaoCompraNome": "Divulgada",
+            "existeResultado": False,
+            "dataAtualizacao": "2024-03-10T10:00:00"
+        }
+        parse = coleta_service.pncp_collector.parse_licitacao
+        
+        assert coleta_service._save_licitacoes(db_session, sample_municipio, [parse(raw)])[0] == 1
+        assert coleta_service._save_licitacoes(db_session, sample_municipio, [parse(raw)])[0] == 0
+        assert db_session.query(TarefaColeta).count() == 0
+        
+        homologada = {**raw, "situacaoCompraNome": "Homologada", "existeResultado": True,
+                      "dataAtualizacao": "2024-04-02T08:00:00"}
+        assert coleta_service._save_licitacoes(db_session, sample_municipio, [parse(homologada)])[0] == 1
+        
+        licitacao = db_session.query(Licitacao).one()
+        db_session.refresh(licitacao)
+        assert licitacao.existe_resultado is True
+        tarefas = {t.chave: t for t in db_session.query(TarefaColeta)}
+        assert set(tarefas) == {f"itens:{licitacao.id}", f"anomalias:{licitacao.id}"}
+        
+        # A later change reopens the finished refresh
+        for tarefa in tarefas.values():
+            tarefa.status = "concluida"
+        db_session.commit()
+        revogada = {**homologada, "situacaoCompraNome": "Revogada", "dataAtualizacao": "2024-05-01T08:00:00"}
+        coleta_service._save_licitacoes(db_session, sample_municipio, [parse(revogada)])
+        assert {t.status for t in db_session.query(TarefaColeta)} == {"pendente"}
+
+class TestReplayServiceIntegration:
+    """Integration tests for offline archive replay."""
+    
+    @staticmethod
+    def arquivar_listagem(archive, objeto):
+        """Archive a listing page with one in-radius and one out-of-radius bidding."""
+        archive.save(f"{settings.PNCP_BASE_URL}/contratacoes/publicacao", {"pagina": 1}, {"data": [
+            {
+                "numeroControlePNCP": "01612092000123-1-000001/2024",
+                "anoCompra": 2024,
+                "sequencialCompra": 1,
+                "orgaoEntidade": {"cnpj": "01612092000123", "razaoSocial": "Prefeitura"},
+                "unidadeOrgao": {"codigoIbge": "5208707"},
+                "objetoCompra": objeto
+            },
+            {
+                "numeroControlePNCP": "99999999000199-1-000001/2024",
+                "orgaoEntidade": {"cnpj": "99999999000199", "razaoSocial": "Prefeitura distante"},
+                "unidadeOrgao": {"codigoIbge": "5300108"}
+            }
+        ]})
+    
+    def test_replay_rebuilds_tables_from_archive(self, db_session, sample_municipio, tmp_path):
+        """Test that replay rebuilds biddings, items and results and is idempotent."""
+        archive = ResponseArchive(str(tmp_path))
+        compra = f"{settings.PNCP_BASE_URL}/orgaos/01612092000123/compras/2024/1"
+        self.arquivar_listagem(archive, "Versão 1")
+        archive.save(f"{compra}/itens", None, [{"numeroItem": 1, "descricao": "Papel A4"}])
+        archive.save(f"{compra}/itens/1/resultados", None, [{
+            "sequencialResultado": 1,
+            "niFornecedor": "11222333000181",
+            "nomeRazaoSocialFornecedor": "Fornecedor"
+        }])
+        
+        @contextmanager
+        def test_db_context():
+            yield db_session
+        
+        with patch('src.services.replay_service.get_db_context', test_db_context):
+            stats = ReplayService(archive).replay(workers=1)
+            
+            assert stats['arquivos'] == 3
+            assert stats['licitacoes'] == 1
+            assert stats['itens'] == 1
+            assert stats['resultados'] == 1
+            assert stats['ignorados'] == 1
+            
+            # A parser fix shows up after replaying again, without duplicates
+            self.arquivar_listagem(archive, "Versão 2")
+            ReplayService(archive).replay(workers=1)
+        
+        licitacao = db_session.query(Licitacao).one()
+        assert licitacao.objeto_compra == "Versão 2"
+        assert db_session.query(Item).filter_by(licitacao_id=licitacao.id).count() == 1
+        assert db_session.query(Resultado).count() == 1
+
+
+class TestWorkQueueIntegration:
+    """Integration tests for the lease-based collection work queue."""
+    
+    @pytest.mark.asyncio
+    async def test_workers_drain_backfill_queue(self, db_session, sample_municipio, coleta_service):
+        """Test that several workers run every window once and record the watermark."""
+        enfileiradas = WorkQueueService(BackfillService(coleta_service)).enfileirar_backfill(years=1)
+        assert enfileiradas == db_session.query(BackfillShard).count()
+        assert WorkQueueService().enfileirar_backfill(years=1) == 0
+        
+        stats_a = await ColetaWorker("worker-a", coleta_service).run(concorrencia=2, max_tarefas=3)
+        stats_b = await ColetaWorker("worker-b", coleta_service).run(concorrencia=2)
+        
+        assert stats_a['tarefas_concluidas'] == 3
+        assert stats_a['tarefas_concluidas'] + stats_b['tarefas_concluidas'] == enfileiradas
+        assert db_session.query(TarefaColeta).filter(TarefaColeta.status != "concluida").count() == 0
+        assert db_session.query(Licitacao).count() == 1
+        estado = db_session.query(ColetaEstado).filter_by(municipio_id=sample_municipio.id).one()
+        assert estado.max_data_atualizacao == datetime(2024, 3, 10, 10, 0)
+    
+    @pytest.mark.asyncio
+    async def test_failed_unit_is_retried(self, db_session, sample_licitacao, coleta_service):
+        """Test that a failing unit goes back to the queue until attempts run out."""
+        assert WorkQueueService().enfileirar_itens() == 1
+        coleta_service.collect_itens_and_resultados = AsyncMock(side_effect=RuntimeError("PNCP down"))
+        
+        stats = await ColetaWorker("worker-a", coleta_service, max_tentativas=2).run(concorrencia=1)
+        
+        assert stats['tarefas_com_erro'] == 2
+        tarefa = db_session.query(TarefaColeta).one()
+        assert tarefa.status == "erro"
+        assert tarefa.erro == "PNCP down"
+        coleta_service.collect_itens_and_resultados.assert_awaited_with(sample_licitacao.id, substituir=True)
+    
+    @pytest.mark.asyncio
+    async def test_failed_results_fetch_keeps_stored_results(self, db_session, sample_licitacao, coleta_service):
+        """Test that an item whose results could not be fetched keeps them and the task is retried."""
+        fornecedor = Fornecedor(cnpj_cpf="11222333000181", razao_social="Fornecedor")
+        for numero in (1, 2):
+            item = Item(licitacao_id=sample_licitacao.id, numero_item=numero, descricao="Papel A4")
+            db_session.add(Resultado(item=item, fornecedor=fornecedor, sequencial_resultado=1, valor_total_homologado=10))
+        db_session.commit()
+        
+        async def fetch_resultados(cnpj, ano, sequencial, numero_item):
+            if numero_item == 2:
+                raise RuntimeError("Timeout")
+            return [{
+                "sequencialResultado": 1,
+                "niFornecedor": "11222333000181",
+                "nomeRazaoSocialFornecedor": "Fornecedor",
+                "valorTotalHomologado": 20
+            }]
+        
+        coletor = coleta_service.resultados_collector
+        coletor.collect_itens = AsyncMock(return_value=[
+            {"numeroItem": numero, "descricao": "Papel A4"} for numero in (1, 2)
+        ])
+        coletor._fetch_resultados = AsyncMock(side_effect=fetch_resultados)
+        ColetaService._enfileirar_alteradas(db_session, [sample_licitacao.id])
+        
+        stats = await ColetaWorker("worker-a", coleta_service, tipos=["itens"], max_tentativas=1).run(concorrencia=1)
+        
+        assert stats['tarefas_com_erro'] == 1
+        valores = {r.item.numero_item: float(r.valor_total_homologado) for r in db_session.query(Resultado)}
+        assert valores == {1: 20.0, 2: 10.0}
+    
+    @pytest.mark.asyncio
+    async def test_items_fetch_holds_no_session(self, db_session, sample_licitacao, coleta_service):
+        """Test that no database session is open while the items and results are fetched."""
+        abertas = []
+        
+        @contextmanager
+        def tracked_db_context():
+            abertas.append(db_session)
+            try:
+                yield db_session
+            finally:
+                abertas.pop()
+        
+        async def collect_all(cnpj, ano, sequencial):
+            assert abertas == []
+            return {'items_with_results': [{'item': {"numeroItem": 1, "descricao": "Papel A4"}, 'resultados': []}]}
+        
+        coleta_service.resultados_collector.collect_all_itens_and_resultados = AsyncMock(side_effect=collect_all)
+        with patch('src.services.coleta_service.get_db_context', tracked_db_context):
+            stats = await coleta_service.collect_itens_and_resultados(sample_licitacao.id)
+        
+        assert stats['itens'] == 1
+        assert db_session.query(Item).filter_by(licitacao_id=sample_licitacao.id).count() == 1
+    
+    @pytest.mark.asyncio
+    async def test_anomaly_reanalysis_task(self, db_session, sample_licitacao, coleta_service):
+        """Test that queued anomaly re-analysis runs in the worker."""
+        ColetaService._enfileirar_alteradas(db_session, [sample_licitacao.id])
+        
+        stats = await ColetaWorker("worker-a", coleta_service, tipos=["anomalias"]).run(concorrencia=1)
+        
+        assert stats['tarefas_concluidas'] == 1
+        tarefa = db_session.query(TarefaColeta).filter_by(tipo="anomalias").one()
+        assert tarefa.status == "concluida"
+        assert tarefa.resultado == {"anomalias": 0}
+        assert db_session.query(TarefaColeta).filter_by(tipo="itens").one().status == "pendente"
+
+
 class TestServiceWithMockedExternalAPIs:
     """Test services with mocked external API calls."""
     
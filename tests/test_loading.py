@@ -0,0 +1,114 @@
+"""Tests for eager-loading profiles and the batched analysis loops."""
+
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+from src.database.loading import LICITACAO_COMPLETA, LICITACAO_LISTA
+from src.database.repositories import LicitacaoRepository
+from src.models import (
+    AlertaConfiguracao, AlertaDisparado, Anomalia, Fornecedor, Item, Licitacao, Resultado
+)
+from src.services.alerta_service import AlertaService
+from src.services.anomalia_service import AnomaliaService
+
+
+@contextmanager
+def contar_selects(db):
+    """Count the SELECT statements run on the session's engine."""
+    selects = []
+    
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+    
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        yield selects
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+
+
+def _criar_licitacoes(db, quantidade, itens_por_licitacao=3):
+    """Create recent biddings with a short deadline, items and one supplier each."""
+    publicacao = datetime.now() - timedelta(days=1)
+    for n in range(quantidade):
+        licitacao = Licitacao(
+            numero_controle_pncp=f"0000000000000{n:07d}",
+            objeto_compra=f"Objeto {n}",
+            data_publicacao_pncp=publicacao,
+            data_abertura_proposta=publicacao + timedelta(days=2)
+        )
+        fornecedor = Fornecedor(cnpj_cpf=f"{n:014d}", razao_social=f"Fornecedor {n}")
+        for numero in range(1, itens_por_licitacao + 1):
+            item = Item(licitacao=licitacao, numero_item=numero, descricao=f"Item {numero}")
+            db.add(Resultado(item=item, fornecedor=fornecedor))
+        db.add(licitacao)
+    db.commit()
+    db.expunge_all()
+
+
+class TestLoadingProfiles:
+    """Tests for the named loading profiles."""
+    
+    def test_list_profile_refuses_lazy_loads(self, db_session):
+        """Test that list views cannot trigger hidden relationship queries."""
+        _criar_licitacoes(db_session, 2)
+        
+        page = LicitacaoRepository(db_session).get_page(profile=LICITACAO_LISTA)
+        
+        assert len(page.items) == 2
+        with pytest.raises(InvalidRequestError):
+            page.items[0].itens
+    
+    @pytest.mark.parametrize("itens", [1, 5])
+    def test_full_profile_runs_fixed_queries(self, db_session, itens):
+        """Test that a full bidding graph loads in the same queries however many items it has."""
+        _criar_licitacoes(db_session, 1, itens_por_licitacao=itens)
+        
+        with contar_selects(db_session) as selects:
+            licitacao = LicitacaoRepository(db_session).get_by_id(1, profile=LICITACAO_COMPLETA)
+            fornecedores = {r.fornecedor.razao_social for i in licitacao.itens for r in i.resultados}
+        
+        assert fornecedores == {"Fornecedor 0"}
+        assert len(selects) == 3
+
+
+class TestBatchedLoops:
+    """Tests for the batched anomaly and alert loops."""
+    
+    @pytest.mark.parametrize("licitacoes", [2, 6])
+    def test_anomaly_analysis_query_count(self, db_session, licitacoes):
+        """Test that the analysis does not query once per bidding."""
+        _criar_licitacoes(db_session, licitacoes)
+        
+        with contar_selects(db_session) as selects:
+            anomalias = AnomaliaService(db_session).executar_analise_completa()
+        
+        assert len(anomalias) == 2 * licitacoes
+        assert len(selects) == 4
+        
+        # Re-running stores nothing new
+        AnomaliaService(db_session).executar_analise_completa()
+        assert db_session.query(Anomalia).count() == 2 * licitacoes
+    
+    def test_periodic_check_loads_configurations_once(self, db_session):
+        """Test that pending alerts and their configurations come from one query."""
+        _criar_licitacoes(db_session, 4)
+        for n in range(4):
+            config = AlertaConfiguracao(
+                nome=f"Alerta {n}", tipo="palavra_chave",
+                canal_notificacao="email" if n % 2 else "telegram", destinatario="x@example.com"
+            )
+            db_session.add(AlertaDisparado(configuracao=config, licitacao_id=n + 1, mensagem="m"))
+        db_session.commit()
+        db_session.expunge_all()
+        
+        with contar_selects(db_session) as selects:
+            AlertaService(db_session).executar_verificacao_periodica()
+        
+        assert len(selects) == 1
+        assert db_session.query(AlertaDisparado).filter_by(enviado=True).count() == 4
@@ -0,0 +1,148 @@
+"""Tests for the monthly partitioning helpers."""
+
+import pytest
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from src.database import partitioning
+from src.database.partitioning import (
+    add_months, conflict_key, create_partitions, is_partitioned, maintain_partitions, partition_window
+)
+from src.database.repositories import ItemRepository, LicitacaoRepository
+from src.models import Fornecedor, Item, Licitacao, Resultado
+from src.services.analise_precos_service import AnalisePrecoService
+
+
+@pytest.fixture
+def licitacao(db_session):
+    """Stored bidding published in March 2024."""
+    licitacao = Licitacao(numero_controle_pncp="1", data_publicacao_pncp=datetime(2024, 3, 15))
+    db_session.add(licitacao)
+    db_session.commit()
+    return licitacao
+
+
+class TestPartitioning:
+    """Tests for partition helpers."""
+    
+    def test_add_months(self):
+        """Test month arithmetic across year boundaries."""
+        assert add_months(date(2024, 11, 20), 3) == date(2025, 2, 1)
+        assert add_months(date(2024, 1, 31), -1) == date(2023, 12, 1)
+        assert add_months(date(2024, 5, 2), 0) == date(2024, 5, 1)
+    
+    def test_unpartitioned_database(self, db_session):
+        """Test that SQLite keeps the plain natural keys and creates nothing."""
+        assert not is_partitioned(db_session)
+        assert conflict_key(db_session, ("numero_controle_pncp",)) == ("numero_controle_pncp",)
+        assert create_partitions(db_session) == []
+    
+    def test_partitioned_conflict_key(self, db_session, monkeypatch):
+        """Test that upserts name the partition key on partitioned databases."""
+        monkeypatch.setitem(partitioning._particionado, db_session.get_bind(), True)
+        
+        assert conflict_key(db_session, ("licitacao_id", "numero_item")) == (
+            "licitacao_id", "numero_item", "data_publicacao_pncp"
+        )
+    
+    def test_partitioning_is_rechecked(self, db_session, monkeypatch):
+        """Test that a cached answer expires and is dropped by partition maintenance."""
+        engine = db_session.get_bind()
+        assert not is_partitioned(db_session)
+        
+        monkeypatch.setitem(partitioning._particionado, engine, True)
+        assert is_partitioned(db_session)
+        monkeypatch.setattr(partitioning, "PARTITIONED_CHECK_INTERVAL", 0)
+        assert not is_partitioned(db_session)
+        
+        partitioning._particionado[engine] = True
+        maintain_partitions(db_session)
+        assert partitioning._particionado[engine] is False
+    
+    def test_conflict_target_error_drops_cache(self, db_session, monkeypatch):
+        """Test that an ON CONFLICT key rejected by PostgreSQL makes the next upsert re-check."""
+        engine = db_session.get_bind()
+        monkeypatch.setitem(partitioning._particionado, engine, False)
+        erro = type("ProgrammingError", (Exception,), {"pgcode": partitioning.INVALID_CONFLICT_TARGET})()
+        
+        partitioning._conflict_target_error(SimpleNamespace(original_exception=erro, engine=engine))
+        
+        assert engine not in partitioning._particionado
+    
+    def test_partition_window(self, db_session, monkeypatch):
+        """Test that the pruning filters are only added on partitioned databases."""
+        desde = datetime(2024, 1, 1)
+        assert partition_window(db_session, desde, Item.data_publicacao_pncp) == []
+        
+        monkeypatch.setitem(partitioning._particionado, db_session.get_bind(), True)
+        filtros = partition_window(db_session, desde, Item.data_publicacao_pncp, Resultado.data_publicacao_pncp)
+        assert [str(filtro) for filtro in filtros] == [
+            "itens.data_publicacao_pncp >= :data_publicacao_pncp_1",
+            "resultados.data_publicacao_pncp >= :data_publicacao_pncp_1",
+        ]
+    
+    def test_items_without_copy_still_counted(self, db_session):
+        """Test that unpartitioned databases keep items whose partition key copy is NULL."""
+        licitacao = Licitacao(numero_controle_pncp="1", data_publicacao_pncp=datetime.now())
+        db_session.add_all([
+            Item(licitacao=licitacao, numero_item=numero, descricao="Papel A4", valor_unitario_estimado=valor)
+            for numero, valor in ((1, 10), (2, 20))
+        ])
+        db_session.commit()
+        # Rows written before migration 018 have no copy of the date
+        db_session.query(Item).update({Item.data_publicacao_pncp: None})
+        db_session.commit()
+        
+        service = AnalisePrecoService(db_session)
+        assert service.calcular_estatisticas_item("Papel")['total_registros'] == 2
+        assert len(service.historico_precos_timeline("Papel")) == 2
+
+
+class TestPartitionedUpsert:
+    """Tests for bidding upserts on partitioned databases."""
+    
+    def test_changed_publication_date_held(self, db_session, licitacao, monkeypatch):
+        """Test that re-ingesting a bidding with another date (or none) stores no second copy."""
+        monkeypatch.setitem(partitioning._particionado, db_session.get_bind(), True)
+        
+        stats = LicitacaoRepository(db_session).upsert_many([
+            {"numero_controle_pncp": "1", "data_publicacao_pncp": datetime(2024, 4, 2)},
+            {"numero_controle_pncp": "2", "data_inclusao": datetime(2024, 4, 2)},
+        ])
+        
+        assert stats['retidos'] == 2
+        assert stats['inseridos'] == 0
+        assert db_session.query(Licitacao.numero_controle_pncp, Licitacao.data_publicacao_pncp).all() == [
+            ("1", datetime(2024, 3, 15))
+        ]
+    
+    def test_same_publication_date_written(self, db_session, licitacao):
+        """Test that biddings re-sent with their stored date are not held."""
+        rows = [
+            {"numero_controle_pncp": "1", "data_publicacao_pncp": datetime(2024, 3, 15)},
+            {"numero_controle_pncp": "2", "data_publicacao_pncp": datetime(2024, 4, 2)},
+        ]
+        
+        assert LicitacaoRepository(db_session)._reter_fora_da_particao(rows) == (rows, 0)
+
+
+class TestPartitionKeyCopy:
+    """Tests for copying the bidding's publication date to items and results."""
+    
+    def test_orm_inserts(self, db_session, licitacao):
+        """Test that ORM-created items and results get the partition key."""
+        item = Item(licitacao_id=licitacao.id, numero_item=1, descricao="Item")
+        fornecedor = Fornecedor(cnpj_cpf="11222333000144", razao_social="Fornecedor X")
+        db_session.add(Resultado(item=item, fornecedor=fornecedor))
+        db_session.commit()
+        
+        assert item.data_publicacao_pncp == datetime(2024, 3, 15)
+        assert item.resultados[0].data_publicacao_pncp == datetime(2024, 3, 15)
+    
+    def test_bulk_item_creation(self, db_session, licitacao):
+        """Test that bulk-saved items (no mapper events) get the partition key."""
+        ItemRepository(db_session).create_bulk([
+            {"licitacao_id": licitacao.id, "numero_item": numero, "descricao": "Item"} for numero in (1, 2)
+        ])
+        
+        assert {d for d, in db_session.query(Item.data_publicacao_pncp)} == {datetime(2024, 3, 15)}
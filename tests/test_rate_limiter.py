@@ -0,0 +1,54 @@
+"""Tests for the token bucket rate limiter."""
+
+import time
+import pytest
+
+from src.utils.rate_limiter import TokenBucketRateLimiter
+
+
+class TestTokenBucketRateLimiter:
+    """Tests for token bucket rate limiter."""
+    
+    @pytest.mark.asyncio
+    async def test_burst_does_not_wait(self):
+        """Test that requests within the burst are not delayed."""
+        limiter = TokenBucketRateLimiter(rate=1.0, capacity=5)
+        
+        start = time.monotonic()
+        for _ in range(5):
+            await limiter.acquire()
+        
+        assert time.monotonic() - start < 0.1
+    
+    @pytest.mark.asyncio
+    async def test_waits_when_bucket_empty(self):
+        """Test that requests beyond the burst are spaced by the rate."""
+        limiter = TokenBucketRateLimiter(rate=20.0, capacity=1)
+        
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        
+        assert time.monotonic() - start >= 0.09
+    
+    @pytest.mark.asyncio
+    async def test_pause_delays_next_acquire(self):
+        """Test that pause blocks all callers for the given time."""
+        limiter = TokenBucketRateLimiter(rate=100.0, capacity=10)
+        limiter.pause(0.1)
+        
+        start = time.monotonic()
+        await limiter.acquire()
+        
+        assert time.monotonic() - start >= 0.09
+    
+    def test_disabled_limiter(self):
+        """Test that a zero rate disables limiting."""
+        limiter = TokenBucketRateLimiter(rate=0, capacity=1)
+        
+        start = time.monotonic()
+        for _ in range(100):
+            limiter.acquire_sync()
+        
+        assert not limiter.enabled
+        assert time.monotonic() - start < 0.1
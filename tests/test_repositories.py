@@ -1,8 +1,19 @@
 """Tests for database repositories."""
 
 import pytest
-from src.database.repositories import MunicipioRepository, LicitacaoRepository
-from src.models import Municipio, Licitacao, Orgao
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import postgresql
+
+from src.database.repositories import (
+    MunicipioRepository,
+    LicitacaoRepository,
+    ItemResultadoLoader,
+    TarefaColetaRepository
+)
+from src.database.pagination import _Explain
+from src.database.repositories.item_resultado_loader import _copy_value
+from src.exceptions import ValidationError
+from src.models import Municipio, Licitacao, Orgao, TarefaColeta, Item, Resultado, Fornecedor
 
 
 class TestMunicipioRepository:
@@ -65,3 +76,258 @@ class TestLicitacaoRepository:
         
         count = repo.count()
         assert count == 1
+    
+    def test_upsert_many_inserts_and_updates(self, db_session, sample_licitacao_data):
+        """Test bulk upsert counts, keyed on the control number."""
+        repo = LicitacaoRepository(db_session)
+        repo.create(dict(sample_licitacao_data))
+        
+        novo = {**sample_licitacao_data, "numero_controle_pncp": "99999999999999999999"}
+        alterado = {**sample_licitacao_data, "situacao_compra_nome": "Revogada"}
+        stats = repo.upsert_many([novo, alterado])
+        
+        assert (stats["inseridos"], stats["atualizados"], stats["inalterados"]) == (1, 1, 0)
+        assert repo.count() == 2
+        licitacao = repo.get_by_numero_controle("12345678901234567890")
+        db_session.refresh(licitacao)
+        assert licitacao.situacao_compra_nome == "Revogada"
+        assert stats["ids_atualizados"] == [licitacao.id]
+        assert licitacao.conteudo_hash
+    
+    def test_upsert_many_skips_unchanged_content(self, db_session, sample_licitacao_data):
+        """Test that re-reading the same content writes nothing."""
+        repo = LicitacaoRepository(db_session)
+        repo.upsert_many([dict(sample_licitacao_data)])
+        
+        stats = repo.upsert_many([dict(sample_licitacao_data)])
+        
+        assert (stats["inseridos"], stats["atualizados"], stats["inalterados"]) == (0, 0, 1)
+        assert stats["ids_atualizados"] == []
+    
+    def test_upsert_many_keeps_newer_stored_version(self, db_session, sample_licitacao_data):
+        """Test that an older data_atualizacao does not overwrite a newer one."""
+        repo = LicitacaoRepository(db_session)
+        repo.upsert_many([{**sample_licitacao_data, "data_atualizacao": "2024-03-10T10:00:00"}])
+        antiga = {**sample_licitacao_data, "data_atualizacao": "2024-03-01T10:00:00", "processo": "antigo"}
+        
+        assert repo.upsert_many([antiga])["atualizados"] == 0
+        assert repo.upsert_many([antiga], somente_mais_recentes=False)["atualizados"] == 1
+    
+    def test_upsert_many_without_update_skips_existing(self, db_session, sample_licitacao_data):
+        """Test that existing biddings are left untouched when not updating."""
+        repo = LicitacaoRepository(db_session)
+        repo.create(dict(sample_licitacao_data))
+        
+        stats = repo.upsert_many([{**sample_licitacao_data, "situacao_compra_nome": "Revogada"}], atualizar=False)
+        
+        assert (stats["inseridos"], stats["atualizados"], stats["inalterados"]) == (0, 0, 1)
+        assert repo.get_by_numero_controle("12345678901234567890").situacao_compra_nome == "Homologada"
+    
+    def test_upsert_many_deduplicates_keys(self, db_session, sample_licitacao_data):
+        """Test that the last row wins when a key repeats in a batch."""
+        repo = LicitacaoRepository(db_session)
+        
+        stats = repo.upsert_many([
+            {**sample_licitacao_data, "processo": "A"},
+            {**sample_licitacao_data, "processo": "B"}
+        ], chunk_size=1)
+        
+        assert (stats["inseridos"], stats["atualizados"]) == (1, 0)
+        assert repo.get_by_numero_controle("12345678901234567890").processo == "B"
+    
+    def test_search_page_walks_all_rows_by_cursor(self, db_session, sample_licitacao_data):
+        """Test keyset pages with tied and missing publication dates."""
+        repo = LicitacaoRepository(db_session)
+        datas = [datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 2), None, None, datetime(2024, 1, 3)]
+        repo.upsert_many([
+            {**sample_licitacao_data, "numero_controle_pncp": f"PNCP-{i}", "data_publicacao_pncp": data}
+            for i, data in enumerate(datas)
+        ])
+        
+        vistos, cursor = [], None
+        while True:
+            page = repo.get_page(cursor=cursor, limit=4 if cursor is None else 1)
+            vistos.extend(page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        
+        assert len({licitacao.id for licitacao in vistos}) == len(datas)
+        # Newest first, undated biddings ahead (NULLs sort as the largest value)
+        assert [licitacao.data_publicacao_pncp for licitacao in vistos][:3] == [None, None, datetime(2024, 1, 3)]
+        assert repo.get_all(limit=100) == vistos
+    
+    def test_search_page_totals(self, db_session, sample_licitacao_data):
+        """Test exact totals capped at the count limit."""
+        repo = LicitacaoRepository(db_session)
+        repo.upsert_many([
+            {**sample_licitacao_data, "numero_controle_pncp": f"PNCP-{i}"} for i in range(5)
+        ])
+        
+        page = repo.search_page(limit=2, count="exact", count_limit=10, modalidade_id=6)
+        assert (len(page.items), page.total, page.total_exact) == (2, 5, True)
+        
+        page = repo.search_page(limit=2, count="exact", count_limit=3)
+        assert (page.total, page.total_exact) == (3, False)
+        
+        # PostgreSQL-only estimates fall back to the capped count
+        assert repo.search_page(count="estimated").total == 5
+        assert repo.search_page(count="none").total is None
+    
+    def test_search_page_rejects_invalid_cursor(self, db_session):
+        """Test that a tampered cursor is a validation error."""
+        with pytest.raises(ValidationError):
+            LicitacaoRepository(db_session).get_page(cursor="not-a-cursor")
+    
+    def test_estimate_explains_with_bound_parameters(self, db_session):
+        """Test that the planner estimate keeps the filter values as bound parameters."""
+        query = db_session.query(Licitacao).filter(
+            Licitacao.modalidade_id.in_([6, 8]), Licitacao.objeto_compra == "x' OR 1=1 --"
+        )
+        
+        compiled = _Explain(query.statement).compile(dialect=postgresql.psycopg2.dialect())
+        
+        assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT")
+        assert "OR 1=1" not in str(compiled)
+        assert compiled.params["objeto_compra_1"] == "x' OR 1=1 --"
+
+
+class TestItemResultadoLoader:
+    """Tests for the bulk item/result loader."""
+    
+    @pytest.fixture
+    def licitacao_id(self, db_session, sample_licitacao_data):
+        """Stored bidding and supplier."""
+        db_session.add(Fornecedor(id=1, cnpj_cpf="11222333000144", razao_social="Fornecedor X"))
+        db_session.commit()
+        return LicitacaoRepository(db_session).create(sample_licitacao_data).id
+    
+    @staticmethod
+    def item(licitacao_id, numero, descricao="Item"):
+        """Build a parsed item."""
+        return {"licitacao_id": licitacao_id, "numero_item": numero, "descricao": descricao}
+    
+    @staticmethod
+    def resultado(licitacao_id, numero, sequencial=1, valor=10):
+        """Build a parsed result of supplier 1."""
+        return {
+            "licitacao_id": licitacao_id, "numero_item": numero, "fornecedor_id": 1,
+            "sequencial_resultado": sequencial, "valor_total_homologado": valor
+        }
+    
+    def test_reloading_updates_without_duplicates(self, db_session, licitacao_id):
+        """Test that items and results are merged on their natural keys."""
+        loader = ItemResultadoLoader(db_session)
+        loader.carregar([self.item(licitacao_id, 1), self.item(licitacao_id, 2)], [self.resultado(licitacao_id, 1)])
+        
+        stats = loader.carregar(
+            [self.item(licitacao_id, 1, "Item revisado")],
+            [self.resultado(licitacao_id, 1, valor=20), self.resultado(licitacao_id, 9)]
+        )
+        
+        assert (stats["itens"], stats["resultados"], stats["resultados_sem_item"]) == (1, 1, 1)
+        assert db_session.query(Item).count() == 2
+        assert db_session.query(Item).filter_by(numero_item=1).one().descricao == "Item revisado"
+        assert [float(r.valor_total_homologado) for r in db_session.query(Resultado)] == [20.0]
+    
+    def test_substituir_drops_stale_rows(self, db_session, licitacao_id):
+        """Test that a replacing load removes items and results PNCP dropped."""
+        loader = ItemResultadoLoader(db_session)
+        loader.carregar(
+            [self.item(licitacao_id, 1), self.item(licitacao_id, 2)],
+            [self.resultado(licitacao_id, 1, 1), self.resultado(licitacao_id, 1, 2), self.resultado(licitacao_id, 2)]
+        )
+        
+        # Results are not part of this load: the kept item keeps them
+        loader.carregar([self.item(licitacao_id, 1)], None, substituir=True)
+        assert [i.numero_item for i in db_session.query(Item)] == [1]
+        assert db_session.query(Resultado).count() == 2
+        
+        stats = loader.carregar([self.item(licitacao_id, 1)], [self.resultado(licitacao_id, 1, 2)], substituir=True)
+        assert stats["removidos"] == 1
+        assert [r.sequencial_resultado for r in db_session.query(Resultado)] == [2]
+    
+    def test_rows_carry_the_publication_date(self, db_session, sample_licitacao_data):
+        """Test that loaded items and results copy their bidding's partition key."""
+        publicacao = datetime(2024, 3, 15, 10, 0)
+        db_session.add(Fornecedor(id=1, cnpj_cpf="11222333000144", razao_social="Fornecedor X"))
+        licitacao_id = LicitacaoRepository(db_session).create(
+            {**sample_licitacao_data, "data_publicacao_pncp": publicacao}
+        ).id
+        
+        ItemResultadoLoader(db_session).carregar([self.item(licitacao_id, 1)], [self.resultado(licitacao_id, 1)])
+        
+        assert db_session.query(Item.data_publicacao_pncp).scalar() == publicacao
+        assert db_session.query(Resultado.data_publicacao_pncp).scalar() == publicacao
+    
+    def test_copy_value_escapes_text_format(self):
+        """Test COPY text-format encoding of NULLs, booleans and separators."""
+        assert _copy_value(None) == "\\N"
+        assert _copy_value(True) == "t"
+        assert _copy_value("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+
+
+class TestTarefaColetaRepository:
+    """Tests for collection work queue repository."""
+    
+    TAREFAS = [
+        {'tipo': 'itens', 'chave': 'itens:1', 'parametros': {'licitacao_id': 1}},
+        {'tipo': 'itens', 'chave': 'itens:2', 'parametros': {'licitacao_id': 2}}
+    ]
+    
+    def test_enfileirar_is_idempotent(self, db_session):
+        """Test that enqueueing the same keys twice creates them once."""
+        repo = TarefaColetaRepository(db_session)
+        
+        assert repo.enfileirar(self.TAREFAS) == 2
+        assert repo.enfileirar(self.TAREFAS) == 0
+        assert db_session.query(TarefaColeta).count() == 2
+    
+    def test_reivindicar_hands_each_task_to_one_worker(self, db_session):
+        """Test that claimed tasks are leased to a single worker."""
+        repo = TarefaColetaRepository(db_session)
+        repo.enfileirar(self.TAREFAS)
+        
+        primeira = repo.reivindicar("worker-a", lease_seconds=60)
+        segunda = repo.reivindicar("worker-b", lease_seconds=60)
+        
+        assert {primeira.chave, segunda.chave} == {'itens:1', 'itens:2'}
+        assert repo.reivindicar("worker-c", lease_seconds=60) is None
+        assert primeira.status == "executando"
+        assert primeira.lease_expira_em > datetime.now()
+    
+    def test_only_lease_holder_can_finish(self, db_session):
+        """Test that state changes are guarded by the worker id."""
+        repo = TarefaColetaRepository(db_session)
+        repo.enfileirar(self.TAREFAS[:1])
+        tarefa = repo.reivindicar("worker-a", lease_seconds=60)
+        
+        assert not repo.renovar_lease(tarefa.id, "worker-b", 60)
+        assert not repo.concluir(tarefa.id, "worker-b", {})
+        assert repo.concluir(tarefa.id, "worker-a", {'itens': 3})
+        assert repo.get_by_id(tarefa.id).status == "concluida"
+    
+    def test_expired_leases_are_requeued(self, db_session):
+        """Test that tasks of a dead worker go back to the queue."""
+        repo = TarefaColetaRepository(db_session)
+        repo.enfileirar(self.TAREFAS[:1])
+        tarefa = repo.reivindicar("worker-a", lease_seconds=60)
+        tarefa.lease_expira_em = datetime.now() - timedelta(seconds=1)
+        db_session.commit()
+        
+        assert repo.requeue_expirados(max_tentativas=3) == 1
+        retomada = repo.reivindicar("worker-b", lease_seconds=60)
+        assert retomada.id == tarefa.id
+        assert retomada.tentativas == 2
+        assert not repo.concluir(tarefa.id, "worker-a", {})
+    
+    def test_falhar_retries_then_gives_up(self, db_session):
+        """Test that failed tasks are retried until attempts run out."""
+        repo = TarefaColetaRepository(db_session)
+        repo.enfileirar(self.TAREFAS[:1])
+        
+        tarefa = repo.reivindicar("worker-a", lease_seconds=60)
+        assert repo.falhar(tarefa.id, "worker-a", "boom", max_tentativas=2) == "pendente"
+        tarefa = repo.reivindicar("worker-a", lease_seconds=60)
+        assert repo.falhar(tarefa.id, "worker-a", "boom", max_tentativas=2) == "erro"
+        assert repo.resumo() == {'itens': {'erro': 1}}
@@ -2,10 +2,13 @@
 
 import pytest
 import asyncio
-from unittest.mock import Mock, AsyncMock
+from unittest.mock import Mock, AsyncMock, patch
 from src.utils.retry import (
     retry_with_exponential_backoff,
-    retry_on_http_error
+    retry_on_http_error,
+    retry_with_decorrelated_jitter,
+    decorrelated_jitter,
+    parse_retry_after
 )
 from src.exceptions import ExternalAPIError
 
@@ -214,3 +217,86 @@ class TestRetryOnHTTPError:
         
         assert result == {"data": "success"}
         assert mock_func.call_count == 1
+
+
+
+class FakeHTTPError(Exception):
+    """HTTP error carrying a response, like httpx.HTTPStatusError."""
+    
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = Mock(status_code=status_code, headers=headers or {})
+
+
+class TestRetryWithDecorrelatedJitter:
+    """Tests for retry with decorrelated jitter."""
+    
+    def test_decorrelated_jitter_bounds(self):
+        """Test that jittered delays stay within bounds."""
+        for _ in range(100):
+            delay = decorrelated_jitter(previous_delay=2.0, base_delay=1.0, max_delay=5.0)
+            assert 1.0 <= delay <= 5.0
+    
+    def test_parse_retry_after(self):
+        """Test parsing of Retry-After values."""
+        assert parse_retry_after("12") == 12.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("invalid") is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_honors_retry_after(self):
+        """Test that Retry-After on 429 is used as the delay."""
+        call_count = 0
+        paused = []
+        
+        @retry_with_decorrelated_jitter(
+            max_attempts=3,
+            base_delay=0.01,
+            max_delay=30.0,
+            on_retry_after=paused.append
+        )
+        async def test_func():
+            nonlocal call_count
+            call_count += 1
+            if call_count == 1:
+                raise FakeHTTPError(429, {"Retry-After": "7"})
+            return "success"
+        
+        with patch("src.utils.retry.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            result = await test_func()
+        
+        assert result == "success"
+        mock_sleep.assert_awaited_once_with(7.0)
+        assert paused == [7.0]
+    
+    @pytest.mark.asyncio
+    async def test_retries_network_exceptions(self):
+        """Test that configured exception types are retried."""
+        mock_func = AsyncMock(side_effect=[ConnectionError("reset"), "success"])
+        
+        @retry_with_decorrelated_jitter(
+            max_attempts=3,
+            base_delay=0.01,
+            max_delay=0.02,
+            exceptions=(ConnectionError,)
+        )
+        async def test_func():
+            return await mock_func()
+        
+        assert await test_func() == "success"
+        assert mock_func.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_no_retry_on_client_error(self):
+        """Test that 4xx errors other than 429 are not retried."""
+        mock_func = AsyncMock(side_effect=FakeHTTPError(404))
+        
+        @retry_with_decorrelated_jitter(max_attempts=3, base_delay=0.01)
+        async def test_func():
+            return await mock_func()
+        
+        with pytest.raises(FakeHTTPError):
+            await test_func()
+        
+        assert mock_func.call_count == 1
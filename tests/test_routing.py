@@ -0,0 +1,133 @@
+"""Tests for read-replica routing."""
+
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.routing import ReplicaRouter, RoutingSession
+from src.models import Base, Municipio
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """Primary and two replica databases, each with a distinct municipality."""
+    criados = {}
+    for nome in ("primaria", "replica1", "replica2"):
+        engine = create_engine(f"sqlite:///{tmp_path / nome}.db")
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(Municipio(codigo_ibge=nome[:7], municipio=nome, uf="GO"))
+            db.commit()
+        criados[nome] = engine
+    
+    yield criados
+    
+    for engine in criados.values():
+        engine.dispose()
+
+
+def _sessao(router):
+    return sessionmaker(class_=RoutingSession, router=router)()
+
+
+def _lida_de(db) -> str:
+    return db.query(Municipio.municipio).scalar()
+
+
+class TestReplicaRouter:
+    """Tests for replica selection and health checks."""
+    
+    def test_without_replicas_reads_use_the_primary(self, engines):
+        """Test the primary-only configuration."""
+        router = ReplicaRouter(engines["primaria"])
+        
+        assert _lida_de(_sessao(router)) == "primaria"
+    
+    def test_sessions_are_round_robined(self, engines):
+        """Test spreading sessions over the replicas."""
+        router = ReplicaRouter(engines["primaria"], [engines["replica1"], engines["replica2"]])
+        router.verificar()
+        
+        lidas = [_lida_de(_sessao(router)) for _ in range(4)]
+        
+        assert lidas == ["replica1", "replica2", "replica1", "replica2"]
+    
+    def test_lagging_replica_falls_back_to_primary(self, engines, monkeypatch):
+        """Test that a replica above the lag limit is skipped until it catches up."""
+        router = ReplicaRouter(engines["primaria"], [engines["replica1"]], max_lag=5, check_interval=0)
+        lag = {"s": 60.0}
+        monkeypatch.setattr(ReplicaRouter, "medir_lag", staticmethod(lambda engine: lag["s"]))
+        router.verificar()
+        
+        assert _lida_de(_sessao(router)) == "primaria"
+        assert router.status()[0]["saudavel"] is False
+        
+        lag["s"] = 1.0
+        router.verificar()
+        assert _lida_de(_sessao(router)) == "replica1"
+    
+    def test_unreachable_replica_is_skipped(self, engines, monkeypatch):
+        """Test that a failing health check moves reads to the next replica."""
+        router = ReplicaRouter(engines["primaria"], [engines["replica1"], engines["replica2"]])
+        
+        def medir_lag(engine):
+            if engine is engines["replica1"]:
+                raise ConnectionError("replica1 down")
+            return 0.0
+        
+        monkeypatch.setattr(ReplicaRouter, "medir_lag", staticmethod(medir_lag))
+        router.verificar()
+        
+        assert [_lida_de(_sessao(router)) for _ in range(2)] == ["replica2", "replica2"]
+        assert router.status()[0]["erro"] == "replica1 down"
+    
+    def test_health_check_does_not_block_reads(self, engines, monkeypatch):
+        """Test that sessions never wait for a slow replica check."""
+        router = ReplicaRouter(engines["primaria"], [engines["replica1"]])
+        liberar = threading.Event()
+        
+        def medir_lag(engine):
+            liberar.wait(timeout=5)
+            return 0.0
+        
+        monkeypatch.setattr(ReplicaRouter, "medir_lag", staticmethod(medir_lag))
+        
+        inicio = time.monotonic()
+        assert _lida_de(_sessao(router)) == "primaria"
+        assert time.monotonic() - inicio < 1
+        assert router.status()[0]["saudavel"] is None
+        
+        liberar.set()
+        prazo = time.monotonic() + 2
+        while router.replicas[0].verificando and time.monotonic() < prazo:
+            time.sleep(0.01)
+        assert _lida_de(_sessao(router)) == "replica1"
+
+
+class TestRoutingSession:
+    """Tests for read-your-writes routing within a session."""
+    
+    def test_writes_pin_the_session_to_the_primary(self, engines):
+        """Test that a session reads its own writes after writing."""
+        router = ReplicaRouter(engines["primaria"], [engines["replica1"]])
+        router.verificar()
+        db = _sessao(router)
+        
+        assert _lida_de(db) == "replica1"
+        
+        db.add(Municipio(codigo_ibge="5208707", municipio="Goiânia", uf="GO"))
+        db.commit()
+        
+        assert db.na_primaria
+        assert db.query(Municipio).filter_by(codigo_ibge="5208707").count() == 1
+        with sessionmaker(bind=engines["replica1"])() as replica:
+            assert replica.query(Municipio).filter_by(codigo_ibge="5208707").count() == 0
+    
+    def test_pin_primary(self, engines):
+        """Test forcing reads to the primary."""
+        db = _sessao(ReplicaRouter(engines["primaria"], [engines["replica1"]]))
+        db.pin_primary()
+        
+        assert _lida_de(db) == "primaria"
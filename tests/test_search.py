@@ -0,0 +1,43 @@
+"""Tests for the trigram-friendly substring search builder."""
+
+import pytest
+
+from src.database.repositories import FornecedorRepository, LicitacaoRepository
+from src.database.search import contains, escape_like
+from src.exceptions import ValidationError
+from src.models import Fornecedor, Licitacao
+
+
+class TestContains:
+    """Tests for the substring filter."""
+    
+    def test_escape_like(self):
+        """Test that wildcards and the escape character are matched literally."""
+        assert escape_like("50%_off\\x") == "50\\%\\_off\\\\x"
+    
+    def test_short_terms_are_rejected(self):
+        """Test that terms without a full trigram raise a validation error."""
+        with pytest.raises(ValidationError) as erro:
+            contains(Licitacao.objeto_compra, " ab ", field="palavra_chave")
+        
+        assert erro.value.field == "palavra_chave"
+    
+    def test_wildcards_in_terms_match_literally(self, db_session):
+        """Test that a % in the term does not match everything."""
+        db_session.add_all([
+            Fornecedor(cnpj_cpf="11222333000144", razao_social="Desconto 100% Ltda"),
+            Fornecedor(cnpj_cpf="11222333000145", razao_social="Comercial 1000 Ltda"),
+        ])
+        db_session.commit()
+        
+        encontrados = FornecedorRepository(db_session).search_by_name("100%")
+        
+        assert [f.razao_social for f in encontrados] == ["Desconto 100% Ltda"]
+    
+    def test_search_is_case_insensitive(self, db_session, sample_licitacao_data):
+        """Test keyword search on the bidding object."""
+        repo = LicitacaoRepository(db_session)
+        repo.create(sample_licitacao_data)
+        
+        assert len(repo.search(palavra_chave="  MATERIAIS ")) == 1
+        assert repo.search(palavra_chave="ferro") == []
@@ -0,0 +1,100 @@
+"""Tests for the repository unit of work."""
+
+import pytest
+
+from src.database.repositories import MunicipioRepository
+from src.database.unit_of_work import UnitOfWork, current_unit_of_work, savepoint
+from src.models import Municipio, Orgao
+from src.services.identity_resolver import orgao_resolver
+
+
+def _municipio(codigo: str) -> dict:
+    return {"codigo_ibge": codigo, "municipio": f"Municipio {codigo}", "uf": "GO"}
+
+
+class TestUnitOfWork:
+    """Tests for batched repository writes."""
+    
+    def test_writes_are_committed_once_on_exit(self, db_session):
+        """Test that repository writes inside the unit share one commit."""
+        repo = MunicipioRepository(db_session)
+        
+        with UnitOfWork(db_session) as uow:
+            repo.create(_municipio("5208707"))
+            repo.create(_municipio("5201405"))
+            assert uow.pending == 2
+            assert uow.commits == 0
+        
+        assert uow.commits == 1
+        assert current_unit_of_work(db_session) is None
+        assert db_session.query(Municipio).count() == 2
+    
+    def test_batch_size_commits_along_the_way(self, db_session):
+        """Test committing every batch_size rows."""
+        repo = MunicipioRepository(db_session)
+        
+        with UnitOfWork(db_session, batch_size=2) as uow:
+            for codigo in ("5208707", "5201405", "5200050"):
+                repo.create(_municipio(codigo))
+            assert uow.commits == 1
+            assert uow.pending == 1
+        
+        assert uow.commits == 2
+    
+    def test_exception_rolls_back_pending_writes(self, db_session):
+        """Test that a failing block leaves nothing behind."""
+        repo = MunicipioRepository(db_session)
+        
+        with pytest.raises(RuntimeError):
+            with UnitOfWork(db_session):
+                repo.create(_municipio("5208707"))
+                raise RuntimeError("falha")
+        
+        assert db_session.query(Municipio).count() == 0
+        assert current_unit_of_work(db_session) is None
+    
+    def test_nested_unit_joins_the_outer_one(self, db_session):
+        """Test that an inner unit does not commit on its own."""
+        repo = MunicipioRepository(db_session)
+        
+        with UnitOfWork(db_session) as outer:
+            with UnitOfWork(db_session) as inner:
+                repo.create(_municipio("5208707"))
+            assert inner is outer
+            assert outer.commits == 0
+        
+        assert outer.commits == 1
+    
+    def test_savepoint_failure_keeps_other_writes(self, db_session):
+        """Test that a failed step only undoes its own writes."""
+        repo = MunicipioRepository(db_session)
+        
+        with UnitOfWork(db_session):
+            repo.create(_municipio("5208707"))
+            with pytest.raises(RuntimeError):
+                with savepoint(db_session):
+                    repo.create(_municipio("5201405"))
+                    raise RuntimeError("falha")
+            repo.create(_municipio("5200050"))
+        
+        codigos = {m.codigo_ibge for m in db_session.query(Municipio)}
+        assert codigos == {"5208707", "5200050"}
+    
+    def test_resolver_caches_ids_only_after_commit(self, db_session):
+        """Test that IDs of rolled back rows never reach the resolver cache."""
+        resolver = orgao_resolver()
+        
+        with pytest.raises(RuntimeError):
+            with UnitOfWork(db_session):
+                resolver.resolver_um(db_session, "11111111000111", razao_social="Prefeitura A")
+                assert resolver.stats()["em_cache"] == 0
+                raise RuntimeError("falha")
+        
+        assert db_session.query(Orgao).count() == 0
+        assert resolver.stats()["em_cache"] == 0
+        
+        with UnitOfWork(db_session):
+            orgao_id = resolver.resolver_um(db_session, "11111111000111", razao_social="Prefeitura A")
+        
+        assert resolver.stats() == {"em_cache": 1, "acertos": 0, "criados": 1}
+        assert db_session.get(Orgao, orgao_id) is not None